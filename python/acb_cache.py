@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2021 Kentaro Hara
+#
+# This software is released under the MIT License.
+# http://opensource.org/licenses/mit-license.php
+
+import argparse, hashlib, inspect, io, os, pickle, random, sys, tempfile
+import johnlawcoin
+
+#-------------------------------------------------------------------------------
+# [Result cache]
+#
+# A content-addressed on-disk cache of simulator runs. A run is keyed by the
+# simulator class, its constructor arguments, the seed and the hash of the
+# sources of johnlawcoin.py and the module that defines the simulator. The
+# cache stores the output of the run and a summary (e.g., the metrics and
+# the per-epoch logs of ACBSimulator). A sweep with a cache skips the runs
+# that have been computed, resumes after an interruption from the first run
+# that was not stored, and recomputes everything after a change of the
+# sources it depends on.
+#
+# Usage:
+#   ./acb_simulator.py --cache-dir ../cache
+#-------------------------------------------------------------------------------
+
+# Write to all of |files|. Used to print the output of a run while it is
+# recorded.
+class Tee:
+    def __init__(self, *files):
+        self.files = files
+
+    def write(self, data):
+        for file in self.files:
+            file.write(data)
+        return len(data)
+
+    def flush(self):
+        for file in self.files:
+            file.flush()
+
+
+# Return the SHA-256 of the contents of |paths|.
+def source_hash(paths):
+    hasher = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as file:
+            contents = file.read()
+        hasher.update(b"%d:" % len(contents))
+        hasher.update(contents)
+    return hasher.hexdigest()
+
+# Return the summary of an ACBSimulator run.
+def simulator_summary(simulator):
+    return {
+        "metrics": dict(simulator.metrics.__dict__),
+        "logging": simulator._logging,
+        "epoch_count": simulator.epoch_count,
+        "stopped": simulator.stopped,
+    }
+
+
+class ResultCache:
+    # Parameters
+    # ----------------
+    # |directory|: The directory of the cache. It is created if it does not
+    # exist.
+    # |sources|: The source files the results depend on in addition to
+    # johnlawcoin.py and the module of the simulator class. None to use only
+    # these two.
+    def __init__(self, directory, sources=None):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.sources = list(sources or [])
+        self.hits = 0
+        self.misses = 0
+        # A dict from the source files to their hashes.
+        self._source_hashes = {}
+        # A dict from the (class, arguments) to the number of the runs so
+        # far. Used to give repeated runs of the same arguments their own
+        # seeds.
+        self._occurrences = {}
+
+    # Return the hash of the sources |simulator_class| depends on.
+    def _sources_of(self, simulator_class):
+        paths = [inspect.getsourcefile(johnlawcoin),
+                 inspect.getsourcefile(simulator_class)] + self.sources
+        paths = tuple(dict.fromkeys([os.path.abspath(path)
+                                     for path in paths]))
+        if paths not in self._source_hashes:
+            self._source_hashes[paths] = source_hash(paths)
+        return self._source_hashes[paths]
+
+    # Return the key of a run.
+    #
+    # Parameters
+    # ----------------
+    # |simulator_class|: The class of the simulator.
+    # |arguments|: The tuple of the arguments of the constructor.
+    # |seed|: The seed of the random numbers.
+    #
+    # Returns
+    # ----------------
+    # The hex digest of the key.
+    def key(self, simulator_class, arguments, seed):
+        # The module name is not part of the key because it is "__main__"
+        # when the simulator runs as a script. The source hash covers it.
+        material = repr((simulator_class.__qualname__, tuple(arguments), seed,
+                         self._sources_of(simulator_class)))
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".pickle")
+
+    # Return the stored record of |key|, or None if it is not stored.
+    def get(self, key):
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as file:
+            return pickle.load(file)
+
+    # Store |record| as the record of |key|.
+    def put(self, key, record):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write the record atomically so that an interrupted sweep does not
+        # leave a broken record. Two workers can compute the same key (e.g.,
+        # after a lease of acb_queue expires), so every writer has its own
+        # temporary file.
+        with tempfile.NamedTemporaryFile(dir=os.path.dirname(path),
+                                         suffix=".tmp",
+                                         delete=False) as file:
+            try:
+                pickle.dump(record, file)
+            except BaseException:
+                file.close()
+                os.remove(file.name)
+                raise
+        os.replace(file.name, path)
+
+    # Run a simulation unless it is cached. The output of the run is printed
+    # either way.
+    #
+    # Parameters
+    # ----------------
+    # |simulator_class|: The class of the simulator. It must have run() and
+    # teardown().
+    # |arguments|: The tuple of the arguments of the constructor.
+    # |seed|: The seed of the first run of |arguments|. The n-th run of the
+    # same arguments uses |seed| + n so that repeated runs differ.
+    # |summarize|: A function that takes the simulator after the run and
+    # returns a picklable summary. None to store no summary.
+    #
+    # Returns
+    # ----------------
+    # The record returned by compute().
+    def run(self, simulator_class, arguments, seed=0, summarize=None):
+        arguments = tuple(arguments)
+        occurrence = (simulator_class, repr(arguments))
+        count = self._occurrences.get(occurrence, 0)
+        self._occurrences[occurrence] = count + 1
+        return self.compute(simulator_class, arguments, seed + count,
+                            summarize)
+
+    # Run a simulation with exactly |seed| unless it is cached. The output of
+    # the run is printed either way.
+    #
+    # Parameters
+    # ----------------
+    # The same as run().
+    #
+    # Returns
+    # ----------------
+    # A dict with:
+    #  - "arguments": |arguments|.
+    #  - "seed": The seed of the run.
+    #  - "output": The output of the run.
+    #  - "summary": The summary.
+    def compute(self, simulator_class, arguments, seed, summarize=None):
+        arguments = tuple(arguments)
+        key = self.key(simulator_class, arguments, seed)
+        record = self.get(key)
+        if record is not None:
+            self.hits += 1
+            sys.stdout.write(record["output"])
+            return record
+
+        self.misses += 1
+        record = self.simulate(simulator_class, arguments, seed, summarize)
+        self.put(key, record)
+        return record
+
+    # Run a simulation with exactly |seed| without looking up or storing the
+    # record. The output of the run is printed.
+    #
+    # Parameters
+    # ----------------
+    # The same as run().
+    #
+    # Returns
+    # ----------------
+    # The record in the format of compute().
+    def simulate(self, simulator_class, arguments, seed, summarize=None):
+        arguments = tuple(arguments)
+        output = io.StringIO()
+        stdout = sys.stdout
+        sys.stdout = Tee(stdout, output)
+        try:
+            random.seed(seed)
+            simulator = simulator_class(*arguments)
+            simulator.run()
+            simulator.teardown()
+        finally:
+            sys.stdout = stdout
+        record = {
+            "arguments": arguments,
+            "seed": seed,
+            "output": output.getvalue(),
+            "summary": summarize(simulator) if summarize else None,
+        }
+        return record
+
+
+# Run a simulation with |cache|, or without a cache like the simulators have
+# always run if |cache| is None.
+def run_simulation(cache, simulator_class, arguments, seed=0, summarize=None):
+    if cache is None:
+        simulator = simulator_class(*arguments)
+        simulator.run()
+        simulator.teardown()
+        return
+    cache.run(simulator_class, arguments, seed, summarize)
+
+# Parse the command line options of a simulator script that can use a result
+# cache.
+#
+# Returns
+# ----------------
+# A tuple of two values:
+#  - The ResultCache, or None if --cache-dir is not given.
+#  - The seed.
+def parse_cache_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cache-dir", default=None,
+                        help="skip the runs stored in this result cache")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="the seed of the runs with a result cache")
+    args = parser.parse_args()
+    cache = ResultCache(args.cache_dir) if args.cache_dir else None
+    return (cache, args.seed)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2021 Kentaro Hara
+#
+# This software is released under the MIT License.
+# http://opensource.org/licenses/mit-license.php
+
+from acb_cache import *
+from acb_simulator import ACBSimulator
+from oracle_simulator import OracleSimulator
+import concurrent.futures, contextlib, io, os, random, shutil, tempfile
+import unittest
+
+# A simulator that fails in the middle of the run.
+class FailingSimulator:
+    def __init__(self, value):
+        print("value=%d" % value)
+
+    def run(self):
+        assert(False)
+
+    def teardown(self):
+        pass
+
+
+class ACBCacheUnitTest(unittest.TestCase):
+    def __init__(self, voter_count):
+        super().__init__()
+        print('voter_count=%d' % voter_count)
+        self._voter_count = voter_count
+
+    def teardown(self):
+        pass
+
+    def run(self):
+        directory = tempfile.mkdtemp()
+        source = os.path.join(directory, "source.py")
+        with open(source, "w") as file:
+            file.write("# version 1\n")
+        arguments = (996, 1000, 12, 2, 7 * 24 * 60 * 60, 90, 10, 10,
+                     [6, 7, 8, 9, 10, 11, 12, 13, 14], 1, 8 * 60 * 60, 20, 3,
+                     self._voter_count, 10)
+
+        def run(cache, simulator_class, arguments, seed, summarize=None):
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                record = cache.run(simulator_class, arguments, seed, summarize)
+            self.assertEqual(output.getvalue(), record["output"])
+            return record
+
+        # The first run is computed and stored.
+        cache = ResultCache(os.path.join(directory, "cache"), [source])
+        record = run(cache, ACBSimulator, arguments, 3, simulator_summary)
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+        self.assertEqual(record["seed"], 3)
+        self.assertEqual(record["arguments"], arguments)
+        self.assertTrue("bond_price=996" in record["output"])
+        summary = record["summary"]
+        self.assertEqual(summary["epoch_count"], 10)
+        self.assertEqual(sorted(summary["logging"].epoch_logs),
+                         list(range(4, 14)))
+
+        # The run is deterministic for the seed.
+        with contextlib.redirect_stdout(io.StringIO()):
+            random.seed(3)
+            simulator = ACBSimulator(*arguments)
+            simulator.run()
+        self.assertEqual(summary["metrics"], simulator.metrics.__dict__)
+
+        # The same run of another sweep is a hit and prints the same output.
+        cache = ResultCache(os.path.join(directory, "cache"), [source])
+        hit = run(cache, ACBSimulator, arguments, 3, simulator_summary)
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+        self.assertEqual(hit["output"], record["output"])
+        self.assertEqual(hit["summary"]["metrics"], summary["metrics"])
+        for epoch_id in summary["logging"].epoch_logs:
+            self.assertEqual(
+                hit["summary"]["logging"].epoch_logs[epoch_id].__dict__,
+                summary["logging"].epoch_logs[epoch_id].__dict__)
+
+        # A repeated run of the same arguments uses the next seed.
+        repeated = run(cache, ACBSimulator, arguments, 3, simulator_summary)
+        self.assertEqual(repeated["seed"], 4)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        stored = cache.get(cache.key(ACBSimulator, arguments, 4))
+        self.assertEqual(stored["output"], repeated["output"])
+        self.assertEqual(stored["summary"]["metrics"],
+                         repeated["summary"]["metrics"])
+
+        # Other arguments and other seeds are different keys.
+        keys = set([cache.key(ACBSimulator, arguments, 3),
+                    cache.key(ACBSimulator, arguments, 4),
+                    cache.key(ACBSimulator, arguments[:-1] + (11,), 3),
+                    cache.key(OracleSimulator, arguments, 3)])
+        self.assertEqual(len(keys), 4)
+        self.assertEqual(len(cache.key(ACBSimulator, arguments, 3)), 64)
+
+        # Concurrent writers of the same key publish one of the records
+        # intact. A record that fails to pickle leaves the stored one.
+        key = cache.key(ACBSimulator, arguments, 5)
+        records = [{"output": str(index) * 100000} for index in range(8)]
+        with concurrent.futures.ThreadPoolExecutor(8) as pool:
+            list(pool.map(lambda record: cache.put(key, record), records))
+        self.assertTrue(cache.get(key) in records)
+        with self.assertRaises(Exception):
+            cache.put(key, {"output": lambda: None})
+        self.assertTrue(cache.get(key) in records)
+        self.assertEqual([name for name in os.listdir(
+            os.path.dirname(cache._path(key))) if name.endswith(".tmp")], [])
+
+        # A change of the sources invalidates the results.
+        with open(source, "w") as file:
+            file.write("# version 2\n")
+        cache = ResultCache(os.path.join(directory, "cache"), [source])
+        run(cache, ACBSimulator, arguments, 3, simulator_summary)
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+        cache = ResultCache(os.path.join(directory, "cache"), [source])
+        run(cache, ACBSimulator, arguments, 3, simulator_summary)
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+        # A simulator without a summary.
+        oracle_arguments = (4, 1, 90, self._voter_count, 5)
+        record = run(cache, OracleSimulator, oracle_arguments, 0)
+        self.assertEqual(record["summary"], None)
+        self.assertTrue(record["output"].startswith("level_max=4"))
+        cache = ResultCache(os.path.join(directory, "cache"), [source])
+        self.assertEqual(run(cache, OracleSimulator, oracle_arguments, 0),
+                         record)
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+        # A failed run is not stored, so it runs again when the sweep is
+        # resumed.
+        for i in range(2):
+            with self.assertRaises(AssertionError):
+                run(cache, FailingSimulator, (i,), 0)
+        self.assertEqual(cache.get(cache.key(FailingSimulator, (0,), 0)),
+                         None)
+        self.assertEqual(cache.misses, 2)
+
+        # Without a cache, the simulator runs as it always has.
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            run_simulation(None, OracleSimulator, oracle_arguments)
+        self.assertTrue(output.getvalue().startswith("level_max=4"))
+
+        shutil.rmtree(directory)
+
+
+def main():
+    for voter_count in [1, 10]:
+        test = ACBCacheUnitTest(voter_count)
+        test.run()
+        test.teardown()
+
+
+if __name__ == "__main__":
+    main()
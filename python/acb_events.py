@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2021 Kentaro Hara
+#
+# This software is released under the MIT License.
+# http://opensource.org/licenses/mit-license.php
+
+from johnlawcoin import *
+from acb_service import create_benchmark_acb
+import argparse, heapq, itertools, random, time
+
+#-------------------------------------------------------------------------------
+# [Discrete-event scheduler]
+#
+# Runs an ACB simulation as a sequence of timestamped events instead of whole
+# epochs. Agents schedule actions (votes, transfers, bond and coin trades or
+# anything else) at arbitrary timestamps. The scheduler runs them in timestamp
+# order (in scheduling order for the same timestamp), moves ACB.timestamp
+# forward monotonically and starts a new epoch exactly when EPOCH_DURATION
+# has elapsed since the current epoch started, instead of at the first vote
+# of the epoch. A gap with no events that spans many epochs is advanced with
+# ACB.fast_forward().
+#
+# An action is a callable. If it fails with an AssertionError (a revert in
+# the contracts), the failure is counted and the simulation continues.
+#
+# Usage:
+#   ./acb_events.py bench --events 1000000 --mean-interval 60
+#
+# The default mean interval of 60 seconds spreads the events over many
+# epochs so that the benchmark covers the epoch rollovers, the votes and the
+# open market operation of every epoch. The throughput is reported both for
+# all the events and for the events that did not revert.
+#-------------------------------------------------------------------------------
+
+class EventScheduler:
+    # Parameters
+    # ----------------
+    # |acb|: The ACB. Its current timestamp is the start of the simulation.
+    def __init__(self, acb):
+        self.acb = acb
+        self.queue = []
+        self.sequence = itertools.count()
+        # Callables called with the scheduler after every epoch rollover.
+        self.epoch_listeners = []
+        self.event_count = 0
+        self.failed_count = 0
+        self.epoch_count = 0
+
+    # Return the current timestamp.
+    def now(self):
+        return self.acb.get_timestamp()
+
+    # Schedule |action|(*|args|) at |timestamp|.
+    #
+    # Parameters
+    # ----------------
+    # |timestamp|: The timestamp. Must not be earlier than now().
+    # |action|: The callable.
+    # |args|: The arguments passed to |action|.
+    #
+    # Returns
+    # ----------------
+    # None.
+    def schedule(self, timestamp, action, *args):
+        assert(timestamp >= self.acb.get_timestamp())
+        heapq.heappush(self.queue,
+                       (timestamp, next(self.sequence), action, args))
+
+    # Schedule |action|(*|args|) |delay| seconds after now().
+    def schedule_after(self, delay, action, *args):
+        self.schedule(self.acb.get_timestamp() + delay, action, *args)
+
+    # Run the events scheduled up to |until|. The events the actions schedule
+    # meanwhile are run too if they are not later than |until|.
+    #
+    # Parameters
+    # ----------------
+    # |until|: The timestamp to stop at. The ACB timestamp is |until| when
+    # this returns.
+    # |max_events|: Stop after this many events if not None. The ACB
+    # timestamp is then the timestamp of the last event.
+    #
+    # Returns
+    # ----------------
+    # The number of events run.
+    def run(self, until, max_events=None):
+        acb = self.acb
+        queue = self.queue
+        count = 0
+        while queue and queue[0][0] <= until:
+            if max_events is not None and count >= max_events:
+                self.event_count += count
+                return count
+            (timestamp, sequence, action, args) = heapq.heappop(queue)
+            if (timestamp >=
+                acb.current_epoch_start + ACB.EPOCH_DURATION):
+                self.roll_over(timestamp)
+            acb.set_timestamp(timestamp)
+            try:
+                action(*args)
+            except AssertionError:
+                self.failed_count += 1
+            count += 1
+        self.event_count += count
+        self.roll_over(until)
+        acb.set_timestamp(until)
+        return count
+
+    # Start the epochs whose start timestamps are not later than
+    # |timestamp|. Each epoch starts exactly EPOCH_DURATION after the
+    # previous one.
+    def roll_over(self, timestamp):
+        acb = self.acb
+        n_epochs = ((timestamp - acb.current_epoch_start) //
+                    ACB.EPOCH_DURATION)
+        if n_epochs <= 0:
+            return
+        acb.set_timestamp(acb.current_epoch_start +
+                          n_epochs * ACB.EPOCH_DURATION)
+        if n_epochs > 4:
+            acb.fast_forward(n_epochs)
+        else:
+            for i in range(n_epochs):
+                acb.advance_epoch(acb.current_epoch_start + ACB.EPOCH_DURATION)
+        self.epoch_count += n_epochs
+        for listener in self.epoch_listeners:
+            listener(self)
+
+
+# An agent that acts at exponentially distributed intervals (a Poisson
+# process).
+class PoissonAgent:
+    # Parameters
+    # ----------------
+    # |scheduler|: The EventScheduler.
+    # |mean_interval|: The mean interval between actions in seconds.
+    # |act|: The callable called with the scheduler at every arrival.
+    # |rng|: The random.Random to draw the intervals from.
+    def __init__(self, scheduler, mean_interval, act, rng=random):
+        self.scheduler = scheduler
+        self.rate = 1 / mean_interval
+        self.act = act
+        self.rng = rng
+        self.arrive_next()
+
+    def arrive(self):
+        # Schedule the next arrival first so that a failing action does not
+        # stop the agent.
+        self.arrive_next()
+        self.act(self.scheduler)
+
+    def arrive_next(self):
+        self.scheduler.schedule_after(int(self.rng.expovariate(self.rate)),
+                                      self.arrive)
+
+
+# Records the Dutch auction price of the open market operation at every
+# price change.
+class PriceRecorder:
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        # A list of (timestamp, epoch ID, coin budget, price).
+        self.path = []
+        scheduler.epoch_listeners.append(lambda scheduler: self.sample())
+        self.sample()
+
+    def sample(self):
+        acb = self.scheduler.acb
+        elapsed_time = acb.get_timestamp() - acb.current_epoch_start
+        open_market_operation = acb.open_market_operation
+        self.path.append((acb.get_timestamp(), acb.oracle.epoch_id,
+                          open_market_operation.coin_budget,
+                          open_market_operation.get_current_price(
+                              elapsed_time)))
+        # The price stops changing after PRICE_CHANGE_MAX changes.
+        interval = open_market_operation.get_price_interval(elapsed_time)
+        if interval >= OpenMarketOperation.PRICE_CHANGE_MAX:
+            return
+        next_change = acb.current_epoch_start + (interval + 1) * (
+            OpenMarketOperation.PRICE_CHANGE_INTERVAL)
+        if next_change < acb.current_epoch_start + ACB.EPOCH_DURATION:
+            self.scheduler.schedule(next_change, self.sample)
+
+
+# Set up a market with |account_count| accounts that vote once per epoch and
+# transfer, trade bonds and exchange coins as Poisson processes.
+#
+# Parameters
+# ----------------
+# |scheduler|: The EventScheduler. Accounts 1 to |account_count| must have
+# coins.
+# |account_count|: The number of accounts.
+# |mean_interval|: The mean interval in seconds between the actions of the
+# market as a whole.
+# |rng|: The random.Random to use.
+#
+# Returns
+# ----------------
+# The list of the agents.
+def create_market(scheduler, account_count, mean_interval, rng):
+    acb = scheduler.acb
+    accounts = list(range(1, account_count + 1))
+    salts = {}
+
+    def vote(account):
+        level = rng.randint(0, Oracle.LEVEL_MAX - 1)
+        salt = rng.randint(0, 1000000)
+        (revealed_level, revealed_salt) = salts.get(account, (0, 0))
+        acb.vote(account, acb.encrypt(account, level, salt),
+                 revealed_level, revealed_salt)
+        salts[account] = (level, salt)
+
+    def schedule_votes(scheduler):
+        for account in accounts:
+            scheduler.schedule_after(
+                rng.randint(0, ACB.EPOCH_DURATION - 1), vote, account)
+
+    def transfer(scheduler):
+        sender = rng.choice(accounts)
+        acb.coin.transfer(sender, rng.choice(accounts),
+                          rng.randint(0, acb.coin.balance_of(sender) // 10))
+
+    def purchase_bonds(scheduler):
+        acb.purchase_bonds(rng.choice(accounts), rng.randint(1, 10))
+
+    def redeem_bonds(scheduler):
+        acb.redeem_all_eligible(rng.choice(accounts))
+
+    def purchase_coins(scheduler):
+        open_market_operation = acb.open_market_operation
+        price = open_market_operation.get_current_price(
+            acb.get_timestamp() - acb.current_epoch_start)
+        acb.purchase_coins(rng.choice(accounts), price * rng.randint(1, 100))
+
+    def sell_coins(scheduler):
+        acb.sell_coins(rng.choice(accounts), rng.randint(1, 100))
+
+    scheduler.epoch_listeners.append(schedule_votes)
+    schedule_votes(scheduler)
+    # The share of each action in the market.
+    actions = [(transfer, 50), (purchase_bonds, 10), (redeem_bonds, 10),
+               (purchase_coins, 15), (sell_coins, 15)]
+    return [PoissonAgent(scheduler, mean_interval * 100 / share, act, rng)
+            for (act, share) in actions]
+
+def run_benchmark(event_count, account_count, mean_interval, seed):
+    rng = random.Random(seed)
+    acb = create_benchmark_acb(account_count)
+    scheduler = EventScheduler(acb)
+    create_market(scheduler, account_count, mean_interval, rng)
+    prices = PriceRecorder(scheduler)
+    start = time.time()
+    while scheduler.event_count < event_count:
+        scheduler.run(acb.get_timestamp() + ACB.EPOCH_DURATION,
+                      event_count - scheduler.event_count)
+    elapsed = time.time() - start
+    succeeded = scheduler.event_count - scheduler.failed_count
+    return {
+        "events": scheduler.event_count,
+        "failed": scheduler.failed_count,
+        "epochs": scheduler.epoch_count,
+        "price_samples": len(prices.path),
+        "events_per_minute": scheduler.event_count / elapsed * 60,
+        "succeeded_events_per_minute": succeeded / elapsed * 60,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    bench_parser = subparsers.add_parser(
+        "bench", help="measure the event throughput")
+    bench_parser.add_argument("--events", type=int, default=1000000)
+    bench_parser.add_argument("--accounts", type=int, default=100)
+    bench_parser.add_argument("--mean-interval", type=float, default=60,
+                              help="the mean seconds between market actions")
+    bench_parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    result = run_benchmark(args.events, args.accounts, args.mean_interval,
+                           args.seed)
+    print("events=%d failed=%d epochs=%d price_samples=%d "
+          "%.0f events/min %.0f non-reverting events/min" % (
+              result["events"], result["failed"], result["epochs"],
+              result["price_samples"], result["events_per_minute"],
+              result["succeeded_events_per_minute"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2021 Kentaro Hara
+#
+# This software is released under the MIT License.
+# http://opensource.org/licenses/mit-license.php
+
+from johnlawcoin import *
+from acb_events import *
+from acb_service import create_benchmark_acb
+import copy, random, unittest
+
+class ACBEventsUnitTest(unittest.TestCase):
+    def __init__(self, mean_interval, gap_epochs):
+        super().__init__()
+        print('mean_interval=%d gap_epochs=%d' % (mean_interval, gap_epochs))
+        self._mean_interval = mean_interval
+        self._gap_epochs = gap_epochs
+
+    def teardown(self):
+        pass
+
+    def run(self):
+        acb = create_benchmark_acb(4)
+        scheduler = EventScheduler(acb)
+        duration = ACB.EPOCH_DURATION
+        start = acb.current_epoch_start
+
+        # Events run in timestamp order, and in scheduling order for the same
+        # timestamp.
+        log = []
+        for (timestamp, name) in [(30, "c"), (10, "a"), (30, "d"), (20, "b"),
+                                  (10, "b2")]:
+            scheduler.schedule(start + timestamp, log.append, name)
+        scheduler.schedule_after(5, lambda: scheduler.schedule_after(
+            5, log.append, "a0"))
+        self.assertEqual(scheduler.run(start + 25), 5)
+        self.assertEqual(log, ["a", "b2", "a0", "b"])
+        self.assertEqual(scheduler.now(), start + 25)
+        with self.assertRaises(Exception):
+            scheduler.schedule(start + 24, log.append, "x")
+        self.assertEqual(scheduler.run(start + 30), 2)
+        self.assertEqual(log, ["a", "b2", "a0", "b", "c", "d"])
+
+        # A failing action is counted.
+        scheduler.schedule_after(0, acb.coin.transfer, 1, 2, 10 ** 18)
+        self.assertEqual(scheduler.run(scheduler.now()), 1)
+        self.assertEqual(scheduler.failed_count, 1)
+        self.assertEqual(scheduler.event_count, 8)
+
+        # An epoch starts exactly when EPOCH_DURATION elapses, even if no
+        # one votes.
+        epoch_id = acb.oracle.epoch_id
+        starts = []
+        scheduler.epoch_listeners.append(
+            lambda scheduler: starts.append(scheduler.acb.current_epoch_start))
+        scheduler.schedule(start + duration - 1, log.append, "e")
+        scheduler.schedule(start + duration, lambda: log.append(
+            acb.get_timestamp() - acb.current_epoch_start))
+        scheduler.run(start + duration + 1)
+        self.assertEqual(log[-2:], ["e", 0])
+        self.assertEqual(acb.oracle.epoch_id, epoch_id + 1)
+        self.assertEqual(starts, [start + duration])
+        self.assertEqual(acb.vote(1, ACB.NULL_HASH, 0, 0)[5], False)
+
+        # A gap without events is the same as starting every epoch on time.
+        expected = copy.deepcopy(acb)
+        for i in range(self._gap_epochs):
+            expected.advance_epoch(expected.current_epoch_start + duration)
+        end = acb.current_epoch_start + self._gap_epochs * duration + 7
+        epoch_id = acb.oracle.epoch_id
+        scheduler.run(end)
+        self.assertEqual(acb.oracle.epoch_id, epoch_id + self._gap_epochs)
+        self.assertEqual(acb.current_epoch_start,
+                         start + (self._gap_epochs + 1) * duration)
+        self.assertEqual(acb.get_timestamp(), end)
+        self.assertEqual(scheduler.epoch_count, self._gap_epochs + 1)
+        self.assertEqual(acb.oracle.epoch_id, expected.oracle.epoch_id)
+        self.assertEqual(acb.current_epoch_start,
+                         expected.current_epoch_start)
+        self.assertEqual(acb.oracle_level, expected.oracle_level)
+        self.assertEqual(acb.coin.balances, expected.coin.balances)
+        self.assertEqual(acb.coin.total_supply, expected.coin.total_supply)
+        self.assertEqual(acb.bond_operation.bond_budget,
+                         expected.bond_operation.bond_budget)
+        self.assertEqual(acb.open_market_operation.coin_budget,
+                         expected.open_market_operation.coin_budget)
+
+        # A market of Poisson agents. The coins are conserved and the price
+        # moves only at the price changes of the Dutch auction.
+        rng = random.Random(self._mean_interval)
+        acb = create_benchmark_acb(20)
+        scheduler = EventScheduler(acb)
+        agents = create_market(scheduler, 20, self._mean_interval, rng)
+        self.assertEqual(len(agents), 5)
+        prices = PriceRecorder(scheduler)
+        epoch_count = 4
+        scheduler.run(acb.get_timestamp() + epoch_count * duration)
+        self.assertEqual(scheduler.epoch_count, epoch_count)
+        self.assertEqual(acb.oracle.epoch_id, 3 + epoch_count)
+        self.assertTrue(scheduler.event_count >
+                        epoch_count * duration / self._mean_interval / 2)
+        self.assertTrue(scheduler.failed_count < scheduler.event_count)
+        self.assertEqual(sum(acb.coin.balances.values()),
+                         acb.coin.total_supply)
+        epoch_log = acb.logging.epoch_logs[acb.oracle.epoch_id - 1]
+        self.assertEqual(epoch_log.current_epoch_start,
+                         acb.current_epoch_start - duration)
+        self.assertEqual(
+            len(prices.path),
+            epoch_count * (((duration - 1) // OpenMarketOperation.
+                            PRICE_CHANGE_INTERVAL) + 1) + 1)
+        for (previous, sample) in zip(prices.path, prices.path[1:]):
+            self.assertTrue(sample[0] > previous[0])
+            if sample[1] != previous[1]:
+                continue
+            self.assertEqual(sample[2] > 0, previous[2] > 0)
+            if sample[2] > 0:
+                self.assertTrue(sample[3] <= previous[3])
+            elif sample[2] < 0:
+                self.assertTrue(sample[3] >= previous[3])
+
+
+def main():
+    for mean_interval in [60, 600]:
+        for gap_epochs in [0, 1, 4, 5, 100]:
+            test = ACBEventsUnitTest(mean_interval, gap_epochs)
+            test.run()
+            test.teardown()
+
+
+if __name__ == "__main__":
+    main()
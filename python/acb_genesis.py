@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2021 Kentaro Hara
+#
+# This software is released under the MIT License.
+# http://opensource.org/licenses/mit-license.php
+
+from acb_simulator import ACBSimulator
+import contextlib, io, multiprocessing, multiprocessing.connection, os
+import random, traceback
+
+#-------------------------------------------------------------------------------
+# [Genesis simulators]
+#
+# Builds the ACBSimulator of every configuration once and runs the seeded
+# simulations of the configuration in processes forked from the builder. A
+# forked process shares the pages of the built simulators with the builder
+# and the other forked processes, and copies a page only when it writes to
+# it (copy-on-write), so a simulation starts without constructing the
+# JohnLawCoin, the Oracle and the voters again.
+#
+# Constructing a simulator draws random numbers for the names of the
+# internal accounts of the contracts. A forked simulation skips as many
+# random numbers after random.seed(), so it makes the same random decisions
+# and ends with the same metrics as a simulation that constructs its own
+# simulator after random.seed(). Only the names of the internal accounts,
+# and thus the state hashes, differ.
+#
+# Only the startup is saved. A simulation touches every voter and Python
+# writes the reference counts of the objects it touches, so a forked process
+# ends up with a private copy of most of the pages anyway. The built
+# simulators are not copied in the workers instead because unpickling or
+# deep-copying a simulator with many voters is slower than constructing it.
+#
+# Forking needs os.fork(), so this runs on POSIX only.
+#-------------------------------------------------------------------------------
+
+class Genesis:
+    # Parameters
+    # ----------------
+    # |configurations|: A list of the arguments of ACBSimulator.
+    def __init__(self, configurations):
+        # The built simulators of |configurations|. They are never run in
+        # this process.
+        self.simulators = []
+        # The numbers of the random numbers the constructions drew.
+        self.draws = []
+        state = random.getstate()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for arguments in configurations:
+                random.seed(0)
+                self.simulators.append(ACBSimulator(*arguments))
+                constructed = random.getstate()
+                random.seed(0)
+                draws = 0
+                while random.getstate() != constructed:
+                    random.random()
+                    draws += 1
+                self.draws.append(draws)
+        random.setstate(state)
+        # A dict from the connections of the running processes to their keys
+        # and process IDs.
+        self.running = {}
+
+    # Return the number of the running simulations.
+    def __len__(self):
+        return len(self.running)
+
+    # Start a simulation in a forked process.
+    #
+    # Parameters
+    # ----------------
+    # |key|: The key wait() returns with the result.
+    # |index|: The index of the configuration.
+    # |seed|: The seed of the random numbers of the simulation.
+    # |function|: A function that takes the simulator, runs it and returns a
+    # picklable result. It is called in the forked process, so it need not
+    # be picklable.
+    #
+    # Returns
+    # ----------------
+    # None.
+    def start(self, key, index, seed, function):
+        (reader, writer) = multiprocessing.Pipe(False)
+        pid = os.fork()
+        if pid == 0:
+            try:
+                reader.close()
+                simulator = self.simulators[index]
+                # The contracts keep their constants in class attributes,
+                # which the last built simulator set.
+                simulator.override_constants(
+                    simulator._oracle, simulator._bond_operation,
+                    simulator._open_market_operation, simulator._acb)
+                random.seed(seed)
+                for _ in range(self.draws[index]):
+                    random.random()
+                writer.send((True, function(simulator)))
+            except BaseException:
+                writer.send((False, traceback.format_exc()))
+            finally:
+                # Exit without running the cleanup of the builder, which
+                # belongs to the builder.
+                os._exit(0)
+        writer.close()
+        self.running[reader] = (key, pid)
+
+    # Wait until at least one of the running simulations finishes.
+    #
+    # Returns
+    # ----------------
+    # A list of (key, result) of the finished simulations. A failure of a
+    # simulation is raised as a RuntimeError with its traceback.
+    def wait(self):
+        assert(self.running)
+        finished = []
+        errors = []
+        for reader in multiprocessing.connection.wait(list(self.running)):
+            (key, pid) = self.running.pop(reader)
+            try:
+                (succeeded, result) = reader.recv()
+            except EOFError:
+                (succeeded, result) = (False, "the process %d died" % pid)
+            reader.close()
+            os.waitpid(pid, 0)
+            if succeeded:
+                finished.append((key, result))
+            else:
+                errors.append(result)
+        if errors:
+            raise RuntimeError(errors[0])
+        return finished
+
+    # Run simulations and return their results.
+    #
+    # Parameters
+    # ----------------
+    # |function|: The function passed to start().
+    # |jobs|: A list of (index of the configuration, seed).
+    # |processes|: The number of the simulations that run at the same time.
+    #
+    # Returns
+    # ----------------
+    # The list of the results of |jobs|.
+    def map(self, function, jobs, processes=1):
+        assert(processes >= 1)
+        results = {}
+        for (key, (index, seed)) in enumerate(jobs):
+            if len(self) >= processes:
+                results.update(self.wait())
+            self.start(key, index, seed, function)
+        while self.running:
+            results.update(self.wait())
+        return [results[key] for key in range(len(jobs))]
+
+    # Wait for the running simulations and release the built simulators.
+    def close(self):
+        while self.running:
+            try:
+                self.wait()
+            except RuntimeError:
+                pass
+        self.simulators = []
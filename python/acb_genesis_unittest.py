@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2021 Kentaro Hara
+#
+# This software is released under the MIT License.
+# http://opensource.org/licenses/mit-license.php
+
+from acb_genesis import *
+from acb_replication import replicate, run_replication
+import unittest
+
+# Return the total coin supply and the random state after a simulation.
+def supply(simulator):
+    replicate(simulator)
+    return (simulator._coin.total_supply, simulator.epoch_count,
+            random.getstate())
+
+# Fail in the forked process.
+def fail(simulator):
+    assert(False)
+
+class ACBGenesisUnitTest(unittest.TestCase):
+    def __init__(self, processes):
+        super().__init__()
+        print('processes=%d' % processes)
+        self._processes = processes
+
+    def teardown(self):
+        pass
+
+    def run(self):
+        def configuration(bond_price, damping_factor, voter_count):
+            return (bond_price, 1000, 12, 2, 7 * 24 * 60 * 60, 90, 10,
+                    damping_factor, [6, 7, 8, 9, 10, 11, 12, 13, 14], 1,
+                    8 * 60 * 60, 20, 3, voter_count, 20)
+        configurations = [configuration(996, 10, 10),
+                          configuration(800, 90, 20),
+                          configuration(1000, 10, 0)]
+
+        state = random.getstate()
+        genesis = Genesis(configurations)
+        # The construction does not change the random numbers of the caller.
+        self.assertEqual(random.getstate(), state)
+        self.assertEqual(len(genesis.simulators), 3)
+        self.assertTrue(all([draws > 0 for draws in genesis.draws]))
+
+        # The forked simulations end the same as the simulations that
+        # construct their own simulators.
+        jobs = [(index, seed) for seed in range(4) for index in range(3)]
+        results = genesis.map(supply, jobs, self._processes)
+        for ((index, seed), result) in zip(jobs, results):
+            random.seed(seed)
+            with contextlib.redirect_stdout(io.StringIO()):
+                simulator = ACBSimulator(*configurations[index])
+            self.assertEqual(result, supply(simulator))
+        self.assertEqual(genesis.map(replicate, jobs, self._processes),
+                         [run_replication((configurations[index], seed))
+                          for (index, seed) in jobs])
+        self.assertEqual(len(genesis), 0)
+
+        # The built simulators are not run in this process.
+        for simulator in genesis.simulators:
+            self.assertFalse(hasattr(simulator, "epoch_count"))
+            self.assertEqual(sum([voter.balance
+                                  for voter in simulator._voters]), 0)
+
+        # start() and wait() return the results with their keys.
+        genesis.start("a", 1, 5, supply)
+        genesis.start("b", 0, 5, supply)
+        results = {}
+        while len(genesis):
+            results.update(genesis.wait())
+        self.assertEqual(results, {"a": genesis.map(supply, [(1, 5)])[0],
+                                   "b": genesis.map(supply, [(0, 5)])[0]})
+
+        # A failure in a forked process is raised with its traceback.
+        with self.assertRaises(RuntimeError) as context:
+            genesis.map(fail, [(0, 0), (1, 0)], self._processes)
+        self.assertTrue("AssertionError" in str(context.exception))
+        genesis.close()
+        self.assertEqual(len(genesis), 0)
+        self.assertEqual(genesis.simulators, [])
+
+
+def main():
+    for processes in [1, 3]:
+        test = ACBGenesisUnitTest(processes)
+        test.run()
+        test.teardown()
+
+
+if __name__ == "__main__":
+    main()
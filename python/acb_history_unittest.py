@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2021 Kentaro Hara
+#
+# This software is released under the MIT License.
+# http://opensource.org/licenses/mit-license.php
+
+from johnlawcoin import *
+import random, unittest
+
+PARAMS = [996, 1000, 12, 2, 7 * 24 * 60 * 60, 90, 10, 10,
+          [6, 7, 8, 9, 10, 11, 12, 13, 14], 1, 8 * 60 * 60, 20, 3]
+
+class ACBHistoryUnitTest(unittest.TestCase):
+    def __init__(self, account_count, retention):
+        super().__init__()
+        print('account_count=%d retention=%s' % (account_count, retention))
+        self._account_count = account_count
+        self._retention = retention
+
+    def teardown(self):
+        pass
+
+    def run(self):
+        # LedgerHistory.
+        history = LedgerHistory(5, {"a": 1, "b": 2})
+        history.record("a", 3)
+        history.record("a", 4)
+        history.advance(7)
+        history.record("a", 0)
+        history.record("c", 6)
+        history.advance(8)
+        self.assertEqual([history.balance_at("a", epoch)
+                          for epoch in range(5, 9)], [4, 4, 0, 0])
+        self.assertEqual([history.balance_at("b", epoch)
+                          for epoch in range(5, 9)], [2, 2, 2, 2])
+        self.assertEqual([history.balance_at("c", epoch)
+                          for epoch in range(5, 9)], [0, 0, 6, 6])
+        self.assertEqual(history.change_count(), 3)
+        history.compact(6)
+        self.assertEqual(history.checkpoint_epoch, 6)
+        self.assertEqual(history.checkpoint, {"a": 4, "b": 2})
+        self.assertEqual(history.change_count(), 2)
+        self.assertEqual([history.balance_at("a", epoch)
+                          for epoch in range(6, 9)], [4, 0, 0])
+        history.compact(8)
+        self.assertEqual(history.checkpoint, {"b": 2, "c": 6})
+        self.assertEqual(history.changes, {})
+        with self.assertRaises(AssertionError):
+            history.balance_at("a", 7)
+        history = LedgerHistory(0, {}, retention=2)
+        for epoch in range(1, 10):
+            history.advance(epoch)
+            history.record("a", epoch)
+            self.assertLess(epoch - history.checkpoint_epoch, 4)
+            self.assertEqual(history.balance_at("a", epoch - 1), epoch - 1)
+
+        # Run an ACB with the history and compare the balances at the end of
+        # every epoch with the recorded ones.
+        rng = random.Random(self._account_count)
+        genesis = "0x00000000000000000000000000000000000000a0"
+        accounts = [genesis] + ["0x%040x" % (index + 1)
+                                for index in range(self._account_count)]
+        acb = create_acb(genesis, *PARAMS)
+        coin = acb.coin
+        bond = acb.bond_operation.bond
+        for account in accounts[1:]:
+            coin.transfer(genesis, account, rng.randint(0, 100000))
+        acb.record_history(self._retention)
+        expected = {}
+        redemption_epochs = set()
+        for epoch in range(20):
+            if epoch == 10:
+                acb.set_timestamp(acb.get_timestamp() +
+                                  8 * ACB.EPOCH_DURATION)
+                acb.fast_forward(8)
+                self.assertEqual(bond.history.epoch, acb.oracle.epoch_id)
+            else:
+                acb.set_timestamp(acb.get_timestamp() + ACB.EPOCH_DURATION)
+            for account in accounts:
+                (level, salt) = (rng.randint(0, 8), rng.randint(0, 10))
+                acb.vote(account, acb.encrypt(account, level, salt),
+                         level, salt)
+            self.assertEqual(coin.history.epoch, acb.oracle.epoch_id)
+            # Let the accounts purchase bonds whatever the oracle level is.
+            acb.bond_operation.bond_budget = max(
+                acb.bond_operation.bond_budget, 100)
+            requests = []
+            for account in accounts:
+                action = rng.randint(0, 3)
+                try:
+                    if action == 0:
+                        coin.transfer(account, rng.choice(accounts),
+                                      rng.randint(0, 1000))
+                    elif action == 1:
+                        redemption_epochs.add(acb.purchase_bonds(
+                            account, rng.randint(1, 10)))
+                    elif action == 2:
+                        acb.redeem_bonds(account, sorted(redemption_epochs))
+                    else:
+                        requests.append((account, rng.randint(1, 3)))
+                except AssertionError:
+                    pass
+            if acb.bond_operation.bond_budget >= sum(
+                    [count for (account, count) in requests]):
+                (redemption_epoch, purchased) = acb.purchase_bonds_many(
+                    requests)
+                redemption_epochs.add(redemption_epoch)
+            epoch_id = acb.oracle.epoch_id
+            expected[epoch_id] = (
+                {account: coin.balance_of(account) for account in accounts},
+                {(account, redemption_epoch):
+                 bond.balance_of(account, redemption_epoch)
+                 for account in accounts
+                 for redemption_epoch in redemption_epochs},
+                {account: bond.number_of_bonds_owned_by(account)
+                 for account in accounts})
+
+            for (past_epoch, (balances, bonds, counts)) in expected.items():
+                if past_epoch < coin.history.checkpoint_epoch:
+                    with self.assertRaises(AssertionError):
+                        coin.balance_of_at(genesis, past_epoch)
+                    continue
+                for (account, balance) in balances.items():
+                    self.assertEqual(coin.balance_of_at(account, past_epoch),
+                                     balance)
+                for ((account, redemption_epoch), count) in bonds.items():
+                    self.assertEqual(bond.balance_of_at(
+                        account, redemption_epoch, past_epoch), count)
+                for (account, count) in counts.items():
+                    self.assertEqual(bond.number_of_bonds_owned_by_at(
+                        account, past_epoch), count)
+            if self._retention is not None:
+                self.assertLess(acb.oracle.epoch_id -
+                                coin.history.checkpoint_epoch,
+                                2 * self._retention)
+                self.assertLessEqual(
+                    coin.history.checkpoint_epoch, acb.oracle.epoch_id -
+                    min(self._retention, len(expected) - 1))
+        self.assertTrue(any([any(counts.values())
+                             for (balances, bonds, counts)
+                             in expected.values()]))
+
+        # The history is not recorded by default.
+        acb_without_history = create_acb(genesis, *PARAMS)
+        self.assertEqual(acb_without_history.coin.history, None)
+        self.assertEqual(acb_without_history.bond_operation.bond.history,
+                         None)
+
+
+def main():
+    for account_count in [1, 10]:
+        for retention in [None, 1, 3]:
+            test = ACBHistoryUnitTest(account_count, retention)
+            test.run()
+            test.teardown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,492 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2021 Kentaro Hara
+#
+# This software is released under the MIT License.
+# http://opensource.org/licenses/mit-license.php
+
+from johnlawcoin import *
+import argparse, csv, json, os, pickle, sys, time
+
+#-------------------------------------------------------------------------------
+# [Event log ingestion]
+#
+# Feeds the history of the deployed contracts into the Python model to
+# reconcile the model with production. The history is an export of the events
+# of the ACB and JohnLawCoin contracts written by a node as a JSON Lines or CSV
+# file. Every event that corresponds to a call is applied to an ACB at the
+# timestamp of its block, and what the model returns is compared with what
+# the event logged.
+#
+# A record has the name of the event in "event", the timestamp of the block
+# in "timestamp" and the arguments of the event by name. A CSV file has a
+# header row and leaves the columns of the other events empty. The records
+# are:
+#
+#   TransferEvent: sender, receiver, amount, tax
+#   VoteEvent: sender, epoch_id, hash, oracle_level, salt, commit_result,
+#     reveal_result, deposited, reclaimed, rewarded, epoch_updated
+#   UpdateEpochEvent: epoch_id, current_epoch_start, tax, burned, delta, mint
+#   PurchaseBondsEvent: sender, epoch_id, purchased_bonds, redemption_epoch
+#   RedeemBondsEvent: sender, epoch_id, redeemed_bonds, expired_bonds,
+#     redemption_epochs
+#   PurchaseCoinsEvent: sender, requested_eth_amount, eth_amount, coin_amount
+#   SellCoinsEvent: sender, requested_coin_amount, eth_amount, coin_amount
+#   Transfer: from, to, value (the ERC20 event of JohnLawCoin)
+#
+# Every record can have the hash of its transaction in "transaction".
+#
+# RedeemBondsEvent does not log which bonds were redeemed, so the exporter
+# adds |redemption_epochs| from the input of the transaction (separated by
+# spaces in a CSV file, where an empty list is an empty cell). Integers can
+# be strings because uint256 values do not fit in a double. The events the
+# other contracts emit during these calls (MintEvent, CommitEvent,
+# UpdateBondBudgetEvent, ...) are skipped.
+#
+# UpdateEpochEvent is emitted by the vote that starts the epoch, before its
+# VoteEvent. It is compared with the epoch log of the model after the vote.
+#
+# JohnLawCoin emits the ERC20 Transfer event for every coin movement,
+# including the ones inside the calls above (the tax and the amount of a
+# transfer, the deposits and rewards of a vote, ...). Those are applied by
+# the call, so a Transfer is skipped if it mints or burns coins (|from| or
+# |to| is the zero address) or if a call event of the same transaction
+# follows it. The other Transfers come from ERC20's transferFrom, which
+# JohnLawCoin does not override: it moves the coins without the tax and
+# emits no TransferEvent. They are applied as moves once their transaction
+# has ended. Without transaction hashes, a Transfer is paired with the next
+# call event of the same block, so a transferFrom followed by a call in the
+# same block is skipped. An export has to end at the end of a transaction.
+#
+# The model cannot compute the keccak256 hashes committed to the contracts,
+# so a revealed level and salt match the committed hash exactly when the
+# VoteEvent logged that the reveal succeeded (see IngestOracle). The other
+# conditions of the reveal (the phase, the epoch and the level) are checked
+# as usual.
+#
+# The records flow through generators (read_records() -> parse_events() ->
+# Ingestor.apply()), so the memory does not grow with the length of the
+# export. Every |checkpoint_every| events and at the end of the file, the
+# ingestor and the position in the file are written to the checkpoint file.
+# The next ingestion resumes from there, so an export that grows can be
+# ingested incrementally.
+#
+# Usage:
+#   ./acb_ingest.py events.jsonl --genesis-account 0x... \
+#       --timestamp 1612137600 --checkpoint events.checkpoint
+#-------------------------------------------------------------------------------
+
+# The arguments of the applied events.
+EVENT_FIELDS = {
+    "TransferEvent": ["sender", "receiver", "amount", "tax"],
+    "VoteEvent": ["sender", "epoch_id", "hash", "oracle_level", "salt",
+                  "commit_result", "reveal_result", "deposited", "reclaimed",
+                  "rewarded", "epoch_updated"],
+    "UpdateEpochEvent": ["epoch_id", "current_epoch_start", "tax", "burned",
+                         "delta", "mint"],
+    "PurchaseBondsEvent": ["sender", "epoch_id", "purchased_bonds",
+                           "redemption_epoch"],
+    "RedeemBondsEvent": ["sender", "epoch_id", "redeemed_bonds",
+                         "expired_bonds", "redemption_epochs"],
+    "PurchaseCoinsEvent": ["sender", "requested_eth_amount", "eth_amount",
+                           "coin_amount"],
+    "SellCoinsEvent": ["sender", "requested_coin_amount", "eth_amount",
+                       "coin_amount"],
+    "Transfer": ["from", "to", "value"],
+}
+
+def parse_account(value):
+    return str(value).lower()
+
+def is_zero_account(account):
+    return account.replace("0x", "", 1).strip("0") == ""
+
+def parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    assert(str(value).lower() in ["true", "false", "1", "0"])
+    return str(value).lower() in ["true", "1"]
+
+def parse_hash(value):
+    hash = str(value).lower()
+    if int(hash, 16) == 0:
+        return ACB.NULL_HASH
+    return hash
+
+def parse_epochs(value):
+    if isinstance(value, list):
+        return [int(epoch) for epoch in value]
+    return [int(epoch) for epoch in str(value).split()]
+
+# The parsers of the arguments. The other arguments are integers.
+FIELD_PARSERS = {
+    "sender": parse_account,
+    "receiver": parse_account,
+    "from": parse_account,
+    "to": parse_account,
+    "hash": parse_hash,
+    "commit_result": parse_bool,
+    "reveal_result": parse_bool,
+    "epoch_updated": parse_bool,
+    "redemption_epochs": parse_epochs,
+}
+
+# An Oracle whose reveal matches the committed hash if |revealed| is True.
+class IngestOracle(Oracle):
+    def __init__(self):
+        super().__init__()
+        self.revealed = False
+
+    def encrypt(self, sender, level, salt):
+        if not self.revealed:
+            return None
+        return self.epochs[(self.epoch_id - 1) % 3].commits[sender].hash
+
+
+# Create an ACB as deployed.
+#
+# Parameters
+# ----------------
+# |genesis_account|: The account the initial coins are minted to.
+# |timestamp|: The timestamp of the deployment.
+# |params|: The first 13 parameters of ACBSimulator to override the
+# constants, or None to use the constants of the contracts.
+#
+# Returns
+# ----------------
+# The ACB.
+def create_deployed_acb(genesis_account, timestamp, params=None):
+    if params is None:
+        acb = ACB(JohnLawCoin(genesis_account), IngestOracle(),
+                  BondOperation(JohnLawBond()), OpenMarketOperation(),
+                  EthPool(), Logging())
+    else:
+        acb = create_acb(genesis_account, *params,
+                         oracle_class=IngestOracle)
+    acb.set_timestamp(timestamp)
+    acb.current_epoch_start = timestamp
+    return acb
+
+# Read the records of an export.
+#
+# Parameters
+# ----------------
+# |path|: The path of the file. A file whose name ends with ".csv" is a CSV
+# file. Other files are JSON Lines files.
+# |position|: The position to start reading from, as yielded.
+#
+# Returns
+# ----------------
+# A generator of tuples of two values:
+# - The position after the record: a tuple of the byte offset and the line
+# number.
+# - The record as a dict.
+def read_records(path, position=(0, 0)):
+    (offset, line_number) = position
+    with open(path, "rb") as file:
+        columns = None
+        if path.endswith(".csv"):
+            columns = next(csv.reader([file.readline().decode()]))
+            if offset == 0:
+                (offset, line_number) = (file.tell(), 1)
+        file.seek(offset)
+        for line in iter(file.readline, b""):
+            line_number += 1
+            line = line.decode().strip()
+            if not line:
+                continue
+            if columns is None:
+                record = json.loads(line)
+            else:
+                record = {column: value for (column, value)
+                          in zip(columns, next(csv.reader([line])))
+                          if value != ""}
+            yield ((file.tell(), line_number), record)
+
+# Parse the records into events.
+#
+# Parameters
+# ----------------
+# |records|: The records yielded by read_records().
+#
+# Returns
+# ----------------
+# A generator of tuples of four values:
+# - The position after the event.
+# - The name of the event.
+# - The timestamp.
+# - A dict of the parsed arguments in EVENT_FIELDS and the "transaction"
+# (None if the record has none), or None if the event is skipped.
+def parse_events(records):
+    for (position, record) in records:
+        name = record["event"]
+        fields = None
+        if name in EVENT_FIELDS:
+            fields = {field: FIELD_PARSERS.get(field, int)(
+                record.get(field, ""))
+                      for field in EVENT_FIELDS[name]}
+            fields["transaction"] = record.get("transaction")
+        yield (position, name, int(record["timestamp"]), fields)
+
+
+# Applies events to an ACB and collects the divergences.
+class Ingestor:
+    # Parameters
+    # ----------------
+    # |acb|: The ACB created by create_deployed_acb().
+    # |params|: The |params| the ACB was created with.
+    # |max_divergences|: The number of the divergences kept with their
+    # descriptions. The rest are only counted.
+    def __init__(self, acb, params=None, max_divergences=100):
+        self.acb = acb
+        self.params = params
+        self.max_divergences = max_divergences
+        # The position in the file after the last event.
+        self.position = (0, 0)
+        self.event_count = 0
+        self.applied_count = 0
+        self.divergence_count = 0
+        # A list of (line number, description).
+        self.divergences = []
+        # The UpdateEpochEvent waiting for its VoteEvent as (line number,
+        # arguments).
+        self.pending_update = None
+        # The Transfers waiting for the end of their transaction as a list
+        # of (line number, timestamp, arguments).
+        self.pending_transfers = []
+
+    def diverge(self, line_number, description):
+        self.divergence_count += 1
+        if len(self.divergences) < self.max_divergences:
+            self.divergences.append((line_number, description))
+
+    # Record a divergence for every value of |actual| that differs from
+    # |fields|.
+    def compare(self, line_number, name, actual, fields):
+        for key in actual:
+            if actual[key] != fields[key]:
+                self.diverge(line_number, "%s %s is %s, expected %s" %
+                             (name, key, actual[key], fields[key]))
+
+    # Apply one event yielded by parse_events().
+    def apply(self, position, name, timestamp, fields):
+        self.event_count += 1
+        self.position = position
+        if fields is None:
+            return
+        line_number = position[1]
+        if (self.pending_transfers and
+            not self.in_pending_transaction(timestamp, fields)):
+            self.apply_transfers()
+        if name == "Transfer":
+            if not self.is_mint_or_burn(fields):
+                self.pending_transfers.append(
+                    (line_number, timestamp, fields))
+            return
+        # The Transfers were emitted by this call.
+        self.pending_transfers = []
+        if self.pending_update is not None and name != "VoteEvent":
+            self.diverge(self.pending_update[0],
+                         "UpdateEpochEvent is not followed by VoteEvent")
+            self.pending_update = None
+        if name == "UpdateEpochEvent":
+            self.pending_update = (line_number, fields)
+            return
+        self.applied_count += 1
+        self.acb.set_timestamp(timestamp)
+        try:
+            actual = self.call(name, fields)
+        except Exception:
+            self.diverge(line_number, "%s reverted" % name)
+            self.pending_update = None
+            return
+        self.compare(line_number, name, actual, fields)
+        if name == "VoteEvent":
+            self.check_update_epoch(actual["epoch_updated"])
+
+    # Return True if an event at |timestamp| with |fields| belongs to the
+    # transaction of the pending Transfers.
+    def in_pending_transaction(self, timestamp, fields):
+        (line_number, pending_timestamp, pending) = self.pending_transfers[0]
+        if (pending["transaction"] is not None and
+            fields["transaction"] is not None):
+            return pending["transaction"] == fields["transaction"]
+        return pending_timestamp == timestamp
+
+    def is_mint_or_burn(self, fields):
+        return (is_zero_account(fields["from"]) or
+                is_zero_account(fields["to"]))
+
+    # Apply the pending Transfers, which no call event followed, as
+    # transferFrom.
+    def apply_transfers(self):
+        coin = self.acb.coin
+        for (line_number, timestamp, fields) in self.pending_transfers:
+            self.applied_count += 1
+            self.acb.set_timestamp(timestamp)
+            if coin.balance_of(fields["from"]) < fields["value"]:
+                self.diverge(line_number, "Transfer reverted")
+                continue
+            coin.move(fields["from"], fields["to"], fields["value"])
+        self.pending_transfers = []
+
+    # Apply the events that wait for the end of the export.
+    def finish(self):
+        if self.pending_transfers:
+            self.apply_transfers()
+
+    # Call the ACB for the event.
+    #
+    # Returns
+    # ----------------
+    # A dict of the values to compare with the arguments of the event.
+    def call(self, name, fields):
+        acb = self.acb
+        sender = fields.get("sender")
+        if name == "TransferEvent":
+            amount = fields["amount"] + fields["tax"]
+            acb.coin.transfer(sender, fields["receiver"], amount)
+            tax = amount * JohnLawCoin.TAX_RATE // 100
+            return {"amount": amount - tax, "tax": tax}
+        if name == "VoteEvent":
+            acb.oracle.revealed = fields["reveal_result"]
+            result = acb.vote(sender, fields["hash"], fields["oracle_level"],
+                              fields["salt"])
+            actual = dict(zip(["commit_result", "reveal_result", "deposited",
+                               "reclaimed", "rewarded", "epoch_updated"],
+                              result))
+            actual["epoch_id"] = acb.oracle.epoch_id
+            return actual
+        if name == "PurchaseBondsEvent":
+            redemption_epoch = acb.purchase_bonds(
+                sender, fields["purchased_bonds"])
+            return {"epoch_id": acb.oracle.epoch_id,
+                    "redemption_epoch": redemption_epoch}
+        if name == "RedeemBondsEvent":
+            epoch_id = acb.oracle.epoch_id
+            acb.logging.ensure_logs(epoch_id)
+            log = acb.logging.bond_operation_logs[epoch_id]
+            expired_bonds = log.expired_bonds
+            redeemed_bonds = acb.redeem_bonds(sender,
+                                              fields["redemption_epochs"])
+            return {"epoch_id": epoch_id, "redeemed_bonds": redeemed_bonds,
+                    "expired_bonds": log.expired_bonds - expired_bonds}
+        if name == "PurchaseCoinsEvent":
+            (eth_amount, coin_amount) = acb.purchase_coins(
+                sender, fields["requested_eth_amount"])
+            return {"eth_amount": eth_amount, "coin_amount": coin_amount}
+        if name == "SellCoinsEvent":
+            (eth_amount, coin_amount) = acb.sell_coins(
+                sender, fields["requested_coin_amount"])
+            return {"eth_amount": eth_amount, "coin_amount": coin_amount}
+        assert(False)
+
+    # Compare the pending UpdateEpochEvent with the epoch log of the model.
+    def check_update_epoch(self, epoch_updated):
+        if self.pending_update is None:
+            return
+        (line_number, fields) = self.pending_update
+        self.pending_update = None
+        if not epoch_updated:
+            return
+        log = self.acb.logging.epoch_logs[self.acb.oracle.epoch_id]
+        self.compare(line_number, "UpdateEpochEvent", {
+            "epoch_id": self.acb.oracle.epoch_id,
+            "current_epoch_start": log.current_epoch_start,
+            "tax": log.tax,
+            "burned": log.burned_coins,
+            "delta": log.coin_supply_delta,
+            "mint": log.minted_coins,
+        }, fields)
+
+    # Write the ingestor to |path|.
+    def checkpoint(self, path):
+        with open(path + ".tmp", "wb") as file:
+            pickle.dump((self.params, pickle.dumps(self)), file)
+        os.replace(path + ".tmp", path)
+
+
+# Load an Ingestor from the checkpoint at |path|.
+def restore_ingestor(path):
+    with open(path, "rb") as file:
+        (params, state) = pickle.load(file)
+    # The constants are class attributes set by the constructors.
+    create_deployed_acb(0, 0, params)
+    return pickle.loads(state)
+
+# Ingest an export.
+#
+# Parameters
+# ----------------
+# |path|: The path of the export.
+# |genesis_account|, |timestamp|, |params|: The arguments of
+# create_deployed_acb().
+# Ignored when resuming from a checkpoint.
+# |checkpoint_path|: The path of the checkpoint file, or None to not write
+# checkpoints. If the file exists, the ingestion resumes from it.
+# |checkpoint_every|: The number of events between checkpoints.
+# |progress|: A callable called with the Ingestor, the number of the events
+# ingested by this call and the elapsed seconds after every checkpoint, or
+# None.
+#
+# Returns
+# ----------------
+# A tuple of two values:
+# - The Ingestor.
+# - The number of the events ingested by this call.
+def ingest(path, genesis_account=0, timestamp=0, params=None,
+           checkpoint_path=None, checkpoint_every=100000, progress=None):
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        ingestor = restore_ingestor(checkpoint_path)
+    else:
+        acb = create_deployed_acb(genesis_account, timestamp, params)
+        ingestor = Ingestor(acb, params)
+    start = time.time()
+    first_event = ingestor.event_count
+    for event in parse_events(read_records(path, ingestor.position)):
+        ingestor.apply(*event)
+        if ingestor.event_count % checkpoint_every == 0:
+            if checkpoint_path:
+                ingestor.checkpoint(checkpoint_path)
+            if progress:
+                progress(ingestor, ingestor.event_count - first_event,
+                         time.time() - start)
+    ingestor.finish()
+    if checkpoint_path:
+        ingestor.checkpoint(checkpoint_path)
+    return (ingestor, ingestor.event_count - first_event)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path", help="the JSON Lines or CSV export")
+    parser.add_argument("--genesis-account", default="0",
+                        help="the account the initial coins were minted to")
+    parser.add_argument("--timestamp", type=int, default=0,
+                        help="the timestamp of the deployment")
+    parser.add_argument("--checkpoint", help="the checkpoint file")
+    parser.add_argument("--checkpoint-every", type=int, default=100000)
+    args = parser.parse_args()
+
+    def print_progress(ingestor, count, elapsed):
+        print("%d events (%d events/s), %d divergences" %
+              (ingestor.event_count, count / max(elapsed, 1e-9),
+               ingestor.divergence_count), file=sys.stderr)
+
+    start = time.time()
+    (ingestor, count) = ingest(
+        args.path, parse_account(args.genesis_account), args.timestamp,
+        None, args.checkpoint, args.checkpoint_every, print_progress)
+    elapsed = time.time() - start
+    for (line_number, description) in ingestor.divergences:
+        print("%s:%d: %s" % (args.path, line_number, description))
+    print("ingested %d events in %.2fs (%d events/s): %d applied, "
+          "%d divergences" %
+          (count, elapsed, count / max(elapsed, 1e-9),
+           ingestor.applied_count, ingestor.divergence_count),
+          file=sys.stderr)
+    sys.exit(1 if ingestor.divergence_count else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2021 Kentaro Hara
+#
+# This software is released under the MIT License.
+# http://opensource.org/licenses/mit-license.php
+
+from johnlawcoin import *
+from acb_ingest import *
+from acb_trace import get_state
+import csv, json, os, random, shutil, tempfile, unittest
+
+PARAMS = [996, 1000, 12, 2, 7 * 24 * 60 * 60, 90, 10, 10,
+          [6, 7, 8, 9, 10, 11, 12, 13, 14], 1, 8 * 60 * 60, 20, 3]
+
+ZERO_ACCOUNT = "0x%040x" % 0
+
+# Calls an ACB and records the events the contracts would emit, including
+# the ERC20 Transfer events of the coin movements. Every call is a
+# transaction.
+class EventExporter:
+    def __init__(self, acb):
+        self.acb = acb
+        self.records = []
+        self.transaction_count = 0
+        coin = acb.coin
+        move = coin.move
+        def move_and_emit(sender, receiver, amount):
+            move(sender, receiver, amount)
+            self.emit("Transfer", **{"from": sender, "to": receiver,
+                                     "value": amount})
+        coin.move = move_and_emit
+
+    def emit(self, name, **fields):
+        fields["event"] = name
+        fields["timestamp"] = self.acb.get_timestamp()
+        fields["transaction"] = "0x%064x" % self.transaction_count
+        self.records.append(fields)
+
+    # Start a transaction.
+    def begin(self):
+        self.transaction_count += 1
+
+    # ERC20's transferFrom, which moves the coins without the tax and emits
+    # only the Transfer event.
+    def transfer_from(self, sender, receiver, amount):
+        self.begin()
+        assert(self.acb.coin.balance_of(sender) >= amount)
+        self.acb.coin.move(sender, receiver, amount)
+
+    def transfer(self, sender, receiver, amount):
+        self.begin()
+        self.acb.coin.transfer(sender, receiver, amount)
+        tax = amount * JohnLawCoin.TAX_RATE // 100
+        self.emit("TransferEvent", sender=sender, receiver=receiver,
+                  amount=amount - tax, tax=tax)
+
+    def vote(self, sender, level, salt, revealed_level, revealed_salt):
+        self.begin()
+        acb = self.acb
+        hash = acb.encrypt(sender, level, salt)
+        result = acb.vote(sender, hash, revealed_level, revealed_salt)
+        if result[5]:
+            log = acb.logging.epoch_logs[acb.oracle.epoch_id]
+            self.emit("UpdateEpochEvent", epoch_id=acb.oracle.epoch_id,
+                      current_epoch_start=log.current_epoch_start,
+                      tax=log.tax, burned=log.burned_coins,
+                      delta=log.coin_supply_delta, mint=log.minted_coins)
+        self.emit("CommitEvent", sender=sender, epoch_id=acb.oracle.epoch_id)
+        self.emit("VoteEvent", sender=sender, epoch_id=acb.oracle.epoch_id,
+                  hash=hash, oracle_level=revealed_level, salt=revealed_salt,
+                  commit_result=result[0], reveal_result=result[1],
+                  deposited=result[2], reclaimed=result[3],
+                  rewarded=result[4], epoch_updated=result[5])
+
+    def purchase_bonds(self, sender, count):
+        self.begin()
+        redemption_epoch = self.acb.purchase_bonds(sender, count)
+        self.emit("PurchaseBondsEvent", sender=sender,
+                  epoch_id=self.acb.oracle.epoch_id, purchased_bonds=count,
+                  redemption_epoch=redemption_epoch)
+        return redemption_epoch
+
+    def redeem_bonds(self, sender, redemption_epochs):
+        self.begin()
+        acb = self.acb
+        epoch_id = acb.oracle.epoch_id
+        acb.logging.ensure_logs(epoch_id)
+        expired_bonds = acb.logging.bond_operation_logs[epoch_id].expired_bonds
+        redeemed_bonds = acb.redeem_bonds(sender, redemption_epochs)
+        self.emit("RedeemBondsEvent", sender=sender, epoch_id=epoch_id,
+                  redeemed_bonds=redeemed_bonds,
+                  expired_bonds=acb.logging.bond_operation_logs[
+                      epoch_id].expired_bonds - expired_bonds,
+                  redemption_epochs=list(redemption_epochs))
+
+    def purchase_coins(self, sender, requested_eth_amount):
+        self.begin()
+        (eth_amount, coin_amount) = self.acb.purchase_coins(
+            sender, requested_eth_amount)
+        self.emit("PurchaseCoinsEvent", sender=sender,
+                  requested_eth_amount=str(requested_eth_amount),
+                  eth_amount=str(eth_amount), coin_amount=coin_amount)
+
+    def sell_coins(self, sender, requested_coin_amount):
+        self.begin()
+        (eth_amount, coin_amount) = self.acb.sell_coins(
+            sender, requested_coin_amount)
+        self.emit("SellCoinsEvent", sender=sender,
+                  requested_coin_amount=requested_coin_amount,
+                  eth_amount=str(eth_amount), coin_amount=coin_amount)
+
+
+def write_jsonl(path, records, all_records=None):
+    with open(path, "w") as file:
+        for record in records:
+            file.write(json.dumps(record) + "\n")
+
+# Write |records| with the columns of |all_records|.
+def write_csv(path, records, all_records=None):
+    columns = ["event", "timestamp"]
+    for record in all_records or records:
+        columns += [column for column in record if column not in columns]
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(columns)
+        for record in records:
+            row = []
+            for column in columns:
+                value = record.get(column, "")
+                if isinstance(value, list):
+                    value = " ".join([str(epoch) for epoch in value])
+                row.append(value)
+            writer.writerow(row)
+
+
+class ACBIngestUnitTest(unittest.TestCase):
+    def __init__(self, account_count, checkpoint_every):
+        super().__init__()
+        print('account_count=%d checkpoint_every=%d' %
+              (account_count, checkpoint_every))
+        self._account_count = account_count
+        self._checkpoint_every = checkpoint_every
+
+    def teardown(self):
+        pass
+
+    def run(self):
+        directory = tempfile.mkdtemp()
+        rng = random.Random(self._account_count)
+        genesis = "0x00000000000000000000000000000000000000a0"
+        accounts = [genesis] + ["0x%040x" % (index + 1)
+                                for index in range(self._account_count)]
+        acb = create_acb(genesis, *PARAMS)
+        exporter = EventExporter(acb)
+
+        # Run the ACB for a while and export the events.
+        for account in accounts[1:]:
+            exporter.transfer(genesis, account, rng.randint(0, 100000))
+        votes = {}
+        redemption_epochs = {account: [] for account in accounts}
+        for epoch in range(12):
+            acb.set_timestamp(acb.get_timestamp() + ACB.EPOCH_DURATION)
+            for account in accounts:
+                (level, salt) = votes.get(account, (0, 0))
+                votes[account] = (rng.randint(0, 8), rng.randint(0, 10))
+                exporter.vote(account, *votes[account], level, salt)
+            for account in accounts:
+                action = rng.randint(0, 5)
+                try:
+                    if action == 0:
+                        exporter.transfer(account, rng.choice(accounts),
+                                          rng.randint(0, 1000))
+                    elif action == 1:
+                        redemption_epochs[account].append(
+                            exporter.purchase_bonds(account,
+                                                    rng.randint(1, 10)))
+                    elif action == 2:
+                        exporter.redeem_bonds(account,
+                                              redemption_epochs[account])
+                    elif action == 3:
+                        exporter.purchase_coins(account,
+                                                rng.randint(0, 10 ** 18))
+                    elif action == 4:
+                        exporter.sell_coins(account, rng.randint(0, 1000))
+                    else:
+                        exporter.transfer_from(account, rng.choice(accounts),
+                                               rng.randint(0, 1000))
+                except AssertionError:
+                    # A reverted transaction emits no events.
+                    pass
+                acb.set_timestamp(acb.get_timestamp() + 60)
+        records = exporter.records
+        expected_state = get_state(acb, accounts)
+        self.assertTrue(any([record["event"] == "UpdateEpochEvent"
+                             for record in records]))
+        # The Transfers of the transactions without a call event come from
+        # transferFrom.
+        call_transactions = set([
+            record["transaction"] for record in records
+            if record["event"] not in ["Transfer", "CommitEvent"]])
+        transfers_from = [record for record in records
+                          if record["event"] == "Transfer" and
+                          record["transaction"] not in call_transactions]
+        self.assertTrue(len(transfers_from) > 0)
+
+        for path in [os.path.join(directory, "events.jsonl"),
+                     os.path.join(directory, "events.csv")]:
+            write = write_csv if path.endswith(".csv") else write_jsonl
+            write(path, records)
+
+            # The records are read back as written.
+            parsed = list(parse_events(read_records(path)))
+            self.assertEqual(len(parsed), len(records))
+            self.assertEqual([name for (position, name, timestamp, fields)
+                              in parsed],
+                             [record["event"] for record in records])
+            self.assertEqual(parsed[-1][0][0], os.path.getsize(path))
+
+            # Ingesting the export reproduces the state without divergences.
+            (ingestor, count) = ingest(
+                path, genesis, 0, PARAMS,
+                checkpoint_every=self._checkpoint_every)
+            self.assertEqual(count, len(records))
+            self.assertEqual(ingestor.divergences, [])
+            self.assertEqual(ingestor.applied_count, len(
+                [record for record in records
+                 if record["event"] not in ["CommitEvent",
+                                            "UpdateEpochEvent",
+                                            "Transfer"]]) +
+                             len(transfers_from))
+            self.assertEqual(get_state(ingestor.acb, accounts),
+                             expected_state)
+
+            # An export that grows is ingested incrementally from the
+            # checkpoint. An export ends at the end of a transaction.
+            checkpoint = path + ".checkpoint"
+            half = len(records) // 2
+            while (records[half]["transaction"] ==
+                   records[half - 1]["transaction"]):
+                half += 1
+            write(path, records[:half], records)
+            progress = []
+            (ingestor, count) = ingest(
+                path, genesis, 0, PARAMS, checkpoint, self._checkpoint_every,
+                lambda ingestor, count, elapsed: progress.append(count))
+            self.assertEqual(count, half)
+            self.assertEqual(len(progress), half // self._checkpoint_every)
+            self.assertEqual(ingestor.pending_transfers, [])
+            write(path, records)
+            (ingestor, count) = ingest(path, genesis, 0, PARAMS, checkpoint,
+                                       self._checkpoint_every)
+            self.assertEqual(count, len(records) - half)
+            self.assertEqual(ingestor.event_count, len(records))
+            self.assertEqual(ingestor.divergences, [])
+            self.assertEqual(get_state(ingestor.acb, accounts),
+                             expected_state)
+            (ingestor, count) = ingest(path, genesis, 0, PARAMS, checkpoint)
+            self.assertEqual(count, 0)
+            os.remove(checkpoint)
+
+        # A value that differs from the model is a divergence at its line.
+        path = os.path.join(directory, "events.jsonl")
+        index = [i for (i, record) in enumerate(records)
+                 if record["event"] == "VoteEvent" and
+                 record["deposited"] > 0][0]
+        tampered = [dict(record) for record in records]
+        tampered[index]["deposited"] += 1
+        write_jsonl(path, tampered)
+        (ingestor, count) = ingest(path, genesis, 0, PARAMS)
+        self.assertEqual(ingestor.divergences, [(
+            index + 1, "VoteEvent deposited is %d, expected %d" % (
+                records[index]["deposited"], tampered[index]["deposited"]))])
+
+        # A call that reverts in the model is a divergence. The divergences
+        # beyond |max_divergences| are only counted.
+        tampered = [dict(record) for record in records]
+        for i in range(3):
+            tampered.insert(0, {"event": "TransferEvent", "timestamp": 0,
+                                "sender": "0x%040x" % 0xff, "receiver": genesis,
+                                "amount": 1, "tax": 0})
+        write_jsonl(path, tampered)
+        acb = create_deployed_acb(genesis, 0, PARAMS)
+        ingestor = Ingestor(acb, PARAMS, max_divergences=2)
+        for event in parse_events(read_records(path)):
+            ingestor.apply(*event)
+        self.assertEqual(ingestor.divergences, [(1, "TransferEvent reverted"),
+                                                (2, "TransferEvent reverted")])
+        self.assertEqual(ingestor.divergence_count, 3)
+
+        # An UpdateEpochEvent without the epoch update in the model.
+        update = [record for record in records
+                  if record["event"] == "UpdateEpochEvent"][0]
+        write_jsonl(path, [dict(update, epoch_id=2, mint=1)] + records)
+        (ingestor, count) = ingest(path, genesis, 0, PARAMS)
+        self.assertEqual(ingestor.divergences, [
+            (1, "UpdateEpochEvent is not followed by VoteEvent")])
+
+        # Without transaction hashes, a Transfer followed by a call event of
+        # the same block belongs to the call. The other Transfers are
+        # applied as transferFrom unless they mint or burn coins.
+        receiver = "0x%040x" % 0xfe
+        tax = 100 * JohnLawCoin.TAX_RATE // 100
+        transfers = [
+            {"event": "Transfer", "timestamp": 1, "from": genesis,
+             "to": receiver, "value": 100 - tax},
+            {"event": "TransferEvent", "timestamp": 1, "sender": genesis,
+             "receiver": receiver, "amount": 100 - tax, "tax": tax},
+            {"event": "Transfer", "timestamp": 2, "from": genesis,
+             "to": receiver, "value": 10},
+            {"event": "Transfer", "timestamp": 2, "from": genesis,
+             "to": receiver, "value": 20},
+            {"event": "Transfer", "timestamp": 3, "from": ZERO_ACCOUNT,
+             "to": receiver, "value": 30},
+            {"event": "Transfer", "timestamp": 4, "from": receiver,
+             "to": ZERO_ACCOUNT, "value": 40},
+            {"event": "Transfer", "timestamp": 5, "from": "0x%040x" % 0xff,
+             "to": genesis, "value": 1},
+            {"event": "Transfer", "timestamp": 6, "from": genesis,
+             "to": receiver, "value": 50}]
+        write_jsonl(path, transfers)
+        (ingestor, count) = ingest(path, genesis, 0, PARAMS)
+        self.assertEqual(count, len(transfers))
+        self.assertEqual(ingestor.applied_count, 5)
+        self.assertEqual(ingestor.divergences, [(7, "Transfer reverted")])
+        self.assertEqual(ingestor.acb.coin.balance_of(receiver),
+                         100 - tax + 10 + 20 + 50)
+
+        shutil.rmtree(directory)
+
+
+def main():
+    for account_count in [0, 1, 10]:
+        for checkpoint_every in [1, 7, 100000]:
+            test = ACBIngestUnitTest(account_count, checkpoint_every)
+            test.run()
+            test.teardown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2021 Kentaro Hara
+#
+# This software is released under the MIT License.
+# http://opensource.org/licenses/mit-license.php
+
+from acb_simulator import ACBSimulator
+import argparse, contextlib, io, math, multiprocessing, random
+import statistics, time
+
+#-------------------------------------------------------------------------------
+# [Policy parameter optimizer]
+#
+# Searches the policy parameters of ACBSimulator (the damping factor, the
+# deposit rate, the exchange rate table, the bond periods and the open market
+# operation constants) for the ones that minimize an objective computed from
+# the simulation. Instead of running every combination like the nested loops
+# of acb_simulator.py, the optimizer evaluates random candidates first and
+# then refines the best ones by moving one parameter at a time to an adjacent
+# value until no neighbor improves. Candidates are simulated in parallel
+# worker processes.
+#
+# Usage:
+#   ./acb_optimizer.py --budget 60 --seeds 3 -j 8
+#-------------------------------------------------------------------------------
+
+# The parameters of ACBSimulator in the order of the constructor.
+PARAMETER_NAMES = [
+    "bond_price",
+    "bond_redemption_price",
+    "bond_redemption_period",
+    "bond_redeemable_period",
+    "epoch_duration",
+    "proportional_reward_rate",
+    "deposit_rate",
+    "damping_factor",
+    "level_to_exchange_rate",
+    "reclaim_threshold",
+    "price_change_interval",
+    "price_change_percentage",
+    "price_multiplier",
+    "voter_count",
+    "iteration",
+]
+
+# The parameters used unless the search space overrides them. These are the
+# parameters of the first simulation in acb_simulator.py.
+DEFAULT_PARAMETERS = {
+    "bond_price": 996,
+    "bond_redemption_price": 1000,
+    "bond_redemption_period": 12,
+    "bond_redeemable_period": 2,
+    "epoch_duration": 7 * 24 * 60 * 60,
+    "proportional_reward_rate": 90,
+    "deposit_rate": 10,
+    "damping_factor": 10,
+    "level_to_exchange_rate": [6, 7, 8, 9, 10, 11, 12, 13, 14],
+    "reclaim_threshold": 1,
+    "price_change_interval": 8 * 60 * 60,
+    "price_change_percentage": 20,
+    "price_multiplier": 3,
+    "voter_count": 40,
+    "iteration": 50,
+}
+
+# The values to search for each parameter. The values of a parameter are
+# ordered so that adjacent values are neighbors in the local refinement.
+SEARCH_SPACE = {
+    "bond_redemption_period": [1, 2, 4, 6, 12, 20],
+    "bond_redeemable_period": [1, 2, 4, 12],
+    "deposit_rate": [0, 5, 10, 20, 50, 100],
+    "damping_factor": [5, 10, 20, 50, 100],
+    "level_to_exchange_rate": [
+        [9, 11, 12],
+        [8, 9, 10, 11, 12],
+        [6, 7, 8, 9, 10, 11, 12, 13, 14],
+        [0, 1, 10, 11, 12],
+    ],
+    "price_change_interval": [60 * 60, 4 * 60 * 60, 8 * 60 * 60,
+                              24 * 60 * 60],
+    "price_change_percentage": [5, 10, 15, 20, 30],
+    "price_multiplier": [2, 3, 5],
+}
+
+# The weights of the metrics in the objective.
+DEFAULT_WEIGHTS = {
+    # The standard deviation of the relative change of the total coin supply
+    # per epoch.
+    "supply_volatility": 1.0,
+    # The ratio of the expired bonds to the expired and redeemed bonds.
+    "expired_bond_ratio": 1.0,
+    # The largest relative drop of the ETH pool balance from its peak.
+    "eth_drawdown": 1.0,
+}
+
+# Compute the metrics of a simulation that has run.
+#
+# Parameters
+# ----------------
+# |simulator|: The ACBSimulator.
+#
+# Returns
+# ----------------
+# A dict from the metric names in DEFAULT_WEIGHTS to the values.
+def summarize(simulator):
+    logging = simulator._logging
+    epoch_ids = sorted(logging.epoch_logs)
+    supplies = [logging.epoch_logs[epoch_id].total_coin_supply
+                for epoch_id in epoch_ids]
+    changes = [(current - previous) / previous
+               for (previous, current) in zip(supplies, supplies[1:])
+               if previous > 0]
+    supply_volatility = statistics.pstdev(changes) if changes else 0.0
+
+    expired = simulator.metrics.total_expired_bonds
+    settled = expired + simulator.metrics.total_redeemed_bonds
+    expired_bond_ratio = expired / settled if settled else 0.0
+
+    eth_drawdown = 0.0
+    peak = 0
+    for epoch_id in epoch_ids:
+        balance = logging.open_market_operation_logs[epoch_id].eth_balance
+        peak = max(peak, balance)
+        if peak > 0:
+            eth_drawdown = max(eth_drawdown, (peak - balance) / peak)
+
+    return {
+        "supply_volatility": supply_volatility,
+        "expired_bond_ratio": expired_bond_ratio,
+        "eth_drawdown": eth_drawdown,
+    }
+
+# Return the objective of |metrics|. Smaller is better.
+def score(metrics, weights=DEFAULT_WEIGHTS):
+    return sum([weights[name] * metrics[name] for name in weights])
+
+# Run one simulation without printing anything.
+#
+# Parameters
+# ----------------
+# |parameters|: A dict from PARAMETER_NAMES to the values.
+# |seed|: The seed of the random numbers of the simulation.
+#
+# Returns
+# ----------------
+# The metrics returned by summarize().
+def simulate(parameters, seed):
+    random.seed(seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        simulator = ACBSimulator(*[parameters[name]
+                                   for name in PARAMETER_NAMES])
+        simulator.run()
+        simulator.teardown()
+    return summarize(simulator)
+
+# Run |evaluate|(|parameters|, |seed|) in a worker process.
+def run_job(job):
+    (evaluate, parameters, seed) = job
+    return evaluate(parameters, seed)
+
+
+class Optimizer:
+    # Parameters
+    # ----------------
+    # |space|: A dict from the parameter names to the lists of their values.
+    # |base|: The parameters not in |space|.
+    # |evaluate|: A function that takes the parameters and a seed and returns
+    # the metrics. It must be picklable (defined at the module level) to run
+    # in worker processes.
+    # |seeds|: The seeds to evaluate every candidate with. The objective of a
+    # candidate is the mean over the seeds.
+    # |weights|: The weights passed to score().
+    # |processes|: The number of worker processes. 1 runs in-process.
+    # |rng|: The random.Random to draw the random candidates from.
+    def __init__(self, space, base, evaluate, seeds, weights=DEFAULT_WEIGHTS,
+                 processes=1, rng=random):
+        self.names = list(space)
+        self.space = space
+        self.base = base
+        self.evaluate = evaluate
+        self.seeds = seeds
+        self.weights = weights
+        self.processes = processes
+        self.rng = rng
+        # A dict from the evaluated points to their objectives. A point is a
+        # tuple of the indices of the values in |space|.
+        self.scores = {}
+        # A dict from the evaluated points to the mean metrics.
+        self.metrics = {}
+
+    # Return the number of the points in the search space.
+    def size(self):
+        return math.prod([len(self.space[name]) for name in self.names])
+
+    # Return the parameters of |point|.
+    def parameters(self, point):
+        parameters = dict(self.base)
+        for (name, index) in zip(self.names, point):
+            parameters[name] = self.space[name][index]
+        return parameters
+
+    # Return the point of the values in |base|, or None if some value is not
+    # in the search space.
+    def base_point(self):
+        point = []
+        for name in self.names:
+            if self.base.get(name) not in self.space[name]:
+                return None
+            point.append(self.space[name].index(self.base[name]))
+        return tuple(point)
+
+    # Return the points that differ from |point| by one step of one
+    # parameter.
+    def neighbors(self, point):
+        result = []
+        for dimension in range(len(point)):
+            for step in [-1, 1]:
+                index = point[dimension] + step
+                if 0 <= index < len(self.space[self.names[dimension]]):
+                    result.append(point[:dimension] + (index,) +
+                                  point[dimension + 1:])
+        return result
+
+    # Evaluate the points that have not been evaluated.
+    def evaluate_points(self, points, pool):
+        points = [point for point in dict.fromkeys(points)
+                  if point not in self.scores]
+        jobs = [(self.evaluate, self.parameters(point), seed)
+                for point in points for seed in self.seeds]
+        if pool:
+            results = pool.map(run_job, jobs)
+        else:
+            results = [run_job(job) for job in jobs]
+        for (index, point) in enumerate(points):
+            runs = results[index * len(self.seeds):
+                           (index + 1) * len(self.seeds)]
+            metrics = {name: statistics.fmean([run[name] for run in runs])
+                       for name in runs[0]}
+            self.metrics[point] = metrics
+            self.scores[point] = score(metrics, self.weights)
+
+    # Return the evaluated points from the best.
+    def ranking(self):
+        return sorted(self.scores, key=lambda point: self.scores[point])
+
+    # Search the best point.
+    #
+    # Parameters
+    # ----------------
+    # |budget|: The maximum number of points to evaluate.
+    # |initial|: The number of random points to evaluate first. The point of
+    # |base| is one of them if it is in the search space.
+    # |top|: The number of the best points whose neighbors are evaluated in
+    # each round of the local refinement.
+    #
+    # Returns
+    # ----------------
+    # A tuple of the best parameters and their objective.
+    def optimize(self, budget, initial, top=2):
+        assert(budget >= 1 and initial >= 1)
+        pool = None
+        if self.processes > 1:
+            pool = multiprocessing.Pool(self.processes)
+        try:
+            points = []
+            base_point = self.base_point()
+            if base_point is not None:
+                points.append(base_point)
+            limit = min(initial, budget, self.size())
+            while len(points) < limit:
+                point = tuple([self.rng.randrange(len(self.space[name]))
+                               for name in self.names])
+                if point not in points:
+                    points.append(point)
+            self.evaluate_points(points, pool)
+
+            while len(self.scores) < budget:
+                candidates = []
+                for point in self.ranking()[:top]:
+                    candidates.extend([neighbor
+                                       for neighbor in self.neighbors(point)
+                                       if neighbor not in self.scores])
+                # Stop when the top points are local minima.
+                if not candidates:
+                    break
+                self.evaluate_points(
+                    list(dict.fromkeys(candidates))[
+                        :budget - len(self.scores)], pool)
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+        best_point = self.ranking()[0]
+        return (self.parameters(best_point), self.scores[best_point])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget", type=int, default=60,
+                        help="the maximum number of candidates")
+    parser.add_argument("--initial", type=int, default=20,
+                        help="the number of random candidates")
+    parser.add_argument("--seeds", type=int, default=3,
+                        help="the number of simulations per candidate")
+    parser.add_argument("--voters", type=int, default=40)
+    parser.add_argument("--iteration", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-j", "--processes", type=int,
+                        default=multiprocessing.cpu_count())
+    for name in DEFAULT_WEIGHTS:
+        parser.add_argument("--weight-" + name.replace("_", "-"), type=float,
+                            default=DEFAULT_WEIGHTS[name], dest=name)
+    args = parser.parse_args()
+
+    base = dict(DEFAULT_PARAMETERS)
+    base["voter_count"] = args.voters
+    base["iteration"] = args.iteration
+    weights = {name: getattr(args, name) for name in DEFAULT_WEIGHTS}
+    optimizer = Optimizer(SEARCH_SPACE, base, simulate,
+                          list(range(args.seed, args.seed + args.seeds)),
+                          weights, args.processes, random.Random(args.seed))
+    start = time.time()
+    (parameters, objective) = optimizer.optimize(args.budget, args.initial)
+    elapsed = time.time() - start
+
+    base_point = optimizer.base_point()
+    if base_point in optimizer.scores:
+        print("default: objective=%.6f %s" %
+              (optimizer.scores[base_point], optimizer.metrics[base_point]))
+    best_point = optimizer.ranking()[0]
+    print("best: objective=%.6f %s" % (objective,
+                                       optimizer.metrics[best_point]))
+    for name in SEARCH_SPACE:
+        print("  %s=%s" % (name, parameters[name]))
+    print("evaluated %d of %d candidates (%d simulations) in %.1fs" %
+          (len(optimizer.scores), optimizer.size(),
+           len(optimizer.scores) * args.seeds, elapsed))
+
+
+if __name__ == "__main__":
+    main()
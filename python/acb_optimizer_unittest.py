@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2021 Kentaro Hara
+#
+# This software is released under the MIT License.
+# http://opensource.org/licenses/mit-license.php
+
+from acb_optimizer import *
+import random, unittest
+
+# A synthetic evaluation whose objective is a bowl with the minimum at
+# x=3, y=1, z=4. The seed adds noise that cancels out over the seeds 0 and 1.
+def evaluate_bowl(parameters, seed):
+    noise = 0.5 if seed == 0 else -0.5
+    return {"x": (parameters["x"] - 3) ** 2 + noise,
+            "y": (parameters["y"] - 1) ** 2,
+            "z": (parameters["z"] - 4) ** 2}
+
+class ACBOptimizerUnitTest(unittest.TestCase):
+    def __init__(self, processes):
+        super().__init__()
+        print('processes=%d' % processes)
+        self._processes = processes
+
+    def teardown(self):
+        pass
+
+    def run(self):
+        # A simulation is deterministic for the seed.
+        parameters = dict(DEFAULT_PARAMETERS)
+        parameters["voter_count"] = 10
+        parameters["iteration"] = 20
+        metrics = simulate(parameters, 1)
+        self.assertEqual(metrics, simulate(parameters, 1))
+        self.assertEqual(set(metrics), set(DEFAULT_WEIGHTS))
+        for name in metrics:
+            self.assertTrue(metrics[name] >= 0)
+        self.assertTrue(metrics["expired_bond_ratio"] <= 1)
+        self.assertTrue(metrics["eth_drawdown"] <= 1)
+        self.assertEqual(score(metrics), sum(metrics.values()))
+        self.assertEqual(score(metrics, {"eth_drawdown": 2}),
+                         2 * metrics["eth_drawdown"])
+
+        # Every value of the search space is valid for the simulator.
+        for name in SEARCH_SPACE:
+            for value in SEARCH_SPACE[name]:
+                candidate = dict(parameters)
+                candidate[name] = value
+                candidate["iteration"] = 2
+                simulate(candidate, 0)
+
+        # The neighbors move one parameter by one step.
+        space = {"x": list(range(8)), "y": list(range(8)),
+                 "z": list(range(8))}
+        weights = {"x": 1, "y": 1, "z": 1}
+        optimizer = Optimizer(space, {"x": 0, "y": 7, "z": 9}, evaluate_bowl,
+                              [0, 1], weights, self._processes,
+                              random.Random(0))
+        self.assertEqual(optimizer.size(), 512)
+        self.assertEqual(optimizer.base_point(), None)
+        self.assertEqual(sorted(optimizer.neighbors((0, 3, 7))),
+                         [(0, 2, 7), (0, 3, 6), (0, 4, 7), (1, 3, 7)])
+        self.assertEqual(optimizer.parameters((1, 2, 3)),
+                         {"x": 1, "y": 2, "z": 3})
+
+        # The search finds the minimum with far fewer evaluations than the
+        # exhaustive grid.
+        (best, objective) = optimizer.optimize(200, 10)
+        self.assertEqual(best, {"x": 3, "y": 1, "z": 4})
+        self.assertEqual(objective, 0)
+        self.assertTrue(len(optimizer.scores) < optimizer.size() / 4)
+        self.assertEqual(optimizer.metrics[(3, 1, 4)],
+                         {"x": 0, "y": 0, "z": 0})
+        self.assertEqual(optimizer.ranking()[0], (3, 1, 4))
+
+        # The budget caps the evaluations, and the base point is evaluated.
+        optimizer = Optimizer(space, {"x": 5, "y": 5, "z": 5}, evaluate_bowl,
+                              [0], weights, self._processes, random.Random(1))
+        (best, objective) = optimizer.optimize(7, 3)
+        self.assertEqual(len(optimizer.scores), 7)
+        self.assertTrue((5, 5, 5) in optimizer.scores)
+        self.assertEqual(objective, min(optimizer.scores.values()))
+
+        # The simulator as the evaluation.
+        optimizer = Optimizer({"damping_factor": [10, 100],
+                               "deposit_rate": [0, 10]}, parameters, simulate,
+                              [0], DEFAULT_WEIGHTS, self._processes,
+                              random.Random(0))
+        (best, objective) = optimizer.optimize(4, 2)
+        self.assertEqual(len(optimizer.scores), 4)
+        self.assertEqual(objective, score(simulate(best, 0)))
+
+
+def main():
+    for processes in [1, 2]:
+        test = ACBOptimizerUnitTest(processes)
+        test.run()
+        test.teardown()
+
+
+if __name__ == "__main__":
+    main()
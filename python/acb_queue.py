@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2021 Kentaro Hara
+#
+# This software is released under the MIT License.
+# http://opensource.org/licenses/mit-license.php
+
+from acb_cache import ResultCache
+import argparse, contextlib, importlib, io, multiprocessing, os, pickle
+import socket, sqlite3, sys, threading, time, traceback
+
+#-------------------------------------------------------------------------------
+# [Work queue]
+#
+# Distributes the simulations of a sweep to any number of workers on any
+# number of hosts. A driver submits the jobs (a simulator class, its
+# arguments and a seed) to a work queue. Workers claim jobs with a lease,
+# extend the lease with a heartbeat while the simulation runs, and store the
+# result in a shared ResultCache. A job whose worker fails is retried up to
+# a maximum number of attempts, and a job whose lease expires (e.g., the
+# host died) is claimed again by another worker. Scaling out is starting
+# more workers against the same queue and the same result cache.
+#
+# The queue backend is pluggable. A backend implements the methods of
+# SQLiteQueue. SQLiteQueue keeps the queue in a SQLite database, which is
+# the local and offline implementation (and works on a shared file system
+# that supports file locks).
+#
+# Usage:
+#   ./acb_queue.py submit --queue sweep.db --sweep acb_simulator
+#   ./acb_queue.py worker --queue sweep.db --cache-dir ../cache -j 8
+#   ./acb_queue.py status --queue sweep.db
+#-------------------------------------------------------------------------------
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Return the "module:name" path of a class or a function. A class defined in
+# a script has the module name of the script instead of "__main__" so that
+# the workers can import it.
+def object_path(value):
+    module = value.__module__
+    if module == "__main__":
+        module = os.path.splitext(
+            os.path.basename(sys.modules["__main__"].__file__))[0]
+    return module + ":" + value.__qualname__
+
+# Return the class or the function of a path returned by object_path().
+def load_object(path):
+    (module, name) = path.split(":")
+    return getattr(importlib.import_module(module), name)
+
+
+class Job:
+    def __init__(self, job_id, simulator, arguments, seed, summarize,
+                 attempts):
+        # The ID of the job.
+        self.job_id = job_id
+        # The path of the simulator class.
+        self.simulator = simulator
+        # The tuple of the arguments of the simulator.
+        self.arguments = arguments
+        # The seed of the random numbers.
+        self.seed = seed
+        # The path of the summarize function, or None.
+        self.summarize = summarize
+        # The number of the attempts including this one.
+        self.attempts = attempts
+
+
+class SQLiteQueue:
+    # Parameters
+    # ----------------
+    # |path|: The path of the SQLite database. It is created if it does not
+    # exist.
+    # |max_attempts|: The number of the attempts before a job submitted
+    # through this queue fails.
+    # |clock|: The function that returns the current time in seconds.
+    def __init__(self, path, max_attempts=3, clock=time.time):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.clock = clock
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "job_id INTEGER PRIMARY KEY, simulator TEXT, "
+                "arguments BLOB, seed INTEGER, summarize TEXT, state TEXT, "
+                "worker TEXT, lease_expires REAL, attempts INTEGER, "
+                "max_attempts INTEGER, error TEXT, result_key TEXT)")
+
+    # Open a connection. A connection is opened per operation so that the
+    # queue can be used from any thread and any process.
+    @contextlib.contextmanager
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=60,
+                                     isolation_level=None)
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    # Run |operation|(connection) in a write transaction.
+    def _transaction(self, operation):
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                result = operation(connection)
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+            return result
+
+    # Add jobs.
+    #
+    # Parameters
+    # ----------------
+    # |jobs|: A list of tuples of (simulator class, arguments, seed,
+    # summarize function or None).
+    #
+    # Returns
+    # ----------------
+    # The list of the IDs of the jobs.
+    def submit(self, jobs):
+        rows = [(object_path(simulator_class),
+                 pickle.dumps(tuple(arguments)), seed,
+                 object_path(summarize) if summarize else None, PENDING,
+                 self.max_attempts)
+                for (simulator_class, arguments, seed, summarize) in jobs]
+
+        def operation(connection):
+            job_ids = []
+            for row in rows:
+                cursor = connection.execute(
+                    "INSERT INTO jobs (simulator, arguments, seed, summarize, "
+                    "state, attempts, max_attempts) VALUES "
+                    "(?, ?, ?, ?, ?, 0, ?)", row)
+                job_ids.append(cursor.lastrowid)
+            return job_ids
+        return self._transaction(operation)
+
+    # Claim a pending job or a job whose lease has expired.
+    #
+    # Parameters
+    # ----------------
+    # |worker|: The name of the worker.
+    # |lease|: The seconds the worker holds the job without a heartbeat.
+    #
+    # Returns
+    # ----------------
+    # The Job, or None if no job can be claimed.
+    def claim(self, worker, lease):
+        now = self.clock()
+
+        def operation(connection):
+            # A job whose lease expired on its last attempt fails.
+            connection.execute(
+                "UPDATE jobs SET state = ?, worker = NULL, "
+                "error = 'the lease expired' WHERE state = ? AND "
+                "lease_expires < ? AND attempts >= max_attempts",
+                (FAILED, RUNNING, now))
+            row = connection.execute(
+                "SELECT job_id, simulator, arguments, seed, summarize, "
+                "attempts FROM jobs WHERE state = ? OR (state = ? AND "
+                "lease_expires < ?) ORDER BY job_id LIMIT 1",
+                (PENDING, RUNNING, now)).fetchone()
+            if row is None:
+                return None
+            (job_id, simulator, arguments, seed, summarize, attempts) = row
+            connection.execute(
+                "UPDATE jobs SET state = ?, worker = ?, lease_expires = ?, "
+                "attempts = ? WHERE job_id = ?",
+                (RUNNING, worker, now + lease, attempts + 1, job_id))
+            return Job(job_id, simulator, pickle.loads(arguments), seed,
+                       summarize, attempts + 1)
+        return self._transaction(operation)
+
+    # Extend the lease of a job.
+    #
+    # Returns
+    # ----------------
+    # True if |worker| still holds the job. False if the lease has been lost
+    # to another worker.
+    def heartbeat(self, job_id, worker, lease):
+        now = self.clock()
+        return self._transaction(lambda connection: connection.execute(
+            "UPDATE jobs SET lease_expires = ? WHERE job_id = ? AND "
+            "worker = ? AND state = ?",
+            (now + lease, job_id, worker, RUNNING)).rowcount == 1)
+
+    # Return True if |worker| holds the job and its lease has not expired.
+    def holds(self, job_id, worker):
+        with self._connect() as connection:
+            return connection.execute(
+                "SELECT 1 FROM jobs WHERE job_id = ? AND worker = ? AND "
+                "state = ? AND lease_expires >= ?",
+                (job_id, worker, RUNNING, self.clock())).fetchone() is not None
+
+    # Mark a job done with the key of its result in the ResultCache.
+    #
+    # Returns
+    # ----------------
+    # True if |worker| held the job. False if the lease has expired, in
+    # which case the job is left to be claimed again.
+    def complete(self, job_id, worker, result_key):
+        now = self.clock()
+        return self._transaction(lambda connection: connection.execute(
+            "UPDATE jobs SET state = ?, result_key = ?, error = NULL "
+            "WHERE job_id = ? AND worker = ? AND state = ? AND "
+            "lease_expires >= ?",
+            (DONE, result_key, job_id, worker, RUNNING, now)).rowcount == 1)
+
+    # Record a failure of a job. The job is retried unless it has used up
+    # its attempts.
+    #
+    # Returns
+    # ----------------
+    # True if |worker| held the job. False if the lease has expired.
+    def fail(self, job_id, worker, error):
+        now = self.clock()
+        return self._transaction(lambda connection: connection.execute(
+            "UPDATE jobs SET state = CASE WHEN attempts >= max_attempts "
+            "THEN ? ELSE ? END, worker = NULL, error = ? WHERE job_id = ? "
+            "AND worker = ? AND state = ? AND lease_expires >= ?",
+            (FAILED, PENDING, error, job_id, worker, RUNNING,
+             now)).rowcount == 1)
+
+    # Return a dict from the states to the numbers of the jobs.
+    def status(self):
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        counts = {PENDING: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        counts.update(dict(rows))
+        return counts
+
+    # Return a list of (job ID, state, attempts, error, result key) of all
+    # the jobs.
+    def jobs(self):
+        with self._connect() as connection:
+            return connection.execute(
+                "SELECT job_id, state, attempts, error, result_key FROM jobs "
+                "ORDER BY job_id").fetchall()
+
+
+BACKENDS = {
+    "sqlite": SQLiteQueue,
+}
+
+# Submit the runs of |arguments_list| like ResultCache.run() would run them:
+# the n-th run of the same arguments uses |seed| + n.
+#
+# Returns
+# ----------------
+# The list of the IDs of the jobs.
+def submit_sweep(queue, simulator_class, arguments_list, seed=0,
+                 summarize=None):
+    occurrences = {}
+    jobs = []
+    for arguments in arguments_list:
+        count = occurrences.get(repr(tuple(arguments)), 0)
+        occurrences[repr(tuple(arguments))] = count + 1
+        jobs.append((simulator_class, arguments, seed + count, summarize))
+    return queue.submit(jobs)
+
+# Extend the lease of a job until |stop| is set.
+def send_heartbeats(queue, job_id, worker, lease, interval, stop):
+    while not stop.wait(interval):
+        if not queue.heartbeat(job_id, worker, lease):
+            break
+
+# Run jobs until the queue has no job to claim.
+#
+# Parameters
+# ----------------
+# |queue|: The work queue.
+# |cache|: The ResultCache to store the results in.
+# |worker|: The name of the worker. It must be unique among the workers.
+# |lease|: The seconds a job is held without a heartbeat.
+# |heartbeat_interval|: The seconds between the heartbeats. |lease| / 3 if
+# None.
+# |wait|: If True, wait for the jobs other workers are running, which may
+# be retried, before returning.
+# |poll_interval|: The seconds between the claims while waiting.
+#
+# Returns
+# ----------------
+# A tuple of the numbers of the jobs done and failed by this worker. A job
+# whose lease the worker lost is neither: its result is not stored and it is
+# left to the worker that claims it again.
+def run_worker(queue, cache, worker, lease=60, heartbeat_interval=None,
+               wait=True, poll_interval=1):
+    if heartbeat_interval is None:
+        heartbeat_interval = lease / 3
+    done = 0
+    failed = 0
+    while True:
+        job = queue.claim(worker, lease)
+        if job is None:
+            if wait and queue.status()[RUNNING] > 0:
+                time.sleep(poll_interval)
+                continue
+            return (done, failed)
+
+        stop = threading.Event()
+        heartbeat = threading.Thread(
+            target=send_heartbeats,
+            args=(queue, job.job_id, worker, lease, heartbeat_interval, stop),
+            daemon=True)
+        heartbeat.start()
+        try:
+            simulator_class = load_object(job.simulator)
+            summarize = load_object(job.summarize) if job.summarize else None
+            key = cache.key(simulator_class, job.arguments, job.seed)
+            record = None
+            if cache.get(key) is None:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    record = cache.simulate(simulator_class, job.arguments,
+                                            job.seed, summarize)
+        except Exception:
+            stop.set()
+            heartbeat.join()
+            if queue.fail(job.job_id, worker, traceback.format_exc()):
+                failed += 1
+            continue
+        stop.set()
+        heartbeat.join()
+        # Another worker may be running the job after the lease expired.
+        if not queue.holds(job.job_id, worker):
+            continue
+        if record is not None:
+            cache.put(key, record)
+        if queue.complete(job.job_id, worker, key):
+            done += 1
+
+# Run a worker in a process of the pool started by the worker command.
+def run_worker_process(arguments):
+    (backend, path, cache_dir, lease, index) = arguments
+    worker = "%s:%d:%d" % (socket.gethostname(), os.getpid(), index)
+    return run_worker(BACKENDS[backend](path), ResultCache(cache_dir),
+                      worker, lease)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("command", choices=["submit", "worker", "status"])
+    parser.add_argument("--queue", required=True,
+                        help="the path of the queue")
+    parser.add_argument("--backend", choices=list(BACKENDS),
+                        default="sqlite")
+    parser.add_argument("--sweep", choices=["acb_simulator",
+                                            "oracle_simulator"],
+                        default="acb_simulator",
+                        help="the sweep to submit")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cache-dir", default=None,
+                        help="the shared result cache of the workers")
+    parser.add_argument("--lease", type=float, default=60)
+    parser.add_argument("-j", "--processes", type=int,
+                        default=multiprocessing.cpu_count())
+    args = parser.parse_args()
+    queue = BACKENDS[args.backend](args.queue)
+
+    if args.command == "submit":
+        if args.sweep == "oracle_simulator":
+            from oracle_simulator import OracleSimulator, sweep_arguments
+            job_ids = submit_sweep(queue, OracleSimulator, sweep_arguments(),
+                                   args.seed)
+        else:
+            from acb_simulator import ACBSimulator, sweep_arguments
+            from acb_cache import simulator_summary
+            job_ids = submit_sweep(queue, ACBSimulator, sweep_arguments(),
+                                   args.seed, simulator_summary)
+        print("submitted %d jobs" % len(job_ids))
+    elif args.command == "worker":
+        assert(args.cache_dir)
+        with multiprocessing.Pool(args.processes) as pool:
+            outputs = pool.map(run_worker_process, [
+                (args.backend, args.queue, args.cache_dir, args.lease, index)
+                for index in range(args.processes)])
+        print("done=%d failed=%d" % (sum([done for (done, failed)
+                                          in outputs]),
+                                     sum([failed for (done, failed)
+                                          in outputs])))
+    print(" ".join(["%s=%d" % item for item in queue.status().items()]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2021 Kentaro Hara
+#
+# This software is released under the MIT License.
+# http://opensource.org/licenses/mit-license.php
+
+from acb_queue import *
+from acb_cache import ResultCache, simulator_summary
+from acb_simulator import ACBSimulator
+from oracle_simulator import OracleSimulator
+import concurrent.futures, os, shutil, tempfile, time, unittest
+
+# A simulator that fails on the first attempt. The marker file records the
+# attempt across the worker processes.
+class FlakySimulator:
+    def __init__(self, marker):
+        self.marker = marker
+
+    def run(self):
+        if not os.path.exists(self.marker):
+            open(self.marker, "w").close()
+            assert(False)
+
+    def teardown(self):
+        pass
+
+# A simulator that runs longer than the lease of the workers.
+class SlowSimulator:
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def run(self):
+        time.sleep(self.seconds)
+
+    def teardown(self):
+        pass
+
+# A simulator that always fails.
+class FailingSimulator:
+    def __init__(self, value):
+        pass
+
+    def run(self):
+        assert(False)
+
+    def teardown(self):
+        pass
+
+# A clock the test moves forward.
+class Clock:
+    def __init__(self):
+        self.now = 1000
+
+    def __call__(self):
+        return self.now
+
+def run_test_worker(arguments):
+    (path, cache_dir, index) = arguments
+    return run_worker(SQLiteQueue(path), ResultCache(cache_dir),
+                      "worker%d" % index, 0.2, 0.05, True, 0.05)
+
+class ACBQueueUnitTest(unittest.TestCase):
+    def __init__(self, workers):
+        super().__init__()
+        print('workers=%d' % workers)
+        self._workers = workers
+
+    def teardown(self):
+        pass
+
+    def run(self):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, "queue.db")
+        cache_dir = os.path.join(directory, "cache")
+
+        # Leases, heartbeats and retries.
+        clock = Clock()
+        queue = SQLiteQueue(os.path.join(directory, "lease.db"), 2, clock)
+        self.assertEqual(queue.claim("a", 10), None)
+        job_ids = queue.submit([(OracleSimulator, (2, 0, 0, 1, 1), 5, None),
+                                (FailingSimulator, (0,), 0, None)])
+        self.assertEqual(job_ids, [1, 2])
+        job = queue.claim("a", 10)
+        self.assertEqual((job.job_id, job.arguments, job.seed, job.attempts),
+                         (1, (2, 0, 0, 1, 1), 5, 1))
+        self.assertEqual(load_object(job.simulator), OracleSimulator)
+        self.assertEqual(job.summarize, None)
+        self.assertEqual(queue.claim("b", 10).job_id, 2)
+        self.assertEqual(queue.claim("c", 10), None)
+        clock.now += 8
+        self.assertTrue(queue.heartbeat(1, "a", 10))
+        self.assertFalse(queue.heartbeat(1, "b", 10))
+        clock.now += 8
+        # The lease of the job 2 expired and is claimed again.
+        job = queue.claim("c", 10)
+        self.assertEqual((job.job_id, job.attempts), (2, 2))
+        self.assertFalse(queue.heartbeat(2, "b", 10))
+        self.assertFalse(queue.complete(2, "b", "key"))
+        self.assertFalse(queue.fail(2, "b", "error"))
+        self.assertTrue(queue.fail(2, "c", "error"))
+        self.assertEqual(queue.status(),
+                         {PENDING: 0, RUNNING: 1, DONE: 0, FAILED: 1})
+        self.assertTrue(queue.complete(1, "a", "key"))
+        self.assertFalse(queue.complete(1, "a", "key"))
+        self.assertEqual(queue.jobs(), [(1, DONE, 1, None, "key"),
+                                        (2, FAILED, 2, "error", None)])
+        # A job whose lease expired on the last attempt fails.
+        queue.submit([(FailingSimulator, (1,), 0, None)])
+        queue.claim("a", 1)
+        clock.now += 2
+        queue.claim("b", 1)
+        clock.now += 2
+        self.assertEqual(queue.claim("c", 1), None)
+        self.assertEqual(queue.jobs()[2][1:4],
+                         (FAILED, 2, "the lease expired"))
+        # A job whose lease expired is not done or failed by the worker even
+        # before another worker claims it.
+        queue.submit([(FailingSimulator, (2,), 0, None)])
+        queue.claim("a", 10)
+        self.assertTrue(queue.holds(4, "a"))
+        self.assertFalse(queue.holds(4, "b"))
+        clock.now += 11
+        self.assertFalse(queue.holds(4, "a"))
+        self.assertFalse(queue.complete(4, "a", "key"))
+        self.assertFalse(queue.fail(4, "a", "error"))
+        self.assertEqual(queue.jobs()[3][1:3], (RUNNING, 1))
+
+        # A worker that lost the lease stores no result and leaves the job to
+        # the next claim, which is the worker itself here.
+        queue = SQLiteQueue(os.path.join(directory, "expiring.db"), 2)
+        cache = ResultCache(os.path.join(directory, "expiring"))
+        queue.submit([(SlowSimulator, (0.3,), 0, None)])
+        self.assertEqual(run_worker(queue, cache, "a", 0.2, 100, False),
+                         (0, 0))
+        self.assertEqual(queue.jobs(),
+                         [(1, FAILED, 2, "the lease expired", None)])
+        self.assertEqual(cache.get(cache.key(SlowSimulator, (0.3,), 0)),
+                         None)
+        # The same run within the lease is done.
+        queue.submit([(SlowSimulator, (0.1,), 0, None)])
+        self.assertEqual(run_worker(queue, cache, "a", 10, 100, False),
+                         (1, 0))
+        key = cache.key(SlowSimulator, (0.1,), 0)
+        self.assertEqual(queue.jobs()[1], (2, DONE, 1, None, key))
+        self.assertEqual(cache.get(key)["seed"], 0)
+
+        # A sweep run by the workers.
+        queue = SQLiteQueue(path, 2)
+        acb_arguments = (996, 1000, 12, 2, 7 * 24 * 60 * 60, 90, 10, 10,
+                         [6, 7, 8, 9, 10, 11, 12, 13, 14], 1, 8 * 60 * 60,
+                         20, 3, 10, 10)
+        oracle_arguments = [(level_max, 1, 90, voter_count, 5)
+                            for level_max in [2, 4]
+                            for voter_count in [0, 3]]
+        acb_ids = submit_sweep(queue, ACBSimulator,
+                               [acb_arguments] * 3, 7, simulator_summary)
+        oracle_ids = submit_sweep(queue, OracleSimulator, oracle_arguments)
+        queue.submit([(SlowSimulator, (0.5,), 0, None),
+                      (FlakySimulator, (os.path.join(directory, "marker"),),
+                       0, None),
+                      (FailingSimulator, (0,), 0, None)])
+        # A worker died holding a job. Its lease has expired.
+        queue.claim("dead", -1)
+        if self._workers == 1:
+            outputs = [run_test_worker((path, cache_dir, 0))]
+        else:
+            with concurrent.futures.ProcessPoolExecutor(
+                    self._workers) as pool:
+                outputs = list(pool.map(run_test_worker, [
+                    (path, cache_dir, index)
+                    for index in range(self._workers)]))
+        self.assertEqual(sum([done for (done, failed) in outputs]),
+                         3 + 4 + 2)
+        self.assertEqual(sum([failed for (done, failed) in outputs]), 1 + 2)
+        self.assertEqual(queue.status(),
+                         {PENDING: 0, RUNNING: 0, DONE: 3 + 4 + 2,
+                          FAILED: 1})
+        jobs = queue.jobs()
+        self.assertEqual(jobs[0][2], 2)
+        # The heartbeats keep the slow job from being claimed again.
+        self.assertEqual(jobs[-3][1:3], (DONE, 1))
+        self.assertEqual(jobs[-2][1:3], (DONE, 2))
+        self.assertEqual(jobs[-1][1:3], (FAILED, 2))
+        self.assertTrue("AssertionError" in jobs[-1][3])
+
+        # The results are in the result cache and are the same as the runs
+        # of a local sweep with the cache.
+        cache = ResultCache(cache_dir)
+        for (job_id, arguments, seed) in zip(acb_ids, [acb_arguments] * 3,
+                                             [7, 8, 9]):
+            key = jobs[job_id - 1][4]
+            self.assertEqual(key, cache.key(ACBSimulator, arguments, seed))
+            record = cache.get(key)
+            self.assertEqual(record["seed"], seed)
+            self.assertEqual(record["summary"]["epoch_count"], 10)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for arguments in [acb_arguments] * 3:
+                cache.run(ACBSimulator, arguments, 7, simulator_summary)
+            for arguments in oracle_arguments:
+                cache.run(OracleSimulator, arguments)
+        self.assertEqual((cache.hits, cache.misses), (3 + 4, 0))
+
+        # Nothing is left to claim.
+        self.assertEqual(run_worker(queue, cache, "late"), (0, 0))
+        shutil.rmtree(directory)
+
+
+def main():
+    for workers in [1, 3]:
+        test = ACBQueueUnitTest(workers)
+        test.run()
+        test.teardown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2021 Kentaro Hara
+#
+# This software is released under the MIT License.
+# http://opensource.org/licenses/mit-license.php
+
+from acb_simulator import ACBSimulator
+from acb_genesis import Genesis
+from acb_variance import confidence_interval
+import acb_simulator_long
+import argparse, concurrent.futures, contextlib, io, multiprocessing, random
+import time
+
+#-------------------------------------------------------------------------------
+# [Adaptive replication]
+#
+# Runs every configuration as many times as its metrics need instead of a
+# fixed number of times. Seeded replications of the configurations run in
+# parallel, and a configuration stops when the confidence interval of every
+# metric is narrower than the target precision or when it reaches the
+# maximum number of replications. Stable configurations stop after a few
+# replications and the rest of the runs go to the noisy ones.
+#
+# A configuration stops at the smallest number of replications k such that
+# the replications 0, ..., k-1 meet the target, and the replication i uses
+# the seed |seed| + i. Replications that ran beyond k in parallel are
+# discarded, so the result does not depend on the number of processes.
+#
+# With --genesis, every configuration is constructed once and the
+# replications are forked from it (see acb_genesis.py) instead of
+# constructing the simulator in every replication.
+#
+# Usage:
+#   ./acb_replication.py --precision 0.05 --max 30 -j 8
+#   ./acb_replication.py --genesis -j 8
+#-------------------------------------------------------------------------------
+
+# The metrics of a replication.
+REPLICATION_METRICS = [
+    # The total coin supply at the end relative to the initial supply.
+    "coin_supply_ratio",
+    # The ratio of the reclaims that hit.
+    "reclaim_hit_rate",
+    # The number of the expired bonds.
+    "expired_bonds",
+]
+
+# Run one replication without printing anything.
+#
+# Parameters
+# ----------------
+# |job|: A tuple of the arguments of ACBSimulator and the seed.
+#
+# Returns
+# ----------------
+# A dict from REPLICATION_METRICS to the values.
+def run_replication(job):
+    (arguments, seed) = job
+    random.seed(seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        simulator = ACBSimulator(*arguments)
+    return replicate(simulator)
+
+# Run a constructed simulator without printing anything.
+#
+# Returns
+# ----------------
+# The metrics returned by run_replication().
+def replicate(simulator):
+    with contextlib.redirect_stdout(io.StringIO()):
+        simulator.run()
+        simulator.teardown()
+    metrics = simulator.metrics
+    return {
+        "coin_supply_ratio": (simulator._coin.total_supply /
+                              simulator._initial_coin_supply
+                              if simulator._initial_coin_supply else 0.0),
+        "reclaim_hit_rate": (metrics.total_reclaim_hit /
+                             (metrics.total_reclaim_hit +
+                              metrics.total_reclaim_miss)
+                             if metrics.total_reclaim_hit +
+                             metrics.total_reclaim_miss else 0.0),
+        "expired_bonds": metrics.total_expired_bonds,
+    }
+
+
+class Replications:
+    def __init__(self, arguments, metrics, precision, min_replications,
+                 max_replications, confidence):
+        self.arguments = arguments
+        self.metrics = metrics
+        self.precision = precision
+        self.min_replications = min_replications
+        self.max_replications = max_replications
+        self.confidence = confidence
+        # A dict from the indices of the replications to their metrics.
+        self.samples = {}
+        # The number of the replications launched.
+        self.launched = 0
+        # The number of the replications the configuration stopped at, or
+        # None if it has not stopped.
+        self.stopped_at = None
+
+    # Return the mean and the half width of the confidence interval of
+    # every metric over the first |count| replications.
+    def intervals(self, count):
+        return {name: confidence_interval(
+            [self.samples[index][name] for index in range(count)],
+            self.confidence) for name in self.metrics}
+
+    # Return True if the first |count| replications meet the target.
+    def converged(self, count):
+        if count < self.min_replications:
+            return False
+        for (mean, half_width) in self.intervals(count).values():
+            if half_width > self.precision * abs(mean):
+                return False
+        return True
+
+    # Record the metrics of a replication and check whether the
+    # configuration stops.
+    def add(self, index, sample):
+        self.samples[index] = sample
+        if self.stopped_at is not None:
+            return
+        count = 0
+        while count in self.samples and count < self.max_replications:
+            count += 1
+            if self.converged(count):
+                break
+        if self.converged(count) or count == self.max_replications:
+            self.stopped_at = count
+
+    # Return True if another replication can be launched.
+    def can_launch(self):
+        return (self.stopped_at is None and
+                self.launched < self.max_replications)
+
+
+# Run the configurations with adaptive replication.
+#
+# Parameters
+# ----------------
+# |configurations|: A list of the arguments of ACBSimulator.
+# |metrics|: The names of the metrics in REPLICATION_METRICS to meet the
+# target.
+# |precision|: The target half width of the confidence intervals relative
+# to the means.
+# |min_replications|: The minimum number of the replications.
+# |max_replications|: The maximum number of the replications.
+# |confidence|: The confidence level.
+# |processes|: The number of worker processes. 1 runs in-process.
+# |seed|: The seed of the first replication.
+# |genesis|: True to fork the replications from the configurations
+# constructed once. The replications then run in forked processes even if
+# |processes| is 1.
+#
+# Returns
+# ----------------
+# A tuple of two values:
+#  - A list of dicts for the configurations with:
+#    - "replications": The number of the replications.
+#    - "converged": True if the target was met.
+#    - "metrics": A dict from REPLICATION_METRICS to the means and the half
+#      widths of their confidence intervals.
+#  - The number of the replications run, including the discarded ones.
+def adaptive_replication(configurations, metrics=REPLICATION_METRICS,
+                         precision=0.05, min_replications=3,
+                         max_replications=30, confidence=0.95, processes=1,
+                         seed=0, genesis=False):
+    assert(2 <= min_replications and min_replications <= max_replications)
+    states = [Replications(arguments, metrics, precision, min_replications,
+                           max_replications, confidence)
+              for arguments in configurations]
+
+    # Return the configuration to launch a replication of next, or None.
+    # The configuration with the fewest replications goes first.
+    def next_state():
+        candidates = [state for state in states if state.can_launch()]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda state: state.launched)
+
+    runs = 0
+    if genesis:
+        built = Genesis(configurations)
+        try:
+            while True:
+                while len(built) < processes:
+                    state = next_state()
+                    if state is None:
+                        break
+                    built.start((state, state.launched), states.index(state),
+                                seed + state.launched, replicate)
+                    state.launched += 1
+                if not len(built):
+                    break
+                for ((state, index), sample) in built.wait():
+                    state.add(index, sample)
+                    runs += 1
+        finally:
+            built.close()
+    elif processes > 1:
+        with concurrent.futures.ProcessPoolExecutor(processes) as pool:
+            futures = {}
+            while True:
+                # Keep the pool busy.
+                while len(futures) < 2 * processes:
+                    state = next_state()
+                    if state is None:
+                        break
+                    future = pool.submit(run_replication, (
+                        state.arguments, seed + state.launched))
+                    futures[future] = (state, state.launched)
+                    state.launched += 1
+                if not futures:
+                    break
+                (done, not_done) = concurrent.futures.wait(
+                    futures, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    (state, index) = futures.pop(future)
+                    state.add(index, future.result())
+                    runs += 1
+    else:
+        for state in states:
+            while state.can_launch():
+                state.add(state.launched, run_replication(
+                    (state.arguments, seed + state.launched)))
+                state.launched += 1
+                runs += 1
+
+    results = []
+    for state in states:
+        results.append({
+            "replications": state.stopped_at,
+            "converged": state.converged(state.stopped_at),
+            "metrics": {name: confidence_interval(
+                [state.samples[index][name]
+                 for index in range(state.stopped_at)], confidence)
+                        for name in REPLICATION_METRICS},
+        })
+    return (results, runs)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--precision", type=float, default=0.05,
+                        help="the target half width of the confidence "
+                        "intervals relative to the means")
+    parser.add_argument("--min", type=int, default=3)
+    parser.add_argument("--max", type=int, default=30)
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--metric", action="append",
+                        choices=REPLICATION_METRICS,
+                        help="a metric to meet the target (default: all)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--genesis", action="store_true",
+                        help="construct every configuration once and fork "
+                        "the replications from it")
+    parser.add_argument("-j", "--processes", type=int,
+                        default=multiprocessing.cpu_count())
+    args = parser.parse_args()
+
+    configurations = [arguments for (arguments, repetitions)
+                      in acb_simulator_long.configurations()]
+    start = time.time()
+    (results, runs) = adaptive_replication(
+        configurations, args.metric or REPLICATION_METRICS, args.precision,
+        args.min, args.max, args.confidence, args.processes, args.seed,
+        args.genesis)
+    elapsed = time.time() - start
+    for (arguments, result) in zip(configurations, results):
+        print("%s" % (arguments,))
+        print("  replications=%d%s %s" % (
+            result["replications"],
+            "" if result["converged"] else " (not converged)",
+            " ".join(["%s=%.4f+-%.4f" % ((name,) + result["metrics"][name])
+                      for name in REPLICATION_METRICS])))
+    print("ran %d replications in %.1fs" % (runs, elapsed))
+
+
+if __name__ == "__main__":
+    main()
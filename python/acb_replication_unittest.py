@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2021 Kentaro Hara
+#
+# This software is released under the MIT License.
+# http://opensource.org/licenses/mit-license.php
+
+from acb_replication import *
+import acb_simulator_long
+import unittest
+
+class ACBReplicationUnitTest(unittest.TestCase):
+    def __init__(self, processes):
+        super().__init__()
+        print('processes=%d' % processes)
+        self._processes = processes
+
+    def teardown(self):
+        pass
+
+    def run(self):
+        # The configurations of acb_simulator_long.py.
+        configurations = list(acb_simulator_long.configurations())
+        self.assertEqual(len(configurations), 10)
+        self.assertEqual([repetitions for (arguments, repetitions)
+                          in configurations], [10] + [3] * 9)
+        for (arguments, repetitions) in configurations:
+            self.assertEqual(len(arguments), 15)
+
+        def configuration(bond_price, damping_factor, voter_count):
+            return (bond_price, 1000, 12, 2, 7 * 24 * 60 * 60, 90, 10,
+                    damping_factor, [6, 7, 8, 9, 10, 11, 12, 13, 14], 1,
+                    8 * 60 * 60, 20, 3, voter_count, 20)
+        configurations = [configuration(996, 10, 10),
+                          configuration(800, 90, 10),
+                          configuration(996, 10, 1)]
+
+        # A replication is deterministic for the seed.
+        metrics = run_replication((configurations[0], 3))
+        self.assertEqual(metrics, run_replication((configurations[0], 3)))
+        self.assertEqual(set(metrics), set(REPLICATION_METRICS))
+        self.assertTrue(0 <= metrics["reclaim_hit_rate"] <= 1)
+        self.assertTrue(metrics["coin_supply_ratio"] > 0)
+
+        # A loose target stops at the minimum and a strict target runs up
+        # to the maximum.
+        (results, runs) = adaptive_replication(
+            configurations, REPLICATION_METRICS, 100, 2, 6, 0.95,
+            self._processes)
+        self.assertEqual([result["replications"] for result in results],
+                         [2, 2, 2])
+        self.assertTrue(all([result["converged"] for result in results]))
+        self.assertTrue(runs >= 6)
+        (results, runs) = adaptive_replication(
+            configurations[:1], ["coin_supply_ratio"], 0, 2, 5, 0.95,
+            self._processes, 7)
+        self.assertEqual(results[0]["replications"], 5)
+        self.assertFalse(results[0]["converged"])
+        self.assertEqual(runs, 5)
+        self.assertEqual(
+            results[0]["metrics"]["coin_supply_ratio"],
+            confidence_interval([run_replication(
+                (configurations[0], seed))["coin_supply_ratio"]
+                                 for seed in range(7, 12)]))
+
+        # Every configuration stops at the first number of replications that
+        # meets the target, regardless of the number of processes.
+        (results, runs) = adaptive_replication(
+            configurations, REPLICATION_METRICS, 0.1, 3, 12, 0.95,
+            self._processes)
+        (expected, expected_runs) = adaptive_replication(
+            configurations, REPLICATION_METRICS, 0.1, 3, 12, 0.95, 1)
+        self.assertEqual(results, expected)
+        # The same with the replications forked from the constructed
+        # configurations.
+        (results, runs) = adaptive_replication(
+            configurations, REPLICATION_METRICS, 0.1, 3, 12, 0.95,
+            self._processes, 0, True)
+        self.assertEqual(results, expected)
+        self.assertEqual(expected_runs, sum([result["replications"]
+                                             for result in expected]))
+        for (arguments, result) in zip(configurations, results):
+            count = result["replications"]
+            samples = [run_replication((arguments, seed))
+                       for seed in range(count)]
+            for name in REPLICATION_METRICS:
+                (mean, half_width) = result["metrics"][name]
+                self.assertEqual((mean, half_width), confidence_interval(
+                    [sample[name] for sample in samples]))
+                if result["converged"]:
+                    self.assertTrue(half_width <= 0.1 * abs(mean))
+            if result["converged"] and count > 3:
+                # One replication fewer did not meet the target.
+                state = Replications(arguments, REPLICATION_METRICS, 0.1, 3,
+                                     12, 0.95)
+                for seed in range(count):
+                    state.samples[seed] = samples[seed]
+                self.assertFalse(state.converged(count - 1))
+        # The replications went to the configurations that needed them.
+        self.assertTrue(len(set([result["replications"]
+                                 for result in results])) > 1)
+
+        with self.assertRaises(Exception):
+            adaptive_replication(configurations, REPLICATION_METRICS, 0.1, 1)
+        with self.assertRaises(Exception):
+            adaptive_replication(configurations, REPLICATION_METRICS, 0.1, 5,
+                                 4)
+
+
+def main():
+    for processes in [1, 2]:
+        test = ACBReplicationUnitTest(processes)
+        test.run()
+        test.teardown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2021 Kentaro Hara
+#
+# This software is released under the MIT License.
+# http://opensource.org/licenses/mit-license.php
+
+from johnlawcoin import *
+from acb_snapshot import SnapshotPublisher
+import argparse, asyncio, concurrent.futures, json, os, sys, tempfile, time
+
+#-------------------------------------------------------------------------------
+# [ACB service]
+#
+# Serves one ACB to many clients over a local TCP or Unix socket.
+#
+# The protocol is JSON Lines. A client sends one request per line:
+#
+#   {"id": 1, "method": "purchase_bonds", "params": {"sender": 1, "count": 2}}
+#
+# and receives one response per line, in the order the requests were sent:
+#
+#   {"id": 1, "result": 15}
+#   {"id": 2, "error": "AssertionError"}
+#
+# If the service has a SnapshotPublisher (see acb_snapshot.py), a query with
+# "snapshot": true is answered from the latest snapshot right away instead of
+# waiting for the writer. The answer may not reflect the latest writes.
+#
+# Clients may send requests without waiting for the responses. All the
+# requests go to one queue. The writer takes all the requests in the queue
+# (up to |max_batch|) as one batch, applies them to the ACB in the arrival
+# order on a dedicated thread, and resolves the future of each request.
+# Only the writer touches the ACB, so the ACB needs no locking, and the
+# per-request overhead of switching to the writer is paid once per batch.
+#
+# Usage:
+#   ./acb_service.py serve --port 8000       # Serve on TCP.
+#   ./acb_service.py serve --unix /tmp/acb   # Serve on a Unix socket.
+#   ./acb_service.py bench --clients 16      # Run the benchmark.
+#-------------------------------------------------------------------------------
+
+# The methods a client can call. Each method takes the ACB and the params of
+# the request and returns the result.
+METHODS = {
+    "vote": lambda acb, params: acb.vote(
+        params["sender"], params["hash"], params["oracle_level"],
+        params["salt"]),
+    "encrypt": lambda acb, params: acb.encrypt(
+        params["sender"], params["level"], params["salt"]),
+    "purchase_bonds": lambda acb, params: acb.purchase_bonds(
+        params["sender"], params["count"]),
+    "redeem_bonds": lambda acb, params: acb.redeem_bonds(
+        params["sender"], params["redemption_epochs"]),
+    "redeem_all_eligible": lambda acb, params: acb.redeem_all_eligible(
+        params["sender"]),
+    "purchase_bonds_many": lambda acb, params: acb.purchase_bonds_many(
+        params["requests"]),
+    "redeem_bonds_many": lambda acb, params: acb.redeem_bonds_many(
+        params["requests"]),
+    "exchange_coins_many": lambda acb, params: acb.exchange_coins_many(
+        params["requests"]),
+    "purchase_coins": lambda acb, params: acb.purchase_coins(
+        params["sender"], params["requested_eth_amount"]),
+    "sell_coins": lambda acb, params: acb.sell_coins(
+        params["sender"], params["requested_coin_amount"]),
+    "transfer": lambda acb, params: acb.coin.transfer(
+        params["sender"], params["receiver"], params["amount"]),
+    "balance_of": lambda acb, params: acb.coin.balance_of(params["account"]),
+    "number_of_bonds_owned_by": lambda acb, params:
+        acb.bond_operation.bond.number_of_bonds_owned_by(params["account"]),
+    "get_timestamp": lambda acb, params: acb.get_timestamp(),
+    # Test only.
+    "set_timestamp": lambda acb, params: acb.set_timestamp(
+        params["timestamp"]),
+}
+
+# The queries that can be answered from a snapshot.
+SNAPSHOT_METHODS = {
+    "balance_of": lambda snapshot, params: snapshot.balance_of(
+        params["account"]),
+    "bond_balance_of": lambda snapshot, params: snapshot.bond_balance_of(
+        params["account"], params["redemption_epoch"]),
+    "number_of_bonds_owned_by": lambda snapshot, params:
+        snapshot.number_of_bonds_owned_by(params["account"]),
+    "bond_supply_at": lambda snapshot, params: snapshot.bond_supply_at(
+        params["redemption_epoch"]),
+}
+
+class ACBService:
+    # Parameters
+    # ----------------
+    # |acb|: The ACB. Only the service may touch it while the service runs.
+    # |max_batch|: The maximum number of requests applied in one batch.
+    # |snapshots|: A SnapshotPublisher of |acb| or None. The writer records the
+    # applied requests to it.
+    def __init__(self, acb, max_batch=1024, snapshots=None):
+        self.acb = acb
+        self.max_batch = max_batch
+        self.snapshots = snapshots
+        self.queue = asyncio.Queue()
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.writer_task = None
+        self.server = None
+        self.unix_path = None
+        # Statistics.
+        self.batch_count = 0
+        self.request_count = 0
+
+    # Start the writer and listen on |unix_path| if given, otherwise on
+    # |host|:|port|. Port 0 picks a free port; see port().
+    async def start(self, host="127.0.0.1", port=0, unix_path=None):
+        self.writer_task = asyncio.ensure_future(self.run_writer())
+        if unix_path:
+            self.unix_path = unix_path
+            self.server = await asyncio.start_unix_server(
+                self.handle_connection, path=unix_path)
+        else:
+            self.server = await asyncio.start_server(
+                self.handle_connection, host, port)
+
+    def port(self):
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.unix_path and os.path.exists(self.unix_path):
+            os.unlink(self.unix_path)
+        if self.writer_task:
+            self.writer_task.cancel()
+        self.executor.shutdown()
+
+    # Queue a request and return a future resolved with the result. An
+    # exception raised by the ACB is set to the future.
+    def submit(self, method, params):
+        future = asyncio.get_event_loop().create_future()
+        self.queue.put_nowait((method, params, future))
+        return future
+
+    async def run_writer(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.max_batch and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            results = await loop.run_in_executor(
+                self.executor, self.apply_batch, batch)
+            for ((method, params, future), (ok, value)) in zip(batch, results):
+                if future.cancelled():
+                    continue
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+            self.batch_count += 1
+            self.request_count += len(batch)
+
+    # Apply the requests in |batch| to the ACB in order. Runs on the writer
+    # thread.
+    #
+    # Returns
+    # ----------------
+    # A list of tuples of (whether the request succeeded, the result or the
+    # exception).
+    def apply_batch(self, batch):
+        results = []
+        for (method, params, future) in batch:
+            try:
+                results.append((True, METHODS[method](self.acb, params)))
+            except Exception as error:
+                results.append((False, error))
+        if self.snapshots:
+            self.snapshots.record(len(batch))
+        return results
+
+    async def handle_connection(self, reader, writer):
+        # The responses are written in the order of the requests. Reading the
+        # next request does not wait for the previous response.
+        pending = asyncio.Queue()
+
+        async def respond():
+            while True:
+                (request_id, future) = await pending.get()
+                if future is None:
+                    break
+                try:
+                    response = {"id": request_id, "result": await future}
+                except Exception as error:
+                    response = {"id": request_id,
+                                "error": type(error).__name__}
+                writer.write((json.dumps(response) + "\n").encode())
+                if pending.empty():
+                    await writer.drain()
+
+        responder = asyncio.ensure_future(respond())
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                request = None
+                try:
+                    request = json.loads(line)
+                    method = request["method"]
+                    params = request.get("params", {})
+                    if request.get("snapshot"):
+                        if not self.snapshots:
+                            raise KeyError("snapshot")
+                        future = asyncio.get_event_loop().create_future()
+                        future.set_result(SNAPSHOT_METHODS[method](
+                            self.snapshots.latest(), params))
+                    elif method in METHODS:
+                        future = self.submit(method, params)
+                    else:
+                        raise KeyError(method)
+                except (ValueError, KeyError, TypeError) as error:
+                    future = asyncio.get_event_loop().create_future()
+                    future.set_exception(error)
+                    request = request if isinstance(request, dict) else {}
+                pending.put_nowait((request.get("id"), future))
+        finally:
+            pending.put_nowait((None, None))
+            await responder
+            writer.close()
+
+# A client of ACBService. Requests can be pipelined: call() can be called
+# concurrently from multiple coroutines.
+class ACBClient:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.next_id = 0
+        self.futures = {}
+        self.receiver = asyncio.ensure_future(self.receive())
+
+    @staticmethod
+    async def connect(host="127.0.0.1", port=0, unix_path=None):
+        if unix_path:
+            (reader, writer) = await asyncio.open_unix_connection(unix_path)
+        else:
+            (reader, writer) = await asyncio.open_connection(host, port)
+        return ACBClient(reader, writer)
+
+    async def receive(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            response = json.loads(line)
+            future = self.futures.pop(response["id"])
+            if "error" in response:
+                future.set_exception(RuntimeError(response["error"]))
+            else:
+                future.set_result(response["result"])
+
+    # Call |method| and return the result. Raises RuntimeError if the ACB
+    # rejected the request.
+    async def call(self, method, **params):
+        return await self.send({"method": method, "params": params})
+
+    # Query |method| from the latest snapshot of the service.
+    async def query_snapshot(self, method, **params):
+        return await self.send(
+            {"method": method, "params": params, "snapshot": True})
+
+    async def send(self, request):
+        request["id"] = self.next_id
+        self.next_id += 1
+        future = asyncio.get_event_loop().create_future()
+        self.futures[request["id"]] = future
+        self.writer.write((json.dumps(request) + "\n").encode())
+        return await future
+
+    # Close the connection after receiving all the pending responses.
+    async def close(self):
+        self.writer.write_eof()
+        await self.receiver
+        self.writer.close()
+
+#-------------------------------------------------------------------------------
+# [Benchmark]
+#
+# Each client owns one account and repeatedly sends a transfer, a vote with
+# NULL_HASH, a bond purchase (which fails while the bond budget is zero) and a
+# balance query, keeping |pipeline| requests in flight. The same workload is
+# applied directly to another ACB as the baseline.
+#-------------------------------------------------------------------------------
+
+def workload(client_count, requests_per_client):
+    for i in range(requests_per_client):
+        for client in range(client_count):
+            sender = client + 1
+            kind = (i + client) % 4
+            if kind == 0:
+                yield (client, "transfer",
+                       {"sender": sender,
+                        "receiver": (client + 1) % client_count + 1,
+                        "amount": 10})
+            elif kind == 1:
+                yield (client, "vote",
+                       {"sender": sender, "hash": ACB.NULL_HASH,
+                        "oracle_level": 0, "salt": 0})
+            elif kind == 2:
+                yield (client, "purchase_bonds",
+                       {"sender": sender, "count": 1})
+            else:
+                yield (client, "balance_of", {"account": sender})
+
+def create_benchmark_acb(client_count):
+    acb = create_acb(0, 996, 1000, 12, 2, 7 * 24 * 60 * 60, 90, 10, 10,
+                     [6, 7, 8, 9, 10, 11, 12, 13, 14], 1, 8 * 60 * 60, 20, 3)
+    for client in range(client_count):
+        acb.coin.transfer(0, client + 1, 100000)
+    return acb
+
+def run_baseline(client_count, requests_per_client):
+    acb = create_benchmark_acb(client_count)
+    start = time.time()
+    count = 0
+    for (client, method, params) in workload(client_count,
+                                             requests_per_client):
+        try:
+            METHODS[method](acb, params)
+        except Exception:
+            pass
+        count += 1
+    return count / (time.time() - start)
+
+async def run_load(client_count, requests_per_client, pipeline, max_batch,
+                   unix_path):
+    service = ACBService(create_benchmark_acb(client_count), max_batch)
+    await service.start(unix_path=unix_path)
+    clients = [await ACBClient.connect(port=service.port(),
+                                       unix_path=unix_path)
+               for i in range(client_count)]
+    requests = [[] for i in range(client_count)]
+    for (client, method, params) in workload(client_count,
+                                             requests_per_client):
+        requests[client].append((method, params))
+    latencies = []
+
+    async def call(client, method, params, slots):
+        async with slots:
+            start = time.time()
+            try:
+                await clients[client].call(method, **params)
+            except RuntimeError:
+                pass
+            latencies.append(time.time() - start)
+
+    async def run_client(client):
+        slots = asyncio.Semaphore(pipeline)
+        await asyncio.gather(*[call(client, method, params, slots)
+                               for (method, params) in requests[client]])
+
+    start = time.time()
+    await asyncio.gather(*[run_client(client)
+                           for client in range(client_count)])
+    elapsed = time.time() - start
+    for client in clients:
+        await client.close()
+    await service.stop()
+    latencies.sort()
+    return {
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+        "mean_batch": service.request_count / max(service.batch_count, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    serve_parser = subparsers.add_parser("serve", help="serve an ACB")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8000)
+    serve_parser.add_argument("--unix", help="listen on a Unix socket")
+    serve_parser.add_argument("--max-batch", type=int, default=1024)
+    serve_parser.add_argument("--snapshots", action="store_true",
+                              help="publish read snapshots every epoch")
+    serve_parser.add_argument("--snapshot-every", type=int,
+                              help="also publish every N requests")
+    bench_parser = subparsers.add_parser(
+        "bench", help="measure the throughput and latency")
+    bench_parser.add_argument("--clients", type=int, default=16)
+    bench_parser.add_argument("--requests", type=int, default=1000,
+                              help="the number of requests per client")
+    bench_parser.add_argument("--pipeline", type=int, nargs="+",
+                              default=[1, 8, 64],
+                              help="the requests in flight per client")
+    bench_parser.add_argument("--max-batch", type=int, default=1024)
+    bench_parser.add_argument("--tcp", action="store_true",
+                              help="use TCP instead of a Unix socket")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        async def serve():
+            acb = ACB(JohnLawCoin(0), Oracle(), BondOperation(JohnLawBond()),
+                      OpenMarketOperation(), EthPool(), Logging())
+            snapshots = None
+            if args.snapshots or args.snapshot_every:
+                snapshots = SnapshotPublisher(acb, args.snapshot_every)
+            service = ACBService(acb, args.max_batch, snapshots)
+            await service.start(args.host, args.port, args.unix)
+            print("serving on %s" % (args.unix or "%s:%d" % (
+                args.host, service.port())), file=sys.stderr)
+            await asyncio.Event().wait()
+        asyncio.run(serve())
+        return
+
+    print("direct: %.0f req/s" % run_baseline(args.clients, args.requests))
+    for pipeline in args.pipeline:
+        unix_path = None
+        if not args.tcp:
+            unix_path = os.path.join(tempfile.mkdtemp(), "acb.sock")
+        result = asyncio.run(run_load(args.clients, args.requests, pipeline,
+                                      args.max_batch, unix_path))
+        print("service: clients=%d pipeline=%d %.0f req/s p50=%.2fms "
+              "p99=%.2fms mean_batch=%.1f" %
+              (args.clients, pipeline, result["throughput"],
+               result["p50_ms"], result["p99_ms"], result["mean_batch"]))
+        if unix_path:
+            os.rmdir(os.path.dirname(unix_path))
+
+
+if __name__ == "__main__":
+    main()
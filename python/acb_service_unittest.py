@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2021 Kentaro Hara
+#
+# This software is released under the MIT License.
+# http://opensource.org/licenses/mit-license.php
+
+from johnlawcoin import *
+from acb_service import *
+from acb_snapshot import SnapshotPublisher
+import asyncio, json, os, tempfile, unittest
+
+class ACBServiceUnitTest(unittest.TestCase):
+    def __init__(self, max_batch, use_unix_socket):
+        super().__init__()
+        print('max_batch=%d use_unix_socket=%d' %
+              (max_batch, use_unix_socket))
+        self._max_batch = max_batch
+        self._unix_path = None
+        if use_unix_socket:
+            self._unix_path = os.path.join(tempfile.mkdtemp(), "acb.sock")
+
+    def teardown(self):
+        if self._unix_path:
+            os.rmdir(os.path.dirname(self._unix_path))
+
+    def run(self):
+        asyncio.run(self.run_async())
+
+    async def run_async(self):
+        client_count = 4
+        acb = create_benchmark_acb(client_count)
+        service = ACBService(acb, self._max_batch,
+                             SnapshotPublisher(acb, every_ops=1))
+        await service.start(unix_path=self._unix_path)
+        expected_acb = create_benchmark_acb(client_count)
+        clients = [await ACBClient.connect(port=service.port(),
+                                           unix_path=self._unix_path)
+                   for i in range(client_count)]
+
+        # The results are the same as calling the ACB directly.
+        requests = [
+            ("balance_of", {"account": 1}),
+            ("transfer", {"sender": 1, "receiver": 2, "amount": 100}),
+            ("transfer", {"sender": 1, "receiver": 2, "amount": 10 ** 9}),
+            ("encrypt", {"sender": 1, "level": 2, "salt": 3}),
+            ("purchase_bonds", {"sender": 1, "count": 0}),
+            ("set_timestamp", {"timestamp": 7 * 24 * 60 * 60}),
+            ("get_timestamp", {}),
+            ("balance_of", {"account": 2}),
+            ("number_of_bonds_owned_by", {"account": 1}),
+        ]
+        results = await asyncio.gather(
+            *[clients[0].call(method, **params)
+              for (method, params) in requests], return_exceptions=True)
+        for ((method, params), result) in zip(requests, results):
+            try:
+                expected = json.loads(json.dumps(
+                    METHODS[method](expected_acb, params)))
+            except Exception:
+                self.assertTrue(isinstance(result, RuntimeError))
+                continue
+            self.assertEqual(result, expected)
+
+        balance = await clients[0].call("balance_of", account=1)
+        deposit = balance * ACB.DEPOSIT_RATE // 100
+        hash = await clients[0].call("encrypt", sender=1, level=2, salt=3)
+        self.assertEqual(await clients[0].call(
+            "vote", sender=1, hash=hash, oracle_level=0, salt=0),
+                         [True, False, deposit, 0, 0, True])
+        self.assertEqual(await clients[0].call("balance_of", account=1),
+                         balance - deposit)
+
+        # Malformed requests get errors in order.
+        connection = clients[1]
+        connection.writer.write(b"not json\n")
+        connection.writer.write(b'{"id": 7, "method": "unknown"}\n')
+        futures = [asyncio.get_event_loop().create_future() for i in range(2)]
+        (connection.futures[None], connection.futures[7]) = futures
+        for future in futures:
+            with self.assertRaises(RuntimeError):
+                await future
+        self.assertEqual(await connection.call("balance_of", account=3),
+                         expected_acb.coin.balance_of(3))
+
+        # A snapshot query is answered from the snapshot published after the
+        # last batch.
+        await clients[2].call("transfer", sender=3, receiver=4, amount=10)
+        self.assertEqual(await clients[2].query_snapshot("balance_of",
+                                                         account=3),
+                         acb.coin.balance_of(3))
+        self.assertEqual(await clients[2].query_snapshot(
+            "bond_supply_at", redemption_epoch=3), 0)
+        with self.assertRaises(RuntimeError):
+            await clients[2].query_snapshot("encrypt", sender=1, level=2,
+                                            salt=3)
+
+        # Concurrent clients. Each sends transfers around a ring, so the total
+        # balance of the clients changes only by the tax.
+        total = sum([await clients[0].call("balance_of", account=client + 1)
+                     for client in range(client_count)])
+        request_count = service.request_count
+        await asyncio.gather(
+            *[clients[client].call(
+                "transfer", sender=client + 1,
+                receiver=(client + 1) % client_count + 1, amount=1000)
+              for i in range(50) for client in range(client_count)])
+        self.assertEqual(service.request_count - request_count,
+                         50 * client_count)
+        tax = await clients[0].call("balance_of",
+                                    account=service.acb.coin.tax_account)
+        self.assertEqual(
+            sum([await clients[0].call("balance_of", account=client + 1)
+                 for client in range(client_count)]) + tax, total)
+        self.assertTrue(service.batch_count < service.request_count or
+                        self._max_batch == 1)
+
+        for client in clients:
+            await client.close()
+        await service.stop()
+
+
+def main():
+    for max_batch in [1, 4, 1024]:
+        for use_unix_socket in [False, True]:
+            test = ACBServiceUnitTest(max_batch, use_unix_socket)
+            test.run()
+            test.teardown()
+
+
+if __name__ == "__main__":
+    main()
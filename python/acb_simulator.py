@@ -6,12 +6,30 @@
 # http://opensource.org/licenses/mit-license.php
 
 from johnlawcoin import *
-import unittest, random
+from acb_cache import parse_cache_arguments, run_simulation, simulator_summary
+import pickle, unittest, random
 
 def divide_or_zero(a, b):
     if b == 0:
         return 0
-    return int(a / b)
+    return a // b
+
+# Draw the initial balances of |voter_count| voters from |rng|.
+def initial_balances(voter_count, bond_price, rng=random):
+    balances = []
+    for i in range(voter_count):
+        amount = rng.randint(0, bond_price * 100)
+        if rng.randint(0, 9) >= 9:
+            amount = 0
+        balances.append(amount)
+    return balances
+
+# Random numbers that mirror the ones of random.Random with the same seed:
+# randint(a, b) returns a + b - n instead of n. The simulator draws only
+# with randint().
+class AntitheticRandom(random.Random):
+    def randint(self, a, b):
+        return a + b - super().randint(a, b)
 
 class Voter:
     def __init__(self, address):
@@ -28,6 +46,92 @@ class Voter:
         self.balance = 0
 
 
+class Metrics:
+    def __init__(self):
+        self.reset_total()
+        self.reset_local()
+
+    def reset_local(self):
+        self.reveal_hit = 0
+        self.reveal_miss = 0
+        self.reclaim_hit = 0
+        self.reclaim_miss = 0
+        self.reward_hit = 0
+        self.reward_miss = 0
+        self.redeemed_bonds = 0
+        self.fast_redeemed_bonds = 0
+        self.expired_bonds = 0
+        self.redemption_count = 0
+        self.redeem_hit = 0
+        self.purchase_hit = 0
+        self.purchase_count = 0
+        self.increased_coin_supply = 0
+        self.decreased_coin_supply = 0
+        self.increased_eth = 0
+        self.decreased_eth = 0
+        self.delta = 0
+        self.mint = 0
+        self.lost = 0
+        self.tax = 0
+        self._oracle_level = 0
+        self.deposited = 0
+        self.reclaimed = 0
+        self.rewarded = 0
+
+    def reset_total(self):
+        self.total_reveal_hit = 0
+        self.total_reveal_miss = 0
+        self.total_reclaim_hit = 0
+        self.total_reclaim_miss = 0
+        self.total_reward_hit = 0
+        self.total_reward_miss = 0
+        self.supply_increased = 0
+        self.supply_decreased = 0
+        self.supply_nochange = 0
+        self.total_redemption_count = 0
+        self.total_redeemed_bonds = 0
+        self.total_fast_redeemed_bonds = 0
+        self.total_expired_bonds = 0
+        self.total_redeem_hit = 0
+        self.total_purchase_hit = 0
+        self.total_purchase_count = 0
+        self.total_increased_coin_supply = 0
+        self.total_decreased_coin_supply = 0
+        self.total_increased_eth = 0
+        self.total_decreased_eth = 0
+        self.total_mint = 0
+        self.total_lost = 0
+        self.total_tax = 0
+
+    def update_total(self):
+        self.total_reveal_hit += self.reveal_hit
+        self.total_reveal_miss += self.reveal_miss
+        self.total_reclaim_hit += self.reclaim_hit
+        self.total_reclaim_miss += self.reclaim_miss
+        self.total_reward_hit += self.reward_hit
+        self.total_reward_miss += self.reward_miss
+        if self.delta > 0:
+            self.supply_increased += 1
+        elif self.delta < 0:
+            self.supply_decreased += 1
+        else:
+            self.supply_nochange += 1
+        self.total_redeemed_bonds += self.redeemed_bonds
+        self.total_fast_redeemed_bonds += self.fast_redeemed_bonds
+        self.total_expired_bonds += self.expired_bonds
+        self.total_redemption_count += self.redemption_count
+        self.total_redeem_hit += self.redeem_hit
+        self.total_purchase_hit += self.purchase_hit
+        self.total_purchase_count += self.purchase_count
+        self.total_increased_coin_supply += self.increased_coin_supply
+        self.total_decreased_coin_supply += self.decreased_coin_supply
+        self.total_increased_eth += self.increased_eth
+        self.total_decreased_eth += self.decreased_eth
+        self.total_mint += self.mint
+        self.total_lost += self.lost
+        self.total_tax += self.tax
+
+
 class ACBSimulator(unittest.TestCase):
 
     def __init__(self,
@@ -96,19 +200,8 @@ class ACBSimulator(unittest.TestCase):
         self._acb = ACB(self._coin, self._oracle, self._bond_operation,
                         self._open_market_operation, self._eth_pool,
                         self._logging)
-        self._oracle.override_constants_for_testing(
-            self._level_max, self._reclaim_threshold,
-            self._proportional_reward_rate)
-        self._bond_operation.override_constants_for_testing(
-            self._bond_price, self._bond_redemption_price,
-            self._bond_redemption_period,
-            self._bond_redeemable_period)
-        self._open_market_operation.override_constants_for_testing(
-            self._price_change_interval, self._price_change_percentage,
-            self._price_multiplier)
-        self._acb.override_constants_for_testing(
-            self._epoch_duration, self._deposit_rate,
-            self._damping_factor, self._level_to_exchange_rate)
+        self.override_constants(self._oracle, self._bond_operation,
+                                self._open_market_operation, self._acb)
 
         self._start_price = 0
         self._latest_price = self._open_market_operation.latest_price
@@ -120,110 +213,112 @@ class ACBSimulator(unittest.TestCase):
         for i in range(self._voter_count):
             self._voters.append(Voter(i + 1))
 
-        class Metrics:
-            def __init__(self):
-                self.reset_total()
-                self.reset_local()
-
-            def reset_local(self):
-                self.reveal_hit = 0
-                self.reveal_miss = 0
-                self.reclaim_hit = 0
-                self.reclaim_miss = 0
-                self.reward_hit = 0
-                self.reward_miss = 0
-                self.redeemed_bonds = 0
-                self.fast_redeemed_bonds = 0
-                self.expired_bonds = 0
-                self.redemption_count = 0
-                self.redeem_hit = 0
-                self.purchase_hit = 0
-                self.purchase_count = 0
-                self.increased_coin_supply = 0
-                self.decreased_coin_supply = 0
-                self.increased_eth = 0
-                self.decreased_eth = 0
-                self.delta = 0
-                self.mint = 0
-                self.lost = 0
-                self.tax = 0
-                self._oracle_level = 0
-                self.deposited = 0
-                self.reclaimed = 0
-                self.rewarded = 0
-
-            def reset_total(self):
-                self.total_reveal_hit = 0
-                self.total_reveal_miss = 0
-                self.total_reclaim_hit = 0
-                self.total_reclaim_miss = 0
-                self.total_reward_hit = 0
-                self.total_reward_miss = 0
-                self.supply_increased = 0
-                self.supply_decreased = 0
-                self.supply_nochange = 0
-                self.total_redemption_count = 0
-                self.total_redeemed_bonds = 0
-                self.total_fast_redeemed_bonds = 0
-                self.total_expired_bonds = 0
-                self.total_redeem_hit = 0
-                self.total_purchase_hit = 0
-                self.total_purchase_count = 0
-                self.total_increased_coin_supply = 0
-                self.total_decreased_coin_supply = 0
-                self.total_increased_eth = 0
-                self.total_decreased_eth = 0
-                self.total_mint = 0
-                self.total_lost = 0
-                self.total_tax = 0
-
-            def update_total(self):
-                self.total_reveal_hit += self.reveal_hit
-                self.total_reveal_miss += self.reveal_miss
-                self.total_reclaim_hit += self.reclaim_hit
-                self.total_reclaim_miss += self.reclaim_miss
-                self.total_reward_hit += self.reward_hit
-                self.total_reward_miss += self.reward_miss
-                if self.delta > 0:
-                    self.supply_increased += 1
-                elif self.delta < 0:
-                    self.supply_decreased += 1
-                else:
-                    self.supply_nochange += 1
-                self.total_redeemed_bonds += self.redeemed_bonds
-                self.total_fast_redeemed_bonds += self.fast_redeemed_bonds
-                self.total_expired_bonds += self.expired_bonds
-                self.total_redemption_count += self.redemption_count
-                self.total_redeem_hit += self.redeem_hit
-                self.total_purchase_hit += self.purchase_hit
-                self.total_purchase_count += self.purchase_count
-                self.total_increased_coin_supply += self.increased_coin_supply
-                self.total_decreased_coin_supply += self.decreased_coin_supply
-                self.total_increased_eth += self.increased_eth
-                self.total_decreased_eth += self.decreased_eth
-                self.total_mint += self.mint
-                self.total_lost += self.lost
-                self.total_tax += self.tax
-
         self.metrics = Metrics()
 
+        # The seed of the random numbers of the decisions set by
+        # use_common_random_numbers(), or None to use the global random
+        # numbers.
+        self._random_seed = None
+        self._random_class = random.Random
+        # A dict from the kinds of the decisions to their random numbers in
+        # the epoch |self._random_epoch|.
+        self._random_streams = {}
+        self._random_epoch = None
+        # The state hashes of the ACB at the end of the epochs, or None if
+        # they are not recorded. See record_state_hashes().
+        self.state_hashes = None
+
 
     def teardown(self):
         pass
 
     def run(self):
+        self.start()
+        self.run_epochs(self._iteration)
+        self.report()
+
+    def override_constants(self, oracle, bond_operation,
+                           open_market_operation, acb):
+        oracle.override_constants_for_testing(
+            self._level_max, self._reclaim_threshold,
+            self._proportional_reward_rate)
+        bond_operation.override_constants_for_testing(
+            self._bond_price, self._bond_redemption_price,
+            self._bond_redemption_period,
+            self._bond_redeemable_period)
+        open_market_operation.override_constants_for_testing(
+            self._price_change_interval, self._price_change_percentage,
+            self._price_multiplier)
+        acb.override_constants_for_testing(
+            self._epoch_duration, self._deposit_rate,
+            self._damping_factor, self._level_to_exchange_rate)
+
+    # Draw the decisions of every kind (the initial balances, the votes, the
+    # transfers, the purchases and the redemptions) from their own random
+    # numbers seeded with |seed|, the kind and the epoch instead of the
+    # global random numbers. Two simulations with the same |seed| then make
+    # the same random decisions as far as their states allow (common random
+    # numbers), so the difference of their metrics is much less noisy than
+    # the difference of independent runs. With |antithetic|, the random
+    # numbers are mirrored (see AntitheticRandom). Call before start().
+    def use_common_random_numbers(self, seed, antithetic=False):
+        self._random_seed = seed
+        self._random_class = AntitheticRandom if antithetic else random.Random
+        self._random_streams = {}
+        self._random_epoch = None
+
+    # Record the state hash of the ACB at the end of every epoch in
+    # |self.state_hashes|, where the index i is the end of the epoch i + 1.
+    # Two simulations that should run the same are compared epoch by epoch
+    # with first_divergent_epoch().
+    def record_state_hashes(self):
+        self.state_hashes = []
+
+    def _record_state_hash(self):
+        if self.state_hashes is not None:
+            self.state_hashes.append(self._acb.state_hash())
+
+    # Return the random numbers of the decisions of |kind|.
+    def _random(self, kind):
+        if self._random_seed is None:
+            return random
+        if self._random_epoch != self.epoch_count:
+            self._random_streams = {}
+            self._random_epoch = self.epoch_count
+        if kind not in self._random_streams:
+            self._random_streams[kind] = self._random_class(
+                "%d:%s:%d" % (self._random_seed, kind, self.epoch_count))
+        return self._random_streams[kind]
+
+    # Give the voters their initial balances.
+    def start(self):
+        # The number of the epochs run so far.
+        self.epoch_count = 0
+        # Set to True when the simulation stops because the total coin supply
+        # reached 100 times the initial supply.
+        self.stopped = False
+        balances = initial_balances(self._voter_count, self._bond_price,
+                                    self._random("initial_balances"))
         for i in range(self._voter_count):
-            amount = random.randint(0, self._bond_price * 100)
-            if random.randint(0, 9) >= 9:
-                amount = 0
-            self._voters[i].balance = amount
+            self._voters[i].balance = balances[i]
             self._coin.mint(self._voters[i].address, self._voters[i].balance)
-        initial_coin_supply = self._coin.total_supply
-
-        tax = 0
-        for i in range(self._iteration):
-            if self._coin.total_supply >= initial_coin_supply * 100:
+        self._initial_coin_supply = self._coin.total_supply
+        self._tax = 0
+
+    # Return a checkpoint of the simulation, which is the pickled simulator
+    # and the state of the random numbers. restore_simulator() continues the
+    # simulation from the checkpoint.
+    def checkpoint(self):
+        return pickle.dumps((self, random.getstate()))
+
+    # Run |count| more epochs. A simulation can be continued with another
+    # call, also after it is restored from a checkpoint.
+    def run_epochs(self, count):
+        for i in range(count):
+            if self._coin.total_supply >= self._initial_coin_supply * 100:
+                self.stopped = True
                 break
+            self.epoch_count += 1
 
             self.metrics.reset_local()
 
@@ -231,16 +326,17 @@ class ACBSimulator(unittest.TestCase):
 
             self._acb.set_timestamp(
                 self._acb.get_timestamp() + self._epoch_duration)
-            commit_observed = self.vote(tax)
+            commit_observed = self.vote(self._tax)
             if not commit_observed:
+                self._record_state_hash()
                 continue
 
             if self._open_market_operation.coin_budget > 0:
                 self._start_price = (
                     self._latest_price * self._price_multiplier)
             elif self._open_market_operation.coin_budget < 0:
-                self._start_price = int(
-                    self._latest_price / self._price_multiplier) + 1
+                self._start_price = (
+                    self._latest_price // self._price_multiplier) + 1
             else:
                 self._start_price = 0
             self._latest_price_updated = False
@@ -270,7 +366,7 @@ class ACBSimulator(unittest.TestCase):
             self.assertEqual(epoch_log.oracle_level, self.metrics.oracle_level)
             self.assertEqual(epoch_log.current_epoch_start,
                              self._acb.get_timestamp())
-            self.assertEqual(epoch_log.tax, tax)
+            self.assertEqual(epoch_log.tax, self._tax)
             vote_log = self._logging.vote_logs[epoch_id]
             self.assertEqual(vote_log.commit_succeeded,
                              self.metrics.reveal_hit + self.metrics.reveal_miss)
@@ -310,13 +406,13 @@ class ACBSimulator(unittest.TestCase):
 
             if self._latest_price_updated == False:
                 if self._open_market_operation.coin_budget > 0:
-                    self._latest_price = int(
-                        self._latest_price / self._price_multiplier) + 1
+                    self._latest_price = (
+                        self._latest_price // self._price_multiplier) + 1
                 elif self._open_market_operation.coin_budget < 0:
                     self._latest_price = (
                         self._latest_price * self._price_multiplier)
             
-            tax = self.transfer_coins()
+            self._tax = self.transfer_coins()
 
             if False:
                 print('epoch=%d oracle_level=%d reveal_hit=%d/%d=%d%% '
@@ -385,7 +481,10 @@ class ACBSimulator(unittest.TestCase):
                        self.metrics.tax
                        ))
             self.metrics.update_total()
+            self._record_state_hash()
 
+    # Print the summary of the simulation.
+    def report(self):
         print("================")
         print('epoch=%d reveal_hit=%d/%d=%d%% reclaim_hit=%d/%d=%d%% '
               'reward_hit=%d/%d=%d%% '
@@ -439,7 +538,7 @@ class ACBSimulator(unittest.TestCase):
                self.metrics.supply_increased,
                self.metrics.supply_nochange,
                self.metrics.supply_decreased,
-               self._coin.total_supply / initial_coin_supply * 100,
+               self._coin.total_supply / self._initial_coin_supply * 100,
                self.metrics.total_mint,
                self.metrics.total_lost,
                self._bond.total_supply,
@@ -449,16 +548,22 @@ class ACBSimulator(unittest.TestCase):
         print("================")
         print()
 
+        # Only the genesis account, the voters, the tax account and the
+        # deposit and reward accounts of the three epochs can hold coins.
+        self.assertTrue(self._coin.live_account_count() <=
+                        1 + self._voter_count + 1 + 3 * 2)
+
     def transfer_coins(self):
-        start_index = random.randint(0, self._voter_count - 1)
+        rng = self._random("transfer_coins")
+        start_index = rng.randint(0, self._voter_count - 1)
         tax_total = 0
         for index in range(min(self._voter_count, 10)):
             sender = self._voters[(start_index + index) % self._voter_count]
             receiver = self._voters[
                 (start_index + index + 1) % self._voter_count]
-            transfer = random.randint(
+            transfer = rng.randint(
                 0, min(self._coin.balance_of(sender.address), 10000))
-            tax = int(transfer * self._tax_rate / 100)
+            tax = transfer * self._tax_rate // 100
             balance_sender = self._coin.balance_of(sender.address)
             balance_receiver = self._coin.balance_of(receiver.address)
             balance_tax = self._coin.balance_of(self._coin.tax_account)
@@ -480,26 +585,27 @@ class ACBSimulator(unittest.TestCase):
         return tax_total
 
     def purchase_coins(self):
+        rng = self._random("purchase_coins")
         epoch_id = self._oracle.epoch_id
-        start_index = random.randint(0, self._voter_count - 1)
+        start_index = rng.randint(0, self._voter_count - 1)
         for index in range(self._voter_count):
             coin_budget = self._open_market_operation.coin_budget
             if coin_budget <= 0:
                 break
 
-            intervals = random.randint(0, 6)
+            intervals = rng.randint(0, 6)
             original_timestamp = self._acb.get_timestamp()
             self._acb.set_timestamp(
                 original_timestamp + self._price_change_interval * intervals)
             price = self._start_price
             for i in range(intervals):
-                price = int(price * (
-                    100 - self._price_change_percentage) / 100)
+                price = (price * (
+                    100 - self._price_change_percentage) // 100)
             if price == 0:
                 price = 1
             
             voter = self._voters[(start_index + index) % self._voter_count]
-            requested_coin_amount = int(coin_budget / self._voter_count)
+            requested_coin_amount = coin_budget // self._voter_count
             
             coin_supply = self._coin.total_supply
             voter.balance += requested_coin_amount
@@ -521,28 +627,29 @@ class ACBSimulator(unittest.TestCase):
             self.metrics.increased_eth += requested_coin_amount * price
             
     def sell_coins(self):
+        rng = self._random("sell_coins")
         epoch_id = self._oracle.epoch_id
-        start_index = random.randint(0, self._voter_count - 1)
+        start_index = rng.randint(0, self._voter_count - 1)
         for index in range(self._voter_count):
             coin_budget = self._open_market_operation.coin_budget
             if coin_budget >= 0:
                 break
             
-            intervals = random.randint(0, 6)
+            intervals = rng.randint(0, 6)
             original_timestamp = self._acb.get_timestamp()
             self._acb.set_timestamp(
                 original_timestamp + self._price_change_interval * intervals)
             price = self._start_price
             for i in range(intervals):
-                price = int(price * (
-                    100 + self._price_change_percentage) / 100)
+                price = (price * (
+                    100 + self._price_change_percentage) // 100)
             
             voter = self._voters[(start_index + index) % self._voter_count]
             requested_coin_amount = min(
-                int(-coin_budget / self._voter_count), voter.balance)
+                -coin_budget // self._voter_count, voter.balance)
             requested_coin_amount = min(
                 requested_coin_amount,
-                int(self._eth_pool.eth_balance / price))
+                self._eth_pool.eth_balance // price)
             
             coin_supply = self._coin.total_supply
             voter.balance -= requested_coin_amount
@@ -564,8 +671,9 @@ class ACBSimulator(unittest.TestCase):
             self.metrics.decreased_eth += requested_coin_amount * price
     
     def purchase_bonds(self):
+        rng = self._random("purchase_bonds")
         epoch_id = self._oracle.epoch_id
-        start_index = random.randint(0, self._voter_count - 1)
+        start_index = rng.randint(0, self._voter_count - 1)
         for index in range(self._voter_count):
             bond_budget = self._bond_operation.bond_budget
             if bond_budget <= 0:
@@ -574,7 +682,7 @@ class ACBSimulator(unittest.TestCase):
             bond_price = self._bond_price
             voter = self._voters[(start_index + index) % self._voter_count]
             count = min(self._bond_operation.bond_budget,
-                        int(0.3 * voter.balance / bond_price))
+                        3 * voter.balance // (10 * bond_price))
             if count <= 0:
                 continue
 
@@ -613,10 +721,11 @@ class ACBSimulator(unittest.TestCase):
             self.metrics.purchase_count += count
 
     def redeem_bonds(self):
+        rng = self._random("redeem_bonds")
         epoch_id = self._oracle.epoch_id
-        start_index = random.randint(0, self._voter_count - 1)
+        start_index = rng.randint(0, self._voter_count - 1)
         for index in range(self._voter_count):
-            if random.randint(0, 9) >= 9:
+            if rng.randint(0, 9) >= 9:
                 continue
 
             voter = self._voters[(start_index + index) % self._voter_count]
@@ -686,6 +795,7 @@ class ACBSimulator(unittest.TestCase):
 
 
     def vote(self, tax):
+        rng = self._random("vote")
         _voters = self._voters
         
         epoch_id = self._oracle.epoch_id
@@ -741,7 +851,7 @@ class ACBSimulator(unittest.TestCase):
         if mode_level == self._level_max:
             assert(deposit_to_be_reclaimed == 0)
 
-        target_level = random.randint(0, self._level_max - 1)
+        target_level = rng.randint(0, self._level_max - 1)
         #target_level = int(epoch_id / 6) % 3
         #target_level = epoch_id % 3
 
@@ -758,11 +868,11 @@ class ACBSimulator(unittest.TestCase):
             _voters[i].salt[current] = 0
             _voters[i].reclaimed[current] = False
 
-            _voters[i].committed[current] = (random.randint(0, 99) < 99)
+            _voters[i].committed[current] = (rng.randint(0, 99) < 99)
             if not _voters[i].committed[current]:
                 continue
 
-            rand = random.randint(0, 9)
+            rand = rng.randint(0, 9)
             if rand < 5:
                 _voters[i].committed_level[current] = target_level
             elif rand < 7:
@@ -772,27 +882,27 @@ class ACBSimulator(unittest.TestCase):
                 _voters[i].committed_level[current] = (
                     (target_level + 1) % self._level_max)
             else:
-                _voters[i].committed_level[current] = random.randint(
+                _voters[i].committed_level[current] = rng.randint(
                     0, self._level_max)
 
-            _voters[i].committed_salt[current] = random.randint(0, 10)
+            _voters[i].committed_salt[current] = rng.randint(0, 10)
             hash = self._acb.encrypt(
                 _voters[i].address,
                 _voters[i].committed_level[current],
                 _voters[i].committed_salt[current])
-            _voters[i].deposit[current] = int(
-                _voters[i].balance * self._deposit_rate / 100)
+            _voters[i].deposit[current] = (
+                _voters[i].balance * self._deposit_rate // 100)
 
             _voters[i].revealed[prev] = True
-            if random.randint(0, 99) < 97:
+            if rng.randint(0, 99) < 97:
                 _voters[i].oracle_level[prev] = _voters[i].committed_level[prev]
             else:
-                _voters[i].oracle_level[prev] = random.randint(
+                _voters[i].oracle_level[prev] = rng.randint(
                     0, self._level_max)
-            if random.randint(0, 99) < 97:
+            if rng.randint(0, 99) < 97:
                 _voters[i].salt[prev] = _voters[i].committed_salt[prev]
             else:
-                _voters[i].salt[prev] = random.randint(0, 10)
+                _voters[i].salt[prev] = rng.randint(0, 10)
 
             _voters[i].reclaimed[prev_prev] = True
 
@@ -830,12 +940,12 @@ class ACBSimulator(unittest.TestCase):
                 mode_level == _voters[i].oracle_level[prev_prev]):
                 proportional_reward = 0
                 if revealed_deposits[mode_level] > 0:
-                    proportional_reward = int(
+                    proportional_reward = (
                         self._proportional_reward_rate * reward_total *
-                        _voters[i].deposit[prev_prev] /
+                        _voters[i].deposit[prev_prev] //
                         (100 * revealed_deposits[mode_level]))
-                constant_reward = int(
-                    (100 - self._proportional_reward_rate) * reward_total /
+                constant_reward = (
+                    (100 - self._proportional_reward_rate) * reward_total //
                     (100 * revealed_counts[mode_level]))
                 reward = proportional_reward + constant_reward
 
@@ -876,18 +986,18 @@ class ACBSimulator(unittest.TestCase):
             if not commit_observed:
                 delta = 0
                 if mode_level != self._level_max:
-                    delta = int(
+                    delta = truncated_div(
                         self._coin.total_supply *
-                        (self._level_to_exchange_rate[mode_level] - 10) / 10)
-                    delta = int(delta * self._damping_factor / 100)
+                        (self._level_to_exchange_rate[mode_level] - 10), 10)
+                    delta = truncated_div(delta * self._damping_factor, 100)
 
                 new_epoch_id = self._oracle.epoch_id
                 mint = 0
                 redeemable_bonds = 0
                 issued_bonds = 0
                 if delta >= 0:
-                    necessary_bonds = int(
-                        delta / self._bond_redemption_price)
+                    necessary_bonds = (
+                        delta // self._bond_redemption_price)
                     valid_bond_supply = self._bond_operation.valid_bond_supply(
                         new_epoch_id)
                     if necessary_bonds <= valid_bond_supply:
@@ -897,7 +1007,7 @@ class ACBSimulator(unittest.TestCase):
                         mint = ((necessary_bonds - redeemable_bonds) *
                                 self._bond_redemption_price)
                 else:
-                    issued_bonds = int(-delta / self._bond_price)
+                    issued_bonds = -delta // self._bond_price
 
                 self.assertEqual(self._bond.total_supply, bond_supply)
                 if mode_level == self._level_max:
@@ -927,10 +1037,45 @@ class ACBSimulator(unittest.TestCase):
         return commit_observed
 
 
-def main():
+# Restore a simulation from |checkpoint| returned by ACBSimulator.checkpoint().
+# The contracts keep their constants in class attributes, so the constants of
+# the simulation are set again.
+def restore_simulator(checkpoint):
+    (simulator, state) = pickle.loads(checkpoint)
+    oracle = Oracle()
+    bond_operation = BondOperation(JohnLawBond())
+    open_market_operation = OpenMarketOperation()
+    acb = ACB(JohnLawCoin(0), oracle, bond_operation, open_market_operation,
+              EthPool(), Logging())
+    simulator.override_constants(oracle, bond_operation,
+                                 open_market_operation, acb)
+    random.setstate(state)
+    return simulator
+
+
+# Return the index of the first epoch at which the state hashes recorded by
+# two simulations differ, or None if they do not. Once the states diverge,
+# they stay diverged, so the index is found by bisection with O(log n)
+# comparisons. A simulation that ran fewer epochs diverges where it stopped.
+def first_divergent_epoch(state_hashes_a, state_hashes_b):
+    count = min(len(state_hashes_a), len(state_hashes_b))
+    (low, high) = (0, count)
+    while low < high:
+        middle = (low + high) // 2
+        if state_hashes_a[middle] == state_hashes_b[middle]:
+            low = middle + 1
+        else:
+            high = middle
+    if low == count and len(state_hashes_a) == len(state_hashes_b):
+        return None
+    return low
+
+
+# Yield the arguments of the simulations run by main().
+def sweep_arguments():
     iteration = 1000
 
-    test = ACBSimulator(
+    yield (
         996,
         1000,
         12,
@@ -946,8 +1091,6 @@ def main():
         3,
         200,
         iteration)
-    test.run()
-    test.teardown()
 
     for (bond_price, bond_redemption_price) in [
             (1, 3), (996, 1000), (1000, 1000)]:
@@ -963,12 +1106,12 @@ def main():
                                         [6, 7, 8, 9, 10, 11, 12, 13, 14]]:
                                     for reclaim_threshold in [0, 1, len(
                                             level_to_exchange_rate) - 1]:
-                                        price_change_interval = int(
-                                            epoch_duration / 21) + 1
+                                        price_change_interval = (
+                                            epoch_duration // 21) + 1
                                         price_change_percentage = 20
                                         price_multiplier = 3
                                         for voter_count in [1, 200]:
-                                            test = ACBSimulator(
+                                            yield (
                                                 bond_price,
                                                 bond_redemption_price,
                                                 bond_redemption_period,
@@ -984,8 +1127,13 @@ def main():
                                                 price_multiplier,
                                                 voter_count,
                                                 iteration)
-                                            test.run()
-                                            test.teardown()
+
+
+def main():
+    (cache, seed) = parse_cache_arguments()
+    for arguments in sweep_arguments():
+        run_simulation(cache, ACBSimulator, arguments, seed,
+                       simulator_summary)
 
 
 if __name__ == "__main__":
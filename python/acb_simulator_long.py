@@ -6,9 +6,12 @@
 # http://opensource.org/licenses/mit-license.php
 
 from acb_simulator import *
+from acb_cache import parse_cache_arguments, run_simulation, simulator_summary
 import unittest, random
 
-def main():
+# Yield the configurations run by main(). Each is a tuple of the arguments of
+# ACBSimulator and the number of the runs.
+def configurations():
     # Need 15 parameters:
     # - bond_price
     # - bond_redemption_price
@@ -26,215 +29,184 @@ def main():
     # - voter_count
     # - iteration
 
-    for i in range(10):
-        test = ACBSimulator(
-            996,
-            1000,
-            12,
-            2,
-            7 * 24 * 60 * 60,
-            90,
-            10,
-            10,
-            [6, 7, 8, 9, 10, 11, 12, 13, 14],
-            1,
-            8 * 60 * 60,
-            20,
-            3,
-            40,
-            100)
-        test.run()
-        test.teardown()
-    print("========================================================")
-
-    for i in range(3):
-        test = ACBSimulator(
-            800,
-            1000,
-            12,
-            2,
-            7 * 24 * 60 * 60,
-            90,
-            10,
-            10,
-            [6, 7, 8, 9, 10, 11, 12, 13, 14],
-            1,
-            8 * 60 * 60,
-            20,
-            3,
-            40,
-            100)
-        test.run()
-        test.teardown()
-    print("========================================================")
-
-    for i in range(3):
-        test = ACBSimulator(
-            996,
-            1000,
-            12,
-            2,
-            7 * 24 * 60 * 60,
-            90,
-            10,
-            10,
-            [2, 3, 4, 5, 6, 7, 8, 9, 10],
-            1,
-            8 * 60 * 60,
-            20,
-            3,
-            40,
-            100)
-        test.run()
-        test.teardown()
-    print("========================================================")
-
-    for i in range(3):
-        test = ACBSimulator(
-            996,
-            1000,
-            12,
-            2,
-            7 * 24 * 60 * 60,
-            90,
-            10,
-            10,
-            [10, 11, 12, 13, 14, 15, 16, 17, 18],
-            1,
-            8 * 60 * 60,
-            20,
-            3,
-            40,
-            100)
-        test.run()
-        test.teardown()
-    print("========================================================")
-
-    for i in range(3):
-        test = ACBSimulator(
-            996,
-            1000,
-            12,
-            2,
-            7 * 24 * 60 * 60,
-            90,
-            10,
-            90,
-            [6, 7, 8, 9, 10, 11, 12, 13, 14],
-            1,
-            8 * 60 * 60,
-            20,
-            3,
-            40,
-            100)
-        test.run()
-        test.teardown()
-    print("========================================================")
-
-    for i in range(3):
-        test = ACBSimulator(
-            996,
-            1000,
-            12,
-            2,
-            7 * 24 * 60 * 60,
-            90,
-            90,
-            10,
-            [6, 7, 8, 9, 10, 11, 12, 13, 14],
-            1,
-            8 * 60 * 60,
-            20,
-            3,
-            40,
-            100)
-        test.run()
-        test.teardown()
-    print("========================================================")
-
-    for i in range(3):
-        test = ACBSimulator(
-            996,
-            1000,
-            12,
-            2,
-            7 * 24 * 60 * 60,
-            10,
-            10,
-            10,
-            [6, 7, 8, 9, 10, 11, 12, 13, 14],
-            1,
-            8 * 60 * 60,
-            20,
-            3,
-            40,
-            100)
-        test.run()
-        test.teardown()
-    print("========================================================")
-
-    for i in range(3):
-        test = ACBSimulator(
-            996,
-            1000,
-            1,
-            2,
-            7 * 24 * 60 * 60,
-            90,
-            10,
-            10,
-            [6, 7, 8, 9, 10, 11, 12, 13, 14],
-            1,
-            8 * 60 * 60,
-            20,
-            3,
-            40,
-            100)
-        test.run()
-        test.teardown()
-    print("========================================================")
-
-    for i in range(3):
-        test = ACBSimulator(
-            996,
-            1000,
-            12,
-            2,
-            7 * 24 * 60 * 60,
-            90,
-            10,
-            10,
-            [6, 7, 8, 9, 10, 11, 12, 13, 14],
-            1,
-            8 * 60 * 60,
-            60,
-            3,
-            40,
-            100)
-        test.run()
-        test.teardown()
-    print("========================================================")
-
-    for i in range(3):
-        test = ACBSimulator(
-            996,
-            1000,
-            12,
-            2,
-            7 * 24 * 60 * 60,
-            90,
-            10,
-            10,
-            [6, 7, 8, 9, 10, 11, 12, 13, 14],
-            1,
-            8 * 60 * 60,
-            20,
-            1,
-            40,
-            100)
-        test.run()
-        test.teardown()
-    print("========================================================")
+    yield ((
+        996,
+        1000,
+        12,
+        2,
+        7 * 24 * 60 * 60,
+        90,
+        10,
+        10,
+        [6, 7, 8, 9, 10, 11, 12, 13, 14],
+        1,
+        8 * 60 * 60,
+        20,
+        3,
+        40,
+        100), 10)
+
+    yield ((
+        800,
+        1000,
+        12,
+        2,
+        7 * 24 * 60 * 60,
+        90,
+        10,
+        10,
+        [6, 7, 8, 9, 10, 11, 12, 13, 14],
+        1,
+        8 * 60 * 60,
+        20,
+        3,
+        40,
+        100), 3)
+
+    yield ((
+        996,
+        1000,
+        12,
+        2,
+        7 * 24 * 60 * 60,
+        90,
+        10,
+        10,
+        [2, 3, 4, 5, 6, 7, 8, 9, 10],
+        1,
+        8 * 60 * 60,
+        20,
+        3,
+        40,
+        100), 3)
+
+    yield ((
+        996,
+        1000,
+        12,
+        2,
+        7 * 24 * 60 * 60,
+        90,
+        10,
+        10,
+        [10, 11, 12, 13, 14, 15, 16, 17, 18],
+        1,
+        8 * 60 * 60,
+        20,
+        3,
+        40,
+        100), 3)
+
+    yield ((
+        996,
+        1000,
+        12,
+        2,
+        7 * 24 * 60 * 60,
+        90,
+        10,
+        90,
+        [6, 7, 8, 9, 10, 11, 12, 13, 14],
+        1,
+        8 * 60 * 60,
+        20,
+        3,
+        40,
+        100), 3)
+
+    yield ((
+        996,
+        1000,
+        12,
+        2,
+        7 * 24 * 60 * 60,
+        90,
+        90,
+        10,
+        [6, 7, 8, 9, 10, 11, 12, 13, 14],
+        1,
+        8 * 60 * 60,
+        20,
+        3,
+        40,
+        100), 3)
+
+    yield ((
+        996,
+        1000,
+        12,
+        2,
+        7 * 24 * 60 * 60,
+        10,
+        10,
+        10,
+        [6, 7, 8, 9, 10, 11, 12, 13, 14],
+        1,
+        8 * 60 * 60,
+        20,
+        3,
+        40,
+        100), 3)
+
+    yield ((
+        996,
+        1000,
+        1,
+        2,
+        7 * 24 * 60 * 60,
+        90,
+        10,
+        10,
+        [6, 7, 8, 9, 10, 11, 12, 13, 14],
+        1,
+        8 * 60 * 60,
+        20,
+        3,
+        40,
+        100), 3)
+
+    yield ((
+        996,
+        1000,
+        12,
+        2,
+        7 * 24 * 60 * 60,
+        90,
+        10,
+        10,
+        [6, 7, 8, 9, 10, 11, 12, 13, 14],
+        1,
+        8 * 60 * 60,
+        60,
+        3,
+        40,
+        100), 3)
+
+    yield ((
+        996,
+        1000,
+        12,
+        2,
+        7 * 24 * 60 * 60,
+        90,
+        10,
+        10,
+        [6, 7, 8, 9, 10, 11, 12, 13, 14],
+        1,
+        8 * 60 * 60,
+        20,
+        1,
+        40,
+        100), 3)
+
+
+def main():
+    (cache, seed) = parse_cache_arguments()
+    for (arguments, repetitions) in configurations():
+        for i in range(repetitions):
+            run_simulation(cache, ACBSimulator, arguments, seed,
+                           simulator_summary)
+        print("========================================================")
 
 
 if __name__ == "__main__":
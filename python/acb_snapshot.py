@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2021 Kentaro Hara
+#
+# This software is released under the MIT License.
+# http://opensource.org/licenses/mit-license.php
+
+from johnlawcoin import *
+import copy
+
+#-------------------------------------------------------------------------------
+# [Read snapshots]
+#
+# Lets reader threads query balances, bonds and logs while a writer keeps
+# applying operations to the ACB.
+#
+# The writer owns the ACB and calls SnapshotPublisher.record() after
+# applying operations. The publisher publishes an immutable Snapshot at the
+# start of every epoch and optionally every |every_ops| operations, and
+# replaces its |snapshot| reference with the new one. Replacing a reference
+# is atomic, so readers call latest() and query the returned Snapshot without
+# any lock. A reader that keeps using one Snapshot sees a consistent state
+# even if newer snapshots are published meanwhile.
+#
+# Publishing does not copy the ledgers. JohnLawCoin and JohnLawBond track the
+# keys changed since the last snapshot (|changed_accounts| and
+# |changed_bonds|), and a Snapshot is the previous Snapshot plus a layer of
+# those changes (see LayeredMap). Publishing costs time proportional to the
+# changes, amortized, except for the first snapshot, which copies the
+# ledgers. The logs are layered in the same way: the logs of the past epochs
+# are never updated again, so only the logs of the current epoch are copied.
+#-------------------------------------------------------------------------------
+
+# An immutable mapping made of a stack of dicts, the newest first. A key has
+# the value of the newest dict that has it, or |default|. Every dict is at
+# most half the size of the one below it, so a lookup looks at O(log n)
+# dicts, and a dict is merged into the one below when it grows beyond that.
+# A key is copied O(log n) times by the merges, so pushing a layer takes
+# amortized time proportional to its size.
+class LayeredMap:
+    # Parameters
+    # ----------------
+    # |layers|: The list of the dicts, the newest first. Must not be updated.
+    # |default|: The value of the keys that no dict has. The bottom dict
+    # does not keep the keys with this value.
+    def __init__(self, layers, default):
+        self.layers = layers
+        self.default = default
+
+    # Return a new LayeredMap with the |changes| on top of this one.
+    def push(self, changes):
+        if not changes:
+            return self
+        layers = [changes] + self.layers
+        while len(layers) >= 2 and 2 * len(layers[0]) >= len(layers[1]):
+            merged = dict(layers[1])
+            merged.update(layers[0])
+            if len(layers) == 2:
+                merged = {key: value for (key, value) in merged.items()
+                          if value != self.default}
+            layers = [merged] + layers[2:]
+        return LayeredMap(layers, self.default)
+
+    def get(self, key):
+        for layer in self.layers:
+            if key in layer:
+                return layer[key]
+        return self.default
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value == self.default:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key) != self.default
+
+    # Return the mapping as a new dict without the keys with |default|. This
+    # takes time proportional to the size of the mapping.
+    def to_dict(self):
+        merged = {}
+        for layer in reversed(self.layers):
+            merged.update(layer)
+        return {key: value for (key, value) in merged.items()
+                if value != self.default}
+
+
+class Snapshot:
+    # Take a snapshot of |acb|. Must be called by the writer.
+    #
+    # Parameters
+    # ----------------
+    # |acb|: The ACB.
+    # |version|: The version of this snapshot. Increases by one per snapshot.
+    # |op_count|: The number of operations applied when this snapshot was
+    # taken.
+    # |previous|: The previous Snapshot of |acb|, or None to copy the ledgers
+    # and start tracking their changes.
+    def __init__(self, acb, version, op_count, previous=None):
+        self.version = version
+        self.op_count = op_count
+        self.epoch_id = acb.oracle.epoch_id
+        self.timestamp = acb.get_timestamp()
+        self.oracle_level = acb.oracle_level
+
+        coin = acb.coin
+        bond = acb.bond_operation.bond
+        self.total_coin_supply = coin.total_supply
+        self.total_bond_supply = bond.total_supply
+        if previous is None:
+            self.balances = LayeredMap([dict(coin.balances)], 0)
+            self.bonds = LayeredMap([{
+                (account, redemption_epoch): amount
+                for (account, bonds) in bond.bonds.items()
+                for (redemption_epoch, amount) in bonds.items()}], 0)
+            self.bond_count = LayeredMap([dict(bond.bond_count)], 0)
+            self.bond_supply = LayeredMap([dict(bond.bond_supply)], 0)
+        else:
+            self.balances = previous.balances.push({
+                account: coin.balance_of(account)
+                for account in coin.changed_accounts})
+            self.bonds = previous.bonds.push({
+                (account, redemption_epoch):
+                bond.balance_of(account, redemption_epoch)
+                for (account, redemption_epoch) in bond.changed_bonds})
+            self.bond_count = previous.bond_count.push({
+                account: bond.number_of_bonds_owned_by(account)
+                for (account, redemption_epoch) in bond.changed_bonds})
+            self.bond_supply = previous.bond_supply.push({
+                redemption_epoch: bond.bond_supply_at(redemption_epoch)
+                for (account, redemption_epoch) in bond.changed_bonds})
+        coin.changed_accounts = set()
+        bond.changed_bonds = set()
+
+        # A Logging object whose logs are LayeredMaps. Readers use it like
+        # the live one but must not call methods that update it. Only the
+        # logs of the epochs since the previous snapshot can have changed.
+        logging = acb.logging
+        self.logging = Logging()
+        for name in ["vote_logs", "epoch_logs", "bond_operation_logs",
+                     "open_market_operation_logs"]:
+            logs = getattr(logging, name)
+            if previous is None:
+                changes = dict(logs)
+                first_epoch_id = self.epoch_id
+            else:
+                changes = {}
+                first_epoch_id = previous.epoch_id
+            # The logs are added in the order of the epochs.
+            for epoch_id in reversed(logs):
+                if epoch_id < first_epoch_id:
+                    break
+                changes[epoch_id] = copy.copy(logs[epoch_id])
+            if previous is None:
+                setattr(self.logging, name, LayeredMap([changes], None))
+            else:
+                setattr(self.logging, name, getattr(
+                    previous.logging, name).push(changes))
+
+    # Return the coin balance of |account|.
+    def balance_of(self, account):
+        return self.balances.get(account)
+
+    # Return the number of the bonds owned by |account| that become
+    # redeemable at |redemption_epoch|.
+    def bond_balance_of(self, account, redemption_epoch):
+        return self.bonds.get((account, redemption_epoch))
+
+    # Return the number of the bonds owned by |account|.
+    def number_of_bonds_owned_by(self, account):
+        return self.bond_count.get(account)
+
+    # Return the number of the bonds that become redeemable at
+    # |redemption_epoch|.
+    def bond_supply_at(self, redemption_epoch):
+        return self.bond_supply.get(redemption_epoch)
+
+
+class SnapshotPublisher:
+    # Parameters
+    # ----------------
+    # |acb|: The ACB.
+    # |every_ops|: Publish a snapshot every |every_ops| operations in addition
+    # to every epoch. None to publish only every epoch.
+    #
+    # An ACB can have only one SnapshotPublisher because the publisher resets
+    # the changes tracked by the ledgers.
+    def __init__(self, acb, every_ops=None):
+        assert(every_ops is None or every_ops >= 1)
+        self.acb = acb
+        self.every_ops = every_ops
+        self.op_count = 0
+        self.snapshot = None
+        self.publish()
+
+    # Return the latest snapshot. Can be called from any thread.
+    def latest(self):
+        return self.snapshot
+
+    # Publish a snapshot of the current state. Must be called by the writer.
+    def publish(self):
+        version = self.snapshot.version + 1 if self.snapshot else 0
+        self.snapshot = Snapshot(self.acb, version, self.op_count,
+                                 self.snapshot)
+        return self.snapshot
+
+    # Called by the writer after applying |count| operations. Publishes a
+    # snapshot if the epoch has changed or |every_ops| operations have been
+    # applied since the last snapshot.
+    #
+    # Returns
+    # ----------------
+    # True if a snapshot was published.
+    def record(self, count=1):
+        self.op_count += count
+        if (self.acb.oracle.epoch_id != self.snapshot.epoch_id or
+            (self.every_ops is not None and
+             self.op_count - self.snapshot.op_count >= self.every_ops)):
+            self.publish()
+            return True
+        return False
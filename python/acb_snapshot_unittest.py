@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2021 Kentaro Hara
+#
+# This software is released under the MIT License.
+# http://opensource.org/licenses/mit-license.php
+
+from johnlawcoin import *
+from acb_snapshot import *
+import math, random, threading, unittest
+
+class ACBSnapshotUnitTest(unittest.TestCase):
+    def __init__(self, every_ops, reader_count, op_count):
+        super().__init__()
+        print('every_ops=%s reader_count=%d op_count=%d' %
+              (every_ops, reader_count, op_count))
+        self._every_ops = every_ops
+        self._reader_count = reader_count
+        self._op_count = op_count
+        self._epoch_duration = 7 * 24 * 60 * 60
+        self._acb = create_acb(
+            0, 996, 1000, 12, 2, self._epoch_duration, 90, 10, 10,
+            [6, 7, 8, 9, 10, 11, 12, 13, 14], 1, 8 * 60 * 60, 20, 3)
+        self._accounts = list(range(1, 21))
+        for account in self._accounts:
+            self._acb.coin.transfer(0, account, 100000)
+
+    def teardown(self):
+        pass
+
+    def run(self):
+        # LayeredMap.
+        layered = LayeredMap([{1: 1, 2: 2}], 0)
+        pushed = layered.push({2: 0, 3: 3})
+        self.assertEqual(layered.to_dict(), {1: 1, 2: 2})
+        self.assertEqual(pushed.to_dict(), {1: 1, 3: 3})
+        self.assertEqual(pushed.get(2), 0)
+        self.assertFalse(2 in pushed)
+        self.assertEqual(pushed[3], 3)
+        with self.assertRaises(KeyError):
+            pushed[2]
+        self.assertTrue(pushed.push({}) is pushed)
+        for key in range(1000):
+            pushed = pushed.push({key % 100: key + 1})
+            self.assertTrue(len(pushed.layers) <= 9)
+        self.assertEqual(pushed.to_dict(),
+                         {key: key + 901 for key in range(100)})
+        self.assertEqual(layered.to_dict(), {1: 1, 2: 2})
+
+        acb = self._acb
+        coin = acb.coin
+        bond = acb.bond_operation.bond
+        publisher = SnapshotPublisher(acb, self._every_ops)
+
+        # A snapshot has the state at the time it was published and does not
+        # change afterwards.
+        snapshot = publisher.latest()
+        self.assertEqual(snapshot.version, 0)
+        self.assertEqual(snapshot.epoch_id, acb.oracle.epoch_id)
+        self.assertEqual(snapshot.balance_of(1), coin.balance_of(1))
+        self.assertEqual(snapshot.balance_of("unknown"), 0)
+        balance = coin.balance_of(1)
+        coin.transfer(1, 2, 1000)
+        bond.mint(1, 10, 5)
+        self.assertEqual(publisher.record(2), self._every_ops is not None and
+                         self._every_ops <= 2)
+        self.assertEqual(snapshot.balance_of(1), balance)
+        self.assertEqual(snapshot.number_of_bonds_owned_by(1), 0)
+        self.assertEqual(snapshot.bond_balance_of(1, 10), 0)
+        self.assertEqual(snapshot.bond_supply_at(10), 0)
+        snapshot = publisher.publish()
+        self.assertEqual(snapshot.balance_of(1), balance - 1000)
+        self.assertEqual(snapshot.number_of_bonds_owned_by(1), 5)
+        self.assertEqual(snapshot.bond_balance_of(1, 10), 5)
+        self.assertEqual(snapshot.bond_supply_at(10), 5)
+        bond.burn(1, 10, 5)
+        self.assertEqual(snapshot.number_of_bonds_owned_by(1), 5)
+
+        # A publish only reads the keys changed since the previous snapshot.
+        self.assertEqual(bond.changed_bonds, {(1, 10)})
+        coin.transfer(3, 4, 1000)
+        self.assertEqual(coin.changed_accounts, {3, 4, coin.tax_account})
+        published = [(publisher.publish(), dict(coin.balances))]
+        self.assertEqual(coin.changed_accounts, set())
+        self.assertEqual(bond.changed_bonds, set())
+        self.assertEqual(published[0][0].bond_supply_at(10), 0)
+        self.assertFalse(hasattr(published[0][0], "coin"))
+
+        # A new epoch publishes a snapshot. The logs of the past epochs are
+        # shared and the logs of the current epoch are copied.
+        version = publisher.latest().version
+        acb.set_timestamp(acb.get_timestamp() + self._epoch_duration)
+        acb.vote(1, ACB.NULL_HASH, 0, 0)
+        self.assertEqual(publisher.record(), True)
+        snapshot = publisher.latest()
+        self.assertEqual(snapshot.version, version + 1)
+        self.assertEqual(snapshot.epoch_id, acb.oracle.epoch_id)
+        epoch_id = acb.oracle.epoch_id
+        self.assertFalse(snapshot.logging.vote_logs[epoch_id] is
+                         acb.logging.vote_logs[epoch_id])
+        acb.vote(2, ACB.NULL_HASH, 0, 0)
+        self.assertEqual(
+            snapshot.logging.vote_logs[epoch_id].commit_succeeded + 1,
+            acb.logging.vote_logs[epoch_id].commit_succeeded)
+        self.assertEqual(publisher.record(), self._every_ops == 1)
+
+        # Readers query snapshots while the writer runs.
+        errors = []
+        done = threading.Event()
+
+        def read():
+            version = -1
+            reads = 0
+            try:
+                while not done.is_set() or reads == 0:
+                    snapshot = publisher.latest()
+                    self.assertTrue(snapshot.version >= version)
+                    version = snapshot.version
+                    self.assertEqual(
+                        sum(snapshot.balances.to_dict().values()),
+                        snapshot.total_coin_supply)
+                    self.assertEqual(
+                        sum(snapshot.bonds.to_dict().values()),
+                        snapshot.total_bond_supply)
+                    self.assertEqual(
+                        sum(snapshot.bond_count.to_dict().values()),
+                        snapshot.total_bond_supply)
+                    self.assertEqual(
+                        sum(snapshot.bond_supply.to_dict().values()),
+                        snapshot.total_bond_supply)
+                    layers = snapshot.balances.layers
+                    self.assertTrue(len(layers) <= 2 + math.log2(
+                        1 + sum([len(layer) for layer in layers])))
+                    account = random.choice(self._accounts)
+                    self.assertEqual(
+                        snapshot.number_of_bonds_owned_by(account),
+                        sum([snapshot.bond_balance_of(account, epoch)
+                             for epoch in range(snapshot.epoch_id + 20)]))
+                    reads += 1
+            except Exception as error:
+                errors.append(error)
+
+        readers = [threading.Thread(target=read)
+                   for i in range(self._reader_count)]
+        for reader in readers:
+            reader.start()
+        epoch_count = 0
+        for i in range(self._op_count):
+            sender = random.choice(self._accounts)
+            rand = random.randint(0, 9)
+            if rand < 5:
+                coin.transfer(sender, random.choice(self._accounts),
+                              random.randint(0, coin.balance_of(sender)))
+            elif rand < 8:
+                bond.mint(sender, acb.oracle.epoch_id + random.randint(0, 10),
+                          random.randint(1, 10))
+            elif rand < 9:
+                epochs = list(bond.bonds.get(sender, {}).keys())
+                if epochs:
+                    epoch = random.choice(epochs)
+                    bond.burn(sender, epoch, bond.balance_of(sender, epoch))
+            else:
+                acb.set_timestamp(acb.get_timestamp() + self._epoch_duration)
+                acb.vote(sender, ACB.NULL_HASH, 0, 0)
+                epoch_count += 1
+            publisher.record()
+            if i % 100 == 0:
+                published.append((publisher.publish(), dict(coin.balances)))
+        done.set()
+        for reader in readers:
+            reader.join()
+        self.assertEqual(errors, [])
+
+        # The snapshots keep their states after the later publishes.
+        for (snapshot, balances) in published:
+            self.assertEqual(snapshot.balances.to_dict(), balances)
+        self.assertTrue(publisher.latest().version >= version + epoch_count)
+        if self._every_ops is not None:
+            self.assertTrue(publisher.latest().version >=
+                            version + self._op_count // self._every_ops)
+
+
+def main():
+    op_count = 2000
+    for every_ops in [None, 1, 10, 100]:
+        for reader_count in [1, 4]:
+            test = ACBSnapshotUnitTest(every_ops, reader_count, op_count)
+            test.run()
+            test.teardown()
+
+
+if __name__ == "__main__":
+    main()
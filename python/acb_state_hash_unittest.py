@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2021 Kentaro Hara
+#
+# This software is released under the MIT License.
+# http://opensource.org/licenses/mit-license.php
+
+from johnlawcoin import *
+from acb_simulator import ACBSimulator, first_divergent_epoch
+from acb_simulator import restore_simulator
+import contextlib, io, random, unittest
+
+PARAMS = [996, 1000, 12, 2, 7 * 24 * 60 * 60, 90, 10, 10,
+          [6, 7, 8, 9, 10, 11, 12, 13, 14], 1, 8 * 60 * 60, 20, 3]
+
+# Return the state hash of |acb| computed from scratch.
+def recompute_state_hash(acb):
+    acb.coin.balances_hash = None
+    acb.bond_operation.bond.bonds_hash = None
+    acb.oracle.commits_hash = None
+    return acb.state_hash()
+
+class ACBStateHashUnitTest(unittest.TestCase):
+    def __init__(self, voter_count):
+        super().__init__()
+        print('voter_count=%d' % voter_count)
+        self._voter_count = voter_count
+
+    def teardown(self):
+        pass
+
+    def run(self):
+        # The ledgers do not maintain their hashes until they are asked for.
+        coin = JohnLawCoin(0)
+        coin.mint(1, 10)
+        self.assertEqual(coin.balances_hash, None)
+        self.assertEqual(coin.state_hash(), sum([
+            entry_hash("coin", account) * balance
+            for (account, balance) in coin.balances.items()]) % (
+                STATE_HASH_MODULUS))
+        coin.mint(1, 10)
+        self.assertEqual(coin.state_hash(), sum([
+            entry_hash("coin", account) * balance
+            for (account, balance) in coin.balances.items()]) % (
+                STATE_HASH_MODULUS))
+
+        # The batched operations hash like the scalar ones, and the hash
+        # does not depend on the order of the operations.
+        (coin_a, coin_b) = (JohnLawCoin(0), JohnLawCoin(0))
+        (bond_a, bond_b) = (JohnLawBond(), JohnLawBond())
+        for ledger in [coin_a, coin_b, bond_a, bond_b]:
+            ledger.state_hash()
+        amounts = {account: account * 7 for account in range(1, 10)}
+        coin_a.mint_many(amounts)
+        for account in reversed(range(1, 10)):
+            coin_b.mint(account, amounts[account])
+        self.assertEqual(coin_a.state_hash(), coin_b.state_hash())
+        coin_a.burn_many({1: 7, 2: 1, 3: 0})
+        coin_b.burn(2, 1)
+        coin_b.burn(1, 7)
+        self.assertEqual(coin_a.state_hash(), coin_b.state_hash())
+        coin_b.mint(1, 1)
+        self.assertNotEqual(coin_a.state_hash(), coin_b.state_hash())
+        bond_a.mint_many(3, amounts)
+        for account in range(1, 10):
+            bond_b.mint(account, 3, amounts[account])
+        self.assertEqual(bond_a.state_hash(), bond_b.state_hash())
+        bond_a.burn_many({(1, 3): 7, (2, 3): 5})
+        bond_b.burn(1, 3, 7)
+        bond_b.burn(2, 3, 5)
+        self.assertEqual(bond_a.state_hash(), bond_b.state_hash())
+        bond_b.mint(2, 4, 5)
+        bond_b.burn(2, 4, 5)
+        self.assertEqual(bond_a.state_hash(), bond_b.state_hash())
+        bond_b.mint(2, 4, 5)
+        self.assertNotEqual(bond_a.state_hash(), bond_b.state_hash())
+
+        # Two ACBs have the same hash for the same state although their
+        # internal accounts have different names. The bulk purchases hash
+        # like the single ones.
+        genesis = "0x00000000000000000000000000000000000000a0"
+        accounts = ["0x%040x" % (index + 1)
+                    for index in range(self._voter_count)]
+        (acb_a, acb_b) = (create_acb(genesis, *PARAMS),
+                          create_acb(genesis, *PARAMS))
+        self.assertNotEqual(acb_a.coin.tax_account, acb_b.coin.tax_account)
+        self.assertEqual(acb_a.state_hash(), acb_b.state_hash())
+        for acb in [acb_a, acb_b]:
+            for account in accounts:
+                acb.coin.transfer(genesis, account, 100000)
+            acb.bond_operation.bond_budget = 1000
+        acb_a.purchase_bonds_many([(account, 3) for account in accounts])
+        for account in accounts:
+            acb_b.purchase_bonds(account, 3)
+        self.assertEqual(acb_a.state_hash(), acb_b.state_hash())
+        self.assertEqual(acb_a.state_hash(), recompute_state_hash(acb_a))
+
+        # The hashes follow the votes, the reclaims and the rewards.
+        rng = random.Random(self._voter_count)
+        for epoch in range(8):
+            for acb in [acb_a, acb_b]:
+                acb.set_timestamp(acb.get_timestamp() + ACB.EPOCH_DURATION)
+            for account in accounts:
+                (level, salt) = (rng.randint(0, 8), rng.randint(0, 10))
+                for acb in [acb_a, acb_b]:
+                    acb.vote(account, acb.encrypt(account, level, salt),
+                             level, salt)
+            for acb in [acb_a, acb_b]:
+                acb.vote(genesis, acb.encrypt(genesis, 1, 1), 1, 1)
+            self.assertEqual(acb_a.state_hash(), acb_b.state_hash())
+            self.assertEqual(acb_a.state_hash(), recompute_state_hash(acb_a))
+        if accounts:
+            acb_b.purchase_bonds(accounts[0], 1)
+            self.assertNotEqual(acb_a.state_hash(), acb_b.state_hash())
+            self.assertEqual(acb_b.state_hash(), recompute_state_hash(acb_b))
+        acb_a.open_market_operation.latest_price += 1
+        self.assertNotEqual(acb_a.state_hash(), recompute_state_hash(acb_b))
+
+        # The first divergent epoch is found by bisection.
+        self.assertEqual(first_divergent_epoch([], []), None)
+        self.assertEqual(first_divergent_epoch([1, 2, 3], [1, 2, 3]), None)
+        self.assertEqual(first_divergent_epoch([1, 2, 3], [1, 2]), 2)
+        for diverged_at in range(10):
+            hashes = list(range(10))
+            self.assertEqual(first_divergent_epoch(
+                hashes, hashes[:diverged_at] + [-1] * (10 - diverged_at)),
+                             diverged_at)
+
+        # Two simulations with the same seed record the same hashes and a
+        # simulation perturbed after an epoch diverges at the next epoch.
+        iteration = 12
+        def simulate(perturb_at=None):
+            random.seed(self._voter_count)
+            with contextlib.redirect_stdout(io.StringIO()):
+                simulator = ACBSimulator(*PARAMS, self._voter_count,
+                                         iteration)
+                simulator.record_state_hashes()
+                simulator.start()
+                if perturb_at is not None:
+                    simulator.run_epochs(perturb_at)
+                    simulator = restore_simulator(simulator.checkpoint())
+                    simulator._eth_pool.increase_eth(1)
+                simulator.run_epochs(iteration - simulator.epoch_count)
+            return simulator.state_hashes
+        expected = simulate()
+        self.assertEqual(len(expected), iteration)
+        self.assertEqual(simulate(), expected)
+        for perturb_at in [0, 5, iteration - 1]:
+            self.assertEqual(first_divergent_epoch(expected,
+                                                   simulate(perturb_at)),
+                             perturb_at)
+
+
+def main():
+    for voter_count in [0, 1, 20]:
+        test = ACBStateHashUnitTest(voter_count)
+        test.run()
+        test.teardown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2021 Kentaro Hara
+#
+# This software is released under the MIT License.
+# http://opensource.org/licenses/mit-license.php
+
+from acb_simulator import ACBSimulator, restore_simulator
+from acb_optimizer import PARAMETER_NAMES, summarize, score
+import argparse, concurrent.futures, contextlib, io, math, multiprocessing
+import os, random, tempfile, time
+
+#-------------------------------------------------------------------------------
+# [Successive halving sweep]
+#
+# Runs a sweep of ACBSimulator configurations with successive halving. All
+# the configurations run for a short budget of epochs and are ranked by a
+# stability metric. Only the best 1 / |eta| of them continue, up to |eta|
+# times more epochs, and so on until the maximum budget. The simulations are
+# checkpointed after every round, so the configurations that continue resume
+# where they stopped instead of starting over. The checkpoints are files in a
+# directory, so an interrupted sweep resumes from them too.
+#
+# Usage:
+#   ./acb_sweep.py --min-epochs 50 --max-epochs 1000 --sample 200 -j 8
+#-------------------------------------------------------------------------------
+
+# A stability metric takes a simulator and returns a value. Smaller is more
+# stable. A metric must be defined at the module level so that it can be
+# passed to worker processes.
+
+# The objective of acb_optimizer. A simulation that stopped because the
+# total coin supply exploded is the least stable.
+def objective_metric(simulator):
+    if simulator.stopped:
+        return math.inf
+    return score(summarize(simulator))
+
+# The volatility of the total coin supply per epoch.
+def supply_volatility_metric(simulator):
+    if simulator.stopped:
+        return math.inf
+    return summarize(simulator)["supply_volatility"]
+
+METRICS = {
+    "objective": objective_metric,
+    "supply_volatility": supply_volatility_metric,
+}
+
+# Yield the configurations of the sweep in acb_simulator.py main().
+#
+# Parameters
+# ----------------
+# |voter_count|: The number of the voters.
+#
+# Returns
+# ----------------
+# Dicts from PARAMETER_NAMES to the values. "iteration" is left to the
+# sweep.
+def simulator_grid(voter_count):
+    for (bond_price, bond_redemption_price) in [
+            (1, 3), (996, 1000), (1000, 1000)]:
+        for bond_redemption_period in [1, 12]:
+            for bond_redeemable_period in [1, 2, 12]:
+                for epoch_duration in [1, 7 * 24 * 60 * 60]:
+                    for proportional_reward_rate in [0, 90, 100]:
+                        for deposit_rate in [0, 10, 100]:
+                            for damping_factor in [10, 100]:
+                                for level_to_exchange_rate in [
+                                        [9, 11, 12],
+                                        [0, 1, 10, 11, 12],
+                                        [6, 7, 8, 9, 10, 11, 12, 13, 14]]:
+                                    for reclaim_threshold in [0, 1, len(
+                                            level_to_exchange_rate) - 1]:
+                                        yield {
+                                            "bond_price": bond_price,
+                                            "bond_redemption_price":
+                                            bond_redemption_price,
+                                            "bond_redemption_period":
+                                            bond_redemption_period,
+                                            "bond_redeemable_period":
+                                            bond_redeemable_period,
+                                            "epoch_duration": epoch_duration,
+                                            "proportional_reward_rate":
+                                            proportional_reward_rate,
+                                            "deposit_rate": deposit_rate,
+                                            "damping_factor": damping_factor,
+                                            "level_to_exchange_rate":
+                                            level_to_exchange_rate,
+                                            "reclaim_threshold":
+                                            reclaim_threshold,
+                                            "price_change_interval":
+                                            epoch_duration // 21 + 1,
+                                            "price_change_percentage": 20,
+                                            "price_multiplier": 3,
+                                            "voter_count": voter_count,
+                                        }
+
+# Run a simulation up to |epochs| epochs, resuming from its latest
+# checkpoint, and checkpoint it as "<index>-<epochs>.pickle". The checkpoints
+# of the earlier rounds are kept so that a sweep resumed from the directory
+# ranks every round as before.
+#
+# Parameters
+# ----------------
+# |job|: A tuple of the parameters, the seed, the epochs, the checkpoint
+# directory, the index of the configuration and the metric.
+#
+# Returns
+# ----------------
+# A tuple of three values:
+#  - The metric.
+#  - The number of the epochs the simulation has run.
+#  - The number of the epochs this call ran.
+def run_job(job):
+    (parameters, seed, epochs, checkpoint_dir, index, metric) = job
+    prefix = "%d-" % index
+    checkpoints = [int(name[len(prefix):-len(".pickle")])
+                   for name in os.listdir(checkpoint_dir)
+                   if name.startswith(prefix) and name.endswith(".pickle")]
+    checkpoints = [count for count in checkpoints if count <= epochs]
+    with contextlib.redirect_stdout(io.StringIO()):
+        if checkpoints:
+            path = os.path.join(checkpoint_dir,
+                                "%d-%d.pickle" % (index, max(checkpoints)))
+            with open(path, "rb") as file:
+                simulator = restore_simulator(file.read())
+        else:
+            random.seed(seed)
+            simulator = ACBSimulator(*[parameters[name]
+                                       for name in PARAMETER_NAMES])
+            simulator.start()
+        previous_count = simulator.epoch_count
+        if simulator.epoch_count < epochs and not simulator.stopped:
+            simulator.run_epochs(epochs - simulator.epoch_count)
+        # Write the checkpoint atomically so that an interrupted sweep does
+        # not leave a broken checkpoint.
+        path = os.path.join(checkpoint_dir, "%d-%d.pickle" % (index, epochs))
+        with open(path + ".tmp", "wb") as file:
+            file.write(simulator.checkpoint())
+        os.replace(path + ".tmp", path)
+    return (metric(simulator), simulator.epoch_count,
+            simulator.epoch_count - previous_count)
+
+# Run a successive halving sweep.
+#
+# Parameters
+# ----------------
+# |configurations|: A list of dicts from PARAMETER_NAMES to the values.
+# "iteration" is set to |max_epochs|.
+# |min_epochs|: The epochs of the first round.
+# |max_epochs|: The epochs of the last round.
+# |eta|: The factor the configurations are reduced by and the budget is
+# increased by in every round.
+# |metric|: The stability metric.
+# |checkpoint_dir|: The directory of the checkpoints. A temporary directory
+# is used if None. A configuration is identified by its index, so a sweep
+# resumed from a directory must pass the same configurations.
+# |processes|: The number of worker processes. 1 runs in-process.
+# |seed|: The seed of the first configuration. The configuration at index i
+# uses |seed| + i.
+#
+# Returns
+# ----------------
+# A dict with:
+#  - "ranking": A list of (index, metric, epochs) of all the configurations,
+#    from the best. A configuration that reached a later round ranks higher.
+#  - "rounds": A list of (epochs, indices) of every round.
+#  - "simulated_epochs": The number of the epochs simulated in this call.
+def successive_halving(configurations, min_epochs, max_epochs, eta=2,
+                       metric=objective_metric, checkpoint_dir=None,
+                       processes=1, seed=0):
+    assert(1 <= min_epochs and min_epochs <= max_epochs)
+    assert(eta >= 2)
+    with contextlib.ExitStack() as stack:
+        if checkpoint_dir is None:
+            checkpoint_dir = stack.enter_context(
+                tempfile.TemporaryDirectory())
+        pool = None
+        if processes > 1:
+            pool = stack.enter_context(
+                concurrent.futures.ProcessPoolExecutor(processes))
+
+        results = {}
+        last_round = {}
+        rounds = []
+        simulated_epochs = 0
+        survivors = list(range(len(configurations)))
+        epochs = min_epochs
+        while survivors:
+            jobs = []
+            for index in survivors:
+                parameters = dict(configurations[index])
+                parameters["iteration"] = max_epochs
+                jobs.append((parameters, seed + index, epochs,
+                             checkpoint_dir, index, metric))
+            if pool:
+                outputs = list(pool.map(run_job, jobs))
+            else:
+                outputs = [run_job(job) for job in jobs]
+            for (index, (value, epoch_count, ran)) in zip(survivors,
+                                                          outputs):
+                results[index] = (value, epoch_count)
+                last_round[index] = len(rounds)
+                simulated_epochs += ran
+            rounds.append((epochs, survivors))
+            if epochs >= max_epochs or len(survivors) == 1:
+                break
+            survivors = sorted(survivors, key=lambda index: (
+                results[index][0], index))[:max(len(survivors) // eta, 1)]
+            epochs = min(epochs * eta, max_epochs)
+
+    ranking = sorted(results, key=lambda index: (
+        -last_round[index], results[index][0], index))
+    return {
+        "ranking": [(index,) + results[index] for index in ranking],
+        "rounds": rounds,
+        "simulated_epochs": simulated_epochs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--min-epochs", type=int, default=50)
+    parser.add_argument("--max-epochs", type=int, default=1000)
+    parser.add_argument("--eta", type=int, default=2)
+    parser.add_argument("--metric", choices=list(METRICS),
+                        default="objective")
+    parser.add_argument("--voters", type=int, default=40)
+    parser.add_argument("--sample", type=int, default=0,
+                        help="sweep this many random configurations of the "
+                        "grid (default: all)")
+    parser.add_argument("--checkpoint-dir", default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-j", "--processes", type=int,
+                        default=multiprocessing.cpu_count())
+    args = parser.parse_args()
+
+    configurations = list(simulator_grid(args.voters))
+    if args.sample:
+        configurations = random.Random(args.seed).sample(
+            configurations, min(args.sample, len(configurations)))
+    if args.checkpoint_dir:
+        os.makedirs(args.checkpoint_dir, exist_ok=True)
+
+    start = time.time()
+    result = successive_halving(
+        configurations, args.min_epochs, args.max_epochs, args.eta,
+        METRICS[args.metric], args.checkpoint_dir, args.processes, args.seed)
+    elapsed = time.time() - start
+
+    for (epochs, indices) in result["rounds"]:
+        print("round: epochs=%d configurations=%d" % (epochs, len(indices)))
+    for (index, value, epoch_count) in result["ranking"][:5]:
+        parameters = configurations[index]
+        print("%s=%.6f epochs=%d %s" % (
+            args.metric, value, epoch_count,
+            " ".join(["%s=%s" % (name, parameters[name])
+                      for name in PARAMETER_NAMES if name in parameters])))
+    print("simulated %d epochs (%d without early stopping) in %.1fs" %
+          (result["simulated_epochs"],
+           len(configurations) * args.max_epochs, elapsed))
+
+
+if __name__ == "__main__":
+    main()
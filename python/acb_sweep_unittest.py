@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2021 Kentaro Hara
+#
+# This software is released under the MIT License.
+# http://opensource.org/licenses/mit-license.php
+
+from acb_simulator import ACBSimulator, restore_simulator
+from acb_optimizer import DEFAULT_PARAMETERS, PARAMETER_NAMES
+from acb_sweep import *
+import contextlib, io, os, random, shutil, tempfile, unittest
+
+# A metric that prefers a larger total coin supply.
+def coin_supply_metric(simulator):
+    return -simulator._coin.total_supply
+
+class ACBSweepUnitTest(unittest.TestCase):
+    def __init__(self, processes):
+        super().__init__()
+        print('processes=%d' % processes)
+        self._processes = processes
+
+    def teardown(self):
+        pass
+
+    def run(self):
+        parameters = dict(DEFAULT_PARAMETERS)
+        parameters["voter_count"] = 10
+
+        # A simulation restored from a checkpoint continues exactly as the
+        # simulation that was not interrupted.
+        def simulate(checkpoint_at):
+            random.seed(3)
+            simulator = ACBSimulator(*[parameters[name]
+                                       for name in PARAMETER_NAMES])
+            simulator.start()
+            simulator.run_epochs(checkpoint_at)
+            checkpoint = simulator.checkpoint()
+            # Another simulation with other constants runs meanwhile.
+            other = ACBSimulator(1, 3, 1, 1, 1, 0, 0, 100, [9, 11, 12], 0,
+                                 1, 20, 3, 5, 5)
+            other.run()
+            simulator = restore_simulator(checkpoint)
+            simulator.run_epochs(30 - checkpoint_at)
+            return simulator
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = simulate(30)
+            for checkpoint_at in [0, 1, 17]:
+                actual = simulate(checkpoint_at)
+                self.assertEqual(actual.epoch_count, 30)
+                self.assertEqual(actual._coin.balances,
+                                 expected._coin.balances)
+                self.assertEqual(actual._oracle.epoch_id,
+                                 expected._oracle.epoch_id)
+                for epoch_id in expected._logging.epoch_logs:
+                    self.assertEqual(
+                        actual._logging.epoch_logs[epoch_id].__dict__,
+                        expected._logging.epoch_logs[epoch_id].__dict__)
+                self.assertEqual(actual.metrics.__dict__,
+                                 expected.metrics.__dict__)
+
+        # Successive halving.
+        configurations = []
+        for damping_factor in [10, 100]:
+            for deposit_rate in [0, 10, 100]:
+                configuration = dict(parameters)
+                configuration["damping_factor"] = damping_factor
+                configuration["deposit_rate"] = deposit_rate
+                configurations.append(configuration)
+        checkpoint_dir = tempfile.mkdtemp()
+        result = successive_halving(configurations, 4, 16, 2,
+                                    objective_metric, checkpoint_dir,
+                                    self._processes, 5)
+        self.assertEqual([(epochs, len(indices))
+                          for (epochs, indices) in result["rounds"]],
+                         [(4, 6), (8, 3), (16, 1)])
+        self.assertEqual(result["simulated_epochs"], 6 * 4 + 3 * 4 + 1 * 8)
+        self.assertEqual(len(result["ranking"]), 6)
+        self.assertEqual(sorted([index for (index, value, epochs)
+                                 in result["ranking"]]), list(range(6)))
+        for (epochs, indices) in result["rounds"]:
+            self.assertEqual(
+                set(indices),
+                set([index for (index, value, epoch_count)
+                     in result["ranking"][:len(indices)]]))
+        (best, value, epochs) = result["ranking"][0]
+        self.assertEqual(epochs, 16)
+        self.assertEqual(result["rounds"][-1][1], [best])
+        self.assertEqual(len(os.listdir(checkpoint_dir)), 6 + 3 + 1)
+        for (epochs, indices) in result["rounds"]:
+            for index in indices:
+                self.assertTrue(os.path.exists(os.path.join(
+                    checkpoint_dir, "%d-%d.pickle" % (index, epochs))))
+
+        # The best configuration has the metric of the uninterrupted
+        # simulation.
+        with contextlib.redirect_stdout(io.StringIO()):
+            random.seed(5 + best)
+            configuration = dict(configurations[best])
+            configuration["iteration"] = 16
+            simulator = ACBSimulator(*[configuration[name]
+                                       for name in PARAMETER_NAMES])
+            simulator.start()
+            simulator.run_epochs(16)
+        self.assertEqual(value, objective_metric(simulator))
+
+        # A sweep resumed from the checkpoints simulates nothing again.
+        resumed = successive_halving(configurations, 4, 16, 2,
+                                     objective_metric, checkpoint_dir,
+                                     self._processes, 5)
+        self.assertEqual(resumed["simulated_epochs"], 0)
+        self.assertEqual(resumed["ranking"], result["ranking"])
+        shutil.rmtree(checkpoint_dir)
+
+        # A pluggable metric.
+        result = successive_halving(configurations, 2, 6, 3,
+                                    coin_supply_metric, None,
+                                    self._processes, 5)
+        self.assertEqual([(epochs, len(indices))
+                          for (epochs, indices) in result["rounds"]],
+                         [(2, 6), (6, 2)])
+        first = [value for (index, value, epochs) in result["ranking"][:2]]
+        self.assertEqual(first, sorted(first))
+
+        self.assertEqual(len(list(simulator_grid(1))), 5832)
+        with self.assertRaises(Exception):
+            successive_halving(configurations, 5, 4)
+        with self.assertRaises(Exception):
+            successive_halving(configurations, 1, 4, 1)
+
+
+def main():
+    for processes in [1, 2]:
+        test = ACBSweepUnitTest(processes)
+        test.run()
+        test.teardown()
+
+
+if __name__ == "__main__":
+    main()
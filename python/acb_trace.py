@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2021 Kentaro Hara
+#
+# This software is released under the MIT License.
+# http://opensource.org/licenses/mit-license.php
+
+from johnlawcoin import *
+from acb_simulator import ACBSimulator
+import argparse, json, random, sys, time
+
+#-------------------------------------------------------------------------------
+# [ACB trace]
+#
+# Records an ACBSimulator run as an operation trace and replays the trace
+# against another ACB. test/trace_replay.js replays the same trace against
+# the contracts, so the Python model and JohnLawCoin.sol can be compared
+# operation by operation.
+#
+# The trace is a JSON Lines file. The first line is a header:
+#
+#   {"params": [...], "seed": seed, "accounts": the number of accounts}
+#
+# |params| are the first 13 parameters of ACBSimulator (up to
+# price_multiplier). Every other line is one operation:
+#
+#   ["set_coin", account, amount]
+#   ["transfer", timestamp, sender, receiver, amount]
+#   ["vote", timestamp, sender, committed_level, committed_salt,
+#    oracle_level, salt, result]
+#   ["purchase_bonds", timestamp, sender, count, result]
+#   ["redeem_bonds", timestamp, sender, redemption_epochs, result]
+#   ["purchase_coins", timestamp, sender, "requested_eth_amount", result]
+#   ["sell_coins", timestamp, sender, requested_coin_amount, result]
+#   ["checkpoint", state]
+#
+# Accounts are indices. The account 0 is the genesis account. |result| is
+# what the model returned, or "revert" if the operation failed. A "vote"
+# without a commit has null |committed_level| and |committed_salt|. The
+# result of "redeem_bonds" is the number of the redeemed bonds, which is
+# |redeemed_bonds| of RedeemBondsEvent. ETH amounts are written as strings
+# because they do not fit in a double.
+#
+# A checkpoint is recorded at every epoch boundary (just before the vote
+# that updates the epoch) and at the end of the trace. See get_state() for
+# the recorded state.
+#-------------------------------------------------------------------------------
+
+# Return the state compared at checkpoints.
+#
+# Parameters
+# ----------------
+# |acb|: The ACB.
+# |accounts|: The accounts to compare, in the order of their indices.
+def get_state(acb, accounts):
+    return {
+        "epoch_id": acb.oracle.epoch_id,
+        "coin_supply": acb.coin.total_supply,
+        "bond_supply": acb.bond_operation.bond.total_supply,
+        "bond_budget": acb.bond_operation.bond_budget,
+        "coin_budget": acb.open_market_operation.coin_budget,
+        "oracle_level": acb.oracle_level,
+        "eth_balance": str(acb.eth_pool.eth_balance),
+        "latest_price": str(acb.open_market_operation.latest_price),
+        "balances": [acb.coin.balance_of(account) for account in accounts],
+        "bonds": [acb.bond_operation.bond.number_of_bonds_owned_by(account)
+                  for account in accounts],
+    }
+
+# Records the operations issued to an ACB and its JohnLawCoin contract.
+class TraceRecorder:
+    def __init__(self, acb, genesis_account):
+        self.acb = acb
+        self.ops = []
+        self.accounts = []
+        self.account_indices = {}
+        # The mapping from committed hashes to (level, salt).
+        self.hashes = {}
+        self.index(genesis_account)
+
+    # Return the index of |account|.
+    def index(self, account):
+        if account not in self.account_indices:
+            self.account_indices[account] = len(self.accounts)
+            self.accounts.append(account)
+        return self.account_indices[account]
+
+    # Record |op|. |call| performs the operation and returns its result.
+    # |convert| converts the result to the trace format.
+    def record(self, op, call, convert=lambda result: result):
+        try:
+            result = call()
+        except Exception:
+            self.ops.append(op + ["revert"])
+            raise
+        self.ops.append(op + [convert(result)])
+        return result
+
+    def checkpoint(self):
+        self.ops.append(["checkpoint", get_state(self.acb, self.accounts)])
+
+    # Write the trace to |path|.
+    def write(self, path, params, seed):
+        with open(path, "w") as file:
+            file.write(json.dumps({"params": params, "seed": seed,
+                                   "accounts": len(self.accounts)}) + "\n")
+            for op in self.ops:
+                file.write(json.dumps(op, separators=(",", ":")) + "\n")
+
+# Convert the result of purchase_coins or sell_coins to the trace format.
+def convert_exchange(result):
+    (eth_amount, coin_amount) = result
+    return [str(eth_amount), coin_amount]
+
+# Forwards calls to an ACB and records them.
+class TracingACB:
+    def __init__(self, recorder):
+        self._recorder = recorder
+        self._acb = recorder.acb
+
+    def __getattr__(self, name):
+        return getattr(self._acb, name)
+
+    def encrypt(self, sender, level, salt):
+        hash = self._acb.encrypt(sender, level, salt)
+        self._recorder.hashes[hash] = (level, salt)
+        return hash
+
+    def vote(self, sender, hash, oracle_level, salt):
+        recorder = self._recorder
+        if (self._acb.get_timestamp() >=
+            self._acb.current_epoch_start + ACB.EPOCH_DURATION):
+            recorder.checkpoint()
+        (committed_level, committed_salt) = (None, None)
+        if hash != ACB.NULL_HASH:
+            (committed_level, committed_salt) = recorder.hashes[hash]
+        return recorder.record(
+            ["vote", self._acb.get_timestamp(), recorder.index(sender),
+             committed_level, committed_salt, oracle_level, salt],
+            lambda: self._acb.vote(sender, hash, oracle_level, salt), list)
+
+    def purchase_bonds(self, sender, count):
+        recorder = self._recorder
+        return recorder.record(
+            ["purchase_bonds", self._acb.get_timestamp(),
+             recorder.index(sender), count],
+            lambda: self._acb.purchase_bonds(sender, count))
+
+    def redeem_bonds(self, sender, redemption_epochs):
+        recorder = self._recorder
+        return recorder.record(
+            ["redeem_bonds", self._acb.get_timestamp(),
+             recorder.index(sender), list(redemption_epochs)],
+            lambda: self._acb.redeem_bonds(sender, redemption_epochs))
+
+    def purchase_coins(self, sender, requested_eth_amount):
+        recorder = self._recorder
+        return recorder.record(
+            ["purchase_coins", self._acb.get_timestamp(),
+             recorder.index(sender), str(requested_eth_amount)],
+            lambda: self._acb.purchase_coins(sender, requested_eth_amount),
+            convert_exchange)
+
+    def sell_coins(self, sender, requested_coin_amount):
+        recorder = self._recorder
+        return recorder.record(
+            ["sell_coins", self._acb.get_timestamp(),
+             recorder.index(sender), requested_coin_amount],
+            lambda: self._acb.sell_coins(sender, requested_coin_amount),
+            convert_exchange)
+
+# Forwards calls to a JohnLawCoin contract and records them.
+class TracingCoin:
+    def __init__(self, recorder):
+        self._recorder = recorder
+        self._coin = recorder.acb.coin
+
+    def __getattr__(self, name):
+        return getattr(self._coin, name)
+
+    # ACBSimulator mints the initial balances with this method. The contracts
+    # do the same with ACBForTesting.setCoin.
+    def mint(self, account, amount):
+        assert(self._coin.balance_of(account) == 0)
+        self._recorder.ops.append(
+            ["set_coin", self._recorder.index(account), amount])
+        self._coin.mint(account, amount)
+
+    def transfer(self, sender, receiver, amount):
+        recorder = self._recorder
+        return recorder.record(
+            ["transfer", recorder.acb.get_timestamp(), recorder.index(sender),
+             recorder.index(receiver), amount],
+            lambda: self._coin.transfer(sender, receiver, amount))
+
+# Run ACBSimulator with |params| and |seed| and write the trace to |path|.
+def record(path, params, seed):
+    random.seed(seed)
+    simulator = ACBSimulator(*params)
+    recorder = TraceRecorder(simulator._acb, 0)
+    simulator._acb = TracingACB(recorder)
+    simulator._coin = TracingCoin(recorder)
+    simulator.run()
+    simulator.teardown()
+    recorder.checkpoint()
+    recorder.write(path, params[:13], seed)
+    return len(recorder.ops)
+
+# Replay the trace at |path| against a new ACB.
+#
+# The operations between two checkpoints are applied as one batch and the
+# state is compared at the end of the batch.
+#
+# Returns
+# ----------------
+# A tuple of two values:
+# - The number of replayed operations.
+# - A list of divergences. Each divergence is a tuple of (line number,
+# description).
+def replay(path):
+    divergences = []
+    count = 0
+    with open(path) as file:
+        header = json.loads(next(file))
+        accounts = list(range(header["accounts"]))
+        acb = create_acb(0, *header["params"])
+        batch = []
+        for (line_number, line) in enumerate(file, 2):
+            op = json.loads(line)
+            if op[0] != "checkpoint":
+                batch.append((line_number, op))
+                continue
+            for (batch_line_number, batch_op) in batch:
+                result = apply(acb, batch_op)
+                if result != batch_op[-1]:
+                    divergences.append(
+                        (batch_line_number, "%s returned %s, expected %s" %
+                         (batch_op[0], result, batch_op[-1])))
+            count += len(batch) + 1
+            batch = []
+            state = get_state(acb, accounts)
+            for key in op[1]:
+                if state[key] != op[1][key]:
+                    divergences.append(
+                        (line_number, "%s is %s, expected %s" %
+                         (key, state[key], op[1][key])))
+    return (count, divergences)
+
+# Apply one operation to |acb| and return its result in the trace format.
+def apply(acb, op):
+    name = op[0]
+    if name == "set_coin":
+        acb.coin.burn(op[1], acb.coin.balance_of(op[1]))
+        acb.coin.mint(op[1], op[2])
+        return op[-1]
+    acb.set_timestamp(op[1])
+    try:
+        if name == "transfer":
+            return acb.coin.transfer(op[2], op[3], op[4])
+        if name == "vote":
+            hash = ACB.NULL_HASH
+            if op[3] is not None:
+                hash = acb.encrypt(op[2], op[3], op[4])
+            return list(acb.vote(op[2], hash, op[5], op[6]))
+        if name == "purchase_bonds":
+            return acb.purchase_bonds(op[2], op[3])
+        if name == "redeem_bonds":
+            return acb.redeem_bonds(op[2], op[3])
+        if name == "purchase_coins":
+            return convert_exchange(acb.purchase_coins(op[2], int(op[3])))
+        if name == "sell_coins":
+            return convert_exchange(acb.sell_coins(op[2], op[3]))
+    except Exception:
+        return "revert"
+    assert(False)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    record_parser = subparsers.add_parser(
+        "record", help="record an ACBSimulator run")
+    record_parser.add_argument("path")
+    record_parser.add_argument("--seed", type=int, default=0)
+    record_parser.add_argument("--voters", type=int, default=40)
+    record_parser.add_argument("--iteration", type=int, default=40)
+    replay_parser = subparsers.add_parser(
+        "replay", help="replay a trace against the Python model")
+    replay_parser.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        params = [996, 1000, 12, 2, 7 * 24 * 60 * 60, 90, 10, 10,
+                  [6, 7, 8, 9, 10, 11, 12, 13, 14], 1, 8 * 60 * 60, 20, 3,
+                  args.voters, args.iteration]
+        count = record(args.path, params, args.seed)
+        print("recorded %d operations to %s" % (count, args.path),
+              file=sys.stderr)
+    else:
+        start = time.time()
+        (count, divergences) = replay(args.path)
+        elapsed = time.time() - start
+        for (line_number, description) in divergences:
+            print("%s:%d: %s" % (args.path, line_number, description))
+        print("replayed %d operations in %.2fs (%d ops/s): %d divergences" %
+              (count, elapsed, count / max(elapsed, 1e-9), len(divergences)),
+              file=sys.stderr)
+        sys.exit(1 if divergences else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2021 Kentaro Hara
+#
+# This software is released under the MIT License.
+# http://opensource.org/licenses/mit-license.php
+
+from johnlawcoin import *
+from acb_trace import *
+import contextlib, io, json, os, shutil, tempfile, unittest
+
+PARAMS = [996, 1000, 12, 2, 7 * 24 * 60 * 60, 90, 10, 10,
+          [6, 7, 8, 9, 10, 11, 12, 13, 14], 1, 8 * 60 * 60, 20, 3]
+
+class ACBTraceUnitTest(unittest.TestCase):
+    def __init__(self, voter_count, seed):
+        super().__init__()
+        print('voter_count=%d seed=%d' % (voter_count, seed))
+        self._voter_count = voter_count
+        self._seed = seed
+
+    def teardown(self):
+        pass
+
+    def run(self):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, "trace.jsonl")
+        iteration = 20
+        with contextlib.redirect_stdout(io.StringIO()):
+            count = record(path, PARAMS + [self._voter_count, iteration],
+                           self._seed)
+
+        with open(path) as file:
+            lines = file.readlines()
+        header = json.loads(lines[0])
+        ops = [json.loads(line) for line in lines[1:]]
+        self.assertEqual(header, {"params": PARAMS, "seed": self._seed,
+                                  "accounts": self._voter_count + 1})
+        self.assertEqual(len(ops), count)
+        checkpoints = [op[1] for op in ops if op[0] == "checkpoint"]
+        self.assertGreater(len(checkpoints), 1)
+        self.assertEqual(ops[-1][0], "checkpoint")
+
+        # The results have the shapes test/trace_replay.js builds from the
+        # events of the contracts.
+        for op in ops:
+            (name, result) = (op[0], op[-1])
+            if name in ["checkpoint", "set_coin"] or result == "revert":
+                continue
+            if name == "transfer":
+                self.assertEqual(result, None)
+            elif name == "vote":
+                self.assertEqual(len(result), 6)
+            elif name in ["purchase_bonds", "redeem_bonds"]:
+                self.assertTrue(isinstance(result, int))
+            else:
+                self.assertTrue(isinstance(result[0], str))
+                self.assertTrue(isinstance(result[1], int))
+
+        # A fresh ACB that applies the operations returns the recorded
+        # results and has the recorded state at every epoch boundary.
+        acb = create_acb(0, *PARAMS)
+        accounts = list(range(header["accounts"]))
+        epoch_ids = []
+        for op in ops:
+            if op[0] == "checkpoint":
+                self.assertEqual(get_state(acb, accounts), op[1])
+                epoch_ids.append(op[1]["epoch_id"])
+            else:
+                self.assertEqual(apply(acb, op), op[-1])
+        self.assertEqual(epoch_ids, sorted(set(epoch_ids)))
+
+        # replay() finds no divergence.
+        self.assertEqual(replay(path), (count, []))
+
+        # A tampered result and a tampered state are divergences at their
+        # lines.
+        index = [i for (i, op) in enumerate(ops) if op[0] == "vote"][-1]
+        tampered = [list(op) for op in ops]
+        tampered[index][-1] = "revert"
+        tampered[-1] = ["checkpoint", dict(ops[-1][1], coin_supply=-1)]
+        with open(path, "w") as file:
+            file.write(lines[0])
+            for op in tampered:
+                file.write(json.dumps(op) + "\n")
+        (replayed, divergences) = replay(path)
+        self.assertEqual(replayed, count)
+        self.assertEqual(divergences, [
+            (index + 2, "vote returned %s, expected revert" % ops[index][-1]),
+            (len(ops) + 1, "coin_supply is %d, expected -1" %
+             ops[-1][1]["coin_supply"])])
+
+        shutil.rmtree(directory)
+
+
+def main():
+    for voter_count in [1, 10]:
+        for seed in [0, 1]:
+            test = ACBTraceUnitTest(voter_count, seed)
+            test.run()
+            test.teardown()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@
 # http://opensource.org/licenses/mit-license.php
 
 from johnlawcoin import *
-import unittest, random
+import copy, unittest, random
 
 class ACBUnitTest(unittest.TestCase):
 
@@ -187,7 +187,7 @@ class ACBUnitTest(unittest.TestCase):
 
         # 1 commit
         balance = self._coin.balance_of(accounts[4])
-        deposit_4[now] = int(balance * self._deposit_rate / 100)
+        deposit_4[now] = balance * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[4], self._acb.encrypt(
                 accounts[4], self._default_level, 1),
@@ -215,7 +215,7 @@ class ACBUnitTest(unittest.TestCase):
         self.set_tax()
 
         balance = self._coin.balance_of(accounts[4])
-        deposit_4[now] = int(balance * self._deposit_rate / 100)
+        deposit_4[now] = balance * self._deposit_rate // 100
         self.assertEqual(acb.current_epoch_start,
                          acb.get_timestamp() - self._epoch_duration)
         self.assertEqual(acb.vote(
@@ -239,13 +239,13 @@ class ACBUnitTest(unittest.TestCase):
         self.set_tax()
 
         balance = self._coin.balance_of(accounts[4])
-        reward = int((100 - self._proportional_reward_rate) *
-                     self._tax / 100)
+        reward = ((100 - self._proportional_reward_rate) *
+                  self._tax // 100)
         if deposit_4[(now - 2) % 3] > 0:
-            reward += int(self._proportional_reward_rate *
-                          self._tax / 100)
+            reward += (self._proportional_reward_rate *
+                       self._tax // 100)
         burned[now] = self._tax - reward
-        deposit_4[now] = int(balance * self._deposit_rate / 100)
+        deposit_4[now] = balance * self._deposit_rate // 100
         self.assertEqual(acb.current_epoch_start,
                          acb.get_timestamp() - self._epoch_duration)
         self.assertEqual(acb.vote(
@@ -276,7 +276,7 @@ class ACBUnitTest(unittest.TestCase):
         balance = self._coin.balance_of(accounts[4])
         coin_supply = self._coin.total_supply
         burned[now] = deposit_4[(now - 2) % 3] + self._tax
-        deposit_4[now] = int(balance * self._deposit_rate / 100)
+        deposit_4[now] = balance * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[4], self._acb.encrypt(
                 accounts[4], self._default_level, 4),
@@ -302,13 +302,13 @@ class ACBUnitTest(unittest.TestCase):
 
         balance = self._coin.balance_of(accounts[4])
         coin_supply = self._coin.total_supply
-        reward = int((100 - self._proportional_reward_rate) *
-                     self._tax / 100)
+        reward = ((100 - self._proportional_reward_rate) *
+                  self._tax // 100)
         if deposit_4[(now - 2) % 3] > 0:
-            reward += int(self._proportional_reward_rate *
-                          self._tax / 100)
+            reward += (self._proportional_reward_rate *
+                       self._tax // 100)
         burned[now] = self._tax - reward
-        deposit_4[now] = int(balance * self._deposit_rate / 100)
+        deposit_4[now] = balance * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[4], self._acb.encrypt(
                 accounts[4], self._default_level, 5),
@@ -337,13 +337,13 @@ class ACBUnitTest(unittest.TestCase):
 
         balance = self._coin.balance_of(accounts[4])
         coin_supply = self._coin.total_supply
-        reward = int((100 - self._proportional_reward_rate) *
-                     self._tax / 100)
+        reward = ((100 - self._proportional_reward_rate) *
+                  self._tax // 100)
         if deposit_4[(now - 2) % 3] > 0:
-            reward += int(self._proportional_reward_rate *
-                          self._tax / 100)
+            reward += (self._proportional_reward_rate *
+                       self._tax // 100)
         burned[now] = self._tax - reward
-        deposit_4[now] = int(balance * self._deposit_rate / 100)
+        deposit_4[now] = balance * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[4], self._acb.encrypt(
                 accounts[4], self._default_level, 6),
@@ -372,13 +372,13 @@ class ACBUnitTest(unittest.TestCase):
 
         balance = self._coin.balance_of(accounts[4])
         coin_supply = self._coin.total_supply
-        reward = int((100 - self._proportional_reward_rate) *
-                     self._tax / 100)
+        reward = ((100 - self._proportional_reward_rate) *
+                  self._tax // 100)
         if deposit_4[(now - 2) % 3] > 0:
-            reward += int(self._proportional_reward_rate *
-                          self._tax / 100)
+            reward += (self._proportional_reward_rate *
+                       self._tax // 100)
         burned[now] = self._tax - reward
-        deposit_4[now] = int(balance * self._deposit_rate / 100)
+        deposit_4[now] = balance * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[4], self._acb.encrypt(
                 accounts[4], self._default_level, 7),
@@ -407,13 +407,13 @@ class ACBUnitTest(unittest.TestCase):
 
         balance = self._coin.balance_of(accounts[4])
         coin_supply = self._coin.total_supply
-        reward = int((100 - self._proportional_reward_rate) *
-                     self._tax / 100)
+        reward = ((100 - self._proportional_reward_rate) *
+                  self._tax // 100)
         if deposit_4[(now - 2) % 3] > 0:
-            reward += int(self._proportional_reward_rate *
-                          self._tax / 100)
+            reward += (self._proportional_reward_rate *
+                       self._tax // 100)
         burned[now] = self._tax - reward
-        deposit_4[now] = int(balance * self._deposit_rate / 100)
+        deposit_4[now] = balance * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[4], self._acb.encrypt(
                 accounts[4], self._default_level, 8),
@@ -479,7 +479,7 @@ class ACBUnitTest(unittest.TestCase):
         coin_supply = self._coin.total_supply
         burned[now] = deposit_4[(now - 2) % 3] + self._tax
         balance_4 = self._coin.balance_of(accounts[4])
-        deposit_4[now] = int(balance_4 * self._deposit_rate / 100)
+        deposit_4[now] = balance_4 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[4], self._acb.encrypt(
                 accounts[4], self._default_level, -1),
@@ -488,7 +488,7 @@ class ACBUnitTest(unittest.TestCase):
         self.assertEqual(self._coin.balance_of(accounts[4]),
                          balance_4 - deposit_4[now])
         balance_5 = self._coin.balance_of(accounts[5])
-        deposit_5[now] = int(balance_5 * self._deposit_rate / 100)
+        deposit_5[now] = balance_5 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[5], self._acb.encrypt(
                 accounts[5], self._default_level, -1),
@@ -497,7 +497,7 @@ class ACBUnitTest(unittest.TestCase):
         self.assertEqual(self._coin.balance_of(accounts[5]),
                          balance_5 - deposit_5[now])
         balance_6 = self._coin.balance_of(accounts[6])
-        deposit_6[now] = int(balance_6 * self._deposit_rate / 100)
+        deposit_6[now] = balance_6 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[6], self._acb.encrypt(
                 accounts[6], self._default_level, -1),
@@ -518,7 +518,7 @@ class ACBUnitTest(unittest.TestCase):
         coin_supply = self._coin.total_supply
         burned[now] = deposit_4[(now - 2) % 3] + self._tax
         balance_4 = self._coin.balance_of(accounts[4])
-        deposit_4[now] = int(balance_4 * self._deposit_rate / 100)
+        deposit_4[now] = balance_4 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[4], self._acb.encrypt(
                 accounts[4], self._default_level, 1),
@@ -527,7 +527,7 @@ class ACBUnitTest(unittest.TestCase):
         self.assertEqual(self._coin.balance_of(accounts[4]),
                          balance_4 - deposit_4[now])
         balance_5 = self._coin.balance_of(accounts[5])
-        deposit_5[now] = int(balance_5 * self._deposit_rate / 100)
+        deposit_5[now] = balance_5 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[5], self._acb.encrypt(
                 accounts[5], self._default_level, 1),
@@ -535,7 +535,7 @@ class ACBUnitTest(unittest.TestCase):
         self.assertEqual(self._coin.balance_of(accounts[5]),
                          balance_5 - deposit_5[now])
         balance_6 = self._coin.balance_of(accounts[6])
-        deposit_6[now] = int(balance_6 * self._deposit_rate / 100)
+        deposit_6[now] = balance_6 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[6], self._acb.encrypt(
                 accounts[6], self._default_level, 1),
@@ -556,7 +556,7 @@ class ACBUnitTest(unittest.TestCase):
         burned[now] = (deposit_4[(now - 2) % 3] + deposit_5[(now - 2) % 3] +
                           deposit_6[(now - 2) % 3] + self._tax)
         balance_4 = self._coin.balance_of(accounts[4])
-        deposit_4[now] = int(balance_4 * self._deposit_rate / 100)
+        deposit_4[now] = balance_4 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[4], self._acb.encrypt(
                 accounts[4], self._default_level, 2),
@@ -565,7 +565,7 @@ class ACBUnitTest(unittest.TestCase):
         self.assertEqual(self._coin.balance_of(accounts[4]),
                          balance_4 - deposit_4[now])
         balance_5 = self._coin.balance_of(accounts[5])
-        deposit_5[now] = int(balance_5 * self._deposit_rate / 100)
+        deposit_5[now] = balance_5 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[5], self._acb.encrypt(
                 accounts[5], self._default_level, 2),
@@ -573,7 +573,7 @@ class ACBUnitTest(unittest.TestCase):
         self.assertEqual(self._coin.balance_of(accounts[5]),
                          balance_5 - deposit_5[now])
         balance_6 = self._coin.balance_of(accounts[6])
-        deposit_6[now] = int(balance_6 * self._deposit_rate / 100)
+        deposit_6[now] = balance_6 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[6], self._acb.encrypt(
                 accounts[6], self._default_level, 2),
@@ -592,25 +592,25 @@ class ACBUnitTest(unittest.TestCase):
 
         coin_supply = self._coin.total_supply
         reward_total = 0 + self._tax
-        constant_reward = int((100 - self._proportional_reward_rate) *
-                              reward_total / (3 * 100))
+        constant_reward = ((100 - self._proportional_reward_rate) *
+                           reward_total // (3 * 100))
         reward_4 = reward_5 = reward_6 = 0
         deposit_total = (deposit_4[(now - 2) % 3] + deposit_5[(now - 2) % 3] +
                          deposit_6[(now - 2) % 3])
         if deposit_total > 0:
-            reward_4 = int(self._proportional_reward_rate *
-                           reward_total * deposit_4[(now - 2) % 3] /
-                           (deposit_total * 100))
-            reward_5 = int(self._proportional_reward_rate *
-                           reward_total * deposit_5[(now - 2) % 3] /
-                           (deposit_total * 100))
-            reward_6 = int(self._proportional_reward_rate *
-                           reward_total * deposit_6[(now - 2) % 3] /
-                           (deposit_total * 100))
+            reward_4 = (self._proportional_reward_rate *
+                        reward_total * deposit_4[(now - 2) % 3] //
+                        (deposit_total * 100))
+            reward_5 = (self._proportional_reward_rate *
+                        reward_total * deposit_5[(now - 2) % 3] //
+                        (deposit_total * 100))
+            reward_6 = (self._proportional_reward_rate *
+                        reward_total * deposit_6[(now - 2) % 3] //
+                        (deposit_total * 100))
         burned[now] = (reward_total - reward_4 - reward_5 - reward_6 -
                           constant_reward * 3)
         balance_4 = self._coin.balance_of(accounts[4])
-        deposit_4[now] = int(balance_4 * self._deposit_rate / 100)
+        deposit_4[now] = balance_4 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[4], self._acb.encrypt(
                 accounts[4], self._default_level, 3),
@@ -622,7 +622,7 @@ class ACBUnitTest(unittest.TestCase):
                          balance_4 - deposit_4[now] + deposit_4[(now - 2) % 3] +
                          reward_4 + constant_reward)
         balance_5 = self._coin.balance_of(accounts[5])
-        deposit_5[now] = int(balance_5 * self._deposit_rate / 100)
+        deposit_5[now] = balance_5 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[5], self._acb.encrypt(
                 accounts[5], self._default_level, 3),
@@ -633,7 +633,7 @@ class ACBUnitTest(unittest.TestCase):
                          balance_5 - deposit_5[now] + deposit_5[(now - 2) % 3] +
                          reward_5 + constant_reward)
         balance_6 = self._coin.balance_of(accounts[6])
-        deposit_6[now] = int(balance_6 * self._deposit_rate / 100)
+        deposit_6[now] = balance_6 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[6], self._acb.encrypt(
                 accounts[6], self._default_level, 3),
@@ -655,25 +655,25 @@ class ACBUnitTest(unittest.TestCase):
 
         coin_supply = self._coin.total_supply
         reward_total = 0 + self._tax
-        constant_reward = int((100 - self._proportional_reward_rate) *
-                              reward_total / (3 * 100))
+        constant_reward = ((100 - self._proportional_reward_rate) *
+                           reward_total // (3 * 100))
         reward_4 = reward_5 = reward_6 = 0
         deposit_total = (deposit_4[(now - 2) % 3] + deposit_5[(now - 2) % 3] +
                          deposit_6[(now - 2) % 3])
         if deposit_total > 0:
-            reward_4 = int(self._proportional_reward_rate *
-                           reward_total * deposit_4[(now - 2) % 3] /
-                           (deposit_total * 100))
-            reward_5 = int(self._proportional_reward_rate *
-                           reward_total * deposit_5[(now - 2) % 3] /
-                           (deposit_total * 100))
-            reward_6 = int(self._proportional_reward_rate *
-                           reward_total * deposit_6[(now - 2) % 3] /
-                           (deposit_total * 100))
+            reward_4 = (self._proportional_reward_rate *
+                        reward_total * deposit_4[(now - 2) % 3] //
+                        (deposit_total * 100))
+            reward_5 = (self._proportional_reward_rate *
+                        reward_total * deposit_5[(now - 2) % 3] //
+                        (deposit_total * 100))
+            reward_6 = (self._proportional_reward_rate *
+                        reward_total * deposit_6[(now - 2) % 3] //
+                        (deposit_total * 100))
         burned[now] = (reward_total - reward_4 - reward_5 - reward_6 -
                           constant_reward * 3)
         balance_4 = self._coin.balance_of(accounts[4])
-        deposit_4[now] = int(balance_4 * self._deposit_rate / 100)
+        deposit_4[now] = balance_4 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[4], self._acb.encrypt(
                 accounts[4], self._default_level, 4),
@@ -685,7 +685,7 @@ class ACBUnitTest(unittest.TestCase):
                          balance_4 - deposit_4[now] + deposit_4[(now - 2) % 3] +
                          reward_4 + constant_reward)
         balance_5 = self._coin.balance_of(accounts[5])
-        deposit_5[now] = int(balance_5 * self._deposit_rate / 100)
+        deposit_5[now] = balance_5 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[5], self._acb.encrypt(
                 accounts[5], self._default_level, 4),
@@ -696,7 +696,7 @@ class ACBUnitTest(unittest.TestCase):
                          balance_5 - deposit_5[now] + deposit_5[(now - 2) % 3] +
                          reward_5 + constant_reward)
         balance_6 = self._coin.balance_of(accounts[6])
-        deposit_6[now] = int(balance_6 * self._deposit_rate / 100)
+        deposit_6[now] = balance_6 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[6], self._acb.encrypt(
                 accounts[6], self._default_level, 4),
@@ -719,25 +719,25 @@ class ACBUnitTest(unittest.TestCase):
 
         coin_supply = self._coin.total_supply
         reward_total = 0 + self._tax
-        constant_reward = int((100 - self._proportional_reward_rate) *
-                              reward_total / (3 * 100))
+        constant_reward = ((100 - self._proportional_reward_rate) *
+                           reward_total // (3 * 100))
         reward_4 = reward_5 = reward_6 = 0
         deposit_total = (deposit_4[(now - 2) % 3] + deposit_5[(now - 2) % 3] +
                          deposit_6[(now - 2) % 3])
         if deposit_total > 0:
-            reward_4 = int(self._proportional_reward_rate *
-                           reward_total * deposit_4[(now - 2) % 3] /
-                           (deposit_total * 100))
-            reward_5 = int(self._proportional_reward_rate *
-                           reward_total * deposit_5[(now - 2) % 3] /
-                           (deposit_total * 100))
-            reward_6 = int(self._proportional_reward_rate *
-                           reward_total * deposit_6[(now - 2) % 3] /
-                           (deposit_total * 100))
+            reward_4 = (self._proportional_reward_rate *
+                        reward_total * deposit_4[(now - 2) % 3] //
+                        (deposit_total * 100))
+            reward_5 = (self._proportional_reward_rate *
+                        reward_total * deposit_5[(now - 2) % 3] //
+                        (deposit_total * 100))
+            reward_6 = (self._proportional_reward_rate *
+                        reward_total * deposit_6[(now - 2) % 3] //
+                        (deposit_total * 100))
         burned[now] = (reward_total - reward_4 - reward_5 - reward_6 -
                           constant_reward * 3)
         balance_4 = self._coin.balance_of(accounts[4])
-        deposit_4[now] = int(balance_4 * self._deposit_rate / 100)
+        deposit_4[now] = balance_4 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[4], self._acb.encrypt(
                 accounts[4], self._default_level, 5),
@@ -749,7 +749,7 @@ class ACBUnitTest(unittest.TestCase):
                          balance_4 - deposit_4[now] + deposit_4[(now - 2) % 3] +
                          reward_4 + constant_reward)
         balance_5 = self._coin.balance_of(accounts[5])
-        deposit_5[now] = int(balance_5 * self._deposit_rate / 100)
+        deposit_5[now] = balance_5 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[5], self._acb.encrypt(
                 accounts[5], self._default_level, 5),
@@ -760,7 +760,7 @@ class ACBUnitTest(unittest.TestCase):
                          balance_5 - deposit_5[now] + deposit_5[(now - 2) % 3] +
                          reward_5 + constant_reward)
         balance_6 = self._coin.balance_of(accounts[6])
-        deposit_6[now] = int(balance_6 * self._deposit_rate / 100)
+        deposit_6[now] = balance_6 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[6], self._acb.encrypt(
                 accounts[6], self._default_level, 5),
@@ -785,25 +785,25 @@ class ACBUnitTest(unittest.TestCase):
 
         coin_supply = self._coin.total_supply
         reward_total = 0 + self._tax
-        constant_reward = int((100 - self._proportional_reward_rate) *
-                              reward_total / (3 * 100))
+        constant_reward = ((100 - self._proportional_reward_rate) *
+                           reward_total // (3 * 100))
         reward_4 = reward_5 = reward_6 = 0
         deposit_total = (deposit_4[(now - 2) % 3] + deposit_5[(now - 2) % 3] +
                          deposit_6[(now - 2) % 3])
         if deposit_total > 0:
-            reward_4 = int(self._proportional_reward_rate *
-                           reward_total * deposit_4[(now - 2) % 3] /
-                           (deposit_total * 100))
-            reward_5 = int(self._proportional_reward_rate *
-                           reward_total * deposit_5[(now - 2) % 3] /
-                           (deposit_total * 100))
-            reward_6 = int(self._proportional_reward_rate *
-                           reward_total * deposit_6[(now - 2) % 3] /
-                           (deposit_total * 100))
+            reward_4 = (self._proportional_reward_rate *
+                        reward_total * deposit_4[(now - 2) % 3] //
+                        (deposit_total * 100))
+            reward_5 = (self._proportional_reward_rate *
+                        reward_total * deposit_5[(now - 2) % 3] //
+                        (deposit_total * 100))
+            reward_6 = (self._proportional_reward_rate *
+                        reward_total * deposit_6[(now - 2) % 3] //
+                        (deposit_total * 100))
         burned[now] = (reward_total - reward_4 - reward_5 - reward_6 -
                           constant_reward * 3)
         balance_4 = self._coin.balance_of(accounts[4])
-        deposit_4[now] = int(balance_4 * self._deposit_rate / 100)
+        deposit_4[now] = balance_4 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[4], self._acb.encrypt(
                 accounts[4], self._default_level, 6),
@@ -815,7 +815,7 @@ class ACBUnitTest(unittest.TestCase):
                          balance_4 - deposit_4[now] + deposit_4[(now - 2) % 3] +
                          reward_4 + constant_reward)
         balance_5 = self._coin.balance_of(accounts[5])
-        deposit_5[now] = int(balance_5 * self._deposit_rate / 100)
+        deposit_5[now] = balance_5 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[5], self._acb.encrypt(
                 accounts[5], self._default_level, 6),
@@ -826,7 +826,7 @@ class ACBUnitTest(unittest.TestCase):
                          balance_5 - deposit_5[now] + deposit_5[(now - 2) % 3] +
                          reward_5 + constant_reward)
         balance_6 = self._coin.balance_of(accounts[6])
-        deposit_6[now] = int(balance_6 * self._deposit_rate / 100)
+        deposit_6[now] = balance_6 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[6], self._acb.encrypt(
                 accounts[6], self._default_level, 6),
@@ -848,15 +848,15 @@ class ACBUnitTest(unittest.TestCase):
 
         coin_supply = self._coin.total_supply
         reward_total = 0 + self._tax
-        constant_reward = int((100 - self._proportional_reward_rate) *
-                              reward_total / (3 * 100))
+        constant_reward = ((100 - self._proportional_reward_rate) *
+                           reward_total // (3 * 100))
         reward_4 = 0
         reward_5 = 0
         reward_6 = 0
         burned[now] = (reward_total - reward_4 - reward_5 - reward_6 -
                           constant_reward * 3)
         balance_4 = self._coin.balance_of(accounts[4])
-        deposit_4[now] = int(balance_4 * self._deposit_rate / 100)
+        deposit_4[now] = balance_4 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[4], self._acb.encrypt(
                 accounts[4], self._default_level, 7),
@@ -868,7 +868,7 @@ class ACBUnitTest(unittest.TestCase):
                          balance_4 - deposit_4[now] + deposit_4[(now - 2) % 3] +
                          reward_4 + constant_reward)
         balance_5 = self._coin.balance_of(accounts[5])
-        deposit_5[now] = int(balance_5 * self._deposit_rate / 100)
+        deposit_5[now] = balance_5 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[5], self._acb.encrypt(
                 accounts[5], self._default_level, 7),
@@ -879,7 +879,7 @@ class ACBUnitTest(unittest.TestCase):
                          balance_5 - deposit_5[now] + deposit_5[(now - 2) % 3] +
                          reward_5 + constant_reward)
         balance_6 = self._coin.balance_of(accounts[6])
-        deposit_6[now] = int(balance_6 * self._deposit_rate / 100)
+        deposit_6[now] = balance_6 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[6], self._acb.encrypt(
                 accounts[6], self._default_level, 7),
@@ -901,21 +901,21 @@ class ACBUnitTest(unittest.TestCase):
 
         coin_supply = self._coin.total_supply
         reward_total = deposit_6[(now - 2) % 3] + self._tax
-        constant_reward = int((100 - self._proportional_reward_rate) *
-                              reward_total / (2 * 100))
+        constant_reward = ((100 - self._proportional_reward_rate) *
+                           reward_total // (2 * 100))
         reward_4 = reward_5 = reward_6 = 0
         deposit_total = (deposit_4[(now - 2) % 3] + deposit_5[(now - 2) % 3])
         if deposit_total > 0:
-            reward_4 = int(self._proportional_reward_rate *
-                           reward_total * deposit_4[(now - 2) % 3] /
-                           (deposit_total * 100))
-            reward_5 = int(self._proportional_reward_rate *
-                           reward_total * deposit_5[(now - 2) % 3] /
-                           (deposit_total * 100))
+            reward_4 = (self._proportional_reward_rate *
+                        reward_total * deposit_4[(now - 2) % 3] //
+                        (deposit_total * 100))
+            reward_5 = (self._proportional_reward_rate *
+                        reward_total * deposit_5[(now - 2) % 3] //
+                        (deposit_total * 100))
         burned[now] = (reward_total - reward_4 - reward_5 - reward_6 -
                           constant_reward * 2)
         balance_4 = self._coin.balance_of(accounts[4])
-        deposit_4[now] = int(balance_4 * self._deposit_rate / 100)
+        deposit_4[now] = balance_4 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[4], self._acb.encrypt(
                 accounts[4], self._default_level, 8),
@@ -927,7 +927,7 @@ class ACBUnitTest(unittest.TestCase):
                          balance_4 - deposit_4[now] + deposit_4[(now - 2) % 3] +
                          reward_4 + constant_reward)
         balance_5 = self._coin.balance_of(accounts[5])
-        deposit_5[now] = int(balance_5 * self._deposit_rate / 100)
+        deposit_5[now] = balance_5 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[5], self._acb.encrypt(
                 accounts[5], self._default_level, 8),
@@ -938,7 +938,7 @@ class ACBUnitTest(unittest.TestCase):
                          balance_5 - deposit_5[now] + deposit_5[(now - 2) % 3] +
                          reward_5 + constant_reward)
         balance_6 = self._coin.balance_of(accounts[6])
-        deposit_6[now] = int(balance_6 * self._deposit_rate / 100)
+        deposit_6[now] = balance_6 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[6], self._acb.encrypt(
                 accounts[6], self._default_level, 8),
@@ -959,18 +959,18 @@ class ACBUnitTest(unittest.TestCase):
         coin_supply = self._coin.total_supply
         reward_total = (deposit_4[(now - 2) % 3] + deposit_5[(now - 2) % 3] +
                         self._tax)
-        constant_reward = int((100 - self._proportional_reward_rate) *
-                              reward_total / (1 * 100))
+        constant_reward = ((100 - self._proportional_reward_rate) *
+                           reward_total // (1 * 100))
         reward_4 = 0
         reward_5 = 0
         reward_6 = 0
         if deposit_6[(now - 2) % 3] > 0:
-            reward_6 = int(self._proportional_reward_rate *
-                           reward_total / 100)
+            reward_6 = (self._proportional_reward_rate *
+                        reward_total // 100)
         burned[now] = (reward_total - reward_4 - reward_5 - reward_6 -
                           constant_reward * 1)
         balance_4 = self._coin.balance_of(accounts[4])
-        deposit_4[now] = int(balance_4 * self._deposit_rate / 100)
+        deposit_4[now] = balance_4 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[4], self._acb.encrypt(
                 accounts[4], self._default_level, 9),
@@ -979,7 +979,7 @@ class ACBUnitTest(unittest.TestCase):
         self.assertEqual(self._coin.balance_of(accounts[4]),
                          balance_4 - deposit_4[now])
         balance_5 = self._coin.balance_of(accounts[5])
-        deposit_5[now] = int(balance_5 * self._deposit_rate / 100)
+        deposit_5[now] = balance_5 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[5], self._acb.encrypt(
                 accounts[5], self._default_level, 9),
@@ -987,7 +987,7 @@ class ACBUnitTest(unittest.TestCase):
         self.assertEqual(self._coin.balance_of(accounts[5]),
                          balance_5 - deposit_5[now])
         balance_6 = self._coin.balance_of(accounts[6])
-        deposit_6[now] = int(balance_6 * self._deposit_rate / 100)
+        deposit_6[now] = balance_6 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[6], self._acb.encrypt(
                 accounts[6], self._default_level, 9),
@@ -1016,7 +1016,7 @@ class ACBUnitTest(unittest.TestCase):
         reward_6 = 0
         burned[now] = reward_total
         balance_4 = self._coin.balance_of(accounts[4])
-        deposit_4[now] = int(balance_4 * self._deposit_rate / 100)
+        deposit_4[now] = balance_4 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[4], self._acb.encrypt(
                 accounts[4], self._default_level, 10),
@@ -1025,7 +1025,7 @@ class ACBUnitTest(unittest.TestCase):
         self.assertEqual(self._coin.balance_of(accounts[4]),
                          balance_4 - deposit_4[now])
         balance_5 = self._coin.balance_of(accounts[5])
-        deposit_5[now] = int(balance_5 * self._deposit_rate / 100)
+        deposit_5[now] = balance_5 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[5], self._acb.encrypt(
                 accounts[5], self._default_level, 10),
@@ -1033,7 +1033,7 @@ class ACBUnitTest(unittest.TestCase):
         self.assertEqual(self._coin.balance_of(accounts[5]),
                          balance_5 - deposit_5[now])
         balance_6 = self._coin.balance_of(accounts[6])
-        deposit_6[now] = int(balance_6 * self._deposit_rate / 100)
+        deposit_6[now] = balance_6 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[6], self._acb.encrypt(
                 accounts[6], self._default_level, 10),
@@ -1052,22 +1052,22 @@ class ACBUnitTest(unittest.TestCase):
 
         coin_supply = self._coin.total_supply
         reward_total = 0 + self._tax
-        constant_reward = int((100 - self._proportional_reward_rate) *
-                              reward_total / (3 * 100))
+        constant_reward = ((100 - self._proportional_reward_rate) *
+                           reward_total // (3 * 100))
         reward_4 = reward_5 = reward_6 = 0
         deposit_total = (deposit_4[(now - 2) % 3] + deposit_5[(now - 2) % 3] +
                          deposit_6[(now - 2) % 3])
         if deposit_total > 0:
-            reward_5 = int(self._proportional_reward_rate *
-                           reward_total * deposit_5[(now - 2) % 3] /
-                           (deposit_total * 100))
-            reward_6 = int(self._proportional_reward_rate *
-                           reward_total * deposit_6[(now - 2) % 3] /
-                           (deposit_total * 100))
+            reward_5 = (self._proportional_reward_rate *
+                        reward_total * deposit_5[(now - 2) % 3] //
+                        (deposit_total * 100))
+            reward_6 = (self._proportional_reward_rate *
+                        reward_total * deposit_6[(now - 2) % 3] //
+                        (deposit_total * 100))
         burned[now] = (reward_total - reward_4 - reward_5 - reward_6 -
                           constant_reward * 2 + deposit_4[(now - 2) % 3])
         balance_5 = self._coin.balance_of(accounts[5])
-        deposit_5[now] = int(balance_5 * self._deposit_rate / 100)
+        deposit_5[now] = balance_5 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[5], self._acb.encrypt(
                 accounts[5], self._default_level, 11),
@@ -1079,7 +1079,7 @@ class ACBUnitTest(unittest.TestCase):
                          balance_5 - deposit_5[now] + deposit_5[(now - 2) % 3] +
                          reward_5 + constant_reward)
         balance_6 = self._coin.balance_of(accounts[6])
-        deposit_6[now] = int(balance_6 * self._deposit_rate / 100)
+        deposit_6[now] = balance_6 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[6], self._acb.encrypt(
                 accounts[6], self._default_level, 11),
@@ -1101,18 +1101,18 @@ class ACBUnitTest(unittest.TestCase):
 
         coin_supply = self._coin.total_supply
         reward_total = deposit_4[(now - 2) % 3] + self._tax
-        constant_reward = int((100 - self._proportional_reward_rate) *
-                              reward_total / (2 * 100))
+        constant_reward = ((100 - self._proportional_reward_rate) *
+                           reward_total // (2 * 100))
         reward_4 = reward_5 = reward_6 = 0
         deposit_total = (deposit_5[(now - 2) % 3] + deposit_6[(now - 2) % 3])
         if deposit_total > 0:
-            reward_6 = int(self._proportional_reward_rate *
-                           reward_total * deposit_6[(now - 2) % 3] /
-                           (deposit_total * 100))
+            reward_6 = (self._proportional_reward_rate *
+                        reward_total * deposit_6[(now - 2) % 3] //
+                        (deposit_total * 100))
         burned[now] = (reward_total - reward_4 - reward_5 - reward_6 -
                           constant_reward + deposit_5[(now - 2) % 3])
         balance_6 = self._coin.balance_of(accounts[6])
-        deposit_6[now] = int(balance_6 * self._deposit_rate / 100)
+        deposit_6[now] = balance_6 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[6], self._acb.encrypt(
                 accounts[6], self._default_level, 12),
@@ -1135,15 +1135,15 @@ class ACBUnitTest(unittest.TestCase):
 
         coin_supply = self._coin.total_supply
         reward_total = deposit_5[(now - 2) % 3] + self._tax
-        constant_reward = int((100 - self._proportional_reward_rate) *
-                              reward_total / (1 * 100))
+        constant_reward = ((100 - self._proportional_reward_rate) *
+                           reward_total // (1 * 100))
         reward_4 = 0
         reward_5 = 0
         reward_6 = 0
         burned[now] = (reward_total - reward_4 - reward_5 - reward_6 -
                           constant_reward * 0 + deposit_6[(now - 2) % 3])
-        deposit13 = int(
-            self._coin.balance_of(accounts[1]) * self._deposit_rate / 100)
+        deposit13 = (
+            self._coin.balance_of(accounts[1]) * self._deposit_rate // 100)
         self.assertEqual(acb.vote(
             accounts[1], self._acb.encrypt(
                 accounts[1], self._default_level, -1),
@@ -1161,8 +1161,8 @@ class ACBUnitTest(unittest.TestCase):
 
         coin_supply = self._coin.total_supply
         burned[now] = deposit_6[(now - 2) % 3] + self._tax
-        deposit14 = int(
-            self._coin.balance_of(accounts[1]) * self._deposit_rate / 100)
+        deposit14 = (
+            self._coin.balance_of(accounts[1]) * self._deposit_rate // 100)
         self.assertEqual(acb.vote(
             accounts[1], self._acb.encrypt(
                 accounts[1], self._default_level, -1),
@@ -1194,7 +1194,7 @@ class ACBUnitTest(unittest.TestCase):
         reward_6 = 0
         burned[now] = reward_total
         balance_4 = self._coin.balance_of(accounts[4])
-        deposit_4[now] = int(balance_4 * self._deposit_rate / 100)
+        deposit_4[now] = balance_4 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[4], self._acb.encrypt(
                 accounts[4], 0, 1),
@@ -1203,7 +1203,7 @@ class ACBUnitTest(unittest.TestCase):
         self.assertEqual(self._coin.balance_of(accounts[4]),
                          balance_4 - deposit_4[now])
         balance_5 = self._coin.balance_of(accounts[5])
-        deposit_5[now] = int(balance_5 * self._deposit_rate / 100)
+        deposit_5[now] = balance_5 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[5], self._acb.encrypt(
                 accounts[5], self._default_level, 1),
@@ -1211,7 +1211,7 @@ class ACBUnitTest(unittest.TestCase):
         self.assertEqual(self._coin.balance_of(accounts[5]),
                          balance_5 - deposit_5[now])
         balance_6 = self._coin.balance_of(accounts[6])
-        deposit_6[now] = int(balance_6 * self._deposit_rate / 100)
+        deposit_6[now] = balance_6 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[6], self._acb.encrypt(
                 accounts[6], self._default_level, 1),
@@ -1236,7 +1236,7 @@ class ACBUnitTest(unittest.TestCase):
         reward_6 = 0
         burned[now] = reward_total
         balance_4 = self._coin.balance_of(accounts[4])
-        deposit_4[now] = int(balance_4 * self._deposit_rate / 100)
+        deposit_4[now] = balance_4 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[4], self._acb.encrypt(
                 accounts[4], self._default_level, 2),
@@ -1245,7 +1245,7 @@ class ACBUnitTest(unittest.TestCase):
         self.assertEqual(self._coin.balance_of(accounts[4]),
                          balance_4 - deposit_4[now])
         balance_5 = self._coin.balance_of(accounts[5])
-        deposit_5[now] = int(balance_5 * self._deposit_rate / 100)
+        deposit_5[now] = balance_5 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[5], self._acb.encrypt(
                 accounts[5], self._default_level, 2),
@@ -1253,7 +1253,7 @@ class ACBUnitTest(unittest.TestCase):
         self.assertEqual(self._coin.balance_of(accounts[5]),
                          balance_5 - deposit_5[now])
         balance_6 = self._coin.balance_of(accounts[6])
-        deposit_6[now] = int(balance_6 * self._deposit_rate / 100)
+        deposit_6[now] = balance_6 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[6], self._acb.encrypt(
                 accounts[6], self._default_level, 2),
@@ -1278,21 +1278,21 @@ class ACBUnitTest(unittest.TestCase):
             reclaim_4 = deposit_4[(now - 2) % 3]
         reward_total = (deposit_4[(now - 2) % 3] - reclaim_4 +
                         self._tax)
-        constant_reward = int((100 - self._proportional_reward_rate) *
-                              reward_total / (2 * 100))
+        constant_reward = ((100 - self._proportional_reward_rate) *
+                           reward_total // (2 * 100))
         reward_4 = reward_5 = reward_6 = 0
         deposit_total = (deposit_5[(now - 2) % 3] + deposit_6[(now - 2) % 3])
         if deposit_total > 0:
-            reward_5 = int(self._proportional_reward_rate *
-                           reward_total * deposit_5[(now - 2) % 3] /
-                           (deposit_total * 100))
-            reward_6 = int(self._proportional_reward_rate *
-                           reward_total * deposit_6[(now - 2) % 3] /
-                           (deposit_total * 100))
+            reward_5 = (self._proportional_reward_rate *
+                        reward_total * deposit_5[(now - 2) % 3] //
+                        (deposit_total * 100))
+            reward_6 = (self._proportional_reward_rate *
+                        reward_total * deposit_6[(now - 2) % 3] //
+                        (deposit_total * 100))
         burned[now] = (reward_total - reward_4 - reward_5 - reward_6 -
                           constant_reward * 2)
         balance_4 = self._coin.balance_of(accounts[4])
-        deposit_4[now] = int(balance_4 * self._deposit_rate / 100)
+        deposit_4[now] = balance_4 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[4], self._acb.encrypt(
                 accounts[4], self._default_level, 3),
@@ -1302,7 +1302,7 @@ class ACBUnitTest(unittest.TestCase):
         self.assertEqual(self._coin.balance_of(accounts[4]),
                          balance_4 - deposit_4[now] + reclaim_4)
         balance_5 = self._coin.balance_of(accounts[5])
-        deposit_5[now] = int(balance_5 * self._deposit_rate / 100)
+        deposit_5[now] = balance_5 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[5], self._acb.encrypt(
                 accounts[5], self._default_level, 3),
@@ -1313,7 +1313,7 @@ class ACBUnitTest(unittest.TestCase):
                          balance_5 - deposit_5[now] + deposit_5[(now - 2) % 3] +
                          reward_5 + constant_reward)
         balance_6 = self._coin.balance_of(accounts[6])
-        deposit_6[now] = int(balance_6 * self._deposit_rate / 100)
+        deposit_6[now] = balance_6 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[6], self._acb.encrypt(
                 accounts[6], self._default_level, 3),
@@ -1346,25 +1346,25 @@ class ACBUnitTest(unittest.TestCase):
 
         coin_supply = self._coin.total_supply
         reward_total = 0 + self._tax
-        constant_reward = int((100 - self._proportional_reward_rate) *
-                              reward_total / (3 * 100))
+        constant_reward = ((100 - self._proportional_reward_rate) *
+                           reward_total // (3 * 100))
         reward_4 = reward_5 = reward_6 = 0
         deposit_total = (deposit_4[(now - 2) % 3] + deposit_5[(now - 2) % 3] +
                          deposit_6[(now - 2) % 3])
         if deposit_total > 0:
-            reward_4 = int(self._proportional_reward_rate *
-                           reward_total * deposit_4[(now - 2) % 3] /
-                           (deposit_total * 100))
-            reward_5 = int(self._proportional_reward_rate *
-                           reward_total * deposit_5[(now - 2) % 3] /
-                           (deposit_total * 100))
-            reward_6 = int(self._proportional_reward_rate *
-                           reward_total * deposit_6[(now - 2) % 3] /
-                           (deposit_total * 100))
+            reward_4 = (self._proportional_reward_rate *
+                        reward_total * deposit_4[(now - 2) % 3] //
+                        (deposit_total * 100))
+            reward_5 = (self._proportional_reward_rate *
+                        reward_total * deposit_5[(now - 2) % 3] //
+                        (deposit_total * 100))
+            reward_6 = (self._proportional_reward_rate *
+                        reward_total * deposit_6[(now - 2) % 3] //
+                        (deposit_total * 100))
         burned[now] = (reward_total - reward_4 - reward_5 - reward_6 -
                           constant_reward * 3)
         balance_4 = self._coin.balance_of(accounts[4])
-        deposit_4[now] = int(balance_4 * self._deposit_rate / 100)
+        deposit_4[now] = balance_4 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[4], self._acb.encrypt(
                 accounts[4], 0, 4), self._default_level, 3),
@@ -1375,7 +1375,7 @@ class ACBUnitTest(unittest.TestCase):
                          balance_4 - deposit_4[now] + deposit_4[(now - 2) % 3] +
                          reward_4 + constant_reward)
         balance_5 = self._coin.balance_of(accounts[5])
-        deposit_5[now] = int(balance_5 * self._deposit_rate / 100)
+        deposit_5[now] = balance_5 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[5], self._acb.encrypt(
                 accounts[5], 0, 4), self._default_level, 3),
@@ -1385,7 +1385,7 @@ class ACBUnitTest(unittest.TestCase):
                          balance_5 - deposit_5[now] + deposit_5[(now - 2) % 3] +
                          reward_5 + constant_reward)
         balance_6 = self._coin.balance_of(accounts[6])
-        deposit_6[now] = int(balance_6 * self._deposit_rate / 100)
+        deposit_6[now] = balance_6 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[6], self._acb.encrypt(
                 accounts[6], self._default_level, 4), self._default_level, 3),
@@ -1409,25 +1409,25 @@ class ACBUnitTest(unittest.TestCase):
 
         coin_supply = self._coin.total_supply
         reward_total = 0 + self._tax
-        constant_reward = int((100 - self._proportional_reward_rate) *
-                              reward_total / (3 * 100))
+        constant_reward = ((100 - self._proportional_reward_rate) *
+                           reward_total // (3 * 100))
         reward_4 = reward_5 = reward_6 = 0
         deposit_total = (deposit_4[(now - 2) % 3] + deposit_5[(now - 2) % 3] +
                          deposit_6[(now - 2) % 3])
         if deposit_total > 0:
-            reward_4 = int(self._proportional_reward_rate *
-                           reward_total * deposit_4[(now - 2) % 3] /
-                           (deposit_total * 100))
-            reward_5 = int(self._proportional_reward_rate *
-                           reward_total * deposit_5[(now - 2) % 3] /
-                           (deposit_total * 100))
-            reward_6 = int(self._proportional_reward_rate *
-                       reward_total * deposit_6[(now - 2) % 3] /
-                           (deposit_total * 100))
+            reward_4 = (self._proportional_reward_rate *
+                        reward_total * deposit_4[(now - 2) % 3] //
+                        (deposit_total * 100))
+            reward_5 = (self._proportional_reward_rate *
+                        reward_total * deposit_5[(now - 2) % 3] //
+                        (deposit_total * 100))
+            reward_6 = (self._proportional_reward_rate *
+                    reward_total * deposit_6[(now - 2) % 3] //
+                        (deposit_total * 100))
         burned[now] = (reward_total - reward_4 - reward_5 - reward_6 -
                           constant_reward * 3)
         balance_4 = self._coin.balance_of(accounts[4])
-        deposit_4[now] = int(balance_4 * self._deposit_rate / 100)
+        deposit_4[now] = balance_4 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[4], self._acb.encrypt(
                 accounts[4], self._default_level, 5), 0, 4),
@@ -1438,7 +1438,7 @@ class ACBUnitTest(unittest.TestCase):
                          balance_4 - deposit_4[now] + deposit_4[(now - 2) % 3] +
                          reward_4 + constant_reward)
         balance_5 = self._coin.balance_of(accounts[5])
-        deposit_5[now] = int(balance_5 * self._deposit_rate / 100)
+        deposit_5[now] = balance_5 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[5], self._acb.encrypt(
                 accounts[5], self._default_level, 5), 0, 4),
@@ -1448,7 +1448,7 @@ class ACBUnitTest(unittest.TestCase):
                          balance_5 - deposit_5[now] + deposit_5[(now - 2) % 3] +
                          reward_5 + constant_reward)
         balance_6 = self._coin.balance_of(accounts[6])
-        deposit_6[now] = int(balance_6 * self._deposit_rate / 100)
+        deposit_6[now] = balance_6 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[6], self._acb.encrypt(
                 accounts[6], self._default_level, 5), self._default_level, 4),
@@ -1477,18 +1477,18 @@ class ACBUnitTest(unittest.TestCase):
         reward_total = (deposit_4[(now - 2) % 3] - reclaim_4 +
                         deposit_5[(now - 2) % 3] - reclaim_5 +
                         self._tax)
-        constant_reward = int((100 - self._proportional_reward_rate) *
-                              reward_total / (1 * 100))
+        constant_reward = ((100 - self._proportional_reward_rate) *
+                           reward_total // (1 * 100))
         reward_4 = reward_5 = reward_6 = 0
         deposit_total =  deposit_6[(now - 2) % 3]
         if deposit_total > 0:
-            reward_6 = int(self._proportional_reward_rate *
-                           reward_total * deposit_6[(now - 2) % 3] /
-                           (deposit_total * 100))
+            reward_6 = (self._proportional_reward_rate *
+                        reward_total * deposit_6[(now - 2) % 3] //
+                        (deposit_total * 100))
         burned[now] = (reward_total - reward_4 - reward_5 - reward_6 -
                           constant_reward * 1)
         balance_4 = self._coin.balance_of(accounts[4])
-        deposit_4[now] = int(balance_4 * self._deposit_rate / 100)
+        deposit_4[now] = balance_4 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[4], self._acb.encrypt(
                 accounts[4], self._default_level, 6), self._default_level, 5),
@@ -1497,7 +1497,7 @@ class ACBUnitTest(unittest.TestCase):
         self.assertEqual(self._coin.balance_of(accounts[4]),
                          balance_4 - deposit_4[now] + reclaim_4)
         balance_5 = self._coin.balance_of(accounts[5])
-        deposit_5[now] = int(balance_5 * self._deposit_rate / 100)
+        deposit_5[now] = balance_5 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[5], self._acb.encrypt(
                 accounts[5], self._default_level, 6), self._default_level, 5),
@@ -1505,7 +1505,7 @@ class ACBUnitTest(unittest.TestCase):
         self.assertEqual(self._coin.balance_of(accounts[5]),
                          balance_5 - deposit_5[now] + reclaim_5)
         balance_6 = self._coin.balance_of(accounts[6])
-        deposit_6[now] = int(balance_6 * self._deposit_rate / 100)
+        deposit_6[now] = balance_6 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[6], self._acb.encrypt(
                 accounts[6], self._default_level, 6), self._default_level, 5),
@@ -1532,25 +1532,25 @@ class ACBUnitTest(unittest.TestCase):
 
         coin_supply = self._coin.total_supply
         reward_total = 0 + self._tax
-        constant_reward = int((100 - self._proportional_reward_rate) *
-                              reward_total / (3 * 100))
+        constant_reward = ((100 - self._proportional_reward_rate) *
+                           reward_total // (3 * 100))
         reward_4 = reward_5 = reward_6 = 0
         deposit_total = (deposit_4[(now - 2) % 3] + deposit_5[(now - 2) % 3] +
                          deposit_6[(now - 2) % 3])
         if deposit_total > 0:
-            reward_4 = int(self._proportional_reward_rate *
-                           reward_total * deposit_4[(now - 2) % 3] /
-                           (deposit_total * 100))
-            reward_5 = int(self._proportional_reward_rate *
-                           reward_total * deposit_5[(now - 2) % 3] /
-                           (deposit_total * 100))
-            reward_6 = int(self._proportional_reward_rate *
-                           reward_total * deposit_6[(now - 2) % 3] /
-                           (deposit_total * 100))
+            reward_4 = (self._proportional_reward_rate *
+                        reward_total * deposit_4[(now - 2) % 3] //
+                        (deposit_total * 100))
+            reward_5 = (self._proportional_reward_rate *
+                        reward_total * deposit_5[(now - 2) % 3] //
+                        (deposit_total * 100))
+            reward_6 = (self._proportional_reward_rate *
+                        reward_total * deposit_6[(now - 2) % 3] //
+                        (deposit_total * 100))
         burned[now] = (reward_total - reward_4 - reward_5 - reward_6 -
                           constant_reward * 3)
         balance_4 = self._coin.balance_of(accounts[4])
-        deposit_4[now] = int(balance_4 * self._deposit_rate / 100)
+        deposit_4[now] = balance_4 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[4], self._acb.encrypt(
                 accounts[4], self._default_level, 7),
@@ -1562,7 +1562,7 @@ class ACBUnitTest(unittest.TestCase):
                          balance_4 - deposit_4[now] + deposit_4[(now - 2) % 3] +
                          reward_4 + constant_reward)
         balance_5 = self._coin.balance_of(accounts[5])
-        deposit_5[now] = int(balance_5 * self._deposit_rate / 100)
+        deposit_5[now] = balance_5 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[5], self._acb.encrypt(
                 accounts[5], self._default_level, 7),
@@ -1573,7 +1573,7 @@ class ACBUnitTest(unittest.TestCase):
                          balance_5 - deposit_5[now] + deposit_5[(now - 2) % 3] +
                          reward_5 + constant_reward)
         balance_6 = self._coin.balance_of(accounts[6])
-        deposit_6[now] = int(balance_6 * self._deposit_rate / 100)
+        deposit_6[now] = balance_6 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[6], self._acb.encrypt(
                 accounts[6], self._level_max - 1, 7),
@@ -1595,25 +1595,25 @@ class ACBUnitTest(unittest.TestCase):
 
         coin_supply = self._coin.total_supply
         reward_total = 0 + self._tax
-        constant_reward = int((100 - self._proportional_reward_rate) *
-                              reward_total / (3 * 100))
+        constant_reward = ((100 - self._proportional_reward_rate) *
+                           reward_total // (3 * 100))
         reward_4 = reward_5 = reward_6 = 0
         deposit_total = (deposit_4[(now - 2) % 3] + deposit_5[(now - 2) % 3] +
                          deposit_6[(now - 2) % 3])
         if deposit_total > 0:
-            reward_4 = int(self._proportional_reward_rate *
-                           reward_total * deposit_4[(now - 2) % 3] /
-                           (deposit_total * 100))
-            reward_5 = int(self._proportional_reward_rate *
-                           reward_total * deposit_5[(now - 2) % 3] /
-                           (deposit_total * 100))
-            reward_6 = int(self._proportional_reward_rate *
-                           reward_total * deposit_6[(now - 2) % 3] /
-                           (deposit_total * 100))
+            reward_4 = (self._proportional_reward_rate *
+                        reward_total * deposit_4[(now - 2) % 3] //
+                        (deposit_total * 100))
+            reward_5 = (self._proportional_reward_rate *
+                        reward_total * deposit_5[(now - 2) % 3] //
+                        (deposit_total * 100))
+            reward_6 = (self._proportional_reward_rate *
+                        reward_total * deposit_6[(now - 2) % 3] //
+                        (deposit_total * 100))
         burned[now] = (reward_total - reward_4 - reward_5 - reward_6 -
                           constant_reward * 3)
         balance_4 = self._coin.balance_of(accounts[4])
-        deposit_4[now] = int(balance_4 * self._deposit_rate / 100)
+        deposit_4[now] = balance_4 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[4], self._acb.encrypt(
                 accounts[4], self._default_level, 8),
@@ -1625,7 +1625,7 @@ class ACBUnitTest(unittest.TestCase):
                          balance_4 - deposit_4[now] + deposit_4[(now - 2) % 3] +
                          reward_4 + constant_reward)
         balance_5 = self._coin.balance_of(accounts[5])
-        deposit_5[now] = int(balance_5 * self._deposit_rate / 100)
+        deposit_5[now] = balance_5 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[5], self._acb.encrypt(
                 accounts[5], self._default_level, 8),
@@ -1636,7 +1636,7 @@ class ACBUnitTest(unittest.TestCase):
                          balance_5 - deposit_5[now] + deposit_5[(now - 2) % 3] +
                          reward_5 + constant_reward)
         balance_6 = self._coin.balance_of(accounts[6])
-        deposit_6[now] = int(balance_6 * self._deposit_rate / 100)
+        deposit_6[now] = balance_6 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[6], self._acb.encrypt(
                 accounts[6], self._default_level, 8),
@@ -1665,21 +1665,21 @@ class ACBUnitTest(unittest.TestCase):
             reclaim_6 = deposit_6[(now - 2) % 3]
         reward_total = (deposit_6[(now - 2) % 3] - reclaim_6 +
                         self._tax)
-        constant_reward = int((100 - self._proportional_reward_rate) *
-                              reward_total / (2 * 100))
+        constant_reward = ((100 - self._proportional_reward_rate) *
+                           reward_total // (2 * 100))
         reward_4 = reward_5 = reward_6 = 0
         deposit_total = deposit_4[(now - 2) % 3] + deposit_5[(now - 2) % 3]
         if deposit_total > 0:
-            reward_4 = int(self._proportional_reward_rate *
-                           reward_total * deposit_4[(now - 2) % 3] /
-                           (deposit_total * 100))
-            reward_5 = int(self._proportional_reward_rate *
-                           reward_total * deposit_5[(now - 2) % 3] /
-                           (deposit_total * 100))
+            reward_4 = (self._proportional_reward_rate *
+                        reward_total * deposit_4[(now - 2) % 3] //
+                        (deposit_total * 100))
+            reward_5 = (self._proportional_reward_rate *
+                        reward_total * deposit_5[(now - 2) % 3] //
+                        (deposit_total * 100))
         burned[now] = (reward_total - reward_4 - reward_5 - reward_6 -
                           constant_reward * 2)
         balance_4 = self._coin.balance_of(accounts[4])
-        deposit_4[now] = int(balance_4 * self._deposit_rate / 100)
+        deposit_4[now] = balance_4 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[4], self._acb.encrypt(
                 accounts[4], self._default_level, 9),
@@ -1691,7 +1691,7 @@ class ACBUnitTest(unittest.TestCase):
                          balance_4 - deposit_4[now] + deposit_4[(now - 2) % 3] +
                          reward_4 + constant_reward)
         balance_5 = self._coin.balance_of(accounts[5])
-        deposit_5[now] = int(balance_5 * self._deposit_rate / 100)
+        deposit_5[now] = balance_5 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[5], self._acb.encrypt(
                 accounts[5], self._default_level, 9),
@@ -1702,7 +1702,7 @@ class ACBUnitTest(unittest.TestCase):
                          balance_5 - deposit_5[now] + deposit_5[(now - 2) % 3] +
                          reward_5 + constant_reward)
         balance_6 = self._coin.balance_of(accounts[6])
-        deposit_6[now] = int(balance_6 * self._deposit_rate / 100)
+        deposit_6[now] = balance_6 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[6], self._acb.encrypt(
                 accounts[6], self._default_level, 9),
@@ -1733,25 +1733,25 @@ class ACBUnitTest(unittest.TestCase):
 
         coin_supply = self._coin.total_supply
         reward_total = 0 + self._tax
-        constant_reward = int((100 - self._proportional_reward_rate) *
-                              reward_total / (3 * 100))
+        constant_reward = ((100 - self._proportional_reward_rate) *
+                           reward_total // (3 * 100))
         reward_4 = reward_5 = reward_6 = 0
         deposit_total = (deposit_4[(now - 2) % 3] + deposit_5[(now - 2) % 3] +
                          deposit_6[(now - 2) % 3])
         if deposit_total > 0:
-            reward_4 = int(self._proportional_reward_rate *
-                           reward_total * deposit_4[(now - 2) % 3] /
-                           (deposit_total * 100))
-            reward_5 = int(self._proportional_reward_rate *
-                           reward_total * deposit_5[(now - 2) % 3] /
-                           (deposit_total * 100))
-            reward_6 = int(self._proportional_reward_rate *
-                           reward_total * deposit_6[(now - 2) % 3] /
-                           (deposit_total * 100))
+            reward_4 = (self._proportional_reward_rate *
+                        reward_total * deposit_4[(now - 2) % 3] //
+                        (deposit_total * 100))
+            reward_5 = (self._proportional_reward_rate *
+                        reward_total * deposit_5[(now - 2) % 3] //
+                        (deposit_total * 100))
+            reward_6 = (self._proportional_reward_rate *
+                        reward_total * deposit_6[(now - 2) % 3] //
+                        (deposit_total * 100))
         burned[now] = (reward_total - reward_4 - reward_5 - reward_6 -
                           constant_reward * 3)
         balance_4 = self._coin.balance_of(accounts[4])
-        deposit_4[now] = int(balance_4 * self._deposit_rate / 100)
+        deposit_4[now] = balance_4 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[4], self._acb.encrypt(
                 accounts[4], self._default_level, 10),
@@ -1763,7 +1763,7 @@ class ACBUnitTest(unittest.TestCase):
                          balance_4 - deposit_4[now] + deposit_4[(now - 2) % 3] +
                          reward_4 + constant_reward)
         balance_5 = self._coin.balance_of(accounts[5])
-        deposit_5[now] = int(balance_5 * self._deposit_rate / 100)
+        deposit_5[now] = balance_5 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[5], self._acb.encrypt(
                 accounts[5], self._level_max - 1, 10),
@@ -1774,7 +1774,7 @@ class ACBUnitTest(unittest.TestCase):
                          balance_5 - deposit_5[now] + deposit_5[(now - 2) % 3] +
                          reward_5 + constant_reward)
         balance_6 = self._coin.balance_of(accounts[6])
-        deposit_6[now] = int(balance_6 * self._deposit_rate / 100)
+        deposit_6[now] = balance_6 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[6], self._acb.encrypt(
                 accounts[6], self._level_max - 1, 10),
@@ -1799,25 +1799,25 @@ class ACBUnitTest(unittest.TestCase):
 
         coin_supply = self._coin.total_supply
         reward_total = 0 + self._tax
-        constant_reward = int((100 - self._proportional_reward_rate) *
-                              reward_total / (3 * 100))
+        constant_reward = ((100 - self._proportional_reward_rate) *
+                           reward_total // (3 * 100))
         reward_4 = reward_5 = reward_6 = 0
         deposit_total = (deposit_4[(now - 2) % 3] + deposit_5[(now - 2) % 3] +
                          deposit_6[(now - 2) % 3])
         if deposit_total > 0:
-            reward_4 = int(self._proportional_reward_rate *
-                           reward_total * deposit_4[(now - 2) % 3] /
-                           (deposit_total * 100))
-            reward_5 = int(self._proportional_reward_rate *
-                           reward_total * deposit_5[(now - 2) % 3] /
-                           (deposit_total * 100))
-            reward_6 = int(self._proportional_reward_rate *
-                           reward_total * deposit_6[(now - 2) % 3] /
-                           (deposit_total * 100))
+            reward_4 = (self._proportional_reward_rate *
+                        reward_total * deposit_4[(now - 2) % 3] //
+                        (deposit_total * 100))
+            reward_5 = (self._proportional_reward_rate *
+                        reward_total * deposit_5[(now - 2) % 3] //
+                        (deposit_total * 100))
+            reward_6 = (self._proportional_reward_rate *
+                        reward_total * deposit_6[(now - 2) % 3] //
+                        (deposit_total * 100))
         burned[now] = (reward_total - reward_4 - reward_5 - reward_6 -
                           constant_reward * 3)
         balance_4 = self._coin.balance_of(accounts[4])
-        deposit_4[now] = int(balance_4 * self._deposit_rate / 100)
+        deposit_4[now] = balance_4 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[4], self._acb.encrypt(
                 accounts[4], self._default_level, 11),
@@ -1829,7 +1829,7 @@ class ACBUnitTest(unittest.TestCase):
                          balance_4 - deposit_4[now] + deposit_4[(now - 2) % 3] +
                          reward_4 + constant_reward)
         balance_5 = self._coin.balance_of(accounts[5])
-        deposit_5[now] = int(balance_5 * self._deposit_rate / 100)
+        deposit_5[now] = balance_5 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[5], self._acb.encrypt(
                 accounts[5], self._default_level, 11),
@@ -1840,7 +1840,7 @@ class ACBUnitTest(unittest.TestCase):
                          balance_5 - deposit_5[now] + deposit_5[(now - 2) % 3] +
                          reward_5 + constant_reward)
         balance_6 = self._coin.balance_of(accounts[6])
-        deposit_6[now] = int(balance_6 * self._deposit_rate / 100)
+        deposit_6[now] = balance_6 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[6], self._acb.encrypt(
                 accounts[6], self._default_level, 11),
@@ -1871,18 +1871,18 @@ class ACBUnitTest(unittest.TestCase):
         reward_total = (deposit_5[(now - 2) % 3] - reclaim_5 +
                         deposit_6[(now - 2) % 3] - reclaim_6 +
                         self._tax)
-        constant_reward = int((100 - self._proportional_reward_rate) *
-                              reward_total / (1 * 100))
+        constant_reward = ((100 - self._proportional_reward_rate) *
+                           reward_total // (1 * 100))
         reward_4 = reward_5 = reward_6 = 0
         deposit_total = deposit_4[(now - 2) % 3]
         if deposit_total > 0:
-            reward_4 = int(self._proportional_reward_rate *
-                           reward_total * deposit_4[(now - 2) % 3] /
-                           (deposit_total * 100))
+            reward_4 = (self._proportional_reward_rate *
+                        reward_total * deposit_4[(now - 2) % 3] //
+                        (deposit_total * 100))
         burned[now] = (reward_total - reward_4 - reward_5 - reward_6 -
                           constant_reward * 1)
         balance_4 = self._coin.balance_of(accounts[4])
-        deposit_4[now] = int(balance_4 * self._deposit_rate / 100)
+        deposit_4[now] = balance_4 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[4], self._acb.encrypt(
                 accounts[4], self._default_level, 12),
@@ -1894,7 +1894,7 @@ class ACBUnitTest(unittest.TestCase):
                          balance_4 - deposit_4[now] + deposit_4[(now - 2) % 3] +
                          reward_4 + constant_reward)
         balance_5 = self._coin.balance_of(accounts[5])
-        deposit_5[now] = int(balance_5 * self._deposit_rate / 100)
+        deposit_5[now] = balance_5 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[5], self._acb.encrypt(
                 accounts[5], self._default_level, 12),
@@ -1903,7 +1903,7 @@ class ACBUnitTest(unittest.TestCase):
         self.assertEqual(self._coin.balance_of(accounts[5]),
                          balance_5 - deposit_5[now] + reclaim_5)
         balance_6 = self._coin.balance_of(accounts[6])
-        deposit_6[now] = int(balance_6 * self._deposit_rate / 100)
+        deposit_6[now] = balance_6 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[6], self._acb.encrypt(
                 accounts[6], self._default_level, 12),
@@ -1929,25 +1929,25 @@ class ACBUnitTest(unittest.TestCase):
 
         coin_supply = self._coin.total_supply
         reward_total = 0 + self._tax
-        constant_reward = int((100 - self._proportional_reward_rate) *
-                              reward_total / (3 * 100))
+        constant_reward = ((100 - self._proportional_reward_rate) *
+                           reward_total // (3 * 100))
         reward_4 = reward_5 = reward_6 = 0
         deposit_total = (deposit_4[(now - 2) % 3] + deposit_5[(now - 2) % 3] +
                          deposit_6[(now - 2) % 3])
         if deposit_total > 0:
-            reward_4 = int(self._proportional_reward_rate *
-                           reward_total * deposit_4[(now - 2) % 3] /
-                           (deposit_total * 100))
-            reward_5 = int(self._proportional_reward_rate *
-                           reward_total * deposit_5[(now - 2) % 3] /
-                           (deposit_total * 100))
-            reward_6 = int(self._proportional_reward_rate *
-                           reward_total * deposit_6[(now - 2) % 3] /
-                           (deposit_total * 100))
+            reward_4 = (self._proportional_reward_rate *
+                        reward_total * deposit_4[(now - 2) % 3] //
+                        (deposit_total * 100))
+            reward_5 = (self._proportional_reward_rate *
+                        reward_total * deposit_5[(now - 2) % 3] //
+                        (deposit_total * 100))
+            reward_6 = (self._proportional_reward_rate *
+                        reward_total * deposit_6[(now - 2) % 3] //
+                        (deposit_total * 100))
         burned[now] = (reward_total - reward_4 - reward_5 - reward_6 -
                           constant_reward * 3)
         balance_4 = self._coin.balance_of(accounts[4])
-        deposit_4[now] = int(balance_4 * self._deposit_rate / 100)
+        deposit_4[now] = balance_4 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[4], self._acb.encrypt(
                 accounts[4], self._level_max - 1, 13),
@@ -1959,7 +1959,7 @@ class ACBUnitTest(unittest.TestCase):
                          balance_4 - deposit_4[now] + deposit_4[(now - 2) % 3] +
                          reward_4 + constant_reward)
         balance_5 = self._coin.balance_of(accounts[5])
-        deposit_5[now] = int(balance_5 * self._deposit_rate / 100)
+        deposit_5[now] = balance_5 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[5], self._acb.encrypt(
                 accounts[5], self._default_level, 13),
@@ -1970,7 +1970,7 @@ class ACBUnitTest(unittest.TestCase):
                          balance_5 - deposit_5[now] + deposit_5[(now - 2) % 3] +
                          reward_5 + constant_reward)
         balance_6 = self._coin.balance_of(accounts[6])
-        deposit_6[now] = int(balance_6 * self._deposit_rate / 100)
+        deposit_6[now] = balance_6 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[6], self._acb.encrypt(
                 accounts[6], self._default_level, 13),
@@ -1992,25 +1992,25 @@ class ACBUnitTest(unittest.TestCase):
 
         coin_supply = self._coin.total_supply
         reward_total = 0 + self._tax
-        constant_reward = int((100 - self._proportional_reward_rate) *
-                              reward_total / (3 * 100))
+        constant_reward = ((100 - self._proportional_reward_rate) *
+                           reward_total // (3 * 100))
         reward_4 = reward_5 = reward_6 = 0
         deposit_total = (deposit_4[(now - 2) % 3] + deposit_5[(now - 2) % 3] +
                          deposit_6[(now - 2) % 3])
         if deposit_total > 0:
-            reward_4 = int(self._proportional_reward_rate *
-                           reward_total * deposit_4[(now - 2) % 3] /
-                           (deposit_total * 100))
-            reward_5 = int(self._proportional_reward_rate *
-                           reward_total * deposit_5[(now - 2) % 3] /
-                           (deposit_total * 100))
-            reward_6 = int(self._proportional_reward_rate *
-                           reward_total * deposit_6[(now - 2) % 3] /
-                           (deposit_total * 100))
+            reward_4 = (self._proportional_reward_rate *
+                        reward_total * deposit_4[(now - 2) % 3] //
+                        (deposit_total * 100))
+            reward_5 = (self._proportional_reward_rate *
+                        reward_total * deposit_5[(now - 2) % 3] //
+                        (deposit_total * 100))
+            reward_6 = (self._proportional_reward_rate *
+                        reward_total * deposit_6[(now - 2) % 3] //
+                        (deposit_total * 100))
         burned[now] = (reward_total - reward_4 - reward_5 - reward_6 -
                           constant_reward * 3)
         balance_4 = self._coin.balance_of(accounts[4])
-        deposit_4[now] = int(balance_4 * self._deposit_rate / 100)
+        deposit_4[now] = balance_4 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[4], self._acb.encrypt(
                 accounts[4], self._default_level, 14),
@@ -2022,7 +2022,7 @@ class ACBUnitTest(unittest.TestCase):
                          balance_4 - deposit_4[now] + deposit_4[(now - 2) % 3] +
                          reward_4 + constant_reward)
         balance_5 = self._coin.balance_of(accounts[5])
-        deposit_5[now] = int(balance_5 * self._deposit_rate / 100)
+        deposit_5[now] = balance_5 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[5], self._acb.encrypt(
                 accounts[5], self._default_level, 14),
@@ -2033,7 +2033,7 @@ class ACBUnitTest(unittest.TestCase):
                          balance_5 - deposit_5[now] + deposit_5[(now - 2) % 3] +
                          reward_5 + constant_reward)
         balance_6 = self._coin.balance_of(accounts[6])
-        deposit_6[now] = int(balance_6 * self._deposit_rate / 100)
+        deposit_6[now] = balance_6 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[6], self._acb.encrypt(
                 accounts[6], self._default_level, 14),
@@ -2062,21 +2062,21 @@ class ACBUnitTest(unittest.TestCase):
             reclaim_4 = deposit_4[(now - 2) % 3]
         reward_total = (deposit_4[(now - 2) % 3] - reclaim_4 +
                         self._tax)
-        constant_reward = int((100 - self._proportional_reward_rate) *
-                              reward_total / (2 * 100))
+        constant_reward = ((100 - self._proportional_reward_rate) *
+                           reward_total // (2 * 100))
         reward_4 = reward_5 = reward_6 = 0
         deposit_total = (deposit_5[(now - 2) % 3] + deposit_6[(now - 2) % 3])
         if deposit_total > 0:
-            reward_5 = int(self._proportional_reward_rate *
-                           reward_total * deposit_5[(now - 2) % 3] /
-                           (deposit_total * 100))
-            reward_6 = int(self._proportional_reward_rate *
-                           reward_total * deposit_6[(now - 2) % 3] /
-                           (deposit_total * 100))
+            reward_5 = (self._proportional_reward_rate *
+                        reward_total * deposit_5[(now - 2) % 3] //
+                        (deposit_total * 100))
+            reward_6 = (self._proportional_reward_rate *
+                        reward_total * deposit_6[(now - 2) % 3] //
+                        (deposit_total * 100))
         burned[now] = (reward_total - reward_4 - reward_5 - reward_6 -
                           constant_reward * 2)
         balance_4 = self._coin.balance_of(accounts[4])
-        deposit_4[now] = int(balance_4 * self._deposit_rate / 100)
+        deposit_4[now] = balance_4 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[4], self._acb.encrypt(
                 accounts[4], self._default_level, 15),
@@ -2086,7 +2086,7 @@ class ACBUnitTest(unittest.TestCase):
         self.assertEqual(self._coin.balance_of(accounts[4]),
                          balance_4 - deposit_4[now] + reclaim_4)
         balance_5 = self._coin.balance_of(accounts[5])
-        deposit_5[now] = int(balance_5 * self._deposit_rate / 100)
+        deposit_5[now] = balance_5 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[5], self._acb.encrypt(
                 accounts[5], self._default_level, 15),
@@ -2097,7 +2097,7 @@ class ACBUnitTest(unittest.TestCase):
                          balance_5 - deposit_5[now] + deposit_5[(now - 2) % 3] +
                          reward_5 + constant_reward)
         balance_6 = self._coin.balance_of(accounts[6])
-        deposit_6[now] = int(balance_6 * self._deposit_rate / 100)
+        deposit_6[now] = balance_6 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[6], self._acb.encrypt(
                 accounts[6], self._default_level, 15),
@@ -2121,20 +2121,20 @@ class ACBUnitTest(unittest.TestCase):
 
         coin_supply = self._coin.total_supply
         reward_total = 0 + self._tax
-        constant_reward = int((100 - self._proportional_reward_rate) *
-                              reward_total / (3 * 100))
+        constant_reward = ((100 - self._proportional_reward_rate) *
+                           reward_total // (3 * 100))
         reward_4 = reward_5 = reward_6 = 0
         deposit_total = (deposit_4[(now - 2) % 3] + deposit_5[(now - 2) % 3] +
                          deposit_6[(now - 2) % 3])
         if deposit_total > 0:
-            reward_4 = int(self._proportional_reward_rate *
-                           reward_total * deposit_4[(now - 2) % 3] /
-                           (deposit_total * 100))
+            reward_4 = (self._proportional_reward_rate *
+                        reward_total * deposit_4[(now - 2) % 3] //
+                        (deposit_total * 100))
         burned[now] = (reward_total - reward_4 - reward_5 - reward_6 -
                           constant_reward * 1 + deposit_5[(now - 2) % 3] +
                           deposit_6[(now - 2) % 3])
         balance_4 = self._coin.balance_of(accounts[4])
-        deposit_4[now] = int(balance_4 * self._deposit_rate / 100)
+        deposit_4[now] = balance_4 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[4], self._acb.encrypt(
                 accounts[4], 0, 4444),
@@ -2158,18 +2158,18 @@ class ACBUnitTest(unittest.TestCase):
         coin_supply = self._coin.total_supply
         reward_total = (deposit_5[(now - 2) % 3] + deposit_6[(now - 2) % 3] +
                         self._tax)
-        constant_reward = int((100 - self._proportional_reward_rate) *
-                              reward_total / (1 * 100))
+        constant_reward = ((100 - self._proportional_reward_rate) *
+                           reward_total // (1 * 100))
         reward_4 = reward_5 = reward_6 = 0
         deposit_total = deposit_4[(now - 2) % 3]
         if deposit_total > 0:
-            reward_4 = int(self._proportional_reward_rate *
-                           reward_total * deposit_4[(now - 2) % 3] /
-                           (deposit_total * 100))
+            reward_4 = (self._proportional_reward_rate *
+                        reward_total * deposit_4[(now - 2) % 3] //
+                        (deposit_total * 100))
         burned[now] = (reward_total - reward_4 - reward_5 - reward_6 -
                           constant_reward * 1)
         balance_4 = self._coin.balance_of(accounts[4])
-        deposit_4[now] = int(balance_4 * self._deposit_rate / 100)
+        deposit_4[now] = balance_4 * self._deposit_rate // 100
         self.assertEqual(acb.vote(
             accounts[4], self._acb.encrypt(
                 accounts[4], 1, 4444), 0, 4444),
@@ -2208,17 +2208,17 @@ class ACBUnitTest(unittest.TestCase):
                 self._bond_redeemable_period) else 0
             coin_supply = self._coin.total_supply
             reward_total = tax_total
-            constant_reward = int((100 - self._proportional_reward_rate) *
-                                  reward_total / (1 * 100))
+            constant_reward = ((100 - self._proportional_reward_rate) *
+                               reward_total // (1 * 100))
             reward_4 = 0
             deposit_total = deposit_4[(now - 2) % 3]
             if deposit_total > 0:
-                reward_4 = int(self._proportional_reward_rate *
-                               reward_total * deposit_4[(now - 2) % 3] /
-                               (deposit_total * 100))
+                reward_4 = (self._proportional_reward_rate *
+                            reward_total * deposit_4[(now - 2) % 3] //
+                            (deposit_total * 100))
             burned[now] = (reward_total - reward_4 - constant_reward * 1)
             balance_4 = self._coin.balance_of(accounts[4])
-            deposit_4[now] = int(balance_4 * self._deposit_rate / 100)
+            deposit_4[now] = balance_4 * self._deposit_rate // 100
             self.assertEqual(acb.vote(
                 accounts[4], self._acb.encrypt(
                     accounts[4], level, 4444), level - 1, 4444),
@@ -2231,15 +2231,15 @@ class ACBUnitTest(unittest.TestCase):
             
             coin_budget = 0
             bond_budget = 0
-            delta = int(self._coin.total_supply *
-                        (self._level_to_exchange_rate[level - 2] - 10) / 10)
-            delta = int(delta * self._damping_factor / 100)
+            delta = truncated_div(
+                self._coin.total_supply *
+                (self._level_to_exchange_rate[level - 2] - 10), 10)
+            delta = truncated_div(delta * self._damping_factor, 100)
             if delta == 0:
                 coin_budget = 0
                 issued_bonds = 0
             elif delta > 0:
-                necessary_bonds = int(
-                    delta / self._bond_redemption_price)
+                necessary_bonds = delta // self._bond_redemption_price
                 if necessary_bonds >= valid_bond_supply:
                     coin_budget = ((necessary_bonds - valid_bond_supply) *
                                    self._bond_redemption_price)
@@ -2249,7 +2249,7 @@ class ACBUnitTest(unittest.TestCase):
                     bond_budget = -necessary_bonds
             else:
                 coin_budget = delta if level == 2 else 0
-                bond_budget = int(-delta / self._bond_price)
+                bond_budget = -delta // self._bond_price
             period += 1
 
             self.assertEqual(acb.oracle_level, level - 2)
@@ -2271,7 +2271,7 @@ class ACBUnitTest(unittest.TestCase):
             tax_total = 0
             self.assertEqual(self._coin.balance_of(self._coin.tax_account), 0)
             for transfer in [0, 1234, 1111]:
-                tax = int(transfer * self._tax_rate / 100)
+                tax = transfer * self._tax_rate // 100
                 balance_1 = self._coin.balance_of(accounts[1])
                 balance_2 = self._coin.balance_of(accounts[2])
                 balance_tax = self._coin.balance_of(self._coin.tax_account)
@@ -2364,6 +2364,86 @@ class ACBUnitTest(unittest.TestCase):
         self.assertEqual(self._bond_operation.bond_budget, 0)
         self.assertEqual(acb.redeem_bonds(accounts[2], [t1, t2]), 0)
 
+        # redeem all eligible bonds
+        self.reset_balances();
+        self._coin.move(accounts[1], accounts[2], self._bond_price * 60)
+        self._bond_operation.update_bond_budget(
+            -self._bond_price * 100, self._oracle.epoch_id)
+        t1 = self._oracle.epoch_id + self._bond_redemption_period
+        self.assertEqual(acb.purchase_bonds(accounts[1], 10), t1)
+        self.assertEqual(acb.purchase_bonds(accounts[2], 20), t1)
+        self.advance_epoch(1)
+        self._bond_operation.update_bond_budget(
+            -self._bond_price * 70, self._oracle.epoch_id)
+        t2 = self._oracle.epoch_id + self._bond_redemption_period
+        self.assertEqual(acb.purchase_bonds(accounts[1], 30), t2)
+        self.assertEqual(acb.purchase_bonds(accounts[2], 40), t2)
+        self.assertEqual(self._bond.total_supply, 100)
+        self.advance_epoch(self._bond_redemption_period - 1)
+
+        self._bond_operation.update_bond_budget(
+            self._bond_redemption_price * 40, self._oracle.epoch_id)
+        self.assertEqual(self._bond_operation.bond_budget, -40)
+        balance = self._coin.balance_of(accounts[1])
+        self.assertEqual(acb.redeem_all_eligible(accounts[1]), 40)
+        self.assertEqual(self._coin.balance_of(accounts[1]),
+                         balance + self._bond_redemption_price * 40)
+        self.assertEqual(self._bond.balance_of(accounts[1], t2), 0)
+        self.assertEqual(self._bond.total_supply, 60)
+        self.assertEqual(self._bond_operation.bond_budget, -10)
+        self.assertEqual(acb.redeem_all_eligible(accounts[2]), 30)
+        self.assertEqual(self._bond.balance_of(accounts[2], t2), 30)
+        self.assertEqual(self._bond.total_supply, 30)
+        self.assertEqual(self._bond_operation.bond_budget, 0)
+
+        self.advance_epoch(1)
+        self.assertEqual(acb.redeem_all_eligible(accounts[1]), 0)
+        self.assertEqual(acb.redeem_all_eligible(accounts[2]), 30)
+        self.assertEqual(self._bond.total_supply, 0)
+        self.assertEqual(self._bond_operation.bond_budget, 0)
+        self.assertEqual(acb.redeem_all_eligible(accounts[2]), 0)
+
+        # bulk bond operations
+        self.reset_balances();
+        self._coin.move(accounts[1], accounts[2], self._bond_price * 60)
+        self._bond_operation.update_bond_budget(
+            -self._bond_price * 100, self._oracle.epoch_id)
+        self.assertEqual(self._bond_operation.bond_budget, 100)
+        epoch_id = self._oracle.epoch_id
+        t1 = epoch_id + self._bond_redemption_period
+        purchased_bonds = self._logging.bond_operation_logs[
+            epoch_id].purchased_bonds
+        self.assertEqual(acb.purchase_bonds_many(
+            [(accounts[1], 10), (accounts[2], 70), (accounts[3], 10),
+             (accounts[1], 0), (accounts[1], 50)]), (t1, [10, 60, 0, 0, 30]))
+        self.assertEqual(self._bond.balance_of(accounts[1], t1), 40)
+        self.assertEqual(self._bond.balance_of(accounts[2], t1), 60)
+        self.assertEqual(self._coin.balance_of(accounts[2]), 0)
+        self.assertEqual(self._bond_operation.bond_budget, 0)
+        self.assertEqual(
+            self._logging.bond_operation_logs[epoch_id].purchased_bonds,
+            purchased_bonds + 100)
+
+        self._bond_operation.update_bond_budget(
+            self._bond_redemption_price * 50, self._oracle.epoch_id)
+        self.assertEqual(self._bond_operation.bond_budget, -50)
+        redeemed_bonds = self._logging.bond_operation_logs[
+            epoch_id].redeemed_bonds
+        self.assertEqual(acb.redeem_bonds_many(
+            [(accounts[2], [t1]), (accounts[1], [t1, t1]),
+             (accounts[3], [t1])]), [50, 0, 0])
+        self.assertEqual(self._coin.balance_of(accounts[2]),
+                         self._bond_redemption_price * 50)
+        self.assertEqual(self._bond.total_supply, 50)
+        self.assertEqual(self._bond_operation.bond_budget, 0)
+        self.assertEqual(
+            self._logging.bond_operation_logs[epoch_id].redeemed_bonds,
+            redeemed_bonds + 50)
+        self.advance_epoch(self._bond_redemption_period)
+        self.assertEqual(acb.redeem_bonds_many(
+            [(accounts[1], [t1]), (accounts[2], [t1])]), [40, 10])
+        self.assertEqual(self._bond.total_supply, 0)
+
         # open market operation
         self.reset_balances();
         self._open_market_operation.update_coin_budget(0)
@@ -2441,7 +2521,153 @@ class ACBUnitTest(unittest.TestCase):
         with self.assertRaises(Exception):
             acb.sell_coins(accounts[1], 10)
         self.assertEqual(self._open_market_operation.latest_price_updated, True)
-        
+
+        # batch clearing of the open market operation
+        for coin_budget in [1000, -1000, 0, 10, -10]:
+            acb.open_market_operation.update_coin_budget(coin_budget)
+            price = acb.open_market_operation.start_price
+            timestamp = acb.get_timestamp()
+            requests = []
+            for i in range(30):
+                timestamp += random.randint(
+                    0, self._price_change_interval // 2)
+                sender = random.choice(accounts[1:4])
+                if random.randint(0, 1) == 0:
+                    requests.append((timestamp, sender, "purchase_coins",
+                                     random.randint(0, 100 * price)))
+                else:
+                    requests.append((timestamp, sender, "sell_coins",
+                                     random.randint(0, 100)))
+            expected = copy.deepcopy(acb)
+            fills = []
+            for (timestamp, sender, method, amount) in requests:
+                expected.set_timestamp(timestamp)
+                try:
+                    fills.append(getattr(expected, method)(sender, amount))
+                except AssertionError:
+                    fills.append(None)
+            actual = copy.deepcopy(acb)
+            self.assertEqual(actual.exchange_coins_many(requests), fills)
+            self.check_same_state(actual, expected)
+            self.assertEqual(actual.get_timestamp(), expected.get_timestamp())
+            self.assertEqual(actual.eth_pool.eth_balance,
+                             expected.eth_pool.eth_balance)
+            self.assertEqual(actual.open_market_operation.latest_price_updated,
+                             expected.open_market_operation.latest_price_updated)
+            epoch_id = expected.oracle.epoch_id
+            self.assertEqual(
+                actual.logging.open_market_operation_logs[epoch_id].__dict__,
+                expected.logging.open_market_operation_logs[
+                    epoch_id].__dict__)
+            acb = actual
+        self.assertEqual(acb.exchange_coins_many([]), [])
+        with self.assertRaises(Exception):
+            acb.exchange_coins_many(
+                [(acb.get_timestamp() - 1, accounts[1], "sell_coins", 0)])
+        acb = self._acb
+
+        # fast forward
+        self.reset_balances()
+        self._coin.transfer(accounts[1], accounts[2], 100000)
+        self._coin.transfer(accounts[1], accounts[3], 100000)
+        for i in range(2):
+            self._acb.set_timestamp(
+                self._acb.get_timestamp() + self._epoch_duration)
+            for account in accounts[1:4]:
+                acb.vote(account, acb.encrypt(
+                    account, self._default_level, 1),
+                         self._default_level, 1)
+            self.set_tax()
+        for n_epochs in [0, 1, 2, 3, 4, 5, 10, 100]:
+            expected = copy.deepcopy(acb)
+            for i in range(n_epochs):
+                expected.set_timestamp(
+                    expected.get_timestamp() + self._epoch_duration)
+                self.assertEqual(expected.vote(
+                    accounts[7], ACB.NULL_HASH, self._level_max, 0)[5], True)
+            actual = copy.deepcopy(acb)
+            actual.set_timestamp(expected.get_timestamp())
+            if n_epochs > 0:
+                with self.assertRaises(Exception):
+                    actual.set_timestamp(actual.get_timestamp() - 1)
+                    actual.fast_forward(n_epochs)
+                actual.set_timestamp(expected.get_timestamp())
+            actual.fast_forward(n_epochs)
+            self.check_same_state(actual, expected)
+        with self.assertRaises(Exception):
+            acb.fast_forward(-1)
+
+        # settlement mode
+        self.reset_balances()
+        self._coin.transfer(accounts[1], accounts[2], 100000)
+        self._coin.transfer(accounts[1], accounts[3], 100000)
+        for i in range(2):
+            self._acb.set_timestamp(
+                self._acb.get_timestamp() + self._epoch_duration)
+            for account in accounts[1:4]:
+                acb.vote(account, acb.encrypt(
+                    account, self._default_level, 1),
+                         self._default_level, 1)
+            self.set_tax()
+        expected = copy.deepcopy(acb)
+        actual = copy.deepcopy(acb)
+        actual.oracle.settle_on_advance = True
+        expected_reclaims = {}
+        for (target, settle) in [(expected, False), (actual, True)]:
+            target.set_timestamp(target.get_timestamp() + self._epoch_duration)
+            for account in accounts[1:4]:
+                (commit_result, reveal_result, deposited, reclaimed, rewarded,
+                 epoch_updated) = target.vote(
+                     account, ACB.NULL_HASH, self._default_level, 1)
+                self.assertEqual(reveal_result, True)
+                if settle:
+                    self.assertEqual((reclaimed, rewarded), (0, 0))
+                    self.assertEqual(actual.oracle.settlements[account],
+                                     expected_reclaims[account])
+                else:
+                    expected_reclaims[account] = (reclaimed, rewarded)
+        self.check_same_state(actual, expected)
+        epoch_id = expected.oracle.epoch_id
+        for field in ["reclaim_succeeded", "reward_succeeded", "reclaimed",
+                      "rewarded"]:
+            self.assertEqual(
+                getattr(actual.logging.vote_logs[epoch_id], field),
+                getattr(expected.logging.vote_logs[epoch_id], field))
+
+    def check_same_state(self, actual, expected):
+        self.assertEqual(actual.oracle.epoch_id, expected.oracle.epoch_id)
+        self.assertEqual(actual.current_epoch_start,
+                         expected.current_epoch_start)
+        self.assertEqual(actual.oracle_level, expected.oracle_level)
+        self.assertEqual(actual.coin.total_supply, expected.coin.total_supply)
+        for account in self.accounts:
+            self.assertEqual(actual.coin.balance_of(account),
+                             expected.coin.balance_of(account))
+        self.assertEqual(actual.coin.balance_of(actual.coin.tax_account),
+                         expected.coin.balance_of(expected.coin.tax_account))
+        self.assertEqual(actual.bond_operation.bond_budget,
+                         expected.bond_operation.bond_budget)
+        self.assertEqual(actual.open_market_operation.coin_budget,
+                         expected.open_market_operation.coin_budget)
+        self.assertEqual(actual.open_market_operation.latest_price,
+                         expected.open_market_operation.latest_price)
+        self.assertEqual(actual.open_market_operation.start_price,
+                         expected.open_market_operation.start_price)
+        for epoch_index in range(3):
+            actual_epoch = actual.oracle.epochs[epoch_index]
+            expected_epoch = expected.oracle.epochs[epoch_index]
+            self.assertEqual(actual_epoch.phase, expected_epoch.phase)
+            self.assertEqual(actual_epoch.reward_total,
+                             expected_epoch.reward_total)
+            for level in range(self._level_max):
+                self.assertEqual(actual_epoch.votes[level].count,
+                                 expected_epoch.votes[level].count)
+                self.assertEqual(actual_epoch.votes[level].deposit,
+                                 expected_epoch.votes[level].deposit)
+        epoch_id = expected.oracle.epoch_id
+        self.assertEqual(
+            actual.logging.epoch_logs[epoch_id].__dict__,
+            expected.logging.epoch_logs[epoch_id].__dict__)
 
     def advance_epoch(self, advance):
         for i in range(advance):
@@ -2469,9 +2695,9 @@ class ACBUnitTest(unittest.TestCase):
         self._coin.mint(self._coin.tax_account, self._tax)
 
     def mint_at_default_level(self):
-        delta = int(self._coin.total_supply * (11 - 10) / 10)
-        delta = int(delta * self._damping_factor / 100)
-        mint = (int(delta / self._bond_redemption_price) *
+        delta = self._coin.total_supply * (11 - 10) // 10
+        delta = delta * self._damping_factor // 100
+        mint = ((delta // self._bond_redemption_price) *
                 self._bond_redemption_price)
         assert(delta > 0)
         self.assertEqual(self._bond.total_supply, 0)
@@ -2496,7 +2722,7 @@ def main():
     reclaim_threshold = 1
     tax = 12345
     level_to_exchange_rate = [1, 11, 20]
-    price_change_interval = int(epoch_duration / 21)
+    price_change_interval = epoch_duration // 21
     price_change_percentage = 20
     price_multiplier = 3
 
@@ -2533,8 +2759,8 @@ def main():
                                     for reclaim_threshold in [0, 1, len(
                                             level_to_exchange_rate) - 1]:
                                         for tax in [0, 12345]:
-                                            price_change_interval = int(
-                                                epoch_duration / 21) + 1
+                                            price_change_interval = (
+                                                epoch_duration // 21) + 1
                                             price_change_percentage = 20
                                             price_multiplier = 3
                                             test = ACBUnitTest(
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2021 Kentaro Hara
+#
+# This software is released under the MIT License.
+# http://opensource.org/licenses/mit-license.php
+
+from acb_simulator import ACBSimulator
+from acb_optimizer import DEFAULT_PARAMETERS, PARAMETER_NAMES, summarize
+import argparse, ast, concurrent.futures, contextlib, io, math
+import multiprocessing, random, statistics
+
+#-------------------------------------------------------------------------------
+# [Variance reduction]
+#
+# Compares two parameter settings of ACBSimulator with fewer runs. With
+# common random numbers, the two settings run with the same seeds and every
+# kind of decision (the votes, the transfers, the purchases, ...) draws from
+# its own random numbers (see ACBSimulator.use_common_random_numbers()), so
+# the paired runs differ only by the effect of the parameters. With
+# antithetic runs, every seed also runs with the mirrored random numbers and
+# the pair counts as one sample. The confidence intervals use Student's t
+# distribution.
+#
+# Usage:
+#   ./acb_variance.py --set damping_factor=10 --against damping_factor=20 \
+#       --metric supply_volatility --seeds 10
+#-------------------------------------------------------------------------------
+
+# Return the regularized incomplete beta function I_x(a, b). The continued
+# fraction follows Numerical Recipes.
+def regularized_beta(a, b, x):
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) +
+                     a * math.log(x) + b * math.log(1 - x))
+    if x < (a + 1) / (a + b + 2):
+        return front * beta_continued_fraction(a, b, x) / a
+    return 1 - front * beta_continued_fraction(b, a, 1 - x) / b
+
+def beta_continued_fraction(a, b, x):
+    tiny = 1e-300
+    c = 1.0
+    d = 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 1000):
+        for numerator in [m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                          -(a + m) * (a + b + m) * x /
+                          ((a + 2 * m) * (a + 2 * m + 1))]:
+            d = 1.0 + numerator * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            h *= d * c
+        if abs(d * c - 1) < 1e-15:
+            break
+    return h
+
+# Return the cumulative distribution of Student's t distribution with |df|
+# degrees of freedom at |t|.
+def student_t_cdf(t, df):
+    tail = 0.5 * regularized_beta(df / 2, 0.5, df / (df + t * t))
+    return 1 - tail if t > 0 else tail
+
+# Return the |p| quantile of Student's t distribution with |df| degrees of
+# freedom.
+def student_t_quantile(p, df):
+    assert(0 < p and p < 1 and df > 0)
+    (low, high) = (-1.0, 1.0)
+    while student_t_cdf(low, df) > p:
+        low *= 2
+    while student_t_cdf(high, df) < p:
+        high *= 2
+    for i in range(200):
+        middle = (low + high) / 2
+        if student_t_cdf(middle, df) < p:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+# Return the mean of |values| and the half width of its confidence interval.
+# The half width is infinite with fewer than two values.
+def confidence_interval(values, confidence=0.95):
+    mean = statistics.fmean(values)
+    if len(values) < 2:
+        return (mean, math.inf)
+    t = student_t_quantile((1 + confidence) / 2, len(values) - 1)
+    return (mean, t * statistics.stdev(values) / math.sqrt(len(values)))
+
+# Return the mean of the differences of the pairs of |values_a| and
+# |values_b| and the half width of its confidence interval. Used for the
+# runs with common random numbers.
+def paired_confidence_interval(values_a, values_b, confidence=0.95):
+    assert(len(values_a) == len(values_b))
+    return confidence_interval([a - b for (a, b) in zip(values_a, values_b)],
+                               confidence)
+
+# Return the difference of the means of independent |values_a| and
+# |values_b| and the half width of its confidence interval (Welch).
+def difference_confidence_interval(values_a, values_b, confidence=0.95):
+    difference = statistics.fmean(values_a) - statistics.fmean(values_b)
+    if len(values_a) < 2 or len(values_b) < 2:
+        return (difference, math.inf)
+    va = statistics.variance(values_a) / len(values_a)
+    vb = statistics.variance(values_b) / len(values_b)
+    if va + vb == 0:
+        return (difference, 0.0)
+    df = (va + vb) ** 2 / (va ** 2 / (len(values_a) - 1) +
+                           vb ** 2 / (len(values_b) - 1))
+    t = student_t_quantile((1 + confidence) / 2, df)
+    return (difference, t * math.sqrt(va + vb))
+
+# Run one simulation without printing anything.
+#
+# Parameters
+# ----------------
+# |job|: A tuple of:
+#  - The dict from PARAMETER_NAMES to the values.
+#  - The seed.
+#  - True to use common random numbers seeded with the seed, False to seed
+#    the global random numbers like an ordinary run.
+#  - True to use the antithetic random numbers.
+#
+# Returns
+# ----------------
+# The metrics returned by summarize().
+def run_job(job):
+    (parameters, seed, common, antithetic) = job
+    random.seed(seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        simulator = ACBSimulator(*[parameters[name]
+                                   for name in PARAMETER_NAMES])
+        if common:
+            simulator.use_common_random_numbers(seed, antithetic)
+        simulator.start()
+        simulator.run_epochs(parameters["iteration"])
+    return summarize(simulator)
+
+# Compare |metric| of two parameter settings.
+#
+# Parameters
+# ----------------
+# |parameters_a|, |parameters_b|: The dicts from PARAMETER_NAMES to the
+# values.
+# |seeds|: The seeds. Every seed is one sample of each setting.
+# |metric|: The name of a metric returned by summarize().
+# |common|: True to pair the runs with common random numbers. False to run
+# the settings independently (the settings use disjoint seeds).
+# |antithetic|: True to run every seed also with the antithetic random
+# numbers and use the mean of the two runs as the sample. Requires
+# |common|.
+# |confidence|: The confidence level.
+# |processes|: The number of worker processes. 1 runs in-process.
+#
+# Returns
+# ----------------
+# A dict with:
+#  - "difference": The mean of |metric| of A minus the one of B.
+#  - "half_width": The half width of the confidence interval.
+#  - "a", "b": The samples of A and B.
+#  - "runs": The number of the simulations.
+def compare(parameters_a, parameters_b, seeds, metric, common=True,
+            antithetic=False, confidence=0.95, processes=1):
+    assert(common or not antithetic)
+    seeds_b = seeds if common else [seed + len(seeds) for seed in seeds]
+    mirrors = [False, True] if antithetic else [False]
+    jobs = ([(parameters_a, seed, common, mirror)
+             for seed in seeds for mirror in mirrors] +
+            [(parameters_b, seed, common, mirror)
+             for seed in seeds_b for mirror in mirrors])
+    if processes > 1:
+        with concurrent.futures.ProcessPoolExecutor(processes) as pool:
+            outputs = list(pool.map(run_job, jobs))
+    else:
+        outputs = [run_job(job) for job in jobs]
+    values = [output[metric] for output in outputs]
+    # Average the runs of the same seed.
+    samples = [statistics.fmean(values[index:index + len(mirrors)])
+               for index in range(0, len(values), len(mirrors))]
+    (a, b) = (samples[:len(seeds)], samples[len(seeds):])
+    if common:
+        (difference, half_width) = paired_confidence_interval(a, b,
+                                                              confidence)
+    else:
+        (difference, half_width) = difference_confidence_interval(
+            a, b, confidence)
+    return {
+        "difference": difference,
+        "half_width": half_width,
+        "a": a,
+        "b": b,
+        "runs": len(jobs),
+    }
+
+# Parse "name=value" into the parameters.
+def parse_setting(parameters, settings):
+    parameters = dict(parameters)
+    for setting in settings:
+        (name, value) = setting.split("=", 1)
+        assert(name in PARAMETER_NAMES)
+        parameters[name] = ast.literal_eval(value)
+    return parameters
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--set", action="append", default=[],
+                        help="name=value of the setting A")
+    parser.add_argument("--against", action="append", default=[],
+                        help="name=value of the setting B")
+    parser.add_argument("--metric", default="supply_volatility")
+    parser.add_argument("--seeds", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--independent", action="store_true",
+                        help="run the settings independently")
+    parser.add_argument("--antithetic", action="store_true")
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--voters", type=int, default=40)
+    parser.add_argument("--iteration", type=int, default=50)
+    parser.add_argument("-j", "--processes", type=int,
+                        default=multiprocessing.cpu_count())
+    args = parser.parse_args()
+
+    base = dict(DEFAULT_PARAMETERS)
+    base["voter_count"] = args.voters
+    base["iteration"] = args.iteration
+    result = compare(parse_setting(base, args.set),
+                     parse_setting(base, args.against),
+                     list(range(args.seed, args.seed + args.seeds)),
+                     args.metric, not args.independent, args.antithetic,
+                     args.confidence, args.processes)
+    print("%s: A - B = %.6f +- %.6f (%d%% confidence, %d runs)" %
+          (args.metric, result["difference"], result["half_width"],
+           round(args.confidence * 100), result["runs"]))
+
+
+if __name__ == "__main__":
+    main()
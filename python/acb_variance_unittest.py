@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2021 Kentaro Hara
+#
+# This software is released under the MIT License.
+# http://opensource.org/licenses/mit-license.php
+
+from acb_variance import *
+from acb_simulator import AntitheticRandom, restore_simulator
+import contextlib, io, random, unittest
+
+class ACBVarianceUnitTest(unittest.TestCase):
+    def __init__(self, processes):
+        super().__init__()
+        print('processes=%d' % processes)
+        self._processes = processes
+
+    def teardown(self):
+        pass
+
+    def run(self):
+        # The antithetic random numbers mirror the random numbers.
+        (rng, mirror) = (random.Random(1), AntitheticRandom(1))
+        for i in range(100):
+            self.assertEqual(mirror.randint(0, 7), 7 - rng.randint(0, 7))
+            self.assertEqual(mirror.randint(3, 100),
+                             103 - rng.randint(3, 100))
+
+        # The statistics.
+        for (p, df, expected) in [(0.975, 1, 12.7062), (0.975, 10, 2.2281),
+                                  (0.95, 4, 2.1318), (0.995, 30, 2.7500),
+                                  (0.975, 10 ** 6, 1.9600),
+                                  (0.025, 5, -2.5706)]:
+            self.assertAlmostEqual(student_t_quantile(p, df), expected, 4)
+        self.assertAlmostEqual(student_t_cdf(0, 3), 0.5)
+        (mean, half_width) = confidence_interval([1, 2, 3])
+        self.assertEqual(mean, 2)
+        self.assertAlmostEqual(half_width, 4.302653 / math.sqrt(3), 5)
+        self.assertEqual(confidence_interval([5]), (5, math.inf))
+        self.assertEqual(paired_confidence_interval([3, 4, 5], [1, 2, 3]),
+                         (2, 0))
+        (difference, half_width) = difference_confidence_interval(
+            [1, 2, 3], [2, 3, 4])
+        self.assertEqual(difference, -1)
+        self.assertAlmostEqual(half_width, 2.776445 * math.sqrt(2 / 3), 5)
+
+        parameters = dict(DEFAULT_PARAMETERS)
+        parameters["voter_count"] = 20
+        parameters["iteration"] = 30
+
+        # With common random numbers, a run does not depend on the global
+        # random numbers, and a checkpoint resumes the random numbers of the
+        # decisions.
+        def simulate(seed, global_seed, checkpoint_at=None):
+            random.seed(global_seed)
+            with contextlib.redirect_stdout(io.StringIO()):
+                simulator = ACBSimulator(*[parameters[name]
+                                           for name in PARAMETER_NAMES])
+                simulator.use_common_random_numbers(seed)
+                simulator.start()
+                if checkpoint_at is not None:
+                    simulator.run_epochs(checkpoint_at)
+                    simulator = restore_simulator(simulator.checkpoint())
+                    random.seed(global_seed + 1)
+                simulator.run_epochs(parameters["iteration"] -
+                                     simulator.epoch_count)
+            return (simulator.metrics.__dict__,
+                    [voter.balance for voter in simulator._voters])
+        expected = simulate(5, 0)
+        self.assertEqual(simulate(5, 1), expected)
+        self.assertEqual(simulate(5, 2, 11), expected)
+        self.assertNotEqual(simulate(6, 0), expected)
+        self.assertEqual(run_job((parameters, 5, True, False)),
+                         run_job((parameters, 5, True, False)))
+        self.assertNotEqual(run_job((parameters, 5, True, False)),
+                            run_job((parameters, 5, True, True)))
+
+        # Identical settings with common random numbers do not differ.
+        seeds = list(range(8))
+        result = compare(parameters, parameters, seeds, "supply_volatility",
+                         True, False, 0.95, self._processes)
+        self.assertEqual((result["difference"], result["half_width"]),
+                         (0, 0))
+        self.assertEqual(result["runs"], 16)
+
+        # Common random numbers narrow the confidence interval of the
+        # difference of close settings.
+        other = dict(parameters)
+        other["deposit_rate"] = 20
+        common = compare(parameters, other, seeds, "supply_volatility",
+                         True, False, 0.95, self._processes)
+        independent = compare(parameters, other, seeds, "supply_volatility",
+                              False, False, 0.95, self._processes)
+        antithetic = compare(parameters, other, seeds, "supply_volatility",
+                             True, True, 0.95, self._processes)
+        self.assertEqual((common["runs"], independent["runs"],
+                          antithetic["runs"]), (16, 16, 32))
+        self.assertTrue(common["half_width"] * 4 <
+                        independent["half_width"])
+        self.assertTrue(antithetic["half_width"] <
+                        independent["half_width"])
+        self.assertEqual(
+            common["a"], [run_job((parameters, seed, True, False))[
+                "supply_volatility"] for seed in seeds])
+        with self.assertRaises(Exception):
+            compare(parameters, other, seeds, "supply_volatility", False,
+                    True)
+
+        setting = parse_setting(parameters, [
+            "damping_factor=20", "level_to_exchange_rate=[9, 11, 12]"])
+        self.assertEqual(setting["damping_factor"], 20)
+        self.assertEqual(setting["level_to_exchange_rate"], [9, 11, 12])
+        self.assertEqual(parameters["damping_factor"], 10)
+
+
+def main():
+    for processes in [1, 2]:
+        test = ACBVarianceUnitTest(processes)
+        test.run()
+        test.teardown()
+
+
+if __name__ == "__main__":
+    main()
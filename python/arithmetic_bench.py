@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2021 Kentaro Hara
+#
+# This software is released under the MIT License.
+# http://opensource.org/licenses/mit-license.php
+
+from johnlawcoin import *
+import argparse, random, time
+
+#-------------------------------------------------------------------------------
+# [Arithmetic benchmark]
+#
+# Compares the integer arithmetic the model uses with dividing through floats
+# (int(a / b)), for the formulas on the hot paths and for the hot paths
+# themselves.
+#
+# Usage:
+#   ./arithmetic_bench.py --iterations 1000000 --bits 64
+#-------------------------------------------------------------------------------
+
+# Return the seconds |function| takes to run over |operands|.
+def measure(function, operands):
+    start = time.perf_counter()
+    for (a, b) in operands:
+        function(a, b)
+    return time.perf_counter() - start
+
+def run_benchmark(iterations, bits, seed):
+    rng = random.Random(seed)
+    coin = JohnLawCoin(1)
+    amounts = [(rng.randint(0, 2 ** bits), rng.randint(-10, 10))
+               for i in range(iterations)]
+    formulas = [
+        ("tax",
+         lambda amount, rate: int(amount * JohnLawCoin.TAX_RATE / 100),
+         lambda amount, rate: amount * JohnLawCoin.TAX_RATE // 100),
+        ("price_step",
+         lambda price, rate: int(price * 85 / 100),
+         lambda price, rate: price * 85 // 100),
+        ("delta",
+         lambda supply, rate: int(int(supply * rate / 10) * 10 / 100),
+         lambda supply, rate: truncated_div(
+             truncated_div(supply * rate, 10) * 10, 100)),
+    ]
+    results = {}
+    for (name, float_path, integer_path) in formulas:
+        mismatches = sum([float_path(a, b) != integer_path(a, b)
+                          for (a, b) in amounts])
+        results[name] = (measure(float_path, amounts),
+                         measure(integer_path, amounts), mismatches)
+
+    coin.mint(1, 2 ** bits * iterations)
+    start = time.perf_counter()
+    for (amount, rate) in amounts:
+        coin.transfer(1, 2, amount)
+    transfer_time = time.perf_counter() - start
+    return (results, transfer_time)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=1000000)
+    parser.add_argument("--bits", type=int, default=64,
+                        help="the bit width of the operands")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    (results, transfer_time) = run_benchmark(args.iterations, args.bits,
+                                             args.seed)
+    for (name, (float_time, integer_time, mismatches)) in results.items():
+        print("%s: float=%.3fs integer=%.3fs speedup=%.2fx mismatches=%d" %
+              (name, float_time, integer_time, float_time / integer_time,
+               mismatches))
+    print("transfer: %.0f transfers/s" % (args.iterations / transfer_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2021 Kentaro Hara
+#
+# This software is released under the MIT License.
+# http://opensource.org/licenses/mit-license.php
+
+from johnlawcoin import *
+from fractions import Fraction
+import random, unittest
+
+# Return |numerator| / |denominator| truncated toward zero, computed exactly.
+def exact_div(numerator, denominator):
+    return int(Fraction(numerator, denominator))
+
+class ArithmeticUnitTest(unittest.TestCase):
+    def __init__(self, bits):
+        super().__init__()
+        print('bits=%d' % bits)
+        self._bits = bits
+        self._rng = random.Random(bits)
+
+    def teardown(self):
+        pass
+
+    def run(self):
+        rng = self._rng
+        limit = 2 ** self._bits
+
+        # truncated_div() truncates toward zero for every sign.
+        for (a, b, expected) in [(7, 2, 3), (-7, 2, -3), (7, -2, -3),
+                                 (-7, -2, 3), (6, 3, 2), (-6, 3, -2),
+                                 (0, -5, 0), (-1, 10, 0)]:
+            self.assertEqual(truncated_div(a, b), expected)
+        for i in range(1000):
+            a = rng.randint(-limit, limit)
+            b = rng.choice([-1, 1]) * rng.randint(1, limit)
+            self.assertEqual(truncated_div(a, b), exact_div(a, b))
+
+        # The formulas the model uses. Each is a tuple of the numerator and
+        # the denominator; the integer path divides them with // or
+        # truncated_div() and the float path with int(numerator /
+        # denominator).
+        def formulas():
+            amount = rng.randint(0, limit)
+            # The tax, the deposit and the damping.
+            yield (amount * rng.randint(0, 100), 100)
+            # The reward shares.
+            yield (rng.randint(0, 100) * amount * rng.randint(0, limit),
+                   100 * rng.randint(1, limit))
+            # The delta of the coin supply.
+            yield (amount * (rng.randint(0, 20) - 10), 10)
+            # The Dutch auction price steps.
+            yield (amount * rng.choice([85, 115]), 100)
+            # The coin amount and the bond count.
+            yield (amount, rng.randint(1, limit))
+
+        float_mismatches = 0
+        for i in range(1000):
+            for (numerator, denominator) in formulas():
+                integer = truncated_div(numerator, denominator)
+                self.assertEqual(integer, exact_div(numerator, denominator))
+                if numerator >= 0:
+                    self.assertEqual(integer, numerator // denominator)
+                if int(numerator / denominator) != integer:
+                    # The float path is wrong only when the numerator does
+                    # not fit in 53 bits.
+                    self.assertTrue(abs(numerator) >= 2 ** 53)
+                    float_mismatches += 1
+        if self._bits >= 64:
+            self.assertTrue(float_mismatches > 0)
+
+        # The model computes exactly with large values.
+        coin = JohnLawCoin(1)
+        amount = rng.randint(0, limit)
+        coin.mint(1, amount)
+        coin.transfer(1, 2, amount)
+        tax = exact_div(amount * JohnLawCoin.TAX_RATE, 100)
+        self.assertEqual(coin.balance_of(coin.tax_account), tax)
+        self.assertEqual(coin.balance_of(2), amount - tax)
+        self.assertEqual(coin.total_supply, sum(coin.balances.values()))
+
+        for coin_budget in [1, -1]:
+            operation = OpenMarketOperation()
+            operation.latest_price = rng.randint(1, limit)
+            operation.update_coin_budget(coin_budget)
+            if coin_budget > 0:
+                start_price = (operation.latest_price *
+                               OpenMarketOperation.PRICE_MULTIPLIER)
+                percentage = 100 - OpenMarketOperation.PRICE_CHANGE_PERCENTAGE
+            else:
+                start_price = exact_div(
+                    operation.latest_price,
+                    OpenMarketOperation.PRICE_MULTIPLIER) + 1
+                percentage = 100 + OpenMarketOperation.PRICE_CHANGE_PERCENTAGE
+            self.assertEqual(operation.start_price, start_price)
+            price = start_price
+            for interval in range(OpenMarketOperation.PRICE_CHANGE_MAX + 2):
+                elapsed_time = (interval *
+                                OpenMarketOperation.PRICE_CHANGE_INTERVAL)
+                self.assertEqual(operation.get_current_price(elapsed_time),
+                                 max(price, 1) if coin_budget > 0 else price)
+                if interval < OpenMarketOperation.PRICE_CHANGE_MAX:
+                    price = exact_div(price * percentage, 100)
+
+
+def main():
+    for bits in [8, 32, 52, 53, 64, 128, 256]:
+        test = ArithmeticUnitTest(bits)
+        test.run()
+        test.teardown()
+
+
+if __name__ == "__main__":
+    main()
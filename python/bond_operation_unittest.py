@@ -6,7 +6,7 @@
 # http://opensource.org/licenses/mit-license.php
 
 from johnlawcoin import *
-import unittest, random
+import copy, unittest, random
 
 class BondOperationUnitTest(unittest.TestCase):
 
@@ -725,6 +725,94 @@ class BondOperationUnitTest(unittest.TestCase):
         self.assertEqual(self.bond.balance_of(accounts[2], t2), 0)
         self.check_redemption_epochs(self.bond, accounts[2], [])
 
+        # decrease_bond_supply_all is the same as decrease_bond_supply with
+        # all the redemption epochs in ascending order.
+        period = self._bond_redemption_period + self._bond_redeemable_period
+        for budget in [-1000, -50, -1, 0, 50]:
+            for i in range(20):
+                epoch = self.epoch_id + random.randint(-period, period)
+                self.bond.mint(accounts[3], epoch, random.randint(1, 20))
+            bond_operation.bond_budget = budget
+            epochs = self.bond.redemption_epochs_in_range(
+                accounts[3], None, None)
+            self.assertEqual(epochs, sorted(epochs))
+            self.assertEqual(self.bond.redemption_epochs_in_range(
+                accounts[3], epochs[1], epochs[-1]), epochs[1:-1])
+            expected = copy.deepcopy((bond_operation, self.coin))
+            self.assertEqual(
+                bond_operation.decrease_bond_supply_all(
+                    accounts[3], self.epoch_id, self.coin),
+                expected[0].decrease_bond_supply(
+                    accounts[3], epochs, self.epoch_id, expected[1]))
+            self.assertEqual(bond_operation.bond_budget,
+                             expected[0].bond_budget)
+            self.assertEqual(self.coin.balance_of(accounts[3]),
+                             expected[1].balance_of(accounts[3]))
+            self.assertEqual(self.bond.bonds, expected[0].bond.bonds)
+            self.assertEqual(self.bond.bond_supply, expected[0].bond.bond_supply)
+            for epoch in self.bond.redemption_epochs_in_range(
+                    accounts[3], None, None):
+                self.assertTrue(epoch > self.epoch_id)
+            if budget >= 0:
+                self.assertEqual(self.bond.redemption_epochs_in_range(
+                    accounts[3], None, self.epoch_id + 1), [])
+        bond_operation.bond_budget = 0
+        self.assertEqual(self.bond.redemption_epochs_in_range(
+            accounts[4], None, None), [])
+        self.assertEqual(bond_operation.decrease_bond_supply_all(
+            accounts[4], self.epoch_id, self.coin), (0, 0))
+
+        # increase_bond_supply_many and decrease_bond_supply_many are the same
+        # as serving the requests one by one.
+        for account in accounts[2:]:
+            self.coin.mint(account, random.randint(0, 20) * self._bond_price)
+        for budget in [0, 1, 30, 1000]:
+            bond_operation.bond_budget = budget
+            requests = [(random.choice(accounts[2:]), random.randint(-1, 10))
+                        for i in range(20)]
+            expected = copy.deepcopy((bond_operation, self.coin))
+            counts = []
+            for (sender, count) in requests:
+                count = max(min(count, expected[0].bond_budget,
+                                expected[1].balance_of(sender) //
+                                self._bond_price), 0)
+                counts.append(count)
+                if count > 0:
+                    expected[0].increase_bond_supply(
+                        sender, count, self.epoch_id, expected[1])
+            self.assertEqual(
+                bond_operation.increase_bond_supply_many(
+                    requests, self.epoch_id, self.coin),
+                (self.epoch_id + self._bond_redemption_period, counts))
+            self.check_same_bonds(expected)
+            self.epoch_id += 1
+
+        for budget in [-1000, -30, -1, 0, 30]:
+            bond_operation.bond_budget = budget
+            requests = []
+            for i in range(20):
+                sender = random.choice(accounts[2:])
+                epochs = self.bond.redemption_epochs_in_range(
+                    sender, None, None)
+                requests.append((sender, random.sample(
+                    epochs + [self.epoch_id],
+                    random.randint(0, len(epochs) + 1))))
+            expected = copy.deepcopy((bond_operation, self.coin))
+            self.assertEqual(
+                bond_operation.decrease_bond_supply_many(
+                    requests, self.epoch_id, self.coin),
+                [expected[0].decrease_bond_supply(
+                    sender, redemption_epochs, self.epoch_id, expected[1])
+                 for (sender, redemption_epochs) in requests])
+            self.check_same_bonds(expected)
+            self.epoch_id += random.randint(0, self._bond_redemption_period)
+        bond_operation.bond_budget = 0
+        self.assertEqual(bond_operation.increase_bond_supply_many(
+            [], self.epoch_id, self.coin),
+            (self.epoch_id + self._bond_redemption_period, []))
+        self.assertEqual(bond_operation.decrease_bond_supply_many(
+            [], self.epoch_id, self.coin), [])
+
     def check_update_bond_budget(self, delta, mint):
         self.assertEqual(
             self.bond_operation.update_bond_budget(delta, self.epoch_id), mint)
@@ -740,6 +828,21 @@ class BondOperationUnitTest(unittest.TestCase):
         self.assertEqual(ret1, redeemed_bonds)
         self.assertEqual(ret2, expired_bonds)
 
+    def check_same_bonds(self, expected):
+        (bond_operation, coin) = expected
+        self.assertEqual(self.bond_operation.bond_budget,
+                         bond_operation.bond_budget)
+        self.assertEqual(self.coin.balances, coin.balances)
+        self.assertEqual(self.coin.total_supply, coin.total_supply)
+        self.assertEqual(self.bond.bonds, bond_operation.bond.bonds)
+        self.assertEqual(self.bond.redemption_epochs,
+                         bond_operation.bond.redemption_epochs)
+        self.assertEqual(self.bond.bond_count, bond_operation.bond.bond_count)
+        self.assertEqual(self.bond.bond_supply,
+                         bond_operation.bond.bond_supply)
+        self.assertEqual(self.bond.total_supply,
+                         bond_operation.bond.total_supply)
+
     def check_redemption_epochs(self, bond, account, expected):
         count = bond.number_of_redemption_epochs_owned_by(account)
         self.assertEqual(count, len(expected))
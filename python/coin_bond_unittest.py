@@ -139,7 +139,7 @@ class CoinBondUnitTest(unittest.TestCase):
         account2_balance = coin.balance_of(accounts[2])
         tax_balance = coin.balance_of(coin.tax_account)
         for amount in [0, 1, 99, 100, 101, 999, 1000, 1001]:
-            tax = int(amount * JohnLawCoin.TAX_RATE / 100)
+            tax = amount * JohnLawCoin.TAX_RATE // 100
             coin.reset_tax_account()
             coin.transfer(accounts[1], accounts[2], amount)
             self.assertEqual(coin.balance_of(accounts[1]),
@@ -165,6 +165,44 @@ class CoinBondUnitTest(unittest.TestCase):
         self.assertEqual(coin.balance_of(old_tax_account), 0)
         self.assertEqual(coin.balance_of(coin.tax_account), tax_balance + 10)
 
+        # eviction
+        coin = JohnLawCoin(accounts[0])
+        self.assertEqual(coin.live_account_count(), 1)
+        self.assertEqual(coin.evicted_count, 0)
+        coin.mint(accounts[1], 0)
+        coin.burn(accounts[2], 0)
+        coin.move(accounts[3], accounts[4], 0)
+        self.assertEqual(coin.live_account_count(), 1)
+        self.assertEqual(coin.evicted_count, 0)
+        coin.mint(accounts[1], 10)
+        self.assertEqual(coin.live_account_count(), 2)
+        coin.burn(accounts[1], 10)
+        self.assertEqual(coin.live_account_count(), 1)
+        self.assertEqual(coin.evicted_count, 1)
+        self.assertEqual(coin.balance_of(accounts[1]), 0)
+        coin.mint(accounts[1], 10)
+        coin.move(accounts[1], accounts[1], 10)
+        self.assertEqual(coin.balance_of(accounts[1]), 10)
+        self.assertEqual(coin.live_account_count(), 2)
+        self.assertEqual(coin.evicted_count, 2)
+        coin.transfer(accounts[1], accounts[2], 10)
+        self.assertEqual(coin.balance_of(accounts[1]), 0)
+        self.assertEqual(coin.live_account_count(), 2)
+        self.assertEqual(coin.evicted_count, 3)
+        coin.transfer(accounts[1], accounts[2], 0)
+        with self.assertRaises(Exception):
+            coin.transfer(accounts[1], accounts[2], 1)
+        for i in range(100):
+            coin.reset_tax_account()
+        self.assertEqual(coin.balance_of(coin.tax_account), 0)
+        coin.transfer(accounts[0], accounts[1], 1000)
+        for i in range(100):
+            coin.reset_tax_account()
+        self.assertEqual(coin.balance_of(coin.tax_account), 10)
+        self.assertEqual(coin.live_account_count(), 4)
+        self.assertEqual(coin.evicted_count, 103)
+        self.assertEqual(sum(coin.balances.values()), coin.total_supply)
+
         # JohnLawBond
         bond = JohnLawBond()
         self.assertEqual(bond.total_supply, 0)
@@ -311,6 +349,35 @@ class CoinBondUnitTest(unittest.TestCase):
         self.assertEqual(bond.bond_supply_at(1), 0)
         self.assertEqual(bond.bond_supply_at(2), 0)
 
+        # Zero entries are not kept.
+        self.assertEqual(bond.bonds, {})
+        self.assertEqual(bond.redemption_epochs, {})
+        self.assertEqual(bond.bond_count, {})
+        self.assertEqual(bond.bond_supply, {})
+
+        # The entries are removed when the bonds of an epoch are burned.
+        for epoch in range(1, 6):
+            bond.mint(accounts[1], epoch, epoch)
+            bond.mint(accounts[2], epoch, 10 * epoch)
+        self.assertEqual(sorted(bond.bond_supply.keys()), [1, 2, 3, 4, 5])
+        self.assertEqual(bond.total_supply, 165)
+        bond.burn(accounts[2], 2, 20)
+        bond.burn(accounts[1], 2, 2)
+        bond.burn(accounts[1], 4, 4)
+        self.assertEqual(sorted(bond.bond_supply.keys()), [1, 3, 4, 5])
+        self.assertEqual(bond.bond_supply_at(2), 0)
+        self.assertEqual(bond.bond_supply_at(4), 40)
+        self.check_redemption_epochs(bond, accounts[1], [1, 3, 5])
+        self.check_redemption_epochs(bond, accounts[2], [1, 3, 4, 5])
+        self.assertEqual(bond.total_supply, 139)
+        self.assertEqual(sum(bond.bond_supply.values()), bond.total_supply)
+        for account in [accounts[1], accounts[2]]:
+            for epoch in range(1, 6):
+                bond.burn(account, epoch, bond.balance_of(account, epoch))
+        self.assertEqual(bond.total_supply, 0)
+        self.assertEqual(bond.bonds, {})
+        self.assertEqual(bond.bond_supply, {})
+
     def check_redemption_epochs(self, bond, account, expected):
         count = bond.number_of_redemption_epochs_owned_by(account)
         self.assertEqual(count, len(expected))
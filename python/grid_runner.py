@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2021 Kentaro Hara
+#
+# This software is released under the MIT License.
+# http://opensource.org/licenses/mit-license.php
+
+import argparse, concurrent.futures, contextlib, importlib, io
+import multiprocessing, sys, time, traceback
+
+#-------------------------------------------------------------------------------
+# [Grid runner]
+#
+# Runs the Python reference model tests with the same parameter grids as
+# test/run_*.py. Unlike the Truffle runners, there is no network to restart
+# between configurations, so every configuration runs in-process and the
+# configurations are distributed over a process pool.
+#
+# Usage:
+#   ./grid_runner.py                        # Run all the grids.
+#   ./grid_runner.py oracle_unittest -j 4   # Run one grid with 4 processes.
+#
+# The Truffle-only run_acb_upgrade.py grid has no counterpart because the
+# Python model does not have upgradeable contracts. acb_service_unittest,
+# acb_snapshot_unittest, acb_events_unittest, arithmetic_unittest,
+# acb_optimizer_unittest, acb_sweep_unittest, acb_cache_unittest,
+# acb_queue_unittest, acb_variance_unittest, acb_replication_unittest,
+# acb_genesis_unittest, acb_ingest_unittest, acb_state_hash_unittest and
+# acb_history_unittest have no Truffle counterpart.
+# acb_trace_unittest checks the Python half of test/run_trace_replay.py, which
+# replays the same traces against the contracts.
+#-------------------------------------------------------------------------------
+
+# Each grid yields jobs. A job is a tuple of (module name, class name,
+# arguments passed to the constructor).
+
+def coin_bond_unittest_grid():
+    yield ("coin_bond_unittest", "CoinBondUnitTest", ())
+
+def logging_unittest_grid():
+    yield ("logging_unittest", "LoggingUnitTest", ())
+
+def oracle_unittest_grid():
+    yield ("oracle_unittest", "OracleUnitTest", (5, 1, 90, 100, 20, 2, 0))
+    for level_max in [2, 4, 9]:
+        for reclaim_threshold in [0, 1, level_max - 1]:
+            for proportional_reward_rate in [0, 90, 100]:
+                for tax in [0, 50]:
+                    for deposit in [0, 100]:
+                        for mode_level in [0, level_max // 2,
+                                           level_max - 1]:
+                            for other_level in [0, level_max // 2,
+                                                level_max - 1]:
+                                if other_level == mode_level:
+                                    continue
+                                yield ("oracle_unittest", "OracleUnitTest",
+                                       (level_max, reclaim_threshold,
+                                        proportional_reward_rate, tax,
+                                        deposit, mode_level, other_level))
+
+def oracle_simulator_grid():
+    yield ("oracle_simulator", "OracleSimulator", (5, 1, 90, 10, 10))
+    iteration = 40
+    for level_max in [2, 4, 9]:
+        for reclaim_threshold in [0, 1, level_max // 2, level_max - 1]:
+            for proportional_reward_rate in [0, 90, 100]:
+                for voter_count in [1, 20]:
+                    yield ("oracle_simulator", "OracleSimulator",
+                           (level_max, reclaim_threshold,
+                            proportional_reward_rate, voter_count, iteration))
+
+def bond_operation_unittest_grid():
+    yield ("bond_operation_unittest", "BondOperationUnitTest",
+           (996, 1000, 12, 2))
+    for (bond_price, bond_redemption_price) in [
+            (1, 3), (996, 1000), (1000, 1000)]:
+        for bond_redemption_period in [1, 6, 12]:
+            for bond_redeemable_period in [1, 6, 12]:
+                yield ("bond_operation_unittest", "BondOperationUnitTest",
+                       (bond_price, bond_redemption_price,
+                        bond_redemption_period, bond_redeemable_period))
+
+def open_market_operation_unittest_grid():
+    yield ("open_market_operation_unittest", "OpenMarketOperationUnitTest",
+           (28800, 15, 3))
+    for price_change_interval in [1, 8 * 60 * 60]:
+        for price_change_percentage in [0, 1, 15, 50, 99, 100]:
+            for price_multiplier in [1, 3, 100]:
+                yield ("open_market_operation_unittest",
+                       "OpenMarketOperationUnitTest",
+                       (price_change_interval, price_change_percentage,
+                        price_multiplier))
+
+def acb_unittest_grid():
+    yield ("acb_unittest", "ACBUnitTest",
+           (996, 1000, 12, 2, 604800, 90, 10, 10, [1, 11, 20], 1, 12345,
+            28800, 20, 3))
+    for (bond_price, bond_redemption_price) in [(996, 1000)]:
+        for bond_redemption_period in [1, 12]:
+            for bond_redeemable_period in [1, 12]:
+                for epoch_duration in [7 * 24 * 60 * 60]:
+                    for proportional_reward_rate in [0, 90, 100]:
+                        for deposit_rate in [0, 10, 100]:
+                            for damping_factor in [10, 100]:
+                                for level_to_exchange_rate in [
+                                        [0, 1, 10, 11, 12],
+                                        [6, 7, 8, 9, 10, 11, 12, 13, 14]]:
+                                    for reclaim_threshold in [1, len(
+                                            level_to_exchange_rate) - 1]:
+                                        tax = 12345
+                                        price_change_interval = (
+                                            epoch_duration // 21) + 1
+                                        price_change_percentage = 20
+                                        price_multiplier = 3
+                                        yield ("acb_unittest", "ACBUnitTest",
+                                               (bond_price,
+                                                bond_redemption_price,
+                                                bond_redemption_period,
+                                                bond_redeemable_period,
+                                                epoch_duration,
+                                                proportional_reward_rate,
+                                                deposit_rate,
+                                                damping_factor,
+                                                level_to_exchange_rate,
+                                                reclaim_threshold,
+                                                tax,
+                                                price_change_interval,
+                                                price_change_percentage,
+                                                price_multiplier))
+
+def acb_simulator_grid():
+    yield ("acb_simulator", "ACBSimulator",
+           (996, 1000, 12, 2, 604800, 90, 10, 10,
+            [6, 7, 8, 9, 10, 11, 12, 13, 14], 1, 28800, 20, 3, 40, 40))
+    iteration = 40
+    for (bond_price, bond_redemption_price) in [(996, 1000)]:
+        for bond_redemption_period in [1, 12]:
+            for bond_redeemable_period in [1, 12]:
+                for epoch_duration in [7 * 24 * 60 * 60]:
+                    for proportional_reward_rate in [0, 90, 100]:
+                        for deposit_rate in [0, 10, 100]:
+                            for damping_factor in [10, 100]:
+                                for level_to_exchange_rate in [
+                                        [0, 1, 10, 11, 12],
+                                        [6, 7, 8, 9, 10, 11, 12, 13, 14]]:
+                                    for reclaim_threshold in [1, len(
+                                            level_to_exchange_rate) - 1]:
+                                        price_change_interval = (
+                                            epoch_duration // 21 + 1)
+                                        price_change_percentage = 20
+                                        price_multiplier = 3
+                                        for voter_count in [40]:
+                                            yield ("acb_simulator",
+                                                   "ACBSimulator",
+                                                   (bond_price,
+                                                    bond_redemption_price,
+                                                    bond_redemption_period,
+                                                    bond_redeemable_period,
+                                                    epoch_duration,
+                                                    proportional_reward_rate,
+                                                    deposit_rate,
+                                                    damping_factor,
+                                                    level_to_exchange_rate,
+                                                    reclaim_threshold,
+                                                    price_change_interval,
+                                                    price_change_percentage,
+                                                    price_multiplier,
+                                                    voter_count,
+                                                    iteration))
+
+def acb_service_unittest_grid():
+    for max_batch in [1, 4, 1024]:
+        for use_unix_socket in [False, True]:
+            yield ("acb_service_unittest", "ACBServiceUnitTest",
+                   (max_batch, use_unix_socket))
+
+def acb_snapshot_unittest_grid():
+    for every_ops in [None, 1, 10, 100]:
+        for reader_count in [1, 4]:
+            yield ("acb_snapshot_unittest", "ACBSnapshotUnitTest",
+                   (every_ops, reader_count, 2000))
+
+def acb_events_unittest_grid():
+    for mean_interval in [60, 600]:
+        for gap_epochs in [0, 1, 4, 5, 100]:
+            yield ("acb_events_unittest", "ACBEventsUnitTest",
+                   (mean_interval, gap_epochs))
+
+def arithmetic_unittest_grid():
+    for bits in [8, 32, 52, 53, 64, 128, 256]:
+        yield ("arithmetic_unittest", "ArithmeticUnitTest", (bits,))
+
+def acb_optimizer_unittest_grid():
+    for processes in [1, 2]:
+        yield ("acb_optimizer_unittest", "ACBOptimizerUnitTest", (processes,))
+
+def acb_sweep_unittest_grid():
+    for processes in [1, 2]:
+        yield ("acb_sweep_unittest", "ACBSweepUnitTest", (processes,))
+
+def acb_cache_unittest_grid():
+    for voter_count in [1, 10]:
+        yield ("acb_cache_unittest", "ACBCacheUnitTest", (voter_count,))
+
+def acb_queue_unittest_grid():
+    for workers in [1, 3]:
+        yield ("acb_queue_unittest", "ACBQueueUnitTest", (workers,))
+
+def acb_variance_unittest_grid():
+    for processes in [1, 2]:
+        yield ("acb_variance_unittest", "ACBVarianceUnitTest", (processes,))
+
+def acb_replication_unittest_grid():
+    for processes in [1, 2]:
+        yield ("acb_replication_unittest", "ACBReplicationUnitTest",
+               (processes,))
+
+def acb_genesis_unittest_grid():
+    for processes in [1, 3]:
+        yield ("acb_genesis_unittest", "ACBGenesisUnitTest", (processes,))
+
+def acb_ingest_unittest_grid():
+    for account_count in [0, 1, 10]:
+        for checkpoint_every in [1, 7, 100000]:
+            yield ("acb_ingest_unittest", "ACBIngestUnitTest",
+                   (account_count, checkpoint_every))
+
+def acb_state_hash_unittest_grid():
+    for voter_count in [0, 1, 20]:
+        yield ("acb_state_hash_unittest", "ACBStateHashUnitTest",
+               (voter_count,))
+
+def acb_history_unittest_grid():
+    for account_count in [1, 10]:
+        for retention in [None, 1, 3]:
+            yield ("acb_history_unittest", "ACBHistoryUnitTest",
+                   (account_count, retention))
+
+def acb_trace_unittest_grid():
+    for voter_count in [1, 10]:
+        for seed in [0, 1]:
+            yield ("acb_trace_unittest", "ACBTraceUnitTest",
+                   (voter_count, seed))
+
+GRIDS = {
+    "coin_bond_unittest": coin_bond_unittest_grid,
+    "logging_unittest": logging_unittest_grid,
+    "oracle_unittest": oracle_unittest_grid,
+    "oracle_simulator": oracle_simulator_grid,
+    "bond_operation_unittest": bond_operation_unittest_grid,
+    "open_market_operation_unittest": open_market_operation_unittest_grid,
+    "acb_unittest": acb_unittest_grid,
+    "acb_simulator": acb_simulator_grid,
+    "acb_service_unittest": acb_service_unittest_grid,
+    "acb_snapshot_unittest": acb_snapshot_unittest_grid,
+    "acb_events_unittest": acb_events_unittest_grid,
+    "arithmetic_unittest": arithmetic_unittest_grid,
+    "acb_optimizer_unittest": acb_optimizer_unittest_grid,
+    "acb_sweep_unittest": acb_sweep_unittest_grid,
+    "acb_cache_unittest": acb_cache_unittest_grid,
+    "acb_queue_unittest": acb_queue_unittest_grid,
+    "acb_variance_unittest": acb_variance_unittest_grid,
+    "acb_replication_unittest": acb_replication_unittest_grid,
+    "acb_genesis_unittest": acb_genesis_unittest_grid,
+    "acb_ingest_unittest": acb_ingest_unittest_grid,
+    "acb_state_hash_unittest": acb_state_hash_unittest_grid,
+    "acb_history_unittest": acb_history_unittest_grid,
+    "acb_trace_unittest": acb_trace_unittest_grid,
+}
+
+# Run one job and capture its output.
+#
+# Parameters
+# ----------------
+# |job|: A tuple of (module name, class name, arguments).
+#
+# Returns
+# ----------------
+# A tuple of four values:
+# - The job.
+# - boolean: Whether the job passed.
+# - The elapsed seconds.
+# - The captured output of the job.
+def run_job(job):
+    (module_name, class_name, args) = job
+    output = io.StringIO()
+    passed = True
+    start = time.time()
+    with contextlib.redirect_stdout(output):
+        try:
+            module = importlib.import_module(module_name)
+            test = getattr(module, class_name)(*args)
+            test.run()
+            test.teardown()
+        except Exception:
+            passed = False
+            output.write(traceback.format_exc())
+    return (job, passed, time.time() - start, output.getvalue())
+
+# Run the jobs of the grids in a process pool and print a report.
+#
+# Parameters
+# ----------------
+# |grid_names|: The names of the grids to run.
+# |processes|: The number of worker processes.
+#
+# Returns
+# ----------------
+# The number of failed jobs.
+def run_grids(grid_names, processes):
+    jobs = []
+    for grid_name in grid_names:
+        jobs.extend(GRIDS[grid_name]())
+
+    passed_count = {}
+    failed_count = {}
+    elapsed = {}
+    start = time.time()
+    # The workers of ProcessPoolExecutor are not daemonic, so jobs can start
+    # their own worker processes.
+    with concurrent.futures.ProcessPoolExecutor(processes) as pool:
+        for (job, passed, seconds, output) in pool.map(run_job, jobs):
+            module_name = job[0]
+            sys.stdout.write(output)
+            if passed:
+                passed_count[module_name] = (
+                    passed_count.get(module_name, 0) + 1)
+            else:
+                print("FAILED: %s%s" % (job[1], job[2]), file=sys.stderr)
+                failed_count[module_name] = (
+                    failed_count.get(module_name, 0) + 1)
+            elapsed[module_name] = elapsed.get(module_name, 0) + seconds
+            sys.stdout.flush()
+
+    print("================", file=sys.stderr)
+    for grid_name in grid_names:
+        print("%s: passed=%d failed=%d cpu_time=%.1fs" %
+              (grid_name, passed_count.get(grid_name, 0),
+               failed_count.get(grid_name, 0), elapsed.get(grid_name, 0)),
+              file=sys.stderr)
+    print("total: jobs=%d failed=%d wall_time=%.1fs" %
+          (len(jobs), sum(failed_count.values()), time.time() - start),
+          file=sys.stderr)
+    return sum(failed_count.values())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("grids", nargs="*",
+                        help="the grids to run (default: all): " +
+                        ", ".join(GRIDS))
+    parser.add_argument("-j", "--processes", type=int,
+                        default=multiprocessing.cpu_count(),
+                        help="the number of worker processes")
+    args = parser.parse_args()
+    grid_names = args.grids if args.grids else list(GRIDS)
+    for grid_name in grid_names:
+        if grid_name not in GRIDS:
+            parser.error("unknown grid: " + grid_name)
+    sys.exit(1 if run_grids(grid_names, args.processes) else 0)
+
+
+if __name__ == "__main__":
+    main()
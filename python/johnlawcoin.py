@@ -5,7 +5,7 @@
 # This software is released under the MIT License.
 # http://opensource.org/licenses/mit-license.php
 
-import hashlib, random
+import bisect, functools, hashlib, random
 
 #-------------------------------------------------------------------------------
 # [Overview]
@@ -48,6 +48,162 @@ import hashlib, random
 # (https://github.com/xharaken/john-law-coin).
 #-------------------------------------------------------------------------------
 
+#-------------------------------------------------------------------------------
+# [Integer arithmetic]
+#
+# Python only. The contracts compute with uint / int and every division
+# truncates toward zero. The model computes with Python ints in the same way:
+# a division of non-negative values uses // and a division that can involve
+# negative values uses truncated_div(). Dividing through floats (int(a / b))
+# gives the same result only while the values fit in 53 bits.
+#-------------------------------------------------------------------------------
+
+# Return |a| / |b| truncated toward zero as Solidity does for int.
+def truncated_div(a, b):
+    if (a < 0) == (b < 0):
+        return a // b
+    return -(-a // b)
+
+
+#-------------------------------------------------------------------------------
+# [State hashes]
+#
+# Python only. Every ledger keeps a hash of its state so that two models can
+# be compared in O(1) instead of walking every mapping. The hash of a ledger
+# is the sum of the hashes of its entries modulo 2^256, so it does not depend
+# on the order of the entries and is updated in O(1) when an entry changes.
+# The hash of an entry of a balance mapping is entry_hash(key) * balance, so
+# minting or burning |amount| adds or subtracts entry_hash(key) * |amount|
+# without looking up the old balance. Two different states collide with a
+# negligible probability.
+#
+# A ledger starts maintaining its hash when its state_hash() is called for
+# the first time, which walks the mapping once. Until then, mint and burn do
+# not pay for the hash.
+#
+# ACB.state_hash() combines the hashes of all the contracts. The accounts the
+# contracts generate with random names (the tax account and the deposit and
+# reward accounts of the oracle) are hashed by their roles, so the models of
+# different processes or different engines have the same hash for the same
+# state.
+#-------------------------------------------------------------------------------
+
+STATE_HASH_MODULUS = 2 ** 256
+
+# Return the hash of an entry identified by |key| as an integer.
+@functools.lru_cache(maxsize=1 << 16)
+def entry_hash(*key):
+    return int.from_bytes(hashlib.sha256(repr(key).encode()).digest(), "big")
+
+# Return the hashes of the deposit, the oracle level, the phase and the epoch
+# ID of the commit entry of |sender| in the Epoch object at |epoch_index|.
+@functools.lru_cache(maxsize=1 << 16)
+def commit_field_hashes(epoch_index, sender):
+    return tuple([entry_hash("commit", epoch_index, sender, field)
+                  for field in ["deposit", "oracle_level", "phase",
+                                "epoch_id"]])
+
+
+#-------------------------------------------------------------------------------
+# [Versioned ledgers]
+#
+# Python only. JohnLawCoin and JohnLawBond can record the history of their
+# balances so that the balance of an account at a past epoch is answered
+# without running the model again. The recording is off by default and is
+# turned on by ACB.record_history().
+#
+# A LedgerHistory keeps a checkpoint, which is the balances at the end of
+# |checkpoint_epoch|, and for every key changed after the checkpoint the list
+# of the epochs in which it changed and its balance at the end of each of
+# them. A query bisects the list of the key, so it takes O(log changes). With
+# |retention|, the changes older than |retention| epochs are folded into the
+# checkpoint once they span 2 * |retention| epochs, so the memory stays
+# bounded for long histories and the queries for the epochs older than the
+# checkpoint are no longer answered.
+#-------------------------------------------------------------------------------
+
+class LedgerHistory:
+    # Parameters
+    # ----------------
+    # |epoch|: The current epoch. The balances recorded from now on belong to
+    # this epoch.
+    # |balances|: A dict from the keys to the current balances.
+    # |retention|: The number of the past epochs to be kept. None keeps all
+    # the epochs.
+    def __init__(self, epoch, balances, retention=None):
+        assert(retention is None or retention >= 1)
+        self.epoch = epoch
+        self.retention = retention
+        # The epoch of the checkpoint. The balances at the end of the epochs
+        # in [|checkpoint_epoch|, |epoch|] can be queried.
+        self.checkpoint_epoch = epoch
+        # The balances at the end of |checkpoint_epoch| except for the keys
+        # in |changes|, for which they are the balances before their first
+        # change.
+        self.checkpoint = dict(balances)
+        # changes[key] is a pair of the ascending list of the epochs in which
+        # the balance of |key| changed and the list of the balances at the
+        # end of those epochs.
+        self.changes = {}
+
+    # Record that the balance of |key| is now |balance|.
+    def record(self, key, balance):
+        changes = self.changes.get(key)
+        if changes is None:
+            self.changes[key] = ([self.epoch], [balance])
+            return
+        (epochs, balances) = changes
+        if epochs[-1] == self.epoch:
+            balances[-1] = balance
+        else:
+            epochs.append(self.epoch)
+            balances.append(balance)
+
+    # Start recording the balances of |epoch|. Compacts the history if it
+    # spans more than 2 * |retention| epochs.
+    def advance(self, epoch):
+        assert(epoch >= self.epoch)
+        self.epoch = epoch
+        if (self.retention is not None and
+            epoch - self.checkpoint_epoch >= 2 * self.retention):
+            self.compact(epoch - self.retention)
+
+    # Fold the changes until the end of |epoch| into the checkpoint.
+    def compact(self, epoch):
+        assert(self.checkpoint_epoch <= epoch and epoch <= self.epoch)
+        for key in list(self.changes.keys()):
+            (epochs, balances) = self.changes[key]
+            index = bisect.bisect_right(epochs, epoch)
+            if index == 0:
+                continue
+            if balances[index - 1] == 0:
+                self.checkpoint.pop(key, None)
+            else:
+                self.checkpoint[key] = balances[index - 1]
+            if index == len(epochs):
+                del self.changes[key]
+            else:
+                del epochs[:index]
+                del balances[:index]
+        self.checkpoint_epoch = epoch
+
+    # Return the balance of |key| at the end of |epoch|. The balance of the
+    # current epoch is the current balance.
+    def balance_at(self, key, epoch):
+        assert(self.checkpoint_epoch <= epoch and epoch <= self.epoch)
+        changes = self.changes.get(key)
+        if changes is not None:
+            index = bisect.bisect_right(changes[0], epoch)
+            if index > 0:
+                return changes[1][index - 1]
+        return self.checkpoint.get(key, 0)
+
+    # Return the number of the recorded changes.
+    def change_count(self):
+        return sum([len(epochs) for (epochs, balances)
+                    in self.changes.values()])
+
+
 #-------------------------------------------------------------------------------
 # [JohnLawCoin contract]
 #
@@ -62,9 +218,26 @@ class JohnLawCoin:
         JohnLawCoin.TAX_RATE = 1
         
         # The mapping from the user account to the coin balance.
+        #
+        # Python only: Accounts with a zero balance are evicted from the
+        # mapping. Otherwise the deposit, reward and tax accounts the ACB
+        # regenerates every epoch would stay in the mapping forever.
         self.balances = {}
         # The total coin supply.
         self.total_supply = 0
+        # Python only: The number of times accounts were evicted from
+        # |balances|.
+        self.evicted_count = 0
+        # Python only: The state hash of |balances|, or None until
+        # state_hash() is called.
+        self.balances_hash = None
+        # Python only: The LedgerHistory of |balances|, or None if it is not
+        # recorded. See record_history().
+        self.history = None
+        # Python only: The set of the accounts whose balances changed since
+        # the last snapshot, or None if the changes are not tracked. See
+        # acb_snapshot.py.
+        self.changed_accounts = None
         # The account to which the tax is sent.
         self.tax_account = "tax" + str(random.random())
 
@@ -83,10 +256,16 @@ class JohnLawCoin:
     # None.
     def mint(self, account, amount):
         assert(amount >= 0)
-        if account not in self.balances:
-            self.balances[account] = 0
-        self.balances[account] += amount
+        if amount == 0:
+            return
+        self.balances[account] = self.balances.get(account, 0) + amount
         self.total_supply += amount
+        if self.balances_hash is not None:
+            self.balances_hash += entry_hash("coin", account) * amount
+        if self.history is not None:
+            self.history.record(account, self.balances[account])
+        if self.changed_accounts is not None:
+            self.changed_accounts.add(account)
 
     # Burn coins from one account.
     #
@@ -100,12 +279,92 @@ class JohnLawCoin:
     # None.
     def burn(self, account, amount):
         assert(amount >= 0)
-        if account not in self.balances:
-            self.balances[account] = 0
-        assert(self.balances[account] >= amount)
-        self.balances[account] -= amount
+        balance = self.balances.get(account, 0)
+        assert(balance >= amount)
+        if amount == 0:
+            return
+        if balance == amount:
+            del self.balances[account]
+            self.evicted_count += 1
+        else:
+            self.balances[account] = balance - amount
         assert(self.total_supply >= amount)
         self.total_supply -= amount
+        if self.balances_hash is not None:
+            self.balances_hash -= entry_hash("coin", account) * amount
+        if self.history is not None:
+            self.history.record(account, self.balance_of(account))
+        if self.changed_accounts is not None:
+            self.changed_accounts.add(account)
+
+    # Python only.
+    #
+    # Mint coins to many accounts and update the total supply once.
+    #
+    # Parameters
+    # ----------------
+    # |amounts|: A dict from the accounts to the amounts to be minted.
+    #
+    # Returns
+    # ----------------
+    # None.
+    def mint_many(self, amounts):
+        total = 0
+        for (account, amount) in amounts.items():
+            assert(amount >= 0)
+            if amount == 0:
+                continue
+            self.balances[account] = self.balances.get(account, 0) + amount
+            total += amount
+        self.total_supply += total
+        if self.balances_hash is not None:
+            self.balances_hash += sum([
+                entry_hash("coin", account) * amount
+                for (account, amount) in amounts.items()])
+        if self.history is not None:
+            for (account, amount) in amounts.items():
+                if amount > 0:
+                    self.history.record(account, self.balance_of(account))
+        if self.changed_accounts is not None:
+            self.changed_accounts.update(amounts)
+
+    # Python only.
+    #
+    # Burn coins from many accounts and update the total supply once.
+    #
+    # Parameters
+    # ----------------
+    # |amounts|: A dict from the accounts to the amounts to be burned.
+    #
+    # Returns
+    # ----------------
+    # None.
+    def burn_many(self, amounts):
+        total = 0
+        for (account, amount) in amounts.items():
+            assert(amount >= 0)
+            balance = self.balances.get(account, 0)
+            assert(balance >= amount)
+            if amount == 0:
+                continue
+            if balance == amount:
+                del self.balances[account]
+                self.evicted_count += 1
+            else:
+                self.balances[account] = balance - amount
+            total += amount
+        assert(self.total_supply >= total)
+        self.total_supply -= total
+        if self.balances_hash is not None:
+            self.balances_hash -= sum([
+                entry_hash("coin", account) * amount
+                for (account, amount) in amounts.items()])
+        if self.history is not None:
+            for (account, amount) in amounts.items():
+                if amount > 0:
+                    self.history.record(account, self.balance_of(account))
+        if self.changed_accounts is not None:
+            self.changed_accounts.update(amounts)
 
     # Move coins from one account to another account. This method can be used
     # only by the ACB and its oracle. Coin holders should use ERC20's transfer
@@ -131,6 +390,36 @@ class JohnLawCoin:
             return 0
         return self.balances[account]
 
+    # Python only: Return the number of accounts with a non-zero balance.
+    def live_account_count(self):
+        return len(self.balances)
+
+    # Python only: Return the state hash of the balances. The tax account is
+    # hashed by its name. See ACB.state_hash().
+    def state_hash(self):
+        if self.balances_hash is None:
+            self.balances_hash = sum([
+                entry_hash("coin", account) * balance
+                for (account, balance) in self.balances.items()])
+        return self.balances_hash % STATE_HASH_MODULUS
+
+    # Python only: Start recording the history of the balances from |epoch|.
+    # See LedgerHistory.
+    def record_history(self, epoch, retention=None):
+        self.history = LedgerHistory(epoch, self.balances, retention)
+
+    # Python only: Start recording the balances of |epoch| if the history is
+    # recorded.
+    def advance_history(self, epoch):
+        if self.history is not None:
+            self.history.advance(epoch)
+
+    # Python only: Return the coin balance of |account| at the end of
+    # |epoch|. Requires record_history().
+    def balance_of_at(self, account, epoch):
+        assert(self.history is not None)
+        return self.history.balance_at(account, epoch)
+
     # Reset the tax account. Only the ACB can call this method.
     def reset_tax_account(self):
         old_tax_account = self.tax_account
@@ -149,9 +438,8 @@ class JohnLawCoin:
     # ----------------
     # None.
     def transfer(self, sender, receiver, amount):
-        assert(sender in self.balances)
-        assert(self.balances[sender] >= amount)
-        tax = int(amount * JohnLawCoin.TAX_RATE / 100)
+        assert(self.balance_of(sender) >= amount)
+        tax = amount * JohnLawCoin.TAX_RATE // 100
         self.move(sender, self.tax_account, tax)
         self.move(sender, receiver, amount - tax)
 
@@ -171,7 +459,8 @@ class JohnLawBond:
         self.bonds = {}
 
         # _redemption_epochs[account] is a set of the redemption epochs of the
-        # bonds owned by the |account|.
+        # bonds owned by the |account|. Python only: The set is a sorted list
+        # so that redemption_epochs_in_range() can bisect it.
         self.redemption_epochs = {}
 
         # _bond_count[account] is the number of the bonds owned by the
@@ -185,6 +474,24 @@ class JohnLawBond:
         # The total bond supply.
         self.total_supply = 0
 
+        # Python only: The mappings above do not keep entries for zero
+        # balances.
+
+        # Python only: The state hash of |bonds|, or None until state_hash()
+        # is called. The other mappings are derived from |bonds|.
+        self.bonds_hash = None
+
+        # Python only: The LedgerHistory of |bonds| keyed by the (account,
+        # redemption epoch) pairs and the one of |bond_count|, or None if they
+        # are not recorded. See record_history().
+        self.history = None
+        self.count_history = None
+
+        # Python only: The set of the (account, redemption epoch) pairs whose
+        # bonds changed since the last snapshot, or None if the changes are
+        # not tracked. See acb_snapshot.py.
+        self.changed_bonds = None
+
     # Mint bonds to one account.
     #
     # Parameters
@@ -198,23 +505,30 @@ class JohnLawBond:
     # None.
     def mint(self, account, redemption_epoch, amount):
         assert(amount >= 0)
+        if amount == 0:
+            return
         if account not in self.bonds:
             self.bonds[account] = {}
+            self.redemption_epochs[account] = []
             self.bond_count[account] = 0
-        if redemption_epoch not in self.bonds[account]:
-            self.bonds[account][redemption_epoch] = 0
-        if redemption_epoch not in self.bond_supply:
-            self.bond_supply[redemption_epoch] = 0
-        self.bonds[account][redemption_epoch] += amount
+        bonds = self.bonds[account]
+        if redemption_epoch not in bonds:
+            bonds[redemption_epoch] = 0
+            bisect.insort(self.redemption_epochs[account], redemption_epoch)
+        bonds[redemption_epoch] += amount
         self.total_supply += amount
         self.bond_count[account] += amount
-        self.bond_supply[redemption_epoch] += amount
-
-        if account not in self.redemption_epochs:
-            self.redemption_epochs[account] = {}
-        if (self.bonds[account][redemption_epoch] > 0 and
-            redemption_epoch not in self.redemption_epochs[account]):
-            self.redemption_epochs[account][redemption_epoch] = True
+        if self.bonds_hash is not None:
+            self.bonds_hash += (
+                entry_hash("bond", account, redemption_epoch) * amount)
+        if self.history is not None:
+            self.history.record((account, redemption_epoch),
+                                bonds[redemption_epoch])
+            self.count_history.record(account, self.bond_count[account])
+        if self.changed_bonds is not None:
+            self.changed_bonds.add((account, redemption_epoch))
+        self.bond_supply[redemption_epoch] = (
+            self.bond_supply.get(redemption_epoch, 0) + amount)
 
     # Burn bonds from one account.
     #
@@ -229,27 +543,181 @@ class JohnLawBond:
     # None.
     def burn(self, account, redemption_epoch, amount):
         assert(amount >= 0)
-        if account not in self.bonds:
-            self.bonds[account] = {}
-            self.bond_count[account] = 0
-        if redemption_epoch not in self.bonds[account]:
-            self.bonds[account][redemption_epoch] = 0
-        if redemption_epoch not in self.bond_supply:
-            self.bond_supply[redemption_epoch] = 0
-        assert(self.bonds[account][redemption_epoch] >= amount)
-        self.bonds[account][redemption_epoch] -= amount
+        assert(self.balance_of(account, redemption_epoch) >= amount)
+        if amount == 0:
+            return
+        bonds = self.bonds[account]
+        bonds[redemption_epoch] -= amount
+        if bonds[redemption_epoch] == 0:
+            del bonds[redemption_epoch]
+            epochs = self.redemption_epochs[account]
+            del epochs[bisect.bisect_left(epochs, redemption_epoch)]
+        if self.bonds_hash is not None:
+            self.bonds_hash -= (
+                entry_hash("bond", account, redemption_epoch) * amount)
         assert(self.total_supply >= amount)
         self.total_supply -= amount
         assert(self.bond_count[account] >= amount)
         self.bond_count[account] -= amount
+        if self.bond_count[account] == 0:
+            del self.bonds[account]
+            del self.redemption_epochs[account]
+            del self.bond_count[account]
         assert(self.bond_supply[redemption_epoch] >= amount)
         self.bond_supply[redemption_epoch] -= amount
+        if self.bond_supply[redemption_epoch] == 0:
+            del self.bond_supply[redemption_epoch]
+        if self.history is not None:
+            self.history.record((account, redemption_epoch),
+                                self.balance_of(account, redemption_epoch))
+            self.count_history.record(account,
+                                      self.number_of_bonds_owned_by(account))
+        if self.changed_bonds is not None:
+            self.changed_bonds.add((account, redemption_epoch))
 
-        if account not in self.redemption_epochs:
-            self.redemption_epochs[account] = {}
-        if (self.bonds[account][redemption_epoch] == 0 and
-            redemption_epoch in self.redemption_epochs[account]):
-            del self.redemption_epochs[account][redemption_epoch]
+    # Python only.
+    #
+    # Mint bonds of one redemption epoch to many accounts and update the
+    # supplies once.
+    #
+    # Parameters
+    # ----------------
+    # |redemption_epoch|: The redemption epoch of the bonds.
+    # |amounts|: A dict from the accounts to the amounts to be minted.
+    #
+    # Returns
+    # ----------------
+    # None.
+    def mint_many(self, redemption_epoch, amounts):
+        total = 0
+        for (account, amount) in amounts.items():
+            assert(amount >= 0)
+            if amount == 0:
+                continue
+            if account not in self.bonds:
+                self.bonds[account] = {}
+                self.redemption_epochs[account] = []
+                self.bond_count[account] = 0
+            bonds = self.bonds[account]
+            if redemption_epoch not in bonds:
+                bonds[redemption_epoch] = 0
+                bisect.insort(self.redemption_epochs[account],
+                              redemption_epoch)
+            bonds[redemption_epoch] += amount
+            self.bond_count[account] += amount
+            total += amount
+        if total == 0:
+            return
+        self.total_supply += total
+        if self.bonds_hash is not None:
+            self.bonds_hash += sum([
+                entry_hash("bond", account, redemption_epoch) * amount
+                for (account, amount) in amounts.items()])
+        if self.history is not None:
+            for (account, amount) in amounts.items():
+                if amount > 0:
+                    self.history.record(
+                        (account, redemption_epoch),
+                        self.bonds[account][redemption_epoch])
+                    self.count_history.record(account,
+                                              self.bond_count[account])
+        if self.changed_bonds is not None:
+            self.changed_bonds.update([(account, redemption_epoch)
+                                       for account in amounts])
+        self.bond_supply[redemption_epoch] = (
+            self.bond_supply.get(redemption_epoch, 0) + total)
+
+    # Python only.
+    #
+    # Burn bonds from many accounts and update the supplies once per
+    # redemption epoch.
+    #
+    # Parameters
+    # ----------------
+    # |amounts|: A dict from the (account, redemption epoch) pairs to the
+    # amounts to be burned.
+    #
+    # Returns
+    # ----------------
+    # None.
+    def burn_many(self, amounts):
+        totals = {}
+        for ((account, redemption_epoch), amount) in amounts.items():
+            assert(amount >= 0)
+            assert(self.balance_of(account, redemption_epoch) >= amount)
+            if amount == 0:
+                continue
+            bonds = self.bonds[account]
+            bonds[redemption_epoch] -= amount
+            if bonds[redemption_epoch] == 0:
+                del bonds[redemption_epoch]
+                epochs = self.redemption_epochs[account]
+                del epochs[bisect.bisect_left(epochs, redemption_epoch)]
+            self.bond_count[account] -= amount
+            if self.bond_count[account] == 0:
+                del self.bonds[account]
+                del self.redemption_epochs[account]
+                del self.bond_count[account]
+            totals[redemption_epoch] = totals.get(redemption_epoch, 0) + amount
+        if self.bonds_hash is not None:
+            self.bonds_hash -= sum([
+                entry_hash("bond", account, redemption_epoch) * amount
+                for ((account, redemption_epoch), amount) in amounts.items()])
+        if self.history is not None:
+            for ((account, redemption_epoch), amount) in amounts.items():
+                if amount > 0:
+                    self.history.record(
+                        (account, redemption_epoch),
+                        self.balance_of(account, redemption_epoch))
+                    self.count_history.record(
+                        account, self.number_of_bonds_owned_by(account))
+        if self.changed_bonds is not None:
+            self.changed_bonds.update(amounts)
+        for (redemption_epoch, total) in totals.items():
+            assert(self.total_supply >= total)
+            self.total_supply -= total
+            assert(self.bond_supply[redemption_epoch] >= total)
+            self.bond_supply[redemption_epoch] -= total
+            if self.bond_supply[redemption_epoch] == 0:
+                del self.bond_supply[redemption_epoch]
+
+    # Python only: Return the state hash of the bonds.
+    def state_hash(self):
+        if self.bonds_hash is None:
+            self.bonds_hash = sum([
+                entry_hash("bond", account, redemption_epoch) * amount
+                for (account, bonds) in self.bonds.items()
+                for (redemption_epoch, amount) in bonds.items()])
+        return self.bonds_hash % STATE_HASH_MODULUS
+
+    # Python only: Start recording the history of the bonds from |epoch|.
+    # See LedgerHistory.
+    def record_history(self, epoch, retention=None):
+        self.history = LedgerHistory(epoch, {
+            (account, redemption_epoch): amount
+            for (account, bonds) in self.bonds.items()
+            for (redemption_epoch, amount) in bonds.items()}, retention)
+        self.count_history = LedgerHistory(epoch, self.bond_count, retention)
+
+    # Python only: Start recording the bonds of |epoch| if the history is
+    # recorded.
+    def advance_history(self, epoch):
+        if self.history is not None:
+            self.history.advance(epoch)
+            self.count_history.advance(epoch)
+
+    # Python only: Return the number of the bonds owned by the |account| that
+    # become redeemable at |redemption_epoch| at the end of |epoch|. Requires
+    # record_history().
+    def balance_of_at(self, account, redemption_epoch, epoch):
+        assert(self.history is not None)
+        return self.history.balance_at((account, redemption_epoch), epoch)
+
+    # Python only: Return the number of the bonds owned by the |account| at
+    # the end of |epoch|. Requires record_history().
+    def number_of_bonds_owned_by_at(self, account, epoch):
+        assert(self.count_history is not None)
+        return self.count_history.balance_at(account, epoch)
 
     # Public getter: Return the number of the bonds owned by the |account|.
     def number_of_bonds_owned_by(self, account):
@@ -270,7 +738,30 @@ class JohnLawBond:
     def get_redemption_epoch_owned_by(self, account, index):
         assert(0 <= index and
                index < self.number_of_redemption_epochs_owned_by(account))
-        return list(self.redemption_epochs[account].keys())[index]
+        return self.redemption_epochs[account][index]
+
+    # Python only.
+    #
+    # Return the redemption epochs of the bonds owned by the |account| that are
+    # in [|start|, |end|) in ascending order.
+    #
+    # Parameters
+    # ----------------
+    # |account|: The account.
+    # |start|: The first redemption epoch. None means no lower bound.
+    # |end|: The redemption epoch after the last one. None means no upper
+    # bound.
+    #
+    # Returns
+    # ----------------
+    # A new list of the redemption epochs.
+    def redemption_epochs_in_range(self, account, start, end):
+        if account not in self.redemption_epochs:
+            return []
+        epochs = self.redemption_epochs[account]
+        first = 0 if start is None else bisect.bisect_left(epochs, start)
+        last = len(epochs) if end is None else bisect.bisect_left(epochs, end)
+        return epochs[first:last]
 
     # Public getter: Return the number of the bonds owned by the |account| that
     # become redeemable at |redemption_epoch|.
@@ -408,6 +899,18 @@ class Oracle:
         # distinguishable from an uninitialized commit entry in Solidity.
         self.epoch_id = 3
 
+        # Python only. If True, advance() pays out the deposits and rewards of
+        # the epoch that moves to the reclaim phase at once with settle().
+        self.settle_on_advance = False
+
+        # Python only. The payouts of the last settle(): a dict from the
+        # voters to a tuple of (reclaimed coins, reward).
+        self.settlements = {}
+
+        # Python only. The state hash of the commit entries of all the Epoch
+        # objects, or None until state_hash() is called. See commit_hash().
+        self.commits_hash = None
+
     # Test only.
     def override_constants_for_testing(
             self, level_max, reclaim_threshold, proportional_reward_rate):
@@ -453,10 +956,14 @@ class Oracle:
             return False
 
         # Create a commit entry.
+        if self.commits_hash is not None and sender in epoch.commits:
+            self.commits_hash -= self.commit_hash(sender, epoch.commits[sender])
         epoch.commits[sender] = Oracle.Commit(
             hash, deposit, Oracle.LEVEL_MAX,
             Oracle.Phase.COMMIT, self.epoch_id)
         assert(epoch.commits[sender].phase == Oracle.Phase.COMMIT)
+        if self.commits_hash is not None:
+            self.commits_hash += self.commit_hash(sender, epoch.commits[sender])
 
         # Move the deposited coins to the deposit account.
         coin.move(sender, epoch.deposit_account, deposit)
@@ -487,6 +994,8 @@ class Oracle:
         if epoch.commits[sender].phase != Oracle.Phase.COMMIT:
             return False
         epoch.commits[sender].phase = Oracle.Phase.REVEAL
+        self.rehash_commit(sender, epoch.commits[sender], 2,
+                           Oracle.Phase.REVEAL - Oracle.Phase.COMMIT)
 
         # Check if the committed hash matches the revealed level and salt.
         reveal_hash = self.encrypt(sender, oracle_level, salt)
@@ -496,6 +1005,8 @@ class Oracle:
 
         # Update the commit entry with the revealed level.
         epoch.commits[sender].oracle_level = oracle_level
+        self.rehash_commit(sender, epoch.commits[sender], 1,
+                           oracle_level - Oracle.LEVEL_MAX)
 
         # Count up the vote.
         epoch.votes[oracle_level].deposit += epoch.commits[sender].deposit
@@ -529,6 +1040,8 @@ class Oracle:
             return (0, 0)
 
         epoch.commits[sender].phase = Oracle.Phase.RECLAIM
+        self.rehash_commit(sender, epoch.commits[sender], 2,
+                           Oracle.Phase.RECLAIM - Oracle.Phase.REVEAL)
         deposit = epoch.commits[sender].deposit
         oracle_level = epoch.commits[sender].oracle_level
         if oracle_level == Oracle.LEVEL_MAX:
@@ -556,16 +1069,87 @@ class Oracle:
             # incentivizes more voters (including new voters) to join the
             # oracle.
             if epoch.votes[oracle_level].deposit > 0:
-                reward += int(
+                reward += (
                     Oracle.PROPORTIONAL_REWARD_RATE *
-                    epoch.reward_total * deposit /
+                    epoch.reward_total * deposit //
                     (100 * epoch.votes[oracle_level].deposit))
-            reward += int(
-                ((100 - Oracle.PROPORTIONAL_REWARD_RATE) * epoch.reward_total) /
-                (100 * epoch.votes[oracle_level].count))
+            reward += (
+                (100 - Oracle.PROPORTIONAL_REWARD_RATE) *
+                epoch.reward_total // (100 * epoch.votes[oracle_level].count))
             coin.move(epoch.reward_account, sender, reward)
         return (deposit, reward)
 
+    # Python only.
+    #
+    # Reclaim the deposited coins and the rewards of all the voters of the
+    # epoch in the reclaim phase at once. The eligibility and the reward
+    # coefficients are computed once per oracle level, and the coins are
+    # moved with one burn_many() and one mint_many(). Every voter gets the
+    # same amounts as reclaim() would give them, and reclaim() returns (0, 0)
+    # afterwards.
+    #
+    # Parameters
+    # ----------------
+    # |coin|: The JohnLawCoin contract.
+    #
+    # Returns
+    # ----------------
+    # A dict from the voters who reclaimed coins to a tuple of two values:
+    #  - uint: The amount of the reclaimed coins.
+    #  - uint: The amount of the reward.
+    def settle(self, coin):
+        epoch_id = self.epoch_id - 2
+        epoch = self.epochs[epoch_id % 3]
+        assert(epoch.phase == Oracle.Phase.RECLAIM)
+
+        # The reward of a voter who voted for |level| is
+        # proportional[level] * deposit // denominator[level] + constant[level].
+        proportional = [0] * Oracle.LEVEL_MAX
+        denominator = [1] * Oracle.LEVEL_MAX
+        constant = [0] * Oracle.LEVEL_MAX
+        for level in range(Oracle.LEVEL_MAX):
+            vote = epoch.votes[level]
+            if not vote.should_reward:
+                continue
+            assert(vote.should_reclaim and vote.count > 0)
+            if vote.deposit > 0:
+                proportional[level] = (
+                    Oracle.PROPORTIONAL_REWARD_RATE * epoch.reward_total)
+                denominator[level] = 100 * vote.deposit
+            constant[level] = (
+                (100 - Oracle.PROPORTIONAL_REWARD_RATE) *
+                epoch.reward_total // (100 * vote.count))
+
+        settlements = {}
+        payouts = {}
+        deposit_total = 0
+        reward_total = 0
+        for (sender, commit) in epoch.commits.items():
+            if (commit.epoch_id != epoch_id or
+                commit.phase != Oracle.Phase.REVEAL):
+                continue
+            commit.phase = Oracle.Phase.RECLAIM
+            self.rehash_commit(sender, commit, 2,
+                               Oracle.Phase.RECLAIM - Oracle.Phase.REVEAL)
+            level = commit.oracle_level
+            if (level == Oracle.LEVEL_MAX or
+                not epoch.votes[level].should_reclaim):
+                continue
+            deposit = commit.deposit
+            reward = 0
+            if epoch.votes[level].should_reward:
+                reward = (proportional[level] * deposit // denominator[level] +
+                          constant[level])
+            settlements[sender] = (deposit, reward)
+            payouts[sender] = deposit + reward
+            deposit_total += deposit
+            reward_total += reward
+
+        coin.burn_many({epoch.deposit_account: deposit_total,
+                        epoch.reward_account: reward_total})
+        coin.mint_many(payouts)
+        return settlements
+
     # Advance to the next phase. COMMIT => REVEAL, REVEAL => RECLAIM,
     # RECLAIM => COMMIT.
     #
@@ -631,6 +1215,11 @@ class Oracle:
         # Set the total amount of the reward.
         epoch.reward_total = coin.balance_of(epoch.reward_account)
 
+        # Python only: Settle the epoch in the settlement mode.
+        self.settlements = {}
+        if self.settle_on_advance:
+            self.settlements = self.settle(coin)
+
         # Step 3: Move the reclaim phase to the commit phase.
         epoch_index = self.epoch_id % 3
         epoch = self.epochs[epoch_index]
@@ -662,6 +1251,77 @@ class Oracle:
 
         return burned
 
+    # Python only.
+    #
+    # Skip |count| epochs in which no one votes. This is valid only when all
+    # the three Epoch objects are empty; i.e., there are no votes, deposits or
+    # rewards to settle. Then advance() only rotates the phases, which is
+    # done in closed form. Stale commit entries are ignored because their
+    # epoch IDs do not match the new epoch ID.
+    #
+    # Parameters
+    # ----------------
+    # |coin|: The JohnLawCoin contract.
+    # |count|: The number of epochs to skip.
+    #
+    # Returns
+    # ----------------
+    # None.
+    def skip_empty_epochs(self, coin, count):
+        assert(count >= 0)
+        for epoch in self.epochs:
+            for vote in epoch.votes:
+                assert(vote.deposit == 0 and vote.count == 0)
+                assert(not vote.should_reclaim and not vote.should_reward)
+            assert(coin.balance_of(epoch.deposit_account) == 0)
+            assert(coin.balance_of(epoch.reward_account) == 0)
+            assert(epoch.reward_total == 0)
+        assert(coin.balance_of(coin.tax_account) == 0)
+
+        self.epoch_id += count
+        self.epochs[self.epoch_id % 3].phase = Oracle.Phase.COMMIT
+        self.epochs[(self.epoch_id - 1) % 3].phase = Oracle.Phase.REVEAL
+        self.epochs[(self.epoch_id - 2) % 3].phase = Oracle.Phase.RECLAIM
+
+    # Python only: Return the hash of the commit entry |commit| of |sender|.
+    # The fields are hashed separately so that the hash of an entry is
+    # updated in O(1) when the phase or the level changes. The entry is in
+    # the Epoch object at |commit.epoch_id| % 3.
+    def commit_hash(self, sender, commit):
+        (deposit_hash, oracle_level_hash, phase_hash, epoch_id_hash) = (
+            commit_field_hashes(commit.epoch_id % 3, sender))
+        return (entry_hash("commit", commit.epoch_id % 3, sender,
+                           commit.hash) +
+                deposit_hash * commit.deposit +
+                oracle_level_hash * commit.oracle_level +
+                phase_hash * commit.phase +
+                epoch_id_hash * commit.epoch_id)
+
+    # Python only: Update |commits_hash| after the |field| of the commit entry
+    # |commit| of |sender| increased by |delta|. |field| is the index of the
+    # field in commit_field_hashes().
+    def rehash_commit(self, sender, commit, field, delta):
+        if self.commits_hash is not None:
+            self.commits_hash += commit_field_hashes(
+                commit.epoch_id % 3, sender)[field] * delta
+
+    # Python only: Return the state hash of the oracle. The commit entries
+    # are hashed incrementally. The votes are hashed on demand because there
+    # are only 3 * LEVEL_MAX of them. The deposit and reward accounts are
+    # hashed by ACB.state_hash().
+    def state_hash(self):
+        if self.commits_hash is None:
+            self.commits_hash = sum([
+                self.commit_hash(sender, commit) for epoch in self.epochs
+                for (sender, commit) in epoch.commits.items()])
+        state_hash = self.commits_hash + entry_hash("oracle", self.epoch_id)
+        for (epoch_index, epoch) in enumerate(self.epochs):
+            state_hash += entry_hash(
+                "epoch", epoch_index, epoch.phase, epoch.reward_total,
+                tuple([(vote.deposit, vote.count, vote.should_reclaim,
+                        vote.should_reward) for vote in epoch.votes]))
+        return state_hash % STATE_HASH_MODULUS
+
     # Return the oracle level that got the largest amount of deposited coins.
     # In other words, return the mode of the votes weighted by the deposited
     # coins.
@@ -891,6 +1551,28 @@ class Logging:
         self.vote_logs[epoch_id].reclaimed += reclaimed
         self.vote_logs[epoch_id].rewarded += rewarded
 
+    # Python only: Called when the oracle settles an epoch at once.
+    #
+    # Parameters
+    # ----------------
+    # |epoch_id|: The epoch ID.
+    # |settlements|: A dict from the voters to a tuple of the reclaimed coins
+    # and the reward.
+    #
+    # Returns
+    # ----------------
+    # None.
+    def settle(self, epoch_id, settlements):
+        self.ensure_logs(epoch_id)
+        vote_log = self.vote_logs[epoch_id]
+        for (reclaimed, rewarded) in settlements.values():
+            if reclaimed > 0:
+                vote_log.reclaim_succeeded += 1
+            if rewarded > 0:
+                vote_log.reward_succeeded += 1
+            vote_log.reclaimed += reclaimed
+            vote_log.rewarded += rewarded
+
     # Called when ACB.purchaseBonds is called.
     #
     # Parameters
@@ -1106,6 +1788,131 @@ class BondOperation:
 
         return (redeemed_bonds, expired_bonds)
 
+    # Python only.
+    #
+    # Decrease the total bond supply by redeeming all the bonds of the sender
+    # that can be redeemed now: the expired bonds, the bonds that hit their
+    # redemption epoch and, while |self.bond_budget| is negative, the bonds
+    # that have not yet hit their redemption epoch, nearest first. The result
+    # is the same as decrease_bond_supply() with all the redemption epochs of
+    # the sender in ascending order, but only the redeemed epochs are visited.
+    #
+    # Parameters
+    # ----------------
+    # |sender|: The sender account.
+    # |epoch_id|: The current epoch ID.
+    # |coin|: The JohnLawCoin contract.
+    #
+    # Returns
+    # ----------------
+    # A tuple of two values:
+    # - The number of redeemed bonds.
+    # - The number of expired bonds.
+    def decrease_bond_supply_all(self, sender, epoch_id, coin):
+        redemption_epochs = self.bond.redemption_epochs_in_range(
+            sender, None, epoch_id + 1)
+        budget = -self.bond_budget
+        if budget > 0:
+            for redemption_epoch in self.bond.redemption_epochs_in_range(
+                    sender, epoch_id + 1, None):
+                redemption_epochs.append(redemption_epoch)
+                budget -= self.bond.balance_of(sender, redemption_epoch)
+                if budget <= 0:
+                    break
+        return self.decrease_bond_supply(
+            sender, redemption_epochs, epoch_id, coin)
+
+    # Python only.
+    #
+    # Issue bonds to many senders in one pass. The requests are served in the
+    # given order. Each request gets as many of its bonds as the remaining
+    # |self.bond_budget| and the sender's coins allow, so a request can be
+    # partially filled or get nothing. The coins and the bonds are burned and
+    # minted with one bulk write each.
+    #
+    # Parameters
+    # ----------------
+    # |requests|: A list of (sender, count) pairs.
+    # |epoch_id|: The current epoch ID.
+    # |coin|: The JohnLawCoin contract.
+    #
+    # Returns
+    # ----------------
+    # A tuple of two values:
+    # - The redemption epoch of the issued bonds.
+    # - A list of the numbers of bonds issued to each request.
+    def increase_bond_supply_many(self, requests, epoch_id, coin):
+        redemption_epoch = epoch_id + BondOperation.BOND_REDEMPTION_PERIOD
+        counts = []
+        bond_amounts = {}
+        coin_amounts = {}
+        for (sender, count) in requests:
+            balance = coin.balance_of(sender) - coin_amounts.get(sender, 0)
+            count = max(min(count, self.bond_budget,
+                            balance // BondOperation.BOND_PRICE), 0)
+            counts.append(count)
+            if count == 0:
+                continue
+            self.bond_budget -= count
+            bond_amounts[sender] = bond_amounts.get(sender, 0) + count
+            coin_amounts[sender] = (coin_amounts.get(sender, 0) +
+                                    BondOperation.BOND_PRICE * count)
+        assert(self.bond_budget >= 0)
+
+        self.bond.mint_many(redemption_epoch, bond_amounts)
+        coin.burn_many(coin_amounts)
+        return (redemption_epoch, counts)
+
+    # Python only.
+    #
+    # Redeem bonds of many senders in one pass. The result is the same as
+    # calling decrease_bond_supply() for each request in the given order, so
+    # a negative |self.bond_budget| is consumed by the earlier requests
+    # first. The coins and the bonds are minted and burned with one bulk
+    # write each.
+    #
+    # Parameters
+    # ----------------
+    # |requests|: A list of (sender, redemption_epochs) pairs.
+    # |epoch_id|: The current epoch ID.
+    # |coin|: The JohnLawCoin contract.
+    #
+    # Returns
+    # ----------------
+    # A list of (redeemed bonds, expired bonds) tuples, one per request.
+    def decrease_bond_supply_many(self, requests, epoch_id, coin):
+        results = []
+        bond_amounts = {}
+        coin_amounts = {}
+        for (sender, redemption_epochs) in requests:
+            redeemed_bonds = 0
+            expired_bonds = 0
+            for redemption_epoch in redemption_epochs:
+                key = (sender, redemption_epoch)
+                count = (self.bond.balance_of(sender, redemption_epoch) -
+                         bond_amounts.get(key, 0))
+                if epoch_id < redemption_epoch:
+                    if self.bond_budget >= 0:
+                        continue
+                    if count > -self.bond_budget:
+                        count = -self.bond_budget
+                    self.bond_budget += count
+
+                if (epoch_id <
+                    redemption_epoch + BondOperation.BOND_REDEEMABLE_PERIOD):
+                    coin_amounts[sender] = (
+                        coin_amounts.get(sender, 0) +
+                        count * BondOperation.BOND_REDEMPTION_PRICE)
+                    redeemed_bonds += count
+                else:
+                    expired_bonds += count
+                bond_amounts[key] = bond_amounts.get(key, 0) + count
+            results.append((redeemed_bonds, expired_bonds))
+
+        coin.mint_many(coin_amounts)
+        self.bond.burn_many(bond_amounts)
+        return results
+
     # Update the bond budget to increase or decrease the total coin supply.
     #
     # Parameters
@@ -1125,7 +1932,7 @@ class BondOperation:
             self.bond_budget = 0
         elif delta > 0:
             # Increase the total coin supply.
-            count = int(delta / BondOperation.BOND_REDEMPTION_PRICE)
+            count = delta // BondOperation.BOND_REDEMPTION_PRICE
             if count <= bond_supply:
                 # If there are sufficient bonds to redeem, increase the total
                 # coin supply by redeeming bonds.
@@ -1140,7 +1947,7 @@ class BondOperation:
         else:
             assert(delta < 0)
             # Issue new bonds to decrease the total coin supply.
-            self.bond_budget = int(-delta / BondOperation.BOND_PRICE)
+            self.bond_budget = -delta // BondOperation.BOND_PRICE
             assert(self.bond_budget >= 0)
 
         assert(bond_supply + self.bond_budget >= 0)
@@ -1253,10 +2060,16 @@ class OpenMarketOperation:
     # - The amount of JLC to be exchanged.
     def increase_coin_supply(self, requested_eth_amount, elapsed_time):
         assert(self.coin_budget > 0)
-        
+        return self.increase_coin_supply_at_price(
+            requested_eth_amount, self.get_current_price(elapsed_time))
+
+    # Python only: The rest of increase_coin_supply() with |price| already
+    # calculated by get_current_price().
+    def increase_coin_supply_at_price(self, requested_eth_amount, price):
+        assert(self.coin_budget > 0)
+
         # Calculate the amount of JLC and ETH to be exchanged.
-        price = self.get_current_price(elapsed_time)
-        coin_amount = int(requested_eth_amount / price)
+        coin_amount = requested_eth_amount // price
         if coin_amount > self.coin_budget:
             coin_amount = self.coin_budget
         eth_amount = coin_amount * price
@@ -1289,16 +2102,24 @@ class OpenMarketOperation:
     def decrease_coin_supply(self, requested_coin_amount, elapsed_time,
                              eth_balance):
         assert(self.coin_budget < 0)
-        
+        return self.decrease_coin_supply_at_price(
+            requested_coin_amount, self.get_current_price(elapsed_time),
+            eth_balance)
+
+    # Python only: The rest of decrease_coin_supply() with |price| already
+    # calculated by get_current_price().
+    def decrease_coin_supply_at_price(self, requested_coin_amount, price,
+                                      eth_balance):
+        assert(self.coin_budget < 0)
+
         # Calculate the amount of JLC and ETH to be exchanged.
-        price = self.get_current_price(elapsed_time)
         coin_amount = requested_coin_amount
         if coin_amount >= -self.coin_budget:
             coin_amount = -self.coin_budget
-        eth_amount = int(coin_amount * price)
+        eth_amount = coin_amount * price
         if eth_amount >= eth_balance:
             eth_amount = eth_balance
-        coin_amount = int(eth_amount / price)
+        coin_amount = eth_amount // price
         
         if coin_amount > 0:
             self.latest_price = price
@@ -1321,24 +2142,32 @@ class OpenMarketOperation:
         if self.coin_budget > 0:
             price = self.start_price
             for i in range(
-                    min(int(elapsed_time /
-                            OpenMarketOperation.PRICE_CHANGE_INTERVAL),
+                    min(elapsed_time //
+                        OpenMarketOperation.PRICE_CHANGE_INTERVAL,
                         OpenMarketOperation.PRICE_CHANGE_MAX)):
-                price = int(price * (
-                    100 - OpenMarketOperation.PRICE_CHANGE_PERCENTAGE) / 100)
+                price = price * (
+                    100 - OpenMarketOperation.PRICE_CHANGE_PERCENTAGE) // 100
             if price == 0:
                 price = 1
             return price
         if self.coin_budget < 0:
             price = self.start_price
             for i in range(
-                    min(int(elapsed_time /
-                            OpenMarketOperation.PRICE_CHANGE_INTERVAL),
+                    min(elapsed_time //
+                        OpenMarketOperation.PRICE_CHANGE_INTERVAL,
                         OpenMarketOperation.PRICE_CHANGE_MAX)):
-                price = int(price * (
-                    100 + OpenMarketOperation.PRICE_CHANGE_PERCENTAGE) / 100)
+                price = price * (
+                    100 + OpenMarketOperation.PRICE_CHANGE_PERCENTAGE) // 100
             return price
         return 0
+
+    # Python only: Return the index of the price interval |elapsed_time| falls
+    # in. get_current_price() returns the same price for the same index as
+    # long as the coin budget does not change its sign.
+    def get_price_interval(self, elapsed_time):
+        return max(min(elapsed_time //
+                       OpenMarketOperation.PRICE_CHANGE_INTERVAL,
+                       OpenMarketOperation.PRICE_CHANGE_MAX), 0)
     
     # Update the coin budget. The coin budget indicates how many coins should
     # be added to / removed from the total coin supply; i.e., the amount of JLC
@@ -1357,8 +2186,8 @@ class OpenMarketOperation:
             if self.coin_budget > 0:
                 # If no exchange was observed in the previous epoch,
                 # the price setting was too high. Lower the price.
-                self.latest_price = int(
-                    self.latest_price /
+                self.latest_price = (
+                    self.latest_price //
                     OpenMarketOperation.PRICE_MULTIPLIER) + 1
             elif self.coin_budget < 0:
                 # If no exchange was observed in the previous epoch,
@@ -1377,8 +2206,8 @@ class OpenMarketOperation:
         elif self.coin_budget == 0:
             self.start_price = 0
         else:
-            self.start_price = int(
-                self.latest_price /
+            self.start_price = (
+                self.latest_price //
                 OpenMarketOperation.PRICE_MULTIPLIER) + 1
 
         
@@ -1401,6 +2230,18 @@ class EthPool:
     def decrease_eth(self, receiver, eth_amount):
         assert(self.eth_balance >= eth_amount)
         self.eth_balance -= eth_amount
+
+    # Python only: Decrease ETH and send it to many receivers at once.
+    # |eth_amounts| is a dict from the receivers to the amounts.
+    def decrease_eth_many(self, eth_amounts):
+        eth_amount = sum(eth_amounts.values())
+        assert(self.eth_balance >= eth_amount)
+        self.eth_balance -= eth_amount
+
+    # Python only: Return the state hash of the pool, whose only entry is the
+    # ETH balance.
+    def state_hash(self):
+        return entry_hash("eth_pool") * self.eth_balance % STATE_HASH_MODULUS
     
 
 #------------------------------------------------------------------------------
@@ -1585,66 +2426,13 @@ class ACB:
         if timestamp >= self.current_epoch_start + ACB.EPOCH_DURATION:
             # Start a new epoch.
             epoch_updated = True
-            self.current_epoch_start = timestamp
-
-            # Advance to the next epoch. Provide the |tax| coins to the oracle
-            # as a reward.
-            tax = self.coin.balance_of(self.coin.tax_account)
-            burned = self.oracle.advance(self.coin)
-            
-            # Reset the tax account address just in case.
-            self.coin.reset_tax_account()
-            assert(self.coin.balance_of(self.coin.tax_account) == 0)
-
-            delta = 0
-            self.oracle_level = self.oracle.get_mode_level()
-            if self.oracle_level != Oracle.LEVEL_MAX:
-                assert(0 <= self.oracle_level and
-                       self.oracle_level < Oracle.LEVEL_MAX)
-                # Translate the oracle level to the exchange rate.
-                exchange_rate = ACB.LEVEL_TO_EXCHANGE_RATE[self.oracle_level]
-
-                # Calculate the amount of coins to be minted or burned based on
-                # the Quantum Theory of Money. If the exchange rate is 1.1
-                # (i.e., 1 coin = 1.1 USD), the total coin supply is increased
-                # by 10%. If the exchange rate is 0.8 (i.e., 1 coin = 0.8 USD),
-                # the total coin supply is decreased by 20%.
-                delta = int(self.coin.total_supply *
-                            (exchange_rate - ACB.EXCHANGE_RATE_DIVISOR) /
-                            ACB.EXCHANGE_RATE_DIVISOR)
-
-                # To avoid increasing or decreasing too many coins in one epoch,
-                # multiply the damping factor.
-                delta = int(delta * ACB.DAMPING_FACTOR / 100)
-
-            # Update the bond budget.
-            epoch_id = self.oracle.epoch_id
-            mint = self.bond_operation.update_bond_budget(delta, epoch_id)
-
-            # Update the coin budget.
-            if self.oracle_level == 0 and delta < 0:
-                assert(mint == 0)
-                self.open_market_operation.update_coin_budget(delta)
-            else:
-                self.open_market_operation.update_coin_budget(mint)
-
-            self.logging.update_epoch(
-                epoch_id, mint, burned, delta, self.coin.total_supply,
-                self.oracle_level, self.current_epoch_start, tax)
-            self.logging.update_bond_budget(
-                epoch_id, self.bond_operation.bond_budget,
-                self.bond_operation.bond.total_supply,
-                self.bond_operation.valid_bond_supply(epoch_id))
-            self.logging.update_coin_budget(
-                epoch_id, self.open_market_operation.coin_budget,
-                self.eth_pool.eth_balance,
-                self.open_market_operation.latest_price)
+            self.advance_epoch(timestamp)
 
         # Commit.
         #
         # The voter needs to deposit the DEPOSIT_RATE percentage of their coin
         # balance.
-        deposited = int(self.coin.balance_of(sender) * ACB.DEPOSIT_RATE / 100)
+        deposited = self.coin.balance_of(sender) * ACB.DEPOSIT_RATE // 100
         if hash == ACB.NULL_HASH:
             deposited = 0
         assert(deposited >= 0)
@@ -1664,6 +2452,122 @@ class ACB:
         return (commit_result, reveal_result, deposited, reclaimed, rewarded,
                 epoch_updated)
 
+    # Start a new epoch. Called by vote() when the first vote of the epoch
+    # comes in.
+    #
+    # Parameters
+    # ----------------
+    # |timestamp|: The timestamp when the new epoch starts.
+    #
+    # Returns
+    # ----------------
+    # None.
+    def advance_epoch(self, timestamp):
+        self.current_epoch_start = timestamp
+
+        # Python only: The balances change in the next epoch from here on.
+        self.coin.advance_history(self.oracle.epoch_id + 1)
+        self.bond_operation.bond.advance_history(self.oracle.epoch_id + 1)
+
+        # Advance to the next epoch. Provide the |tax| coins to the oracle
+        # as a reward.
+        tax = self.coin.balance_of(self.coin.tax_account)
+        burned = self.oracle.advance(self.coin)
+        if self.oracle.settlements:
+            self.logging.settle(self.oracle.epoch_id, self.oracle.settlements)
+
+        # Reset the tax account address just in case.
+        self.coin.reset_tax_account()
+        assert(self.coin.balance_of(self.coin.tax_account) == 0)
+
+        delta = 0
+        self.oracle_level = self.oracle.get_mode_level()
+        if self.oracle_level != Oracle.LEVEL_MAX:
+            assert(0 <= self.oracle_level and
+                   self.oracle_level < Oracle.LEVEL_MAX)
+            # Translate the oracle level to the exchange rate.
+            exchange_rate = ACB.LEVEL_TO_EXCHANGE_RATE[self.oracle_level]
+
+            # Calculate the amount of coins to be minted or burned based on
+            # the Quantum Theory of Money. If the exchange rate is 1.1
+            # (i.e., 1 coin = 1.1 USD), the total coin supply is increased
+            # by 10%. If the exchange rate is 0.8 (i.e., 1 coin = 0.8 USD),
+            # the total coin supply is decreased by 20%.
+            delta = truncated_div(
+                self.coin.total_supply *
+                (exchange_rate - ACB.EXCHANGE_RATE_DIVISOR),
+                ACB.EXCHANGE_RATE_DIVISOR)
+
+            # To avoid increasing or decreasing too many coins in one epoch,
+            # multiply the damping factor.
+            delta = truncated_div(delta * ACB.DAMPING_FACTOR, 100)
+
+        # Update the bond budget.
+        epoch_id = self.oracle.epoch_id
+        mint = self.bond_operation.update_bond_budget(delta, epoch_id)
+
+        # Update the coin budget.
+        if self.oracle_level == 0 and delta < 0:
+            assert(mint == 0)
+            self.open_market_operation.update_coin_budget(delta)
+        else:
+            self.open_market_operation.update_coin_budget(mint)
+
+        self.logging.update_epoch(
+            epoch_id, mint, burned, delta, self.coin.total_supply,
+            self.oracle_level, self.current_epoch_start, tax)
+        self.logging.update_bond_budget(
+            epoch_id, self.bond_operation.bond_budget,
+            self.bond_operation.bond.total_supply,
+            self.bond_operation.valid_bond_supply(epoch_id))
+        self.logging.update_coin_budget(
+            epoch_id, self.open_market_operation.coin_budget,
+            self.eth_pool.eth_balance,
+            self.open_market_operation.latest_price)
+
+    # Python only.
+    #
+    # Advance |n_epochs| epochs in which no one votes, purchases or redeems
+    # bonds, or purchases or sells coins. This has the same effect as starting
+    # each epoch at its earliest timestamp with no other operations, except
+    # that the last epoch starts at the current timestamp.
+    #
+    # The first three empty epochs still settle the votes, deposits, tax and
+    # coin budget left by the previous epochs. After that, all the three
+    # Epoch objects of the oracle are empty, the oracle level is LEVEL_MAX and
+    # the bond and coin budgets are zero, so every additional empty epoch only
+    # advances the epoch ID. Those epochs are skipped in O(1) and are not
+    # logged.
+    #
+    # Parameters
+    # ----------------
+    # |n_epochs|: The number of epochs to advance. The current timestamp must
+    # be at least |n_epochs| * EPOCH_DURATION after the start of the current
+    # epoch.
+    #
+    # Returns
+    # ----------------
+    # None.
+    def fast_forward(self, n_epochs):
+        assert(n_epochs >= 0)
+        if n_epochs == 0:
+            return
+        timestamp = self.get_timestamp()
+        assert(timestamp >=
+               self.current_epoch_start + n_epochs * ACB.EPOCH_DURATION)
+
+        settled = min(n_epochs - 1, 3)
+        for i in range(settled):
+            self.advance_epoch(self.current_epoch_start + ACB.EPOCH_DURATION)
+        skipped = n_epochs - 1 - settled
+        if skipped > 0:
+            assert(self.oracle_level == Oracle.LEVEL_MAX)
+            assert(self.bond_operation.bond_budget == 0)
+            assert(self.open_market_operation.coin_budget == 0)
+            self.oracle.skip_empty_epochs(self.coin, skipped)
+            self.current_epoch_start += skipped * ACB.EPOCH_DURATION
+        self.advance_epoch(timestamp)
+
     # Purchase bonds.
     #
     # Parameters
@@ -1699,6 +2603,67 @@ class ACB:
             self.oracle.epoch_id, redeemed_bonds, expired_bonds)
         return redeemed_bonds
 
+    # Python only.
+    #
+    # Purchase bonds for many senders with one bulk write and one log entry.
+    # See BondOperation.increase_bond_supply_many().
+    #
+    # Parameters
+    # ----------------
+    # |requests|: A list of (sender, count) pairs.
+    #
+    # Returns
+    # ----------------
+    # A tuple of two values:
+    # - The redemption epoch of the purchased bonds.
+    # - A list of the numbers of bonds purchased by each request.
+    def purchase_bonds_many(self, requests):
+        (redemption_epoch, counts) = (
+            self.bond_operation.increase_bond_supply_many(
+                requests, self.oracle.epoch_id, self.coin))
+        self.logging.purchase_bonds(self.oracle.epoch_id, sum(counts))
+        return (redemption_epoch, counts)
+
+    # Python only.
+    #
+    # Redeem bonds for many senders with one bulk write and one log entry.
+    # See BondOperation.decrease_bond_supply_many().
+    #
+    # Parameters
+    # ----------------
+    # |requests|: A list of (sender, redemption_epochs) pairs.
+    #
+    # Returns
+    # ----------------
+    # A list of the numbers of bonds redeemed by each request.
+    def redeem_bonds_many(self, requests):
+        results = self.bond_operation.decrease_bond_supply_many(
+            requests, self.oracle.epoch_id, self.coin)
+        self.logging.redeem_bonds(
+            self.oracle.epoch_id, sum([result[0] for result in results]),
+            sum([result[1] for result in results]))
+        return [result[0] for result in results]
+
+    # Python only.
+    #
+    # Redeem all the bonds of the sender that can be redeemed now. See
+    # BondOperation.decrease_bond_supply_all().
+    #
+    # Parameters
+    # ----------------
+    # |sender|: The sender account.
+    #
+    # Returns
+    # ----------------
+    # The number of successfully redeemed bonds.
+    def redeem_all_eligible(self, sender):
+        (redeemed_bonds, expired_bonds) = (
+            self.bond_operation.decrease_bond_supply_all(
+                sender, self.oracle.epoch_id, self.coin))
+        self.logging.redeem_bonds(
+            self.oracle.epoch_id, redeemed_bonds, expired_bonds)
+        return redeemed_bonds
+
     # Pay ETH and purchase JLC from the open market operation.
     #
     # Parameters
@@ -1763,6 +2728,149 @@ class ACB:
 
         return (eth_amount, coin_amount)
 
+    # Python only.
+    #
+    # Clear many purchase_coins / sell_coins requests together. The requests
+    # are served in the given order and the fills are the same as calling
+    # purchase_coins() / sell_coins() one by one at the timestamps of the
+    # requests. Because the auction price only changes every
+    # PRICE_CHANGE_INTERVAL, the price is calculated once per interval. The
+    # coin balances, the EthPool and the logs are updated once per batch.
+    #
+    # Parameters
+    # ----------------
+    # |requests|: A list of (timestamp, sender, method, amount) tuples.
+    # |method| is "purchase_coins" or "sell_coins" and |amount| is the
+    # |requested_eth_amount| or the |requested_coin_amount| of the method. The
+    # timestamps must not decrease and must not be earlier than the current
+    # timestamp.
+    #
+    # Returns
+    # ----------------
+    # A list with one value per request: the (eth_amount, coin_amount) tuple
+    # the method would return, or None if the method would fail. The
+    # timestamp is set to the timestamp of the last request.
+    def exchange_coins_many(self, requests):
+        open_market_operation = self.open_market_operation
+        timestamp = self.get_timestamp()
+        prices = {}
+        fills = []
+        minted = {}
+        burned = {}
+        eth_in = 0
+        eth_out = {}
+        eth_balance = self.eth_pool.eth_balance
+        purchased = [0, 0]
+        sold = [0, 0]
+        for (request_timestamp, sender, method, amount) in requests:
+            assert(request_timestamp >= timestamp)
+            timestamp = request_timestamp
+            elapsed_time = timestamp - self.current_epoch_start
+            interval = open_market_operation.get_price_interval(elapsed_time)
+            if interval not in prices:
+                prices[interval] = open_market_operation.get_current_price(
+                    elapsed_time)
+            price = prices[interval]
+
+            if method == "purchase_coins":
+                if open_market_operation.coin_budget <= 0:
+                    fills.append(None)
+                    continue
+                (eth_amount, coin_amount) = (
+                    open_market_operation.increase_coin_supply_at_price(
+                        amount, price))
+                minted[sender] = minted.get(sender, 0) + coin_amount
+                eth_in += eth_amount
+                eth_balance += eth_amount
+                purchased[0] += eth_amount
+                purchased[1] += coin_amount
+            else:
+                assert(method == "sell_coins")
+                if (self.coin.balance_of(sender) + minted.get(sender, 0) -
+                    burned.get(sender, 0) < amount or
+                    open_market_operation.coin_budget >= 0):
+                    fills.append(None)
+                    continue
+                (eth_amount, coin_amount) = (
+                    open_market_operation.decrease_coin_supply_at_price(
+                        amount, price, eth_balance))
+                burned[sender] = burned.get(sender, 0) + coin_amount
+                eth_out[sender] = eth_out.get(sender, 0) + eth_amount
+                eth_balance -= eth_amount
+                sold[0] += eth_amount
+                sold[1] += coin_amount
+            fills.append((eth_amount, coin_amount))
+
+        self.coin.mint_many(minted)
+        self.coin.burn_many(burned)
+        self.logging.purchase_coins(self.oracle.epoch_id, *purchased)
+        self.logging.sell_coins(self.oracle.epoch_id, *sold)
+        self.eth_pool.increase_eth(eth_in)
+        self.eth_pool.decrease_eth_many(eth_out)
+        self.set_timestamp(timestamp)
+        return fills
+
+    # Python only.
+    #
+    # Start recording the history of the coin balances and the bonds from
+    # the current epoch so that JohnLawCoin.balance_of_at(),
+    # JohnLawBond.balance_of_at() and JohnLawBond.number_of_bonds_owned_by_at()
+    # answer the balances at past epochs. See LedgerHistory.
+    #
+    # Parameters
+    # ----------------
+    # |retention|: The number of the past epochs to be kept. None keeps all
+    # the epochs.
+    #
+    # Returns
+    # ----------------
+    # None.
+    def record_history(self, retention=None):
+        self.coin.record_history(self.oracle.epoch_id, retention)
+        self.bond_operation.bond.record_history(self.oracle.epoch_id,
+                                                retention)
+
+    # Python only.
+    #
+    # Return the state hash of the ACB and its contracts. Two ACBs have the
+    # same state hash if and only if (with a negligible probability of
+    # collision) they have the same balances, bonds, commit entries, votes,
+    # ETH balance, budgets and prices. The timestamp, the logs and the
+    # constants are not included. The first call walks the ledgers to start
+    # maintaining their hashes. The later calls take O(LEVEL_MAX) time.
+    #
+    # Parameters
+    # ----------------
+    # None.
+    #
+    # Returns
+    # ----------------
+    # The state hash, an integer in [0, 2^256).
+    def state_hash(self):
+        # Hash the accounts with random names by their roles.
+        coin_hash = self.coin.state_hash()
+        accounts = [(self.coin.tax_account, "tax")]
+        for (epoch_index, epoch) in enumerate(self.oracle.epochs):
+            accounts.append((epoch.deposit_account, "deposit%d" % epoch_index))
+            accounts.append((epoch.reward_account, "reward%d" % epoch_index))
+        for (account, role) in accounts:
+            coin_hash += (entry_hash("coin", ("role", role)) -
+                          entry_hash("coin", account)) * (
+                              self.coin.balance_of(account))
+
+        open_market_operation = self.open_market_operation
+        return (coin_hash +
+                self.bond_operation.bond.state_hash() +
+                self.oracle.state_hash() +
+                self.eth_pool.state_hash() +
+                entry_hash("acb", self.current_epoch_start, self.oracle_level,
+                           self.bond_operation.bond_budget,
+                           open_market_operation.coin_budget,
+                           open_market_operation.latest_price,
+                           open_market_operation.latest_price_updated,
+                           open_market_operation.start_price)) % (
+                               STATE_HASH_MODULUS)
+
     # Calculate a hash to be committed. Voters are expected to use this
     # function to create a hash used in the commit phase.
     #
@@ -1786,3 +2894,49 @@ class ACB:
     # Set the current timestamp in seconds to |timestamp|.
     def set_timestamp(self, timestamp):
         self.timestamp = timestamp
+
+
+# Python only: Create an ACB and its contracts with the given constants.
+#
+# Parameters
+# ----------------
+# |genesis_account|: The account the initial coins are minted to.
+# The rest are the same as the first 13 parameters of ACBSimulator in
+# acb_simulator.py.
+# |oracle_class|: The class of the Oracle contract.
+#
+# Returns
+# ----------------
+# The ACB.
+def create_acb(genesis_account,
+               bond_price,
+               bond_redemption_price,
+               bond_redemption_period,
+               bond_redeemable_period,
+               epoch_duration,
+               proportional_reward_rate,
+               deposit_rate,
+               damping_factor,
+               level_to_exchange_rate,
+               reclaim_threshold,
+               price_change_interval,
+               price_change_percentage,
+               price_multiplier,
+               oracle_class=Oracle):
+    coin = JohnLawCoin(genesis_account)
+    oracle = oracle_class()
+    bond_operation = BondOperation(JohnLawBond())
+    open_market_operation = OpenMarketOperation()
+    acb = ACB(coin, oracle, bond_operation, open_market_operation, EthPool(),
+              Logging())
+    oracle.override_constants_for_testing(
+        len(level_to_exchange_rate), reclaim_threshold,
+        proportional_reward_rate)
+    bond_operation.override_constants_for_testing(
+        bond_price, bond_redemption_price, bond_redemption_period,
+        bond_redeemable_period)
+    open_market_operation.override_constants_for_testing(
+        price_change_interval, price_change_percentage, price_multiplier)
+    acb.override_constants_for_testing(
+        epoch_duration, deposit_rate, damping_factor, level_to_exchange_rate)
+    return acb
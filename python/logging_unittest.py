@@ -151,6 +151,15 @@ class LoggingUnitTest(unittest.TestCase):
             self.assertEqual(vote_log.reclaimed, 10)
             self.assertEqual(vote_log.rewarded, 12)
 
+            logging.settle(epoch_id, {1: (5, 6), 2: (5, 0), 3: (0, 0)})
+            vote_log = logging.vote_logs[epoch_id]
+            self.assertEqual(vote_log.commit_succeeded, 4)
+            self.assertEqual(vote_log.deposited, 40)
+            self.assertEqual(vote_log.reclaim_succeeded, 4)
+            self.assertEqual(vote_log.reward_succeeded, 3)
+            self.assertEqual(vote_log.reclaimed, 20)
+            self.assertEqual(vote_log.rewarded, 18)
+
 
 def main():
     test = LoggingUnitTest()
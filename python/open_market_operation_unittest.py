@@ -72,14 +72,14 @@ class OpenMarketOperationUnitTest(unittest.TestCase):
         self.assertEqual(_operation.latest_price_updated, False)
         _operation.update_coin_budget(100)
         self.assertEqual(_operation.latest_price_updated, False)
-        latest_price = int(latest_price / self._price_multiplier) + 1
+        latest_price = (latest_price // self._price_multiplier) + 1
         self.assertEqual(_operation.latest_price, latest_price)
         self.assertEqual(_operation.start_price,
                          latest_price * self._price_multiplier)
         self.assertEqual(_operation.latest_price_updated, False)
         _operation.update_coin_budget(0)
         self.assertEqual(_operation.latest_price_updated, False)
-        latest_price = int(latest_price / self._price_multiplier) + 1
+        latest_price = (latest_price // self._price_multiplier) + 1
         self.assertEqual(_operation.latest_price, latest_price)
         self.assertEqual(_operation.start_price, 0)
         self.assertEqual(_operation.latest_price_updated, False)
@@ -92,14 +92,14 @@ class OpenMarketOperationUnitTest(unittest.TestCase):
         self.assertEqual(_operation.latest_price_updated, False)
         self.assertEqual(_operation.latest_price, latest_price)
         self.assertEqual(_operation.start_price,
-                         int(latest_price / self._price_multiplier) + 1)
+                         (latest_price // self._price_multiplier) + 1)
         self.assertEqual(_operation.latest_price_updated, False)
         _operation.update_coin_budget(-100)
         self.assertEqual(_operation.latest_price_updated, False)
         latest_price = latest_price * self._price_multiplier
         self.assertEqual(_operation.latest_price, latest_price)
         self.assertEqual(_operation.start_price,
-                         int(latest_price / self._price_multiplier) + 1)
+                         (latest_price // self._price_multiplier) + 1)
         self.assertEqual(_operation.latest_price_updated, False)
         _operation.update_coin_budget(100)
         self.assertEqual(_operation.latest_price_updated, False)
@@ -109,7 +109,7 @@ class OpenMarketOperationUnitTest(unittest.TestCase):
                          latest_price * self._price_multiplier)
         self.assertEqual(_operation.latest_price_updated, False)
         _operation.update_coin_budget(0)
-        latest_price = int(latest_price / self._price_multiplier) + 1
+        latest_price = (latest_price // self._price_multiplier) + 1
         self.assertEqual(_operation.latest_price, latest_price)
         self.assertEqual(_operation.start_price, 0)
 
@@ -120,8 +120,8 @@ class OpenMarketOperationUnitTest(unittest.TestCase):
                 -100000000, -100, -100000000]:
             if not latest_price_updated:
                 if _operation.coin_budget > 0:
-                    latest_price = int(
-                        latest_price / self._price_multiplier) + 1
+                    latest_price = (
+                        latest_price // self._price_multiplier) + 1
                 elif _operation.coin_budget < 0:
                     latest_price = latest_price * self._price_multiplier
             _operation.update_coin_budget(updated_coin_budget)
@@ -131,8 +131,8 @@ class OpenMarketOperationUnitTest(unittest.TestCase):
             if updated_coin_budget > 0:
                 start_price = latest_price * self._price_multiplier
             elif updated_coin_budget < 0:
-                start_price = int(
-                    latest_price / self._price_multiplier) + 1
+                start_price = (
+                    latest_price // self._price_multiplier) + 1
             self.assertEqual(_operation.latest_price_updated, False)
             self.assertEqual(_operation.start_price, start_price)
             self.assertEqual(_operation.latest_price, latest_price)
@@ -159,8 +159,8 @@ class OpenMarketOperationUnitTest(unittest.TestCase):
                         self._price_change_interval * 2 - 1,
                         self._price_change_interval * 22]:
                     for requested_eth_amount in [
-                            0, 1, int(updated_coin_budget * start_price / 4),
-                            int(updated_coin_budget * start_price / 8),
+                            0, 1, updated_coin_budget * start_price // 4,
+                            updated_coin_budget * start_price // 8,
                             updated_coin_budget * start_price + 1]:
                         if coin_budget == 0:
                             with self.assertRaises(Exception):
@@ -169,17 +169,17 @@ class OpenMarketOperationUnitTest(unittest.TestCase):
                             continue
                         price = start_price
                         for i in range(
-                                min(int(elapsed_time /
-                                        self._price_change_interval),
+                                min(elapsed_time //
+                                        self._price_change_interval,
                                     self._price_change_max)):
-                            price = int(price * (
-                                100 - self._price_change_percentage) / 100)
+                            price = (price * (
+                                100 - self._price_change_percentage) // 100)
                         if price == 0:
                             price = 1
                         self.assertEqual(
                             _operation.get_current_price(elapsed_time), price)
                             
-                        coin_amount = int(requested_eth_amount / price)
+                        coin_amount = requested_eth_amount // price
                         if coin_amount > coin_budget:
                             coin_amount = coin_budget
                         eth_amount = coin_amount * price
@@ -203,8 +203,8 @@ class OpenMarketOperationUnitTest(unittest.TestCase):
                         self._price_change_interval * 2 - 1,
                         self._price_change_interval * 22]:
                     for requested_coin_amount in [
-                            0, 1, int(-updated_coin_budget / 4),
-                            int(-updated_coin_budget / 8),
+                            0, 1, -updated_coin_budget // 4,
+                            -updated_coin_budget // 8,
                             -updated_coin_budget + 1]:
                         if coin_budget == 0:
                             with self.assertRaises(Exception):
@@ -215,11 +215,11 @@ class OpenMarketOperationUnitTest(unittest.TestCase):
                         
                         price = start_price
                         for i in range(
-                                min(int(elapsed_time /
-                                        self._price_change_interval),
+                                min(elapsed_time //
+                                        self._price_change_interval,
                                     self._price_change_max)):
-                            price = int(price * (
-                                100 + self._price_change_percentage) / 100)
+                            price = (price * (
+                                100 + self._price_change_percentage) // 100)
                         self.assertEqual(
                             _operation.get_current_price(elapsed_time), price)
                             
@@ -229,7 +229,7 @@ class OpenMarketOperationUnitTest(unittest.TestCase):
                         eth_amount = int(coin_amount * price)
                         if eth_amount >= eth_balance:
                             eth_amount = eth_balance
-                        coin_amount = int(eth_amount / price)
+                        coin_amount = eth_amount // price
                         if coin_amount > 0:
                             latest_price = price
                             latest_price_updated = True
@@ -6,7 +6,8 @@
 # http://opensource.org/licenses/mit-license.php
 
 from johnlawcoin import *
-import unittest, random
+from acb_cache import parse_cache_arguments, run_simulation
+import copy, unittest, random
 
 class OracleSimulator(unittest.TestCase):
     def __init__(self, level_max, reclaim_threshold,
@@ -161,39 +162,55 @@ class OracleSimulator(unittest.TestCase):
                          deposit_total + tax)
 
         self._coin.mint(self._coin.tax_account, tax)
+        # The settlement mode pays out the same amounts at once.
+        settled_coin = copy.deepcopy(self._coin)
+        settled_oracle = copy.deepcopy(self._oracle)
+        settled_oracle.settle_on_advance = True
         burned = self._oracle.advance(self._coin)
         self.assertEqual(self._oracle.get_mode_level(), mode_level)
         self.assertEqual(burned, self._prev_tax)
+        self.assertEqual(settled_oracle.advance(settled_coin), burned)
+        self.assertEqual(settled_coin.total_supply, self._coin.total_supply)
         self._prev_tax = tax
 
         reclaim_total = 0
+        settled_total = 0
         for i in range(len(voters)):
             self.assertEqual(voters[i].address, i + 1)
+            reward = 0
+            reclaimed = 0
+            if (voters[i].revealed_correctly and
+                voters[i].oracle_level == mode_level):
+                self.assertNotEqual(mode_level, self._level_max)
+                if deposits[mode_level] > 0:
+                    reward += (
+                        (self._proportional_reward_rate * reward_total *
+                         voters[i].deposit) //
+                        (100 * deposits[mode_level]))
+                reward += (
+                    ((100 - self._proportional_reward_rate)
+                     * reward_total) //
+                    (100 * counts[mode_level]))
+                reclaimed = voters[i].deposit
+            elif (voters[i].revealed_correctly and
+                  mode_level - self._reclaim_threshold <=
+                  voters[i].oracle_level and
+                  voters[i].oracle_level <=
+                  mode_level + self._reclaim_threshold):
+                self.assertNotEqual(mode_level, self._level_max)
+                reclaimed = voters[i].deposit
+            self.assertEqual(
+                settled_oracle.settlements.get(voters[i].address, (0, 0)),
+                (reclaimed, reward))
+            self.assertEqual(settled_coin.balance_of(voters[i].address),
+                             reclaimed + reward)
+            self.assertEqual(settled_oracle.reclaim(
+                settled_coin, voters[i].address), (0, 0))
+            settled_total += reclaimed + reward
+
             voters[i].reclaimed = (random.randint(0, 99) < 95)
             if voters[i].reclaimed:
                 self.assertEqual(self._coin.balance_of(voters[i].address), 0)
-                reward = 0
-                reclaimed = 0
-                if (voters[i].revealed_correctly and
-                    voters[i].oracle_level == mode_level):
-                    self.assertNotEqual(mode_level, self._level_max)
-                    if deposits[mode_level] > 0:
-                        reward += int(
-                            (self._proportional_reward_rate * reward_total *
-                             voters[i].deposit) /
-                            (100 * deposits[mode_level]))
-                    reward += int(
-                        ((100 - self._proportional_reward_rate)
-                         * reward_total) /
-                        (100 * counts[mode_level]))
-                    reclaimed = voters[i].deposit
-                elif (voters[i].revealed_correctly and
-                      mode_level - self._reclaim_threshold <=
-                      voters[i].oracle_level and
-                      voters[i].oracle_level <=
-                      mode_level + self._reclaim_threshold):
-                    self.assertNotEqual(mode_level, self._level_max)
-                    reclaimed = voters[i].deposit
                 self.assertEqual(self._oracle.reclaim(
                     self._coin, voters[i].address), (reclaimed, reward))
                 reclaim_total += reclaimed + reward
@@ -209,25 +226,33 @@ class OracleSimulator(unittest.TestCase):
         self.assertEqual(deposit_to_reclaim + reward_total,
                          deposit_total + tax)
         burned = deposit_total + tax - reclaim_total
+        settled_burned = deposit_total + tax - settled_total
         tax = random.randint(0, 200)
         self._coin.mint(self._coin.tax_account, tax)
+        settled_coin.mint(settled_coin.tax_account, tax)
         self.assertEqual(self._oracle.advance(self._coin), burned)
+        self.assertEqual(settled_oracle.advance(settled_coin), settled_burned)
         self._prev_tax = tax
 
 
-def main():
+# Yield the arguments of the simulations run by main().
+def sweep_arguments():
     iteration = 1000
     for level_max in [2, 3, 4, 9]:
         for reclaim_threshold in range(0, level_max):
             for proportional_reward_rate in [0, 1, 90, 100]:
                 for voter_count in [0, 1, 100]:
-                    test = OracleSimulator(level_max,
-                                           reclaim_threshold,
-                                           proportional_reward_rate,
-                                           voter_count,
-                                           iteration)
-                    test.run()
-                    test.teardown()
+                    yield (level_max,
+                           reclaim_threshold,
+                           proportional_reward_rate,
+                           voter_count,
+                           iteration)
+
+
+def main():
+    (cache, seed) = parse_cache_arguments()
+    for arguments in sweep_arguments():
+        run_simulation(cache, OracleSimulator, arguments, seed)
 
 
 if __name__ == "__main__":
@@ -2180,11 +2180,11 @@ class OracleUnitTest(unittest.TestCase):
     def get_reward(self, reward_total, count):
         proportional_reward = 0
         if self._deposit > 0:
-            proportional_reward = int(
-                (self._proportional_reward_rate * reward_total) /
+            proportional_reward = (
+                (self._proportional_reward_rate * reward_total) //
                 (100 * count))
-        constant_reward = int(
-            ((100 - self._proportional_reward_rate) * reward_total) /
+        constant_reward = (
+            ((100 - self._proportional_reward_rate) * reward_total) //
             (100 * count))
         return proportional_reward + constant_reward
 
@@ -5,40 +5,188 @@
 # This software is released under the MIT License.
 # http://opensource.org/licenses/mit-license.php
 
-import glob, os, subprocess, sys, time
-
-def kill_ganache():
-    kill_command = [
-        "ps axf | grep ganache | grep -v grep |" +
-        "awk '{ print $1 }' | xargs kill -9"]
-    kill_proc = subprocess.Popen(
-        kill_command, shell=True, stdin=subprocess.DEVNULL,
-        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-    kill_proc.communicate()
-    # Remove tmp files generated by Truffle.
-    command = "rm -rf /tmp/tmp-*/* 2> /dev/null"
-    subprocess.run(command, shell=True)
-    command = "rm -rf /tmp/tmp-* 2> /dev/null"
-    subprocess.run(command, shell=True)
-    for file in glob.glob("/tmp/tmp-*/*"):
-        command = "rm -rf " + file + " 2> /dev/null"
-    subprocess.run(command, shell=True)
-    for file in glob.glob("/tmp/tmp-*"):
-        command = "rm -rf " + file + " 2> /dev/null"
-        subprocess.run(command, shell=True)
-
-def reset_network(voters):
-    # os.chdir(os.path.dirname(os.path.abspath(__file__)))
-    kill_ganache()
-    time.sleep(6)
-    network = subprocess.Popen(
-        "ganache-cli --port 8546 -l 1200000000 -a" + str(voters), shell=True,
-        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL)
-    time.sleep(6)
-
-def run_test(command):
-    print(command, file=sys.stderr)
-    subprocess.run(command, shell=True)
-    sys.stdout.flush()
-    kill_ganache()
+import json, os, queue, shutil, signal, socket, subprocess, sys, tempfile
+import threading, time, urllib.error, urllib.request
+
+# A ganache node managed by the test runners.
+#
+# The node listens on an ephemeral port so that multiple nodes can run in
+# parallel. Instead of sleeping for a fixed time, the node is considered
+# ready when it answers a JSON-RPC request. Instead of restarting the node
+# for every configuration, the node takes a snapshot when it becomes ready
+# and reverts to the snapshot before every configuration.
+class LocalNode:
+    # Start a node.
+    #
+    # Parameters
+    # ----------------
+    # |accounts|: The number of accounts the node creates.
+    # |timeout|: The seconds to wait until the node becomes ready.
+    def __init__(self, accounts, timeout=60):
+        self.accounts = accounts
+        self.port = 0
+        self.process = None
+        self.snapshot_id = None
+        self.db_path = tempfile.mkdtemp(prefix="ganache-")
+        # Retry a few times in case another process took the port between
+        # finding it and ganache binding it.
+        for attempt in range(3):
+            self.port = find_free_port()
+            self.process = subprocess.Popen(
+                ["ganache-cli", "--port", str(self.port),
+                 "--db", self.db_path, "-l", "1200000000",
+                 "-a", str(accounts)],
+                stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL, start_new_session=True)
+            if self.wait_until_ready(timeout):
+                self.snapshot_id = self.call("evm_snapshot")
+                return
+        self.stop()
+        raise RuntimeError("ganache-cli failed to start")
+
+    # Send a JSON-RPC request to the node and return the result.
+    def call(self, method, params=[]):
+        request = urllib.request.Request(
+            "http://127.0.0.1:%d" % self.port,
+            data=json.dumps({"jsonrpc": "2.0", "id": 1, "method": method,
+                             "params": params}).encode(),
+            headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=10) as response:
+            result = json.loads(response.read())
+        if "error" in result:
+            raise RuntimeError(method + ": " + str(result["error"]))
+        return result["result"]
+
+    # Poll the node with an exponential backoff until it answers.
+    #
+    # Returns
+    # ----------------
+    # True if the node became ready. False if the node exited.
+    def wait_until_ready(self, timeout):
+        deadline = time.time() + timeout
+        delay = 0.05
+        while self.process.poll() is None:
+            try:
+                self.call("eth_blockNumber")
+                return True
+            except (OSError, ValueError, urllib.error.URLError):
+                pass
+            if time.time() > deadline:
+                self.stop()
+                raise TimeoutError("ganache-cli did not become ready")
+            time.sleep(delay)
+            delay = min(delay * 2, 1)
+        return False
+
+    # Revert the node to the state when it became ready. A snapshot can be
+    # reverted only once, so take a new snapshot after reverting.
+    def revert(self):
+        assert(self.call("evm_revert", [self.snapshot_id]))
+        self.snapshot_id = self.call("evm_snapshot")
+
+    # Return the environment variables that point Truffle to this node. See
+    # the "test" and "upgrade_test" networks in truffle-config.js.
+    def env(self):
+        env = dict(os.environ)
+        env["GANACHE_PORT"] = str(self.port)
+        return env
+
+    # Stop the node and remove its database.
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            # ganache-cli may spawn child processes. Kill the process group.
+            os.killpg(self.process.pid, signal.SIGTERM)
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                os.killpg(self.process.pid, signal.SIGKILL)
+                self.process.wait()
+        shutil.rmtree(self.db_path, ignore_errors=True)
+
+def find_free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+# Run Truffle test commands in parallel. Each worker owns one LocalNode and
+# reuses it across the jobs it runs. The output of each job is printed when
+# the job finishes, followed by a report of the results and timings.
+#
+# Parameters
+# ----------------
+# |jobs|: A list of tuples of (command, accounts). |accounts| is the number of
+# accounts the node needs to have for the command.
+# |parallelism|: The number of jobs to run concurrently. Defaults to the
+# TEST_PARALLELISM environment variable, or the number of CPUs.
+#
+# Returns
+# ----------------
+# The number of failed jobs.
+def run_jobs(jobs, parallelism=None):
+    if parallelism is None:
+        parallelism = int(os.environ.get("TEST_PARALLELISM",
+                                         os.cpu_count() or 1))
+    pending = queue.Queue()
+    for index in range(len(jobs)):
+        pending.put(index)
+    results = [None] * len(jobs)
+    output_lock = threading.Lock()
+
+    def worker():
+        node = None
+        try:
+            while True:
+                try:
+                    index = pending.get_nowait()
+                except queue.Empty:
+                    return
+                (command, accounts) = jobs[index]
+                start = time.time()
+                try:
+                    if node and node.accounts == accounts:
+                        node.revert()
+                    else:
+                        if node:
+                            node.stop()
+                        node = None
+                        node = LocalNode(accounts)
+                    process = subprocess.run(
+                        command, shell=True, env=node.env(),
+                        stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                        stderr=subprocess.STDOUT, universal_newlines=True)
+                    passed = process.returncode == 0
+                    output = process.stdout
+                except Exception as error:
+                    passed = False
+                    output = str(error) + "\n"
+                    # Do not reuse a node that may be in a broken state.
+                    if node:
+                        node.stop()
+                        node = None
+                results[index] = (passed, time.time() - start)
+                with output_lock:
+                    print(command, file=sys.stderr)
+                    sys.stdout.write(output)
+                    sys.stdout.flush()
+        finally:
+            if node:
+                node.stop()
+
+    start = time.time()
+    threads = [threading.Thread(target=worker)
+               for i in range(max(1, min(parallelism, len(jobs))))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    failed = [index for index in range(len(jobs)) if not results[index][0]]
+    print("================", file=sys.stderr)
+    for index in failed:
+        print("FAILED: " + jobs[index][0], file=sys.stderr)
+    print("jobs=%d passed=%d failed=%d parallelism=%d "
+          "job_time=%.1fs wall_time=%.1fs" %
+          (len(jobs), len(jobs) - len(failed), len(failed), len(threads),
+           sum(result[1] for result in results), time.time() - start),
+          file=sys.stderr)
+    return len(failed)
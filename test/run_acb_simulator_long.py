@@ -5,7 +5,7 @@
 # This software is released under the MIT License.
 # http://opensource.org/licenses/mit-license.php
 
-import common
+import common, sys
 
 # Need 16 parameters:
 # - bond_price
@@ -25,73 +25,67 @@ import common
 # - iteration
 # - should_upgrade
 
+jobs = []
 for i in range(10):
-    command = ("truffle test --network testacb_simulator.js " +
+    command = ("truffle test --network test test/acb_simulator.js " +
                "'996 1000 12 2 604800 90 10 10 " +
                "[6, 7, 8, 9, 10, 11, 12, 13, 14] " +
                "1 28800 20 3 40 100 0'")
-    common.reset_network(41)
-    common.run_test(command)
+    jobs.append((command, 41))
 
-command = ("truffle test --network testacb_simulator.js " +
+command = ("truffle test --network test test/acb_simulator.js " +
            "'800 1000 12 2 604800 90 10 10 " +
            "[6, 7, 8, 9, 10, 11, 12, 13, 14] " +
            "1 28800 20 3 40 100 0'")
-common.reset_network(41)
-common.run_test(command)
+jobs.append((command, 41))
 
-command = ("truffle test --network testacb_simulator.js " +
+command = ("truffle test --network test test/acb_simulator.js " +
            "'996 1000 12 2 604800 90 10 10 " +
            "[2, 3, 4, 5, 6, 7, 8, 9, 10] " +
            "1 28800 20 3 40 100 0'")
-common.reset_network(41)
-common.run_test(command)
+jobs.append((command, 41))
 
-command = ("truffle test --network testacb_simulator.js " +
+command = ("truffle test --network test test/acb_simulator.js " +
            "'996 1000 12 2 604800 90 10 10 " +
            "[10, 11, 12, 13, 14, 15, 16, 17, 18] " +
            "1 28800 20 3 40 100 0'")
-common.reset_network(41)
-common.run_test(command)
+jobs.append((command, 41))
 
-command = ("truffle test --network testacb_simulator.js " +
+command = ("truffle test --network test test/acb_simulator.js " +
            "'996 1000 12 2 604800 90 10 90 " +
            "[6, 7, 8, 9, 10, 11, 12, 13, 14] " +
            "1 28800 20 3 40 100 0'")
-common.reset_network(41)
-common.run_test(command)
+jobs.append((command, 41))
 
-command = ("truffle test --network testacb_simulator.js " +
+command = ("truffle test --network test test/acb_simulator.js " +
            "'996 1000 12 2 604800 90 90 10 " +
            "[6, 7, 8, 9, 10, 11, 12, 13, 14] " +
            "1 28800 20 3 40 100 0'")
-common.reset_network(41)
-common.run_test(command)
+jobs.append((command, 41))
 
-command = ("truffle test --network testacb_simulator.js " +
+command = ("truffle test --network test test/acb_simulator.js " +
            "'996 1000 12 2 604800 10 10 10 " +
            "[6, 7, 8, 9, 10, 11, 12, 13, 14] " +
            "1 28800 20 3 40 100 0'")
-common.reset_network(41)
-common.run_test(command)
+jobs.append((command, 41))
 
-command = ("truffle test --network testacb_simulator.js " +
+command = ("truffle test --network test test/acb_simulator.js " +
            "'996 1000 1 2 604800 90 10 10 " +
            "[6, 7, 8, 9, 10, 11, 12, 13, 14] " +
            "1 28800 20 3 40 100 0'")
-common.reset_network(41)
-common.run_test(command)
+jobs.append((command, 41))
 
-command = ("truffle test --network testacb_simulator.js " +
+command = ("truffle test --network test test/acb_simulator.js " +
            "'996 1000 1 2 604800 90 10 10 " +
            "[6, 7, 8, 9, 10, 11, 12, 13, 14] " +
            "1 28800 60 3 40 100 0'")
-common.reset_network(41)
-common.run_test(command)
+jobs.append((command, 41))
 
-command = ("truffle test --network testacb_simulator.js " +
+command = ("truffle test --network test test/acb_simulator.js " +
            "'996 1000 1 2 604800 90 10 10 " +
            "[6, 7, 8, 9, 10, 11, 12, 13, 14] " +
            "1 28800 20 1 40 100 0'")
-common.reset_network(41)
-common.run_test(command)
+jobs.append((command, 41))
+
+if common.run_jobs(jobs):
+    sys.exit(1)
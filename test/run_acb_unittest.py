@@ -5,7 +5,7 @@
 # This software is released under the MIT License.
 # http://opensource.org/licenses/mit-license.php
 
-import common
+import common, sys
 
 # Need 14 parameters:
 # - bond_price
@@ -23,10 +23,10 @@ import common
 # - price_change_percentage
 # - start_price_multiplier
 
-common.reset_network(8)
+jobs = []
 command = ("truffle test --network test test/acb_unittest.js " +
            "'996 1000 12 2 604800 90 10 10 [1, 11, 20] 1 12345 28800 20 3'")
-common.run_test(command)
+jobs.append((command, 8))
 
 for (bond_price, bond_redemption_price) in [(996, 1000)]:
     for bond_redemption_period in [1, 12]:
@@ -62,5 +62,7 @@ for (bond_price, bond_redemption_price) in [(996, 1000)]:
                                         str(price_change_interval) + " " +
                                         str(price_change_percentage) + " " +
                                         str(start_price_multiplier) + "'")
-                                    common.reset_network(8)
-                                    common.run_test(command)
+                                    jobs.append((command, 8))
+
+if common.run_jobs(jobs):
+    sys.exit(1)
@@ -5,7 +5,7 @@
 # This software is released under the MIT License.
 # http://opensource.org/licenses/mit-license.php
 
-import common
+import common, sys
 
 # Need 16 parameters:
 # - bond_price
@@ -25,11 +25,11 @@ import common
 # - iteration
 # - should_upgrade
 
-common.reset_network(41)
+jobs = []
 command = ("truffle test --network upgrade_test test/acb_simulator.js " +
            "'996 1000 12 2 604800 90 10 10 [6, 7, 8, 9, 10, 11, 12, 13, 14] " +
            "1 28800 20 3 40 30 1'")
-common.run_test(command)
+jobs.append((command, 41))
 
 iteration = 30
 for (bond_price, bond_redemption_price) in [(996, 1000)]:
@@ -69,5 +69,7 @@ for (bond_price, bond_redemption_price) in [(996, 1000)]:
                                             str(start_price_multiplier) + " " +
                                             str(voter_count) + " " +
                                             str(iteration) + " 1'")
-                                        common.reset_network(voter_count + 1)
-                                        common.run_test(command)
+                                        jobs.append((command, voter_count + 1))
+
+if common.run_jobs(jobs):
+    sys.exit(1)
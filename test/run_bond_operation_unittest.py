@@ -5,7 +5,7 @@
 # This software is released under the MIT License.
 # http://opensource.org/licenses/mit-license.php
 
-import common
+import common, sys
 
 # Need 4 parameters:
 # - bond_price
@@ -13,10 +13,10 @@ import common
 # - bond_redemption_period
 # - bond_redeemable_period
 
-common.reset_network(8)
+jobs = []
 command = ("truffle test --network test test/bond_operation_unittest.js " +
            "'996 1000 12 2'")
-common.run_test(command)
+jobs.append((command, 8))
 
 for (bond_price, bond_redemption_price) in [(1, 3), (996, 1000), (1000, 1000)]:
     for bond_redemption_period in [1, 6, 12]:
@@ -28,5 +28,7 @@ for (bond_price, bond_redemption_price) in [(1, 3), (996, 1000), (1000, 1000)]:
                 str(bond_redemption_price) + " " +
                 str(bond_redemption_period) + " " +
                 str(bond_redeemable_period) + "'")
-            common.reset_network(8)
-            common.run_test(command)
+            jobs.append((command, 8))
+
+if common.run_jobs(jobs):
+    sys.exit(1)
@@ -5,8 +5,11 @@
 # This software is released under the MIT License.
 # http://opensource.org/licenses/mit-license.php
 
-import common
+import common, sys
 
-common.reset_network(8)
+jobs = []
 command = ("truffle test --network test test/logging_unittest.js")
-common.run_test(command)
+jobs.append((command, 8))
+
+if common.run_jobs(jobs):
+    sys.exit(1)
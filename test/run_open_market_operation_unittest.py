@@ -5,17 +5,17 @@
 # This software is released under the MIT License.
 # http://opensource.org/licenses/mit-license.php
 
-import common
+import common, sys
 
 # Need 3 parameters:
 # - price_change_interval
 # - price_change_percentage
 # - start_price_multiplier
 
-common.reset_network(8)
+jobs = []
 command = ("truffle test --network test " +
            "test/open_market_operation_unittest.js '28800 15 3'")
-common.run_test(command)
+jobs.append((command, 8))
 
 for price_change_interval in [1, 8 * 60 * 60]:
     for price_change_percentage in [0, 1, 15, 50, 99, 100]:
@@ -26,5 +26,7 @@ for price_change_interval in [1, 8 * 60 * 60]:
                 str(price_change_interval) + " " +
                 str(price_change_percentage) + " " +
                 str(start_price_multiplier) + "'")
-            common.reset_network(8)
-            common.run_test(command)
+            jobs.append((command, 8))
+
+if common.run_jobs(jobs):
+    sys.exit(1)
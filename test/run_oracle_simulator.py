@@ -5,7 +5,7 @@
 # This software is released under the MIT License.
 # http://opensource.org/licenses/mit-license.php
 
-import common
+import common, sys
 
 # Need 5 parameters:
 # - level_max
@@ -14,10 +14,10 @@ import common
 # - voter_count
 # - iteration
 
-common.reset_network(11)
+jobs = []
 command = ("truffle test --network test test/oracle_simulator.js " +
            "'5 1 90 10 10'")
-common.run_test(command)
+jobs.append((command, 11))
 
 iteration = 40
 for level_max in [2, 4, 9]:
@@ -32,5 +32,7 @@ for level_max in [2, 4, 9]:
                     str(proportional_reward_rate) + " " +
                     str(voter_count) + " " +
                     str(iteration) + "'")
-                common.reset_network(voter_count + 1)
-                common.run_test(command)
+                jobs.append((command, voter_count + 1))
+
+if common.run_jobs(jobs):
+    sys.exit(1)
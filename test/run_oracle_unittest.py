@@ -5,7 +5,7 @@
 # This software is released under the MIT License.
 # http://opensource.org/licenses/mit-license.php
 
-import common
+import common, sys
 
 # Need 7 parameters:
 # - level_max
@@ -16,10 +16,10 @@ import common
 # - mode_level
 # - other_level
 
-common.reset_network(8)
+jobs = []
 command = ("truffle test --network test test/oracle_unittest.js " +
            "'5 1 90 100 20 2 0'")
-common.run_test(command)
+jobs.append((command, 8))
 
 for level_max in [2, 4, 9]:
     for reclaim_threshold in [0, 1, level_max - 1]:
@@ -42,5 +42,7 @@ for level_max in [2, 4, 9]:
                                 str(deposit) + " " +
                                 str(mode_level) + " " +
                                 str(other_level) + "'")
-                            common.reset_network(8)
-                            common.run_test(command)
+                            jobs.append((command, 8))
+
+if common.run_jobs(jobs):
+    sys.exit(1)
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2021 Kentaro Hara
+#
+# This software is released under the MIT License.
+# http://opensource.org/licenses/mit-license.php
+
+# Record ACBSimulator runs of the Python model with a few seeds and replay
+# them against the contracts with test/trace_replay.js.
+
+import common, os, subprocess, sys, tempfile
+
+trace_dir = tempfile.mkdtemp(prefix="acb-trace-")
+acb_trace = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         "..", "python", "acb_trace.py")
+voter_count = 40
+
+jobs = []
+for seed in range(4):
+    path = os.path.join(trace_dir, "trace-%d.jsonl" % seed)
+    subprocess.run([sys.executable, acb_trace, "record", path,
+                    "--seed", str(seed), "--voters", str(voter_count)],
+                   stdout=subprocess.DEVNULL, check=True)
+    command = ("ACB_TRACE=" + path +
+               " truffle test --network test test/trace_replay.js")
+    jobs.append((command, voter_count + 1))
+
+if common.run_jobs(jobs):
+    sys.exit(1)
@@ -0,0 +1,206 @@
+// Copyright (c) 2021 Kentaro Hara
+//
+// This software is released under the MIT License.
+// http://opensource.org/licenses/mit-license.php
+
+// Replays a trace recorded by python/acb_trace.py against the contracts and
+// checks that every operation returns the same result as the Python model and
+// that the state matches at every checkpoint. See python/acb_trace.py for the
+// trace format.
+//
+// Usage:
+//   ACB_TRACE=/path/to/trace.jsonl truffle test --network test \
+//       test/trace_replay.js
+
+const { deployProxy } = require('@openzeppelin/truffle-upgrades');
+const fs = require('fs');
+
+const JohnLawCoin = artifacts.require("JohnLawCoin");
+const JohnLawBond = artifacts.require("JohnLawBond");
+const OracleForTesting = artifacts.require("OracleForTesting");
+const BondOperationForTesting = artifacts.require("BondOperationForTesting");
+const OpenMarketOperationForTesting =
+      artifacts.require("OpenMarketOperationForTesting");
+const EthPool = artifacts.require("EthPool");
+const Logging = artifacts.require("Logging");
+const ACBForTesting = artifacts.require("ACBForTesting");
+
+const NULL_HASH =
+      "0x0000000000000000000000000000000000000000000000000000000000000000";
+
+contract("TraceReplay", function (accounts) {
+  let path = process.env.ACB_TRACE;
+  assert.isTrue(path !== undefined, "ACB_TRACE is not set");
+  let lines = fs.readFileSync(path, "utf8").split("\n").filter(
+    line => line.length);
+  let header = JSON.parse(lines[0]);
+  let ops = lines.slice(1).map(line => JSON.parse(line));
+  console.log("trace: " + path + " seed=" + header.seed +
+              " accounts=" + header.accounts + " ops=" + ops.length);
+  assert.isTrue(header.accounts <= accounts.length);
+  replay_test(accounts, header.params, ops);
+});
+
+function replay_test(accounts,
+                     [_bond_price,
+                      _bond_redemption_price,
+                      _bond_redemption_period,
+                      _bond_redeemable_period,
+                      _epoch_duration,
+                      _proportional_reward_rate,
+                      _deposit_rate,
+                      _damping_factor,
+                      _level_to_exchange_rate,
+                      _reclaim_threshold,
+                      _price_change_interval,
+                      _price_change_percentage,
+                      _price_multiplier],
+                     ops) {
+  it("replay", async function () {
+    let _level_max = _level_to_exchange_rate.length;
+
+    let _coin = await deployProxy(JohnLawCoin, []);
+    let _bond = await deployProxy(JohnLawBond, []);
+    let _logging = await deployProxy(Logging, []);
+    let _oracle = await deployProxy(OracleForTesting, []);
+    let _bond_operation =
+        await deployProxy(BondOperationForTesting, [_bond.address]);
+    let _open_market_operation =
+        await deployProxy(OpenMarketOperationForTesting, []);
+    let _eth_pool = await deployProxy(EthPool, []);
+    let _acb = await deployProxy(
+      ACBForTesting, [_coin.address, _oracle.address,
+                      _bond_operation.address,
+                      _open_market_operation.address,
+                      _eth_pool.address,
+                      _logging.address]);
+
+    await _oracle.overrideConstants(_level_max, _reclaim_threshold,
+                                    _proportional_reward_rate);
+    await _bond_operation.overrideConstants(_bond_price,
+                                            _bond_redemption_price,
+                                            _bond_redemption_period,
+                                            _bond_redeemable_period);
+    await _open_market_operation.overrideConstants(_price_change_interval,
+                                                   _price_change_percentage,
+                                                   _price_multiplier);
+    await _acb.overrideConstants(_epoch_duration,
+                                 _deposit_rate,
+                                 _damping_factor,
+                                 _level_to_exchange_rate);
+
+    await _bond.transferOwnership(_bond_operation.address);
+    await _coin.transferOwnership(_acb.address);
+    await _bond_operation.transferOwnership(_acb.address);
+    await _open_market_operation.transferOwnership(_acb.address);
+    await _eth_pool.transferOwnership(_acb.address);
+    await _oracle.transferOwnership(_acb.address);
+    await _logging.transferOwnership(_acb.address);
+
+    // The operations are sent one by one because every operation depends on
+    // the state left by the previous one. The state is read only at
+    // checkpoints.
+    let start = Date.now();
+    for (let i = 0; i < ops.length; i++) {
+      let op = ops[i];
+      let where = "line " + (i + 2) + ": " + JSON.stringify(op);
+      if (op[0] == "checkpoint") {
+        await check_state(op[1], where);
+        continue;
+      }
+      if (op[0] == "set_coin") {
+        await _acb.setCoin(accounts[op[1]], op[2]);
+        continue;
+      }
+      await _acb.setTimestamp(op[1]);
+      let expected = op[op.length - 1];
+      let result;
+      try {
+        result = await apply(op);
+      } catch (e) {
+        if (e.toString().indexOf("revert") == -1) {
+          throw e;
+        }
+        result = "revert";
+      }
+      assert.deepEqual(result, expected, where);
+    }
+    let elapsed = (Date.now() - start) / 1000;
+    console.log("replayed " + ops.length + " operations in " +
+                elapsed.toFixed(1) + "s (" +
+                Math.round(ops.length / elapsed) + " ops/s)");
+
+    // Apply |op| and return its result in the trace format.
+    async function apply(op) {
+      let option = {from: accounts[op[2]]};
+      if (op[0] == "transfer") {
+        await _coin.transfer(accounts[op[3]], op[4], option);
+        return null;
+      }
+      if (op[0] == "vote") {
+        let hash = NULL_HASH;
+        if (op[3] !== null) {
+          hash = await _acb.encrypt(op[3], op[4], option);
+        }
+        let receipt = await _acb.vote(hash, op[5], op[6], option);
+        let args = receipt.logs.filter(e => e.event == 'VoteEvent')[0].args;
+        return [args.commit_result, args.reveal_result,
+                args.deposited.toNumber(), args.reclaimed.toNumber(),
+                args.rewarded.toNumber(), args.epoch_updated];
+      }
+      if (op[0] == "purchase_bonds") {
+        let receipt = await _acb.purchaseBonds(op[3], option);
+        let args =
+            receipt.logs.filter(e => e.event == 'PurchaseBondsEvent')[0].args;
+        return args.redemption_epoch.toNumber();
+      }
+      if (op[0] == "redeem_bonds") {
+        let receipt = await _acb.redeemBonds(op[3], option);
+        let args =
+            receipt.logs.filter(e => e.event == 'RedeemBondsEvent')[0].args;
+        return args.redeemed_bonds.toNumber();
+      }
+      if (op[0] == "purchase_coins") {
+        option.value = op[3];
+        let receipt = await _acb.purchaseCoins(option);
+        let args =
+            receipt.logs.filter(e => e.event == 'PurchaseCoinsEvent')[0].args;
+        return [args.eth_amount.toString(), args.coin_amount.toNumber()];
+      }
+      if (op[0] == "sell_coins") {
+        let receipt = await _acb.sellCoins(op[3], option);
+        let args =
+            receipt.logs.filter(e => e.event == 'SellCoinsEvent')[0].args;
+        return [args.eth_amount.toString(), args.coin_amount.toNumber()];
+      }
+      assert.fail("unknown operation: " + op[0]);
+    }
+
+    async function check_state(state, where) {
+      assert.equal((await _oracle.epoch_id_()).toNumber(), state.epoch_id,
+                   where + " epoch_id");
+      assert.equal((await _coin.totalSupply()).toNumber(), state.coin_supply,
+                   where + " coin_supply");
+      assert.equal((await _bond.totalSupply()).toNumber(), state.bond_supply,
+                   where + " bond_supply");
+      assert.equal((await _bond_operation.bond_budget_()).toNumber(),
+                   state.bond_budget, where + " bond_budget");
+      assert.equal((await _open_market_operation.coin_budget_()).toNumber(),
+                   state.coin_budget, where + " coin_budget");
+      assert.equal((await _acb.oracle_level_()).toNumber(),
+                   state.oracle_level, where + " oracle_level");
+      assert.equal(await web3.eth.getBalance(_eth_pool.address),
+                   state.eth_balance, where + " eth_balance");
+      assert.equal(
+        (await _open_market_operation.latest_price_()).toString(),
+        state.latest_price, where + " latest_price");
+      for (let i = 0; i < state.balances.length; i++) {
+        assert.equal((await _coin.balanceOf(accounts[i])).toNumber(),
+                     state.balances[i], where + " balance of " + i);
+        assert.equal(
+          (await _bond.numberOfBondsOwnedBy(accounts[i])).toNumber(),
+          state.bonds[i], where + " bonds of " + i);
+      }
+    }
+  });
+}
@@ -57,13 +57,14 @@ module.exports = {
     
      test: {
       host: "127.0.0.1",     // Localhost (default: none)
-      port: 8546,            // Standard Ethereum port (default: none)
+      // The test runners start ganache on an ephemeral port (test/common.py).
+      port: process.env.GANACHE_PORT || 8546,
       network_id: "*",       // Any network (default: none)
      },
     
      upgrade_test: {
       host: "127.0.0.1",     // Localhost (default: none)
-      port: 8546,            // Standard Ethereum port (default: none)
+      port: process.env.GANACHE_PORT || 8546,
       network_id: "*",       // Any network (default: none)
      },
     // Another network with more advanced options...